@@ -0,0 +1,472 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""抽象構文木を型付きの配列にまとめて保持するモジュール
+
+   ノードはArenaの中の番号で表し、種類(ast.NODE_CLASSESの添字)、行番号、
+   属性の値をそれぞれarrayに格納する。NodeListの子は子の配列の連続した範囲に置く。
+   属性の値は次のように符号化する。
+     0以上   : ノードの番号
+     UNSET   : 値が設定されていない
+     それ以外: リテラルの表の添字 i を -2 - i として格納する
+   リテラル(識別子の名前、数値、演算子の名前など)は表に1つずつまとめる。
+
+   既存の解析器からはview()で得られるビューを使う。ビューは対応するastのクラスを
+   継承しているので、isinstanceや属性の読み書きはそのまま使える。
+   ただし属性を読むたびにビューを作るので、ビューを渡した解析はオブジェクトの
+   構文木より遅い。意味解析はarena_analyzer.ArenaAnalyzerが配列を直接読んで行う。
+   walk()、find()、field()なども配列を直接読む(検査や計測に使う)。
+
+   型検査で式のノードに記録する型(exptype)は構文ではないので配列には入れず、
+   ノードの番号から型への辞書exptypesに持つ(tobytes()では直列化しない)。"""
+
+import sys
+import struct
+import marshal
+from array import array
+import ast
+
+UNSET = -1
+
+# ノードの種類の番号とクラスの対応
+NODE_CLASSES = [cls for cls in sorted(vars(ast).values(), key=lambda c: getattr(c, "__name__", ""))
+                if isinstance(cls, type) and issubclass(cls, ast.Node)]
+KIND_INDEX = dict((cls, i) for i, cls in enumerate(NODE_CLASSES))
+
+
+def value_fields(cls):
+    """clsの属性のうち、値の配列に格納するもの(行番号、式の型、NodeListの子以外)"""
+    return tuple(name for name in ast.field_names(cls) if name not in ("lineno", "exptype", "nodes"))
+
+
+FIELDS = [value_fields(cls) for cls in NODE_CLASSES]
+WIDTH = max(max(len(fields) for fields in FIELDS), 2)  # NodeListは(先頭, 個数)を格納する
+
+# 直列化の形式(ヘッダの後に各配列とリテラルの表が続く)
+HEADER = struct.Struct("<4sBiiiii")
+MAGIC = "ARNA"
+FORMAT_VERSION = 1
+BYTEORDER = 0 if sys.byteorder == "little" else 1
+
+
+def literal_key(value):
+    """リテラルの表の索引のキー(表がvalueを参照し続けるので、idは使い回されない)"""
+    if isinstance(value, (str, unicode, int, long)) or value is None:
+        return (type(value), value)
+    return (object, id(value))
+
+
+class Arena(object):
+
+    """抽象構文木のノードを配列で保持するアリーナ"""
+
+    def __init__(self):
+        self.kinds = array("B")
+        self.linenos = array("i")
+        self.fields = array("i")    # ノードごとにWIDTH個
+        self.children = array("i")  # NodeListの子のノードの番号
+        self.literals = []
+        self.literal_index = {}
+        self.exptypes = {}          # ノードの番号から式の型
+        self.root = UNSET
+
+    def __len__(self):
+        return len(self.kinds)
+
+    @classmethod
+    def from_tree(cls, tree):
+        """オブジェクトの構文木treeからアリーナを作る(根はroot)"""
+        arena = cls()
+        arena.root = arena.add_tree(tree)
+        return arena
+
+    # 書き込み
+    def literal(self, value):
+        """リテラルの表でのvalueの添字を返す。文字列と整数は同じ値を、
+           それ以外(名前に結び付けた宣言など)は同じオブジェクトを1つにまとめる"""
+        key = literal_key(value)
+        index = self.literal_index.get(key)
+        if index is None:
+            index = len(self.literals)
+            self.literals.append(value)
+            self.literal_index[key] = index
+        return index
+
+    def encode(self, value, memo=None):
+        """属性の値valueを値の配列に格納する整数に変換する"""
+        if getattr(value, "_arena", None) is self:
+            return value._index
+        if isinstance(value, ast.Node):
+            return self.add_tree(value, memo)
+        return -2 - self.literal(value)
+
+    def decode(self, ref):
+        if ref >= 0:
+            return self.view(ref)
+        return self.literals[-2 - ref]
+
+    def add_tree(self, node, memo=None):
+        """nodeとその子孫をアリーナに加え、nodeの番号を返す
+           同じノードを複数の場所から参照している構文木は、番号を共有させる
+
+           深い構文木でもPythonのスタックを使わないように、明示的なスタックで
+           行きがけ順にたどる。スタックには(値, 書き込み先の配列, 位置)を積む"""
+        if memo is None:
+            memo = {}
+        if isinstance(node, ast.ExternalDeclarationList):
+            node.resolve_lines()
+        kinds = self.kinds
+        linenos = self.linenos
+        fields = self.fields
+        children = self.children
+        root = array("i", [UNSET])
+        stack = [(node, root, 0)]
+        pop = stack.pop
+        push = stack.append
+        while stack:
+            value, target, position = pop()
+            if getattr(value, "_arena", None) is self:
+                target[position] = value._index
+                continue
+            if not isinstance(value, ast.Node):
+                target[position] = -2 - self.literal(value)
+                continue
+            index = memo.get(id(value))
+            if index is not None:
+                target[position] = index
+                continue
+
+            cls = type(value)
+            kind = KIND_INDEX[cls]
+            index = len(kinds)
+            memo[id(value)] = index
+            target[position] = index
+            kinds.append(kind)
+            linenos.append(getattr(value, "lineno", UNSET))
+            if getattr(value, "exptype", None) is not None:
+                self.exptypes[index] = value.exptype
+            start = len(fields)
+            fields.extend([UNSET] * WIDTH)
+
+            if isinstance(value, ast.NodeList):
+                # 子の範囲を先に確保しておき、子の番号は後から書き込む
+                nodes = value.nodes
+                first = len(children)
+                fields[start] = first
+                fields[start + 1] = len(nodes)
+                children.extend([UNSET] * len(nodes))
+                for i in range(len(nodes) - 1, -1, -1):
+                    push((nodes[i], children, first + i))
+            else:
+                names = FIELDS[kind]
+                for i in range(len(names) - 1, -1, -1):
+                    if hasattr(value, names[i]):
+                        push((getattr(value, names[i]), fields, start + i))
+        return root[0]
+
+    # 配列を直接読むための操作
+    def kind(self, index):
+        """index番のノードのastのクラスを返す"""
+        return NODE_CLASSES[self.kinds[index]]
+
+    def field(self, index, name):
+        """index番のノードの属性nameの値を返す(ノードはビューで返す)"""
+        fields = FIELDS[self.kinds[index]]
+        ref = self.fields[index * WIDTH + fields.index(name)]
+        if ref == UNSET:
+            raise AttributeError(name)
+        return self.decode(ref)
+
+    def field_refs(self, index):
+        """index番のノードの属性の値を、符号化したままのタプルで返す"""
+        start = index * WIDTH
+        return tuple(self.fields[start:start + len(FIELDS[self.kinds[index]])])
+
+    def children_of(self, index):
+        """index番のNodeListの子のノードの番号のリストを返す"""
+        start = self.fields[index * WIDTH]
+        return self.children[start:start + self.fields[index * WIDTH + 1]].tolist()
+
+    def walk(self, index=None):
+        """indexのノードとその子孫の番号を行きがけ順に返す(共有されたノードは一度だけ)"""
+        if index is None:
+            index = self.root
+        kinds = self.kinds
+        fields = self.fields
+        is_list = [issubclass(cls, ast.NodeList) for cls in NODE_CLASSES]
+        visited = set()
+        stack = [index]
+        while stack:
+            index = stack.pop()
+            if index in visited:
+                continue
+            visited.add(index)
+            yield index
+            start = index * WIDTH
+            if is_list[kinds[index]]:
+                first = fields[start]
+                refs = self.children[first:first + fields[start + 1]]
+            else:
+                refs = fields[start:start + WIDTH]
+            stack.extend(ref for ref in reversed(refs) if ref >= 0)
+
+    def find(self, cls):
+        """種類がclsのノードの番号のリストを返す(種類の配列を文字列として検索する)"""
+        code = chr(KIND_INDEX[cls])
+        kinds = self.kinds.tostring()
+        result = []
+        index = kinds.find(code)
+        while index >= 0:
+            result.append(index)
+            index = kinds.find(code, index + 1)
+        return result
+
+    # ビュー
+    def view(self, index):
+        """index番のノードのビューを返す"""
+        view = VIEW_CLASSES[self.kinds[index]].__new__(VIEW_CLASSES[self.kinds[index]])
+        view._arena = self
+        view._index = index
+        return view
+
+    def root_view(self):
+        return self.view(self.root)
+
+    def to_tree(self, index=None, memo=None):
+        """index番のノード以下をastのオブジェクトの構文木に戻す
+           add_tree()と同じく明示的なスタックでたどる"""
+        if index is None:
+            index = self.root
+        if memo is None:
+            memo = {}
+        literals = self.literals
+        root = [None]
+        stack = [(index, root, 0)]
+        pop = stack.pop
+        push = stack.append
+        while stack:
+            index, target, position = pop()
+            node = memo.get(index)
+            if node is not None:
+                place(target, position, node)
+                continue
+            cls = NODE_CLASSES[self.kinds[index]]
+            node = cls.__new__(cls)
+            memo[index] = node
+            place(target, position, node)
+            if self.linenos[index] != UNSET:
+                node.lineno = self.linenos[index]
+            if "exptype" in ast.field_names(cls):
+                node.exptype = self.exptypes.get(index)
+            if issubclass(cls, ast.NodeList):
+                refs = self.children_of(index)
+                node.nodes = [None] * len(refs)
+                for i in range(len(refs) - 1, -1, -1):
+                    push((refs[i], node.nodes, i))
+            else:
+                for name, ref in zip(FIELDS[self.kinds[index]], self.field_refs(index)):
+                    if ref == UNSET:
+                        continue
+                    if ref >= 0:
+                        push((ref, node, name))
+                    else:
+                        setattr(node, name, literals[-2 - ref])
+        return root[0]
+
+    # 直列化
+    def tobytes(self):
+        """アリーナ全体を1つのバイト列にする(リテラルは文字列と整数に限る)"""
+        literals = marshal.dumps(self.literals)
+        header = HEADER.pack(MAGIC, FORMAT_VERSION * 2 + BYTEORDER, self.root,
+                             len(self.kinds), len(self.children), len(literals), WIDTH)
+        return "".join([header, self.kinds.tostring(), self.linenos.tostring(),
+                        self.fields.tostring(), self.children.tostring(), literals])
+
+    @classmethod
+    def frombytes(cls, data):
+        magic, version, root, count, nchildren, nliterals, width = HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION * 2 + BYTEORDER or width != WIDTH:
+            raise ValueError("Incompatible arena data.")
+        arena = cls()
+        arena.root = root
+        pos = HEADER.size
+        for column, length in ((arena.kinds, count), (arena.linenos, count),
+                               (arena.fields, count * WIDTH), (arena.children, nchildren)):
+            size = length * column.itemsize
+            column.fromstring(data[pos:pos + size])
+            pos += size
+        arena.literals = marshal.loads(data[pos:pos + nliterals])
+        arena.index_literals()
+        return arena
+
+    def index_literals(self):
+        for i, value in enumerate(self.literals):
+            self.literal_index.setdefault(literal_key(value), i)
+
+    # pickleでは配列をバイト列のまま渡し、リテラルの表と式の型はpickleで直列化する
+    # (tobytes()と違い、宣言などの文字列や整数でないリテラルも直列化できる)
+    def __getstate__(self):
+        return (self.root, self.kinds.tostring(), self.linenos.tostring(),
+                self.fields.tostring(), self.children.tostring(), self.literals, self.exptypes)
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.root, kinds, linenos, fields, children, self.literals, self.exptypes = state
+        for column, data in ((self.kinds, kinds), (self.linenos, linenos),
+                             (self.fields, fields), (self.children, children)):
+            column.fromstring(data)
+        self.index_literals()
+
+
+def place(target, position, node):
+    """to_tree()で作ったnodeを、リストの位置positionか属性positionに置く"""
+    if isinstance(position, int):
+        target[position] = node
+    else:
+        setattr(target, position, node)
+
+
+# ビューのクラス
+
+def make_field_property(position, name):
+    def getter(self):
+        ref = self._arena.fields[self._index * WIDTH + position]
+        if ref == UNSET:
+            raise AttributeError(name)
+        return self._arena.decode(ref)
+
+    def setter(self, value):
+        self._arena.fields[self._index * WIDTH + position] = self._arena.encode(value)
+
+    return property(getter, setter)
+
+
+def get_lineno(self):
+    lineno = self._arena.linenos[self._index]
+    if lineno == UNSET:
+        raise AttributeError("lineno")
+    return lineno
+
+
+def set_lineno(self, value):
+    self._arena.linenos[self._index] = value
+
+
+def get_exptype(self):
+    return self._arena.exptypes.get(self._index)
+
+
+def set_exptype(self, value):
+    self._arena.exptypes[self._index] = value
+
+
+def get_nodes(self):
+    """子のビューのリスト(リストを書き換えてもアリーナには反映されない)"""
+    arena = self._arena
+    return [arena.decode(ref) for ref in arena.children_of(self._index)]
+
+
+def store_children(arena, index, refs, slack=0):
+    """index番のNodeListの子の範囲をrefsにする
+
+       子の範囲は連続していなければならない。今の範囲(とその後ろの空き)に収まれば
+       その場で上書きし、範囲が子の配列の末尾まで続いていればその場で伸ばす。
+       どちらでもなければ子の配列の末尾に置き直し、後ろにslack個の空き(UNSET)を付ける"""
+    children = arena.children
+    start = index * WIDTH
+    first, count = arena.fields[start], arena.fields[start + 1]
+    size = len(refs)
+    end = first + count
+    if count:
+        # 範囲の後ろの空きもこの範囲のもの(子のない範囲は、ほかの範囲と同じ位置を指しうる)
+        limit = min(first + size, len(children))
+        while end < limit and children[end] == UNSET:
+            end += 1
+    if count and first + size <= end:
+        children[first:first + size] = array("i", refs)
+        for i in range(first + size, first + count):
+            children[i] = UNSET
+    elif end == len(children):
+        del children[first:]
+        children.extend(refs)
+    else:
+        first = len(children)
+        children.extend(refs)
+        children.extend([UNSET] * slack)
+    arena.fields[start] = first
+    arena.fields[start + 1] = size
+
+
+def set_nodes(self, nodes):
+    arena = self._arena
+    store_children(arena, self._index, [arena.encode(node) for node in nodes])
+
+
+def view_append(self, node):
+    arena = self._arena
+    ref = arena.encode(node)
+    children = arena.children
+    start = self._index * WIDTH
+    first, count = arena.fields[start], arena.fields[start + 1]
+    end = first + count
+    if count and end < len(children) and children[end] == UNSET:
+        children[end] = ref
+    elif end == len(children):
+        children.append(ref)
+    else:
+        # 末尾に置き直すときは同じ数の空きを付けておくので、追加を繰り返しても
+        # 置き直すのは対数回で済む
+        refs = children[first:end].tolist()
+        refs.append(ref)
+        store_children(arena, self._index, refs, slack=len(refs))
+        return
+    arena.fields[start + 1] = count + 1
+
+
+def view_insert(self, index, node):
+    arena = self._arena
+    ref = arena.encode(node)
+    refs = arena.children_of(self._index)
+    refs.insert(index, ref)
+    store_children(arena, self._index, refs, slack=len(refs))
+
+
+def view_eq(self, other):
+    return getattr(other, "_arena", None) is self._arena and other._index == self._index
+
+
+def view_ne(self, other):
+    return not view_eq(self, other)
+
+
+def view_hash(self):
+    return hash((id(self._arena), self._index))
+
+
+def view_repr(self):
+    return "<{0} view #{1}>".format(type(self).__name__, self._index)
+
+
+def make_view_class(cls):
+    attrs = {
+        "__slots__": ("_arena", "_index"),
+        "__eq__": view_eq,
+        "__ne__": view_ne,
+        "__hash__": view_hash,
+        "__repr__": view_repr,
+    }
+    for position, name in enumerate(value_fields(cls)):
+        attrs[name] = make_field_property(position, name)
+    if "lineno" in ast.field_names(cls):
+        attrs["lineno"] = property(get_lineno, set_lineno)
+    if "exptype" in ast.field_names(cls):
+        attrs["exptype"] = property(get_exptype, set_exptype)
+    if issubclass(cls, ast.NodeList):
+        attrs["nodes"] = property(get_nodes, set_nodes)
+        attrs["append"] = view_append
+        attrs["insert"] = view_insert
+    # 名前はastのクラスと同じにしておく(構文木を表示・比較するコードがそのまま使える)
+    return type(cls.__name__, (cls,), attrs)
+
+
+VIEW_CLASSES = [make_view_class(cls) for cls in NODE_CLASSES]
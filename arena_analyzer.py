@@ -0,0 +1,355 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""アリーナ(arena.Arena)の配列を直接読んで意味解析を行うモジュール
+
+   Analyzer(check_types=True)にビューを渡すと、属性を読むたびにビューを作るので、
+   オブジェクトの構文木を解析するより2倍以上遅くなる。ArenaAnalyzerは、ノードの
+   ほとんどを占める関数定義の本体の文と式を、種類と属性の値の配列を明示的な
+   スタックでたどって名前解析と型検査を行う。名前に結び付けた宣言は属性の値の
+   配列に、式の型はexptypesに書き込む。結果と診断メッセージはAnalyzer(check_types=True)
+   で解析したときと同じになる。
+
+   - トップレベルの宣言、関数定義の名前とパラメータ、関数の中の変数宣言は数が
+     少ないので、ビューを渡してAnalyzerで解析する
+   - 診断メッセージを出す式も、ビューを渡してAnalyzerとTypeCheckerのメソッドで
+     検査する(メッセージを1か所にまとめておくため)。エラーのない式ではビューを作らない
+   - トレースを有効にしているときは、すべてをビューに対するAnalyzerで解析する"""
+
+import ast
+import arena
+import visitor
+import typetable
+import semantic_analyzer as sa
+
+WIDTH = arena.WIDTH
+KIND = arena.KIND_INDEX
+ADDRESS = KIND[ast.Address]
+ARGUMENTS = KIND[ast.ArgumentExpressionList]
+BINARY = KIND[ast.BinaryOperators]
+COMPOUND = KIND[ast.CompoundStatement]
+DECLARATIONS = KIND[ast.DeclarationList]
+EXPRESSION = KIND[ast.ExpressionStatement]
+FOR = KIND[ast.ForLoop]
+FUNCTION_DEFINITION = KIND[ast.FunctionDefinition]
+CALL = KIND[ast.FunctionExpression]
+IDENTIFIER = KIND[ast.Identifier]
+IF = KIND[ast.IfStatement]
+NULL = KIND[ast.NullNode]
+NUMBER = KIND[ast.Number]
+POINTER = KIND[ast.Pointer]
+RETURN = KIND[ast.ReturnStatement]
+STATEMENTS = KIND[ast.StatementList]
+WHILE = KIND[ast.WhileLoop]
+
+ARITHMETIC = ("PLUS", "TIMES", "DIVIDE")
+RELATIONAL = ("EQUAL", "NEQ", "LT", "GT", "LEQ", "GEQ")
+LOGICAL = ("AND", "OR")
+FUNCTION_KINDS = ("fun", "proto")
+
+
+def position(cls, name):
+    """clsのノードの属性nameが、値の配列で何番目にあるかを返す"""
+    return arena.value_fields(cls).index(name)
+
+
+COMPOUND_STATEMENT = position(ast.FunctionDefinition, "compound_statement")
+STATEMENT_LIST = position(ast.CompoundStatement, "statement_list")
+ELSE_STATEMENT = position(ast.IfStatement, "else_statement")
+
+
+class ArenaAnalyzer(object):
+
+    """アリーナの配列をたどって名前解析と型検査を行う解析器
+
+       envとdiagnosticsはAnalyzerと同じ。エラーの数はerror_count(名前解析)と
+       type_error_count(型検査)に、警告の数はwarning_countに数える"""
+
+    def __init__(self, stored, env=None, diagnostics=None):
+        self.arena = stored
+        self.analyzer = sa.Analyzer(None, check_types=True, env=env, diagnostics=diagnostics)
+        self.env = self.analyzer.env
+        self.checker = self.analyzer.checker
+
+    @property
+    def error_count(self):
+        return self.analyzer.error_count
+
+    @property
+    def type_error_count(self):
+        return self.checker.error_count
+
+    @property
+    def warning_count(self):
+        return self.analyzer.warning_count
+
+    def analyze(self, index=None):
+        """index番のExternalDeclarationList(省略したときは根)を解析して
+           (大域の環境, 取り除いた宣言のリスト)を返す"""
+        stored = self.arena
+        if index is None:
+            index = stored.root
+        if sa.TRACE.debug:
+            return self.analyzer.analyze(stored.view(index))
+        for node in stored.children_of(index):
+            if stored.kinds[node] == FUNCTION_DEFINITION:
+                self.analyze_function(node, 0)
+            else:
+                visitor.run(self.analyzer.visit(stored.view(node), 0, 0))
+        return self.env, self.env.deleted
+
+    def analyze_function(self, index, level):
+        """index番の関数定義を解析する(Analyzer.visit_FunctionDefinition()と同じ)"""
+        analyzer = self.analyzer
+        checker = self.checker
+        fields = self.arena.fields
+        funcdef = self.arena.view(index)
+        analyzer.define_function(funcdef, level)
+        checker.return_types = []
+        visitor.run(analyzer.visit(funcdef.function_declarator.parameter_type_list, level + 1, 0))
+        start = fields[index * WIDTH + COMPOUND_STATEMENT] * WIDTH
+        self.walk(fields[start], level + 2)
+        self.walk(fields[start + STATEMENT_LIST], level + 2)
+        checker.check_return(funcdef, checker.return_types)
+
+    def walk(self, index, level):
+        """index番のノード(関数定義の本体の文か式)とその子孫を解析し、
+           式なら式の型を返す
+
+           スタックには(ノードの番号, 入れ子の深さ, 段階)を積む。どのノードも
+           処理を終えると値のスタックに値(式の型、引数の型のリスト、文ならNone)を
+           1つ積み、親は後の段階でそれを取り出す"""
+        stored = self.arena
+        kinds = stored.kinds
+        fields = stored.fields
+        children = stored.children
+        literals = stored.literals
+        exptypes = stored.exptypes
+        literal = stored.literal
+        view = stored.view
+        env = self.env
+        lookup = env.lookup
+        analyzer = self.analyzer
+        checker = self.checker
+        return_types = checker.return_types
+        Decl = sa.Decl
+        INT = typetable.INT
+        INT_POINTER = typetable.INT_POINTER
+
+        values = []
+        push_value = values.append
+        pop_value = values.pop
+        stack = [(index, level, 0)]
+        push = stack.append
+        pop = stack.pop
+        while stack:
+            index, level, phase = pop()
+            if index < 0:
+                # ノードでない値(Analyzerでは何もしない)
+                push_value(None)
+                continue
+            kind = kinds[index]
+            start = index * WIDTH
+
+            if kind == IDENTIFIER:
+                name = literals[-2 - fields[start]]
+                if isinstance(name, Decl):
+                    decl = lookup(name.name)
+                elif isinstance(name, str):
+                    decl = lookup(name)
+                else:
+                    decl = None
+                if decl is None or decl.kind == "fun":
+                    push_value(analyzer.visit_Identifier(view(index), level, 0))
+                    continue
+                if isinstance(name, Decl):
+                    decl = name
+                elif decl.kind != "proto":
+                    fields[start] = -2 - literal(decl)
+                exptypes[index] = exptype = INT if decl.objtype is INT else INT_POINTER
+                push_value(exptype)
+
+            elif kind == NUMBER:
+                exptypes[index] = INT
+                push_value(INT)
+
+            elif kind == BINARY:
+                if phase == 0:
+                    push((index, level, 1))
+                    push((fields[start + 2], level, 0))
+                    push((fields[start + 1], level, 0))
+                    continue
+                right = pop_value()
+                left = pop_value()
+                op = literals[-2 - fields[start]]
+                target = fields[start + 1]
+                if target >= 0 and kinds[target] == IDENTIFIER:
+                    name = literals[-2 - fields[target * WIDTH]]
+                    if not isinstance(name, Decl):
+                        analyzer.check_assign_target(view(index))
+                    elif op == "ASSIGN":
+                        decl = lookup(name.name)
+                        if decl is None or decl.kind in FUNCTION_KINDS or decl.objtype.is_array:
+                            analyzer.check_assign_target(view(index))
+                exptype = exptypes.get(index)
+                if exptype is None:
+                    if op in ARITHMETIC:
+                        if left is INT and (right is INT or right is INT_POINTER):
+                            exptype = right
+                        elif left is INT_POINTER and right is INT:
+                            exptype = INT_POINTER
+                    elif op == "MINUS":
+                        if left is INT and right is INT:
+                            exptype = INT
+                    elif op == "ASSIGN":
+                        if left is right:
+                            exptype = left
+                    elif op in RELATIONAL:
+                        if left is right and left is not None:
+                            exptype = INT
+                    elif op in LOGICAL:
+                        if left is INT and right is INT:
+                            exptype = INT
+                    if exptype is None:
+                        exptype = checker.binary_type(view(index), left, right)
+                    if exptype is not None:
+                        exptypes[index] = exptype
+                push_value(exptype)
+
+            elif kind == EXPRESSION:
+                # 式文の値は式の型のまま(親の文のリストが捨てる)
+                push((fields[start], level, 0))
+
+            elif kind == STATEMENTS or kind == DECLARATIONS or kind == ARGUMENTS:
+                count = fields[start + 1]
+                if phase == 0:
+                    push((index, level, 1))
+                    first = fields[start]
+                    for i in range(first + count - 1, first - 1, -1):
+                        push((children[i], level, 0))
+                    continue
+                if kind == ARGUMENTS:
+                    arg_types = values[len(values) - count:]
+                    del values[len(values) - count:]
+                    push_value(arg_types)
+                else:
+                    del values[len(values) - count:]
+                    push_value(None)
+
+            elif kind == CALL:
+                target = fields[start]
+                if phase == 0:
+                    name = literals[-2 - fields[target * WIDTH]]
+                    decl = lookup(name) if isinstance(name, str) else None
+                    if decl is not None and decl.kind in FUNCTION_KINDS:
+                        fields[target * WIDTH] = -2 - literal(decl)
+                    else:
+                        analyzer.bind_function(view(index))
+                    push((index, level, 1))
+                    push((fields[start + 1], 0, 0))
+                    continue
+                arg_types = pop_value() or []
+                exptype = exptypes.get(index)
+                if exptype is None:
+                    name = literals[-2 - fields[target * WIDTH]]
+                    decl = name if isinstance(name, Decl) else lookup(name)
+                    arguments = fields[start + 1]
+                    if decl is not None and arguments >= 0 and kinds[arguments] == ARGUMENTS and \
+                            len(arg_types) == len(decl.objtype.params) and \
+                            all(a is p for a, p in zip(arg_types, decl.objtype.params)):
+                        exptype = decl.objtype.result
+                    else:
+                        exptype = checker.call_type(view(index), arg_types)
+                    if exptype is not None:
+                        exptypes[index] = exptype
+                push_value(exptype)
+
+            elif kind == ADDRESS or kind == POINTER:
+                if phase == 0:
+                    push((index, level, 1))
+                    push((fields[start], level, 0))
+                    continue
+                operand = pop_value()
+                if kind == ADDRESS:
+                    target = fields[start]
+                    decl = None
+                    if target >= 0 and kinds[target] == IDENTIFIER:
+                        name = literals[-2 - fields[target * WIDTH]]
+                        if isinstance(name, Decl):
+                            decl = lookup(name.name)
+                        elif isinstance(name, str):
+                            decl = lookup(name)
+                    if decl is None or decl.kind != "var":
+                        analyzer.check_address_operand(view(index))
+                exptype = exptypes.get(index)
+                if exptype is None:
+                    if kind == ADDRESS:
+                        if operand is INT:
+                            exptype = INT_POINTER
+                        else:
+                            exptype = checker.address_type(view(index), operand)
+                    elif operand is INT_POINTER:
+                        exptype = INT
+                    else:
+                        exptype = checker.pointer_type(view(index), operand)
+                    if exptype is not None:
+                        exptypes[index] = exptype
+                push_value(exptype)
+
+            elif kind == COMPOUND:
+                if phase == 0:
+                    env.enter_scope()
+                    push((index, level, 1))
+                    push((fields[start + STATEMENT_LIST], level + 1, 0))
+                    push((fields[start], level + 1, 0))
+                    continue
+                del values[-2:]
+                env.exit_scope()
+                push_value(None)
+
+            elif kind == IF or kind == WHILE:
+                if phase == 0:
+                    push((index, level, 1))
+                    push((fields[start], level + 1, 0))
+                    continue
+                if phase == 1:
+                    exptype = pop_value()
+                    if exptype is not INT:
+                        checker.condition_type(view(index), exptype, "if" if kind == IF else "while")
+                    push((index, level, 2))
+                    if kind == IF:
+                        push((fields[start + ELSE_STATEMENT], level + 1, 0))
+                    push((fields[start + 1], level + 1, 0))
+                    continue
+                if kind == IF:
+                    values.pop()
+                values[-1] = None
+
+            elif kind == FOR:
+                if phase == 0:
+                    push((index, level, 1))
+                    push((fields[start + 1], level, 0))
+                    push((fields[start], level, 0))
+                    continue
+                del values[-2:]
+                push_value(None)
+
+            elif kind == RETURN:
+                if phase == 0:
+                    push((index, level, 1))
+                    push((fields[start], level, 0))
+                    continue
+                exptype = values[-1]
+                if kinds[fields[start]] == NULL:
+                    exptype = typetable.VOID
+                return_types.append(exptype)
+                values[-1] = None
+
+            elif kind == NULL:
+                push_value(None)
+
+            else:
+                # 変数宣言など、数の少ないノードはビューを渡してAnalyzerで解析する
+                push_value(visitor.run(analyzer.visit(view(index), level, 0)))
+
+        return values[-1]
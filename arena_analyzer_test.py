@@ -0,0 +1,95 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+import nose
+import arena
+import samplegen
+import typetable
+import diagnostics as dg
+import semantic_analyzer as sa
+from arena_analyzer import ArenaAnalyzer
+from parser import Parser
+from parser_test import dump, flat_dump
+
+ERRORS = """int print(int x);
+int g;
+int a[4];
+int f(int *p) { int a; int a; a = *p; if (p) a = 1; return a; }
+void h(int a) { int a; *a; print(g, 1); return a; }
+int k(int a) { if (a) return; while (a < &g) a = a - 1; return b; }
+int m() { return 1 + n; }
+int sub(int *p, int n) { int *q; q = p - n - 1; q = n + p; return *q - n; }
+int main() { int x; f(&g, 2); f(x); x = g == &g; x = x && p; return f(&x); }
+"""
+
+
+class ArenaAnalyzerTest(TestCase):
+
+    def setUp(self):
+        self.parser = Parser()
+        self.parser.build()
+
+    def tearDown(self):
+        pass
+
+    def analyze(self, data):
+        """オブジェクトの構文木とアリーナをそれぞれ解析し、解析した構文木と
+           (重大度, 種類, 行番号)のリストと、エラーと警告の数の組を返す"""
+        tree = self.parser.parse(data)
+        stored = arena.Arena.from_tree(self.parser.parse(data))
+        expected = dg.Diagnostics(echo=False)
+        analyzer = sa.Analyzer(tree, check_types=True, diagnostics=expected)
+        analyzer.analyze(tree)
+        diagnostics = dg.Diagnostics(echo=False)
+        arena_analyzer = ArenaAnalyzer(stored, diagnostics=diagnostics)
+        arena_analyzer.analyze()
+
+        nose.tools.eq_((analyzer.error_count, analyzer.checker.error_count, analyzer.warning_count),
+                       (arena_analyzer.error_count, arena_analyzer.type_error_count,
+                        arena_analyzer.warning_count))
+        nose.tools.eq_([(d.severity, d.code, d.line) for d in expected.records],
+                       [(d.severity, d.code, d.line) for d in diagnostics.records])
+        return tree, stored
+
+    def test_generated(self):
+        """生成したプログラムで、Analyzerと同じ宣言と式の型を書き込むかのテスト"""
+        for seed in range(3):
+            tree, stored = self.analyze(samplegen.generate_program(5, 30, seed=seed))
+            nose.tools.eq_(dump(tree), dump(stored.to_tree()))
+
+    def test_errors(self):
+        """エラーのあるプログラムで、Analyzerと同じ診断メッセージと構文木になるかのテスト"""
+        tree, stored = self.analyze(ERRORS)
+        result = stored.to_tree()
+
+        nose.tools.eq_(dump(tree), dump(result))
+        minus = result.nodes[-2].compound_statement.statement_list.nodes[0].expression.right
+        nose.tools.eq_("TIMES", minus.right.op)
+        nose.tools.ok_(minus.exptype is typetable.INT_POINTER)
+
+    def test_views(self):
+        """エラーのない関数の本体ではビューを作らないかのテスト"""
+        data = samplegen.generate_program(5, 30, seed=1)
+        stored = arena.Arena.from_tree(self.parser.parse(data))
+        views = []
+        view = stored.view
+        stored.view = lambda index: views.append(index) or view(index)
+        ArenaAnalyzer(stored, diagnostics=dg.Diagnostics(echo=False)).analyze()
+
+        body = set()
+        for index in stored.find(arena.ast.StatementList):
+            body.update(stored.walk(index))
+        nose.tools.ok_(views)
+        nose.tools.ok_(len(body) > len(stored) // 2)
+        nose.tools.eq_(set(), body & set(views))
+
+    def test_deep_expression(self):
+        """深い式を、スタックの深さを増やさずに解析できるかのテスト"""
+        data = samplegen.generate_deep_program("expression", 5000)
+        tree, stored = self.analyze(data)
+        nose.tools.eq_(flat_dump(tree), flat_dump(stored.to_tree()))
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])
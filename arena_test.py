@@ -0,0 +1,136 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import cPickle as pickle
+from unittest import TestCase
+import nose
+import ast
+import arena
+import samplegen
+import semantic_analyzer
+import typetable
+from parser import Parser
+from parser_test import dump
+
+
+class ArenaTest(TestCase):
+
+    def setUp(self):
+        self.parser = Parser()
+        self.parser.build()
+        self.data = samplegen.generate_program(3, 20, seed=2, syntax_only=True)
+        self.tree = self.parser.parse(self.data)
+
+    def tearDown(self):
+        pass
+
+    def test_view(self):
+        """ビューがもとの構文木と同じ形と値を持つかのテスト"""
+        stored = arena.Arena.from_tree(self.tree)
+        view = stored.root_view()
+
+        nose.tools.ok_(isinstance(view, ast.ExternalDeclarationList))
+        nose.tools.eq_(dump(self.tree), dump(view))
+        nose.tools.eq_(dump(self.tree), dump(stored.to_tree()))
+
+    def test_bytes(self):
+        """1つのバイト列に直列化して元に戻せるかのテスト"""
+        blob = arena.Arena.from_tree(self.tree).tobytes()
+
+        nose.tools.ok_(isinstance(blob, str))
+        nose.tools.eq_(dump(self.tree), dump(arena.Arena.frombytes(blob).root_view()))
+
+    def test_pickle(self):
+        """文字列でないリテラルと式の型を含むアリーナをpickleして元に戻せるかのテスト"""
+        tree = self.parser.parse("int main() { int a; a = a + 1; return a; }")
+        env, _ = semantic_analyzer.Analyzer(tree, check_types=True).analyze(tree)
+        stored = pickle.loads(pickle.dumps(arena.Arena.from_tree(tree), pickle.HIGHEST_PROTOCOL))
+        statements = stored.root_view().nodes[0].compound_statement.statement_list.nodes
+
+        nose.tools.eq_(dump(tree), dump(stored.root_view()))
+        nose.tools.eq_(env.lookup("a"), statements[0].expression.left.identifier)
+        nose.tools.ok_(statements[0].expression.right.exptype is typetable.INT)
+        nose.tools.eq_(stored.literal("a"), stored.literal_index[(str, "a")])
+
+    def test_shared(self):
+        """共有されたノード(a += b の左辺)が同じ番号になり、書き換えが両方に見えるかのテスト"""
+        tree = self.parser.parse("int main() { int a; a += 1; return a; }")
+        stored = arena.Arena.from_tree(tree)
+        assign = stored.root_view().nodes[0].compound_statement.statement_list.nodes[0].expression
+        plus = assign.right
+
+        nose.tools.eq_(assign.left, plus.left)
+        assign.left.identifier = "b"
+        nose.tools.eq_("b", plus.left.identifier)
+
+    def test_mutation(self):
+        """ビューへの代入とNodeListへの追加がアリーナに反映されるかのテスト"""
+        stored = arena.Arena.from_tree(self.parser.parse("int a;"))
+        view = stored.root_view()
+        view.append(ast.Declaration(ast.TypeSpecifier("int"),
+                                    ast.DeclaratorList(ast.Declarator("NORMAL", ast.DirectDeclarator(
+                                        ast.Identifier("b", 3))))))
+        identifier = view.nodes[1].declarator_list.nodes[0].direct_declarator.identifier
+        identifier.lineno = 4
+
+        nose.tools.eq_(2, view.length())
+        nose.tools.eq_(("b", 4), (identifier.identifier, identifier.lineno))
+        nose.tools.eq_(dump(view), dump(stored.to_tree()))
+
+    def test_children_in_place(self):
+        """NodeListへの追加と代入が、子の範囲をなるべくその場で書き換えるかのテスト"""
+        stored = arena.Arena.from_tree(self.parser.parse("int a; int b;"))
+        view = stored.root_view()
+        declaration = self.parser.parse("int c;").nodes[0]
+        for _ in range(1000):
+            view.append(declaration)
+
+        nose.tools.eq_(1002, view.length())
+        nose.tools.ok_(len(stored.children) < 4 * 1002)
+        size = len(stored.children)
+        view.nodes = list(reversed(view.nodes))
+        nose.tools.eq_(size, len(stored.children))
+        view.insert(0, declaration)
+        nose.tools.eq_(1003, view.length())
+        nose.tools.eq_(dump(view), dump(stored.to_tree()))
+        nose.tools.eq_(dump(view), dump(arena.Arena.frombytes(stored.tobytes()).root_view()))
+
+    def test_direct_access(self):
+        """配列を直接たどる操作のテスト"""
+        stored = arena.Arena.from_tree(self.parser.parse("int a; int main() { return a; }"))
+        identifiers = stored.find(ast.Identifier)
+
+        nose.tools.eq_(["a", "main", "a"], [stored.field(i, "identifier") for i in identifiers])
+        nose.tools.eq_(len(stored), len(list(stored.walk())))
+        nose.tools.eq_(ast.ExternalDeclarationList, stored.kind(stored.root))
+        nose.tools.eq_(2, len(stored.children_of(stored.root)))
+
+    def test_analyzer(self):
+        """ビューの構文木をそのまま意味解析できるかのテスト"""
+        parser = Parser(ast_storage="arena")
+        parser.build()
+        data = samplegen.generate_program(3, 20, seed=2)
+        view = parser.parse(data)
+        tree = self.parser.parse(data)
+
+        env, _ = semantic_analyzer.Analyzer(view).analyze(view)
+        expected, _ = semantic_analyzer.Analyzer(tree).analyze(tree)
+
+        nose.tools.ok_(isinstance(view, arena.VIEW_CLASSES[arena.KIND_INDEX[ast.ExternalDeclarationList]]))
+        nose.tools.eq_(len(expected.decl_list), len(env.decl_list))
+
+    def test_literal_reuse(self):
+        """名前に結び付けた宣言を何度書き込んでも、リテラルの表に1つだけ入るかのテスト"""
+        parser = Parser(ast_storage="arena")
+        parser.build()
+        view = parser.parse("int main() { int a; a = a + a; return a; }")
+        semantic_analyzer.Analyzer(view).analyze(view)
+        stored = view._arena
+        decls = [value for value in stored.literals if isinstance(value, semantic_analyzer.Decl)]
+
+        nose.tools.eq_(2, len(decls))
+        nose.tools.eq_(len(stored.literals), len(stored.literal_index))
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])
@@ -3,6 +3,7 @@
 
 import semantic_analyzer as sa
 import intermed_code as ic
+import visitor
 
 
 class AssignAddress(object):
@@ -19,9 +20,8 @@ class AssignAddress(object):
         for i, itmdelem in enumerate(self.intermed_code):
             # グローバル宣言
             if isinstance(itmdelem, ic.VarDecl):
-                if isinstance(itmdelem.var.objtype, tuple) and \
-                    itmdelem.var.objtype[0] == "array":
-                    self.intermed_code[i].var.offset = self.ofs_to_globalarray(itmdelem.var.objtype[2])
+                if itmdelem.var.objtype.is_array:
+                    self.intermed_code[i].var.offset = self.ofs_to_globalarray(itmdelem.var.objtype.size)
                 else:
                     self.intermed_code[i].var.offset = self.ofs_to_globalvar()
 
@@ -31,17 +31,15 @@ class AssignAddress(object):
 
                 # パラメータ
                 for j, param in enumerate(itmdelem.params):
-                    if isinstance(param.var.objtype, tuple) and \
-                        param.var.objtype[0] == "array":
-                        self.intermed_code[i].params[j].var.offset = self.ofs_to_arrayparam(param.var.objtype[2])
+                    if param.var.objtype.is_array:
+                        self.intermed_code[i].params[j].var.offset = self.ofs_to_arrayparam(param.var.objtype.size)
                     else:
                         self.intermed_code[i].params[j].var.offset = self.ofs_to_param()
 
                 # 関数内での宣言
                 for k, decl in enumerate(itmdelem.body.decls):
-                    if isinstance(decl.var.objtype, tuple) and \
-                        decl.var.objtype[0] == "array":
-                        self.intermed_code[i].body.decls[k].var.offset = self.ofs_to_arrayvar(decl.var.objtype[2])
+                    if decl.var.objtype.is_array:
+                        self.intermed_code[i].body.decls[k].var.offset = self.ofs_to_arrayvar(decl.var.objtype.size)
                     else:
                         self.intermed_code[i].body.decls[k].var.offset = self.ofs_to_var()
 
@@ -55,12 +53,15 @@ class AssignAddress(object):
 
     def assign_address_to_compstmt(self, compstmt):
         """引数として取った複文の宣言と、文に含まれる一時変数の宣言にアドレスを割り当てる"""
+        return visitor.run(self.assign_compstmt(compstmt))
+
+    def assign_compstmt(self, compstmt):
+        """assign_address_to_compstmtの本体(入れ子の複文はvisitor.run()のスタックでたどる)"""
         # 宣言
         for decl in compstmt.decls:
-            if isinstance(decl.var.objtype, tuple) and \
-                decl.var.objtype[0] == "array":
+            if decl.var.objtype.is_array:
                 if decl.var.offset == -1:
-                    decl.var.offset = self.ofs_to_arrayvar(decl.var.objtype[2])
+                    decl.var.offset = self.ofs_to_arrayvar(decl.var.objtype.size)
             else:
                 if decl.var.offset == -1:
                     decl.var.offset = self.ofs_to_var()
@@ -68,22 +69,22 @@ class AssignAddress(object):
         # 複文(を含む可能性のある中間表現)に含まれる複文に再帰的にアドレス割り当て
         for stmt in compstmt.stmts:
             if isinstance(stmt, ic.CompoundStatement):
-                self.assign_address_to_compstmt(stmt)
+                yield self.assign_compstmt(stmt)
 
             elif isinstance(stmt, ic.IfStatement):
                 if isinstance(stmt.then_stmt, ic.CompoundStatement):
-                    self.assign_address_to_compstmt(stmt.then_stmt)
+                    yield self.assign_compstmt(stmt.then_stmt)
                 else:
                     pass
 
                 if isinstance(stmt.else_stmt, ic.CompoundStatement):
-                    self.assign_address_to_compstmt(stmt.else_stmt)
+                    yield self.assign_compstmt(stmt.else_stmt)
                 else:
                     pass
 
             elif isinstance(stmt, ic.WhileStatement):
                 if isinstance(stmt, ic.CompoundStatement):
-                    self.assign_address_to_compstmt(stmt.stmt)
+                    yield self.assign_compstmt(stmt.stmt)
                 else:
                     pass
 
@@ -96,7 +97,7 @@ class AssignAddress(object):
             elif isinstance(stmt, ic.CallStatement) and stmt.dest.offset == -1:
                 stmt.dest.offset = self.ofs_to_var()
 
-        return compstmt
+        yield visitor.Return(compstmt)
 
     def ofs_to_var(self):
         """局所変数に割り当てるアドレスを計算し、その値を返す"""
@@ -3,18 +3,92 @@
 
 """抽象構文木を構築するためのモジュール"""
 
-import ply.lex as lex
-import ply.yacc as yacc
-
 # parent Node
 
 
 class Node(object):
-    pass
+
+    """抽象構文木のノードの基底クラス
+       ノードは大量に作られるので、各クラスは属性を__slots__で宣言し、
+       インスタンスごとの__dict__を持たない
+
+       式のノードのexptypeには、型検査で求めた式の型(typetableの型)が記録される。
+       型検査をする前のノードや式でないノードではNoneになる"""
+
+    __slots__ = ()
+    exptype = None
+
+
+_field_names = {}
+
+
+def field_names(cls):
+    """ノードのクラスclsとその基底クラスが宣言している属性名のタプルを返す
+       "_"で始まる属性(arenaのビューが持つ内部の属性など)は含めない"""
+    names = _field_names.get(cls)
+    if names is None:
+        names = tuple(name for klass in reversed(cls.__mro__)
+                      for name in getattr(klass, "__slots__", ())
+                      if not name.startswith("_"))
+        _field_names[cls] = names
+    return names
+
+
+def iter_fields(node):
+    """nodeの(属性名, 値)の組を順に返す(値が設定されていない属性は除く)"""
+    for name in field_names(type(node)):
+        if hasattr(node, name):
+            yield name, getattr(node, name)
+
+
+_shift_layouts = {}
+
+
+def shift_layout(cls):
+    """clsのノードの(行番号を持つか, 子になりうる属性名のタプル)を返す"""
+    layout = _shift_layouts.get(cls)
+    if layout is None:
+        names = field_names(cls)
+        layout = ("lineno" in names,
+                  tuple(name for name in names if name not in ("lineno", "exptype", "nodes")))
+        _shift_layouts[cls] = layout
+    return layout
+
+
+def shift_lineno(nodes, delta):
+    """nodesとその子孫の行番号をdeltaだけずらす(共有されたノードは一度だけ)
+       深い式でもPythonのスタックを使わないように、明示的なスタックでたどる"""
+    stack = list(nodes)
+    pop = stack.pop
+    push = stack.append
+    visited = set()
+    layouts = _shift_layouts
+    while stack:
+        node = pop()
+        layout = layouts.get(type(node))
+        if layout is None:
+            if not isinstance(node, Node):
+                continue
+            layout = shift_layout(type(node))
+        if id(node) in visited:
+            continue
+        visited.add(id(node))
+        has_lineno, names = layout
+        if has_lineno:
+            lineno = getattr(node, "lineno", 0)
+            if lineno > 0:
+                node.lineno = lineno + delta
+        if isinstance(node, NodeList):
+            stack.extend(node.nodes)
+            continue
+        for name in names:
+            value = getattr(node, name, None)
+            if isinstance(value, Node):
+                push(value)
 
 
 class NullNode(Node):
-    pass
+    __slots__ = ()
 
 
 # Nodes
@@ -22,14 +96,19 @@ class NullNode(Node):
 # Number
 class Number(Node):
 
+    __slots__ = ("value", "exptype")
+
     def __init__(self, value):
         self.value = value
+        self.exptype = None
 
 # Declaration
 
 
 class Declaration(Node):
 
+    __slots__ = ("type_specifier", "declarator_list")
+
     def __init__(self, type_specifier, declator_list):
         self.type_specifier = type_specifier
         self.declarator_list = declator_list
@@ -37,6 +116,8 @@ class Declaration(Node):
 
 class Declarator(Node):
 
+    __slots__ = ("kind", "direct_declarator")
+
     def __init__(self, kind, direct_declarator):
         self.kind = kind
         self.direct_declarator = direct_declarator
@@ -44,12 +125,16 @@ class Declarator(Node):
 
 class DirectDeclarator(Node):
 
+    __slots__ = ("identifier",)
+
     def __init__(self, identifier):
         self.identifier = identifier
 
 
 class DirectArrayDeclarator(Node):
 
+    __slots__ = ("identifier", "constant")
+
     def __init__(self, identifier, constant):
         self.identifier = identifier
         self.constant = constant
@@ -59,15 +144,20 @@ class DirectArrayDeclarator(Node):
 
 class Identifier(Node):
 
+    __slots__ = ("identifier", "lineno", "exptype")
+
     def __init__(self, identifier, lineno):
         self.identifier = identifier
         self.lineno = lineno
+        self.exptype = None
 
 # Parameter
 
 
 class ParameterDeclaration(Node):
 
+    __slots__ = ("type_specifier", "parameter_declarator")
+
     def __init__(self, typespcf, paramdec):
         self.type_specifier = typespcf
         self.parameter_declarator = paramdec
@@ -75,6 +165,8 @@ class ParameterDeclaration(Node):
 
 class ParameterDeclarator(Node):
 
+    __slots__ = ("kind", "identifier")
+
     def __init__(self, kind, identifier):
         self.kind = kind
         self.identifier = identifier
@@ -84,6 +176,8 @@ class ParameterDeclarator(Node):
 
 class TypeSpecifier(Node):
 
+    __slots__ = ("type_specifier",)
+
     def __init__(self, typespcf):
         self.type_specifier = typespcf
 
@@ -92,35 +186,43 @@ class TypeSpecifier(Node):
 
 class BinaryOperators(Node):
 
+    __slots__ = ("op", "left", "right", "lineno", "exptype")
+
     def __init__(self, op, left, right, lineno):
         self.op = op
         self.left = left
         self.right = right
         self.lineno = lineno
+        self.exptype = None
 
 # Unary Operators
 
 
 class UnaryOperator(Node):
 
+    __slots__ = ("expression", "lineno", "exptype")
+
     def __init__(self, node, lineno):
         self.expression = node
         self.lineno = lineno
+        self.exptype = None
 
 # class Negative(UnaryOperator):
     # pass
 
 
 class Address(UnaryOperator):
-    pass
+    __slots__ = ()
 
 
 class Pointer(UnaryOperator):
-    pass
+    __slots__ = ()
 
 
 class ExpressionStatement(Node):
 
+    __slots__ = ("expression",)
+
     def __init__(self, expr):
         self.expression = expr
 
@@ -129,6 +231,8 @@ class ExpressionStatement(Node):
 
 class IfStatement(Node):
 
+    __slots__ = ("expression", "then_statement", "else_statement", "lineno")
+
     def __init__(self, expr, then_stmt, else_stmt, lineno):
         self.expression = expr
         self.then_statement = then_stmt
@@ -138,6 +242,8 @@ class IfStatement(Node):
 
 class WhileLoop(Node):
 
+    __slots__ = ("expression", "statement", "lineno")
+
     def __init__(self, expr, stmt, lineno):
         self.expression = expr
         self.statement = stmt
@@ -146,6 +252,8 @@ class WhileLoop(Node):
 
 class ForLoop(Node):
 
+    __slots__ = ("firstexp_statement", "whileloop_node")
+
     def __init__(self, stmt_firstexp, whilenode):
         self.firstexp_statement = stmt_firstexp
         self.whileloop_node = whilenode
@@ -153,12 +261,16 @@ class ForLoop(Node):
 
 class ReturnStatement(Node):
 
+    __slots__ = ("return_statement",)
+
     def __init__(self, returnstmt):
         self.return_statement = returnstmt
 
 
 class CompoundStatement(Node):
 
+    __slots__ = ("declaration_list", "statement_list")
+
     def __init__(self, dec_list, stmt_list):
         self.declaration_list = dec_list
         self.statement_list = stmt_list
@@ -166,6 +278,8 @@ class CompoundStatement(Node):
 
 class FunctionDefinition(Node):
 
+    __slots__ = ("type_specifier", "function_declarator", "compound_statement")
+
     def __init__(self, typespcf, funcdec, compstmt):
         self.type_specifier = typespcf
         self.function_declarator = funcdec
@@ -174,6 +288,8 @@ class FunctionDefinition(Node):
 
 class FunctionDeclarator(Node):
 
+    __slots__ = ("kind", "identifier", "parameter_type_list")
+
     def __init__(self, kind, identifier, param_type_list):
         self.kind = kind
         self.identifier = identifier
@@ -182,6 +298,8 @@ class FunctionDeclarator(Node):
 
 class FunctionPrototype(Node):
 
+    __slots__ = ("type_specifier", "function_declarator")
+
     def __init__(self, type_specifier, function_declarator):
         self.type_specifier = type_specifier
         self.function_declarator = function_declarator
@@ -189,24 +307,32 @@ class FunctionPrototype(Node):
 
 class FunctionExpression(Node):
 
+    __slots__ = ("identifier", "argument_expression", "lineno", "exptype")
+
     def __init__(self, identifier, argexp, lineno=0):
         self.identifier = identifier
         self.argument_expression = argexp
         if lineno > 0:
             self.lineno = lineno
+        self.exptype = None
 
 
 class ArrayExpression(Node):
 
+    __slots__ = ("postfix_expr", "expression", "exptype")
+
     def __init__(self, postfix_expr, exp):
         self.postfix_expr = postfix_expr
         self.expression = exp
+        self.exptype = None
 
 # NodeLists
 
 
 class NodeList(Node):
 
+    __slots__ = ("nodes",)
+
     def __init__(self, node=None):
         if node is None:
             self.nodes = []
@@ -227,24 +353,51 @@ class NodeList(Node):
 
 
 class ExternalDeclarationList(NodeList):
-    pass
+
+    """トップレベルの宣言のリスト
+
+       incremental.IncrementalParserは、編集で後ろの宣言の行番号がずれたときに
+       ノードを書き換えず、宣言ごとのずれを_line_offsets(nodesと同じ長さのリスト)に
+       足しておく。宣言のノードの行番号を読む前に、resolve_lines()でずれを
+       ノードに反映する(意味解析と型検査はトップレベルで自分で反映する)"""
+
+    __slots__ = ("_line_offsets",)
+
+    def line_offset(self, index):
+        """index番目の宣言の、まだノードに反映していない行番号のずれを返す"""
+        offsets = getattr(self, "_line_offsets", None)
+        return offsets[index] if offsets else 0
+
+    def resolve_lines(self, start=0, stop=None):
+        """start番目からstop番目の前までの宣言に、たまっている行番号のずれを反映する"""
+        offsets = getattr(self, "_line_offsets", None)
+        if not offsets:
+            return
+        if stop is None:
+            stop = len(self.nodes)
+        for index in range(start, stop):
+            if offsets[index] != 0:
+                shift_lineno([self.nodes[index]], offsets[index])
+                offsets[index] = 0
+        if not any(offsets):
+            del self._line_offsets
 
 
 class DeclarationList(NodeList):
-    pass
+    __slots__ = ()
 
 
 class DeclaratorList(NodeList):
-    pass
+    __slots__ = ()
 
 
 class StatementList(NodeList):
-    pass
+    __slots__ = ()
 
 
 class ParameterTypeList(NodeList):
-    pass
+    __slots__ = ()
 
 
 class ArgumentExpressionList(NodeList):
-    pass
\ No newline at end of file
+    __slots__ = ()
\ No newline at end of file
@@ -0,0 +1,1132 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""コンパイラ各部の性能を計測するベンチマーク
+
+   python benchmark.py <ベンチマーク名> [引数...] で実行する。
+   引数なしで実行するとベンチマークの一覧を表示する"""
+
+from __future__ import print_function
+import os
+import sys
+import glob
+import shutil
+import tempfile
+import subprocess
+import time
+import collections
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+BENCHMARKS = collections.OrderedDict()
+
+
+def benchmark(func):
+    """bench_<名前>という関数をベンチマークとして登録する"""
+    BENCHMARKS[func.__name__[len("bench_"):]] = func
+    return func
+
+
+def timeit(func, repeat=3):
+    """funcをrepeat回実行し、最短の実行時間(秒)と最後の返り値を返す"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.time()
+        result = func()
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+
+def run_python(code, cwd):
+    """新しいPythonプロセスでcodeを実行し、かかった時間(秒)を返す"""
+    start = time.time()
+    subprocess.check_call([sys.executable, "-c", code], cwd=cwd)
+    return time.time() - start
+
+
+def copy_sources(dest, exclude=()):
+    """ソース(.pyとコンパイル済みの.pyc)をdestにコピーする"""
+    for path in glob.glob(os.path.join(SRC_DIR, "*.py*")):
+        name = os.path.basename(path)
+        if name.split(".")[0] not in exclude:
+            shutil.copy2(path, os.path.join(dest, name))
+
+
+@benchmark
+def bench_startup(runs=10):
+    """Parserを構築するまでの起動時間を、同梱の表がない場合とある場合で比べる"""
+    runs = int(runs)
+    code = "import parser; parser.Parser().build()"
+
+    # 一度実行して.pycを作っておく
+    run_python(code, SRC_DIR)
+
+    without_tables = []
+    for _ in range(runs):
+        workdir = tempfile.mkdtemp()
+        try:
+            copy_sources(workdir, exclude=("lextab", "parsetab"))
+            without_tables.append(run_python(code, workdir))
+        finally:
+            shutil.rmtree(workdir)
+
+    with_tables = [run_python(code, SRC_DIR) for _ in range(runs)]
+
+    print("cold start without tables: min {0:.3f}s  avg {1:.3f}s".format(
+        min(without_tables), sum(without_tables) / runs))
+    print("cold start with tables:    min {0:.3f}s  avg {1:.3f}s".format(
+        min(with_tables), sum(with_tables) / runs))
+
+
+def count_tokens(lexer, data):
+    lexer.input(data)
+    count = 0
+    token = lexer.token
+    while token() is not None:
+        count += 1
+    return count
+
+
+@benchmark
+def bench_lexer(size=2000000):
+    """PLYの字句解析器とDFAの字句解析器のトークン/秒を比べる"""
+    import samplegen
+    import lexer
+    import dfa_lexer
+
+    data = samplegen.generate_sized_program(int(size), syntax_only=True)
+    for name, lexer_class in (("ply", lexer.Lexer), ("dfa", dfa_lexer.DFALexer)):
+        lexer_obj = lexer_class()
+        lexer_obj.build()
+        elapsed, count = timeit(lambda: count_tokens(lexer_obj.lexer, data))
+        print("{0}: {1} tokens in {2:.3f}s, {3:.0f} tokens/s".format(
+            name, count, elapsed, count / elapsed))
+
+
+def token_list_size(tokens):
+    """LexTokenのリストが使うメモリ(バイト)の概算"""
+    size = sys.getsizeof(tokens)
+    for tok in tokens:
+        size += sys.getsizeof(tok) + sys.getsizeof(tok.__dict__)
+    return size
+
+
+def token_buffer_size(buf):
+    """TokenBufferが使うメモリ(バイト)の概算"""
+    size = sum(sys.getsizeof(column) for column in
+               (buf.kinds, buf.lexpos, buf.lineno, buf.value_ids))
+    size += sys.getsizeof(buf.values) + sys.getsizeof(buf.value_index)
+    size += sum(sys.getsizeof(value) for value in buf.values)
+    return size
+
+
+@benchmark
+def bench_token_buffer(size=2000000):
+    """LexTokenのリストとTokenBufferのメモリ使用量を比べる"""
+    import samplegen
+    import lexer
+    import tokenbuffer
+
+    data = samplegen.generate_sized_program(int(size), syntax_only=True)
+    lexer_obj = lexer.Lexer()
+    lexer_obj.build()
+
+    lexer_obj.lexer.input(data)
+    tokens = list(iter(lexer_obj.lexer.token, None))
+    print("LexToken list: {0} tokens, {1} bytes".format(len(tokens), token_list_size(tokens)))
+    del tokens
+
+    buf = tokenbuffer.TokenBuffer()
+    elapsed, _ = timeit(lambda: buf.fill(lexer_obj.lexer, data))
+    print("TokenBuffer:   {0} tokens, {1} bytes (fill {2:.3f}s)".format(
+        len(buf), token_buffer_size(buf), elapsed))
+
+
+@benchmark
+def bench_parser(size=500000):
+    """PLYのLALR構文解析器と再帰下降構文解析器の解析時間を比べる(字句解析は除く)"""
+    import samplegen
+    import parser
+    import tokenbuffer
+
+    data = samplegen.generate_sized_program(int(size), syntax_only=True)
+    for engine in ("lalr", "rd"):
+        p = parser.Parser(parser_engine=engine)
+        p.build()
+        buf = tokenbuffer.TokenBuffer().fill(p.lexer.lexer, data)
+
+        def parse():
+            cursor = buf.cursor()
+            return p.parser.parse(lexer=cursor, tokenfunc=cursor.token)
+
+        elapsed, _ = timeit(parse)
+        print("{0:<4}: {1} tokens in {2:.3f}s, {3:.0f} tokens/s".format(
+            engine, len(buf), elapsed, len(buf) / elapsed))
+
+
+@benchmark
+def bench_incremental(lines=50000):
+    """大きなファイルの1行を書き換えたときと、コメントに1行加えたときの、
+       全体の解析と差分の解析の時間を比べる"""
+    import samplegen
+    import parser
+
+    lines = int(lines)
+    generator = samplegen.ProgramGenerator(0)
+    program = []
+    count = 0
+    while len(program) < lines:
+        program.extend(generator.function("f{0}".format(count), 20))
+        count += 1
+    data = "\n".join(program) + "\n"
+    middle = len(program) // 2
+    while "= " not in program[middle]:
+        middle += 1
+    original = program[middle]
+    program[middle] = original.replace("= ", "= 1 + ", 1)
+    edited = "\n".join(program) + "\n"
+    # 後ろの宣言の行番号がすべてずれる編集
+    program[middle] = "/* added\n */ " + original
+    shifted = "\n".join(program) + "\n"
+
+    p = parser.Parser()
+    p.build()
+    elapsed, _ = timeit(lambda: p.parse(edited), repeat=1)
+    print("{0} lines, {1} functions".format(len(program), count))
+    print("full parse:        {0:.3f}s".format(elapsed))
+
+    def reparse(new):
+        p.parse_incremental(data)
+        start = time.time()
+        p.parse_incremental(new)
+        return time.time() - start
+
+    p.parse_incremental(data)
+    for name, new in (("same-line edit", edited), ("line-adding edit", shifted)):
+        elapsed = min(reparse(new) for _ in range(3))
+        print("incremental parse, {0}: {1:.3f}s ({2} declaration reparsed)".format(
+            name, elapsed, p.incremental.reparsed))
+
+
+@benchmark
+def bench_parse_cache(size=500000, files=5000):
+    """構文解析とキャッシュからの読み込みの時間を比べ、空のキャッシュに
+       files個のファイルを保存する時間を表示する"""
+    import samplegen
+    import parser
+    import parsecache
+
+    data = samplegen.generate_sized_program(int(size), syntax_only=True)
+    cache_dir = tempfile.mkdtemp()
+    try:
+        p = parser.Parser(cache_dir=cache_dir)
+        p.build()
+        elapsed, _ = timeit(lambda: p.parse_source(data), repeat=1)
+        print("parse:      {0:.3f}s".format(elapsed))
+        p.parse(data)
+        elapsed, _ = timeit(lambda: p.parse(data))
+        size = sum(entry[1] for entry in p.cache.entries())
+        print("cache hit:  {0:.3f}s ({1} bytes on disk for {2} bytes of source)".format(
+            elapsed, size, len(data)))
+        print(p.cache.stats())
+    finally:
+        shutil.rmtree(cache_dir)
+
+    # 多数のファイルを初めて解析するときの保存の時間(ディレクトリ全体を調べる回数も数える)
+    small = parser.Parser()
+    small.build()
+    tree = small.parse(samplegen.generate_program(3, 10, seed=5, syntax_only=True))
+    cache_dir = tempfile.mkdtemp()
+    try:
+        cache = parsecache.ParseCache(cache_dir, "bench")
+        scans = []
+        entries = cache.entries
+        cache.entries = lambda: scans.append(1) or entries()
+        files = int(files)
+        start = time.time()
+        for i in range(files):
+            cache.put(str(i), tree)
+            if i + 1 in (files // 10, files):
+                print("{0} stores: {1:.3f}s, {2} directory scans".format(
+                    i + 1, time.time() - start, len(scans)))
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+def tree_size(tree):
+    """構文木のノード数と、ノードが使うメモリ(バイト)の合計を返す
+       (__dict__を持つノードは__dict__の分も数える。共有されたノードは一度だけ)"""
+    import ast
+
+    count = 0
+    size = 0
+    visited = set()
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if id(node) in visited:
+            continue
+        visited.add(id(node))
+        count += 1
+        size += sys.getsizeof(node)
+        if hasattr(node, "__dict__"):
+            size += sys.getsizeof(node.__dict__)
+        for _, value in ast.iter_fields(node):
+            if isinstance(value, ast.Node):
+                stack.append(value)
+            elif isinstance(value, list):
+                size += sys.getsizeof(value)
+                stack.extend(value)
+    return count, size
+
+
+AST_RSS_CODE = """
+import resource, sys, parser, samplegen
+data = samplegen.generate_sized_program({0}, syntax_only=True)
+p = parser.Parser(parser_engine="rd")
+p.build()
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+tree = p.parse(data)
+print("{{0}} {{1}}".format(base, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+"""
+
+
+@benchmark
+def bench_ast_memory(size=2000000):
+    """構文木のノードあたりのバイト数と、構文解析の前後の最大RSSを表示する"""
+    import samplegen
+    import parser
+
+    data = samplegen.generate_sized_program(int(size), syntax_only=True)
+    p = parser.Parser(parser_engine="rd")
+    p.build()
+    count, nbytes = tree_size(p.parse(data))
+    print("{0} nodes, {1} bytes, {2:.1f} bytes/node".format(count, nbytes, float(nbytes) / count))
+
+    output = subprocess.check_output([sys.executable, "-c", AST_RSS_CODE.format(int(size))],
+                                     cwd=SRC_DIR)
+    before, after = output.split()
+    print("peak RSS: {0} KB before parsing, {1} KB after".format(before, after))
+
+
+def arena_size(stored):
+    """アリーナの配列とリテラルの表が使うメモリ(バイト)の合計を返す"""
+    size = sum(column.itemsize * len(column) for column in
+               (stored.kinds, stored.linenos, stored.fields, stored.children))
+    return size + sys.getsizeof(stored.literals) + sum(sys.getsizeof(v) for v in stored.literals)
+
+
+def count_views(view):
+    """ビューをたどってノードの数を返す(ビューは参照のたびに作られるので、
+       共有されたノードは参照された回数だけ数える)"""
+    import ast
+
+    count = 0
+    stack = [view]
+    while stack:
+        node = stack.pop()
+        count += 1
+        for _, value in ast.iter_fields(node):
+            if isinstance(value, ast.Node):
+                stack.append(value)
+            elif isinstance(value, list):
+                stack.extend(value)
+    return count
+
+
+@benchmark
+def bench_arena(size=2000000):
+    """オブジェクトの構文木とアリーナのメモリ、直列化と走査の時間を比べる"""
+    import cPickle as pickle
+    import samplegen
+    import parser
+    import ast
+    import arena
+
+    data = samplegen.generate_sized_program(int(size), syntax_only=True)
+    p = parser.Parser(parser_engine="rd")
+    p.build()
+    tree = p.parse(data)
+    count, nbytes = tree_size(tree)
+    stored = arena.Arena.from_tree(tree)
+    print("object: {0} nodes, {1:.1f} bytes/node".format(count, float(nbytes) / count))
+    print("arena:  {0} nodes, {1:.1f} bytes/node".format(
+        len(stored), float(arena_size(stored)) / len(stored)))
+
+    elapsed, blob = timeit(lambda: pickle.dumps(tree, pickle.HIGHEST_PROTOCOL))
+    print("pickle dumps:   {0:.3f}s ({1} bytes)".format(elapsed, len(blob)))
+    elapsed, _ = timeit(lambda: pickle.loads(blob))
+    print("pickle loads:   {0:.3f}s".format(elapsed))
+    elapsed, blob = timeit(stored.tobytes)
+    print("arena tobytes:  {0:.3f}s ({1} bytes)".format(elapsed, len(blob)))
+    elapsed, _ = timeit(lambda: arena.Arena.frombytes(blob))
+    print("arena frombytes: {0:.3f}s".format(elapsed))
+
+    elapsed, _ = timeit(lambda: len(list(stored.walk())))
+    print("walk (indices): {0:.3f}s".format(elapsed))
+    elapsed, _ = timeit(lambda: count_views(stored.root_view()))
+    print("walk (views):   {0:.3f}s".format(elapsed))
+    elapsed, found = timeit(lambda: stored.find(ast.Identifier))
+    print("find Identifier: {0:.4f}s ({1} nodes)".format(elapsed, len(found)))
+
+
+
+@benchmark
+def bench_arena_analyze(functions=100, statements=400, repeat=3):
+    """名前解析と型検査を、オブジェクトの構文木、アリーナのビュー、アリーナの配列に対して行う時間を比べる"""
+    import samplegen
+    import parser
+    import arena
+    import diagnostics
+    import semantic_analyzer
+    import arena_analyzer
+
+    data = samplegen.generate_program(int(functions), int(statements), seed=0)
+    p = parser.Parser()
+    p.build()
+    count, _ = tree_size(p.parse(data))
+    print("{0} AST nodes".format(count))
+
+    def analyze(tree):
+        diag = diagnostics.Diagnostics(echo=False)
+        semantic_analyzer.Analyzer(tree, check_types=True, diagnostics=diag).analyze(tree)
+
+    def analyze_arena(stored):
+        diag = diagnostics.Diagnostics(echo=False)
+        arena_analyzer.ArenaAnalyzer(stored, diagnostics=diag).analyze()
+
+    # 意味解析は構文木に書き込むので、繰り返すたびに作り直す
+    best = collections.OrderedDict()
+    for _ in range(int(repeat)):
+        tree = p.parse(data)
+        views = arena.Arena.from_tree(p.parse(data))
+        stored = arena.Arena.from_tree(p.parse(data))
+        for name, func in (("object tree", lambda: analyze(tree)),
+                           ("arena views", lambda: analyze(views.root_view())),
+                           ("arena arrays", lambda: analyze_arena(stored))):
+            elapsed, _ = timeit(func, repeat=1)
+            best[name] = min(best.get(name, elapsed), elapsed)
+
+    for name, elapsed in best.items():
+        print("{0:<12}: {1:.3f}s, {2:.0f} nodes/s".format(name, elapsed, count / elapsed))
+
+
+IMPORTTIME_CODE = """
+import sys, time, __builtin__
+builtin_import = __builtin__.__import__
+records = []
+depth = [0]
+
+def timed_import(name, *args):
+    if name in sys.modules:
+        return builtin_import(name, *args)
+    depth[0] += 1
+    start = time.time()
+    try:
+        return builtin_import(name, *args)
+    finally:
+        depth[0] -= 1
+        records.append((depth[0], name, time.time() - start))
+
+__builtin__.__import__ = timed_import
+start = time.time()
+import {0}
+total = time.time() - start
+__builtin__.__import__ = builtin_import
+for level, name, elapsed in records:
+    sys.stderr.write("import time: {{0:>8.0f}} | {{1}}{{2}}\\n".format(elapsed * 1e6, "  " * level, name))
+print(total)
+"""
+
+
+@benchmark
+def bench_importtime(module="parser", budget_ms=20, runs=10):
+    """モジュールのimportにかかる時間を計り、予算(ミリ秒)を超えたら失敗する
+       python -X importtime と同じく、モジュールごとの累積時間(マイクロ秒)を表示する"""
+    runs = int(runs)
+    budget = float(budget_ms) / 1000
+
+    # .pycを作っておく
+    subprocess.check_call([sys.executable, "-c", "import " + module], cwd=SRC_DIR)
+    code = IMPORTTIME_CODE.format(module)
+    times = []
+    for i in range(runs):
+        stderr = None if i == 0 else open(os.devnull, "w")
+        output = subprocess.check_output([sys.executable, "-c", code], cwd=SRC_DIR, stderr=stderr)
+        times.append(float(output))
+
+    best = min(times)
+    print("import {0}: min {1:.1f}ms  avg {2:.1f}ms  (budget {3:.1f}ms)".format(
+        module, best * 1000, sum(times) / runs * 1000, budget * 1000))
+    if best > budget:
+        print("import {0} is over budget".format(module))
+        return 1
+    return 0
+
+
+PEAK_RSS_CODE = """
+import resource, time, parser
+p = parser.Parser(lexer_engine="dfa")
+p.build()
+start = time.time()
+{0}
+print("{{0:.3f}} {{1}}".format(time.time() - start,
+                             resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+"""
+
+
+@benchmark
+def bench_parse_file(size=2000000):
+    """文字列を読み込んで解析する場合とmmapしたファイルを解析する場合の最大RSSを比べる"""
+    import samplegen
+
+    fd, path = tempfile.mkstemp(suffix=".c")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(samplegen.generate_sized_program(int(size), syntax_only=True))
+        print("input: {0} bytes".format(os.path.getsize(path)))
+        for name, stmt in (("parse", "p.parse(open({0!r}).read())".format(path)),
+                           ("parse_file", "p.parse_file({0!r})".format(path))):
+            output = subprocess.check_output([sys.executable, "-c", PEAK_RSS_CODE.format(stmt)],
+                                             cwd=SRC_DIR)
+            elapsed, maxrss = output.split()
+            print("{0:<10}: {1}s, peak RSS {2} KB".format(name, elapsed, maxrss))
+    finally:
+        os.remove(path)
+
+
+class NullWriter(object):
+
+    """書き込まれた文字列を捨てるファイル(各パスのデバッグ出力を測らないようにする)"""
+
+    def write(self, data):
+        pass
+
+    def flush(self):
+        pass
+
+
+@benchmark
+def bench_passes(functions=20, statements=200, repeat=3):
+    """意味解析、型検査、中間コード生成、コード生成、コード復元の各パスのノード/秒を表示する"""
+    import samplegen
+    import parser
+    import semantic_analyzer
+    import intermed_code
+    import assign_address
+    import codegen
+    import restorecode
+
+    data = samplegen.generate_program(int(functions), int(statements), seed=0)
+    p = parser.Parser()
+    p.build()
+    count, _ = tree_size(p.parse(data))
+    print("{0} AST nodes".format(count))
+
+    # 意味解析は構文木を書き換えるので、繰り返すたびに解析し直す
+    best = collections.OrderedDict()
+    stdout = sys.stdout
+    for _ in range(int(repeat)):
+        tree = p.parse(data)
+        state = {}
+
+        def analyze():
+            state["env"], _ = semantic_analyzer.Analyzer(tree).analyze(tree)
+
+        def check_type():
+            checker = semantic_analyzer.TypeChecker(state["env"])
+            checker.check_type(tree)
+
+        def intermed():
+            state["code"] = intermed_code.IntermedCodeGenerator(tree).intermed_code_generator()
+            state["code"] = assign_address.AssignAddress(state["code"]).assign_address()
+
+        def generate():
+            codegen.CodeGenerator(state["code"]).intermed_code_to_code()
+
+        def restore():
+            restorecode.restore_code(tree)
+
+        sys.stdout = NullWriter()
+        try:
+            for name, func in (("analyze", analyze), ("check_type", check_type),
+                               ("intermed", intermed), ("codegen", generate),
+                               ("restore", restore)):
+                elapsed, _ = timeit(func, repeat=1)
+                best[name] = min(best.get(name, elapsed), elapsed)
+        finally:
+            sys.stdout = stdout
+
+    for name, elapsed in best.items():
+        print("{0:<10}: {1:.3f}s, {2:.0f} nodes/s".format(name, elapsed, count / elapsed))
+
+
+@benchmark
+def bench_deep(depth=8000):
+    """深く入れ子になったプログラム(長い式、複文、if文、while文)のコンパイル時間を表示する"""
+    import samplegen
+    import parser
+    from stress_test import compile_program
+
+    p = parser.Parser()
+    p.build()
+    for shape in ("expression", "block", "if", "while"):
+        data = samplegen.generate_deep_program(shape, int(depth))
+        elapsed, _ = timeit(lambda: compile_program(p, data), repeat=1)
+        print("{0:<10}: depth {1}, {2:.3f}s".format(shape, depth, elapsed))
+
+
+@benchmark
+def bench_symbols(globals_count=5000, functions=2000, repeat=3):
+    """グローバル変数と関数の多いプログラムの意味解析(名前解決)の時間を表示する"""
+    import samplegen
+    import parser
+    import semantic_analyzer
+
+    data = samplegen.generate_wide_program(int(globals_count), int(functions))
+    p = parser.Parser()
+    p.build()
+
+    def analyze():
+        tree = p.parse(data)
+        stdout = sys.stdout
+        sys.stdout = NullWriter()
+        try:
+            start = time.time()
+            semantic_analyzer.Analyzer(tree).analyze(tree)
+            return time.time() - start
+        finally:
+            sys.stdout = stdout
+
+    elapsed = min(analyze() for _ in range(int(repeat)))
+    print("{0} globals, {1} functions: analyze {2:.3f}s".format(globals_count, functions, elapsed))
+
+
+@benchmark
+def bench_typecheck(functions=100, statements=400, repeat=5):
+    """大きなプログラムの型検査と、型を記録した構文木の型検査のし直しの時間を表示する"""
+    import samplegen
+    import parser
+    import semantic_analyzer
+
+    data = samplegen.generate_program(int(functions), int(statements), seed=0)
+    p = parser.Parser()
+    p.build()
+    count, _ = tree_size(p.parse(data))
+
+    # 型検査は式のノードに型を記録するので、繰り返すたびに解析し直す
+    best = collections.OrderedDict()
+    stdout = sys.stdout
+    for _ in range(int(repeat)):
+        tree = p.parse(data)
+        sys.stdout = NullWriter()
+        try:
+            env, _ = semantic_analyzer.Analyzer(tree).analyze(tree)
+            for name in ("check_type", "recheck"):
+                elapsed, _ = timeit(lambda: semantic_analyzer.TypeChecker(env).check_type(tree), repeat=1)
+                best[name] = min(best.get(name, elapsed), elapsed)
+        finally:
+            sys.stdout = stdout
+
+    for name, elapsed in best.items():
+        print("{0} AST nodes: {1} {2:.3f}s, {3:.0f} nodes/s".format(count, name, elapsed, count / elapsed))
+
+
+@benchmark
+def bench_semantic(functions=100, statements=400, repeat=3):
+    """意味解析を名前解析と型検査の2回の走査で行う場合と、1回の走査で行う場合の時間を表示する"""
+    import samplegen
+    import parser
+    import semantic_analyzer
+
+    data = samplegen.generate_program(int(functions), int(statements), seed=0)
+    p = parser.Parser()
+    p.build()
+    count, _ = tree_size(p.parse(data))
+    print("{0} AST nodes".format(count))
+
+    # 意味解析は構文木を書き換えるので、繰り返すたびに解析し直す
+    best = collections.OrderedDict()
+    stdout = sys.stdout
+    for _ in range(int(repeat)):
+        trees = [p.parse(data), p.parse(data)]
+        state = {}
+
+        def analyze():
+            state["env"], _ = semantic_analyzer.Analyzer(trees[0]).analyze(trees[0])
+
+        def check_type():
+            semantic_analyzer.TypeChecker(state["env"]).check_type(trees[0])
+
+        def fused():
+            semantic_analyzer.Analyzer(trees[1], check_types=True).analyze(trees[1])
+
+        sys.stdout = NullWriter()
+        try:
+            for name, func in (("analyze", analyze), ("check_type", check_type), ("fused", fused)):
+                elapsed, _ = timeit(func, repeat=1)
+                best[name] = min(best.get(name, elapsed), elapsed)
+        finally:
+            sys.stdout = stdout
+
+    best["two-pass"] = best["analyze"] + best["check_type"]
+    for name, elapsed in best.items():
+        print("{0:<10}: {1:.3f}s, {2:.0f} nodes/s".format(name, elapsed, count / elapsed))
+
+
+@benchmark
+def bench_parallel(functions=200, statements=400, processes=None, repeat=3):
+    """関数定義ごとの意味解析を複数のプロセスで並列に行う場合の時間を表示する"""
+    import multiprocessing
+    import samplegen
+    import parser
+    import semantic_analyzer
+    import diagnostics
+    import parallel_analyzer
+
+    processes = int(processes or multiprocessing.cpu_count())
+    data = samplegen.generate_program(int(functions), int(statements), seed=0)
+    p = parser.Parser()
+    p.build()
+    count, _ = tree_size(p.parse(data))
+    print("{0} AST nodes, {1} functions, {2} CPUs".format(
+        count, functions, multiprocessing.cpu_count()))
+
+    # 意味解析は構文木を書き換えるので、繰り返すたびに解析し直す
+    best = collections.OrderedDict()
+    stdout = sys.stdout
+    for _ in range(int(repeat)):
+        trees = [p.parse(data) for _ in range(4)]
+        collector = parallel_analyzer.DiagnosticCollector()
+        state = {}
+
+        def fused():
+            diag = diagnostics.Diagnostics(echo=False)
+            semantic_analyzer.Analyzer(trees[0], check_types=True, diagnostics=diag).analyze(trees[0])
+
+        def globals_pass():
+            state["result"] = parallel_analyzer.declare_globals(trees[1], collector)
+
+        def bodies():
+            analyzer, positions, visible = state["result"]
+            nodes = [trees[1].nodes[position] for position in positions]
+            state["state"] = (nodes, positions, visible, analyzer.env.scopes[0])
+            parallel_analyzer.analyze_functions(state["state"], 0, len(nodes), collector)
+
+        def dump():
+            decls = state["state"][3]
+            decl_index = dict((id(decl), i) for i, decl in enumerate(decls))
+            state["data"] = parallel_analyzer.dump_result(state["state"][0], [], (0, 0, 0), decl_index)
+
+        def load():
+            state["loaded"] = parallel_analyzer.load_result(state["data"], state["state"][3])
+
+        def apply():
+            # ワーカーの結果を書き込む親の構文木は、解析していない別の構文木
+            nodes = [trees[2].nodes[position] for position in state["result"][1]]
+            parallel_analyzer.apply_results(nodes, state["loaded"][0])
+
+        sys.stdout = NullWriter()
+        try:
+            for name, func in (("fused", fused), ("globals", globals_pass), ("bodies", bodies),
+                               ("dump", dump), ("load", load), ("apply", apply)):
+                elapsed, _ = timeit(func, repeat=1)
+                best[name] = min(best.get(name, elapsed), elapsed)
+        finally:
+            sys.stdout = stdout
+
+    for name, elapsed in best.items():
+        print("{0:<10}: {1:.3f}s, {2:.0f} nodes/s".format(name, elapsed, count / elapsed))
+    print("pickled result: {0} bytes".format(len(state["data"])))
+
+    # 親のプロセスで逐次に行う部分(大域の宣言の解析、結果の読み込みと書き込み)と、
+    # ワーカーで行う部分から見積もったプロセスの数ごとの速度向上(Amdahlの法則。
+    # プールの起動の時間は含めない)。checkは構文木に書き込まない(annotate=False)場合
+    for name, sequential, parallel in (
+            ("annotate", best["globals"] + best["load"] + best["apply"], best["bodies"] + best["dump"]),
+            ("check", best["globals"], best["bodies"])):
+        print("{0}: serial fraction {1:.1%}, estimated speedup {2}".format(
+            name, sequential / (sequential + parallel), ", ".join(
+                "{0}: {1:.2f}x".format(workers, best["fused"] / (sequential + parallel / workers))
+                for workers in (2, 4, 8, 16, 32))))
+    # annotateでは親の書き込みがワーカーの数によらず残るので、速度向上はこの値で頭打ちになる
+    print("annotate: parent write-back bounds the speedup at {0:.2f}x; "
+          "check scales with the number of processes".format(
+              best["fused"] / (best["globals"] + best["load"] + best["apply"])))
+
+    # 実際にプロセスプールで解析した時間。親のCPU時間は逐次に行う部分、ワーカーの
+    # CPU時間(終了したワーカーの分をos.times()で数える)は並列に行える部分になる。
+    # 親は結果の書き込みをワーカーの解析と重ねて行うので、CPUがn個あるときの時間は
+    # max(親のCPU時間, ワーカーのCPU時間 / n)を下回らない。その時間で1つのプロセスで
+    # 解析した時間(fused)を割ったものを、速度向上の上限として表示する
+    for annotate in (True, False):
+        for workers in sorted(set((2, 4, processes))):
+            tree = p.parse(data)
+            analyzer = parallel_analyzer.ParallelAnalyzer(
+                tree, processes=workers, annotate=annotate,
+                diagnostics=diagnostics.Diagnostics(echo=False))
+            before = os.times()
+            elapsed, _ = timeit(analyzer.analyze, repeat=1)
+            after = os.times()
+            parent = after[0] + after[1] - before[0] - before[1]
+            children = after[2] + after[3] - before[2] - before[3]
+            print("pool({0}, annotate={1}): {2:.3f}s wall, parent CPU {3:.3f}s, "
+                  "workers CPU {4:.3f}s, speedup bound {5}".format(
+                      workers, annotate, elapsed, parent, children, ", ".join(
+                          "{0}: {1:.2f}x".format(cpus, best["fused"] / max(parent, children / cpus))
+                          for cpus in (4, 8, 16, 32))))
+
+
+@benchmark
+def bench_recheck(statements=50, repeat=5):
+    """関数の本体を1行書き換えたときの意味解析のやり直しの時間を、ファイルの大きさごとに表示する"""
+    import logging
+    import samplegen
+    import parser
+    import semantic_analyzer
+    import incremental_analyzer
+
+    stdout = sys.stdout
+    for functions in (100, 400, 1600):
+        lines = samplegen.generate_program(functions, int(statements), seed=0).splitlines(True)
+        middle = len(lines) // 2
+        while "= " not in lines[middle]:
+            middle += 1
+        data = "".join(lines)
+        edited = "".join(lines[:middle] + [lines[middle].replace("= ", "= 1 + ", 1)] + lines[middle + 1:])
+        p = parser.Parser()
+        p.build()
+
+        # 生成したプログラムでは変数の重複などの診断メッセージが多いので表示しない
+        sys.stdout = NullWriter()
+        logging.disable(logging.CRITICAL)
+        try:
+            def full():
+                tree = p.parse(edited)
+                start = time.time()
+                semantic_analyzer.Analyzer(tree, check_types=True).analyze(tree)
+                return time.time() - start
+
+            def recheck():
+                # 解析済みの構文木を使い回さないように、構文解析器も作り直す
+                incremental_parser = parser.Parser()
+                incremental_parser.build()
+                analyzer = incremental_analyzer.IncrementalAnalyzer()
+                analyzer.analyze(incremental_parser.parse_incremental(data))
+                tree = incremental_parser.parse_incremental(edited)
+                start = time.time()
+                analyzer.analyze(tree)
+                return time.time() - start, analyzer.reanalyzed
+
+            full_elapsed = min(full() for _ in range(int(repeat)))
+            recheck_elapsed, reanalyzed = min(recheck() for _ in range(int(repeat)))
+        finally:
+            sys.stdout = stdout
+            logging.disable(logging.NOTSET)
+        print("{0:>5} functions: full {1:.3f}s, recheck {2:.2f}ms ({3} function reanalyzed)".format(
+            functions, full_elapsed, recheck_elapsed * 1000, reanalyzed))
+
+
+@benchmark
+def bench_trace(functions=20, statements=200, repeat=3):
+    """意味解析と中間コード生成の時間を、トレースを無効にしたときと有効にしたときで比べる"""
+    import logging
+    import samplegen
+    import parser
+    import semantic_analyzer
+    import intermed_code
+    import trace
+
+    data = samplegen.generate_program(int(functions), int(statements), seed=0)
+    p = parser.Parser()
+    p.build()
+
+    def run():
+        tree = p.parse(data)
+        start = time.time()
+        semantic_analyzer.Analyzer(tree).analyze(tree)
+        middle = time.time()
+        intermed_code.IntermedCodeGenerator(tree).intermed_code_generator()
+        return middle - start, time.time() - middle
+
+    logging.disable(logging.CRITICAL)
+    try:
+        for name, format in (("disabled", None), ("text", "text"), ("jsonl", "jsonl")):
+            if format is None:
+                trace.disable()
+            else:
+                trace.enable(output=os.devnull, format=format)
+            analyze, intermed = [min(times) for times in zip(*[run() for _ in range(int(repeat))])]
+            print("{0:<8}: analyze {1:.3f}s, intermed {2:.3f}s".format(name, analyze, intermed))
+    finally:
+        trace.disable()
+        logging.disable(logging.NOTSET)
+
+
+@benchmark
+def bench_emit(max_statements=1000000, statements=500):
+    """中間コード生成とコード生成の時間を、文の数を1000から10倍ずつmax_statementsまで
+       増やして表示する(文あたりの時間が一定なら、手間は文の数に比例している)
+
+       100万文のアセンブリをすべて持つと数GBになるので、コード生成は関数ごとに行い、
+       生成した命令はその関数の分を数えたら捨てる。中間コード生成はプログラム全体に
+       対して行い、コード生成で使い終わった関数の中間命令から捨てる"""
+    import gcpause
+    import logging
+    import samplegen
+    import parser
+    import semantic_analyzer
+    import intermed_code
+    import assign_address
+    import codegen
+
+    p = parser.Parser(parser_engine="rd")
+    p.build()
+    logging.disable(logging.CRITICAL)
+    try:
+        size = 1000
+        while size <= int(max_statements):
+            functions = max(1, size // int(statements))
+            data = samplegen.generate_program(functions, size // functions, seed=0)
+            tree = p.parse(data)
+            semantic_analyzer.Analyzer(tree, check_types=True).analyze(tree)
+            del data
+
+            start = time.time()
+            code = intermed_code.IntermedCodeGenerator(tree).intermed_code_generator()
+            intermed = time.time() - start
+            del tree
+            code = assign_address.AssignAddress(code).assign_address()
+            generator = codegen.CodeGenerator(code)
+            count = 0
+            start = time.time()
+            with gcpause.paused():
+                for i, itmd in enumerate(code):
+                    if isinstance(itmd, intermed_code.FunctionDefinition):
+                        count += len(generator.intermed_fundef_to_code(itmd))
+                    code[i] = None
+            generate = time.time() - start
+            print("{0:>8} statements: intermed {1:.3f}s ({2:.2f}us/stmt), "
+                  "codegen {3:.3f}s ({4:.2f}us/stmt), {5} instructions".format(
+                      size, intermed, intermed * 1e6 / size, generate, generate * 1e6 / size,
+                      count))
+            del code, generator
+            size *= 10
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def code_size(code):
+    """中間命令またはアセンブリの命令の列が使う命令の数と、メモリ(バイト)の合計を返す
+       (__dict__を持つ命令は__dict__の分も数える。命令が参照する宣言(Decl)は数えない)"""
+    import intermed_code
+
+    count = 0
+    size = 0
+    stack = list(code)
+    while stack:
+        item = stack.pop()
+        count += 1
+        size += sys.getsizeof(item)
+        if hasattr(item, "__dict__"):
+            size += sys.getsizeof(item.__dict__)
+        for name in item._fields:
+            value = getattr(item, name)
+            if isinstance(value, intermed_code.Fields):
+                stack.append(value)
+            elif isinstance(value, list):
+                size += sys.getsizeof(value)
+                stack.extend(item for item in value if isinstance(item, intermed_code.Fields))
+    return count, size
+
+
+@benchmark
+def bench_ir(functions=4, statements=5000, repeat=3):
+    """大きな関数の中間コード生成とコード生成の時間、命令が使うメモリ、
+       命令の列どうしの比較の時間を表示する"""
+    import logging
+    import samplegen
+    import parser
+    import semantic_analyzer
+    import intermed_code
+    import assign_address
+    import codegen
+
+    data = samplegen.generate_program(int(functions), int(statements), seed=0)
+    p = parser.Parser(parser_engine="rd")
+    p.build()
+    logging.disable(logging.CRITICAL)
+    try:
+        tree = p.parse(data)
+        semantic_analyzer.Analyzer(tree, check_types=True).analyze(tree)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    def generate():
+        return intermed_code.IntermedCodeGenerator(tree).intermed_code_generator()
+
+    elapsed, code = timeit(generate, repeat=int(repeat))
+    count, size = code_size(code)
+    print("intermed: {0:.3f}s, {1} IR objects, {2:.1f} bytes/object".format(
+        elapsed, count, float(size) / count))
+    other = generate()
+    elapsed, equal = timeit(lambda: code == other, repeat=int(repeat))
+    print("compare : {0:.3f}s, {1:.0f} objects/s (equal: {2})".format(elapsed, count / elapsed, equal))
+
+    code = assign_address.AssignAddress(code).assign_address()
+    elapsed, instrs = timeit(lambda: codegen.CodeGenerator(code).intermed_code_to_code(),
+                             repeat=int(repeat))
+    count, size = code_size(instrs)
+    print("codegen : {0:.3f}s, {1} instructions, {2:.1f} bytes/instruction".format(
+        elapsed, count, float(size) / count))
+
+
+@benchmark
+def bench_temps(functions=20, statements=200, repeat=3):
+    """一時変数を使い回すときと使い回さないときの、一時変数の数、フレームの大きさ、
+       中間コード生成の時間を表示する(小さな関数が多いものと大きな関数が1つのもの)"""
+    import logging
+    import samplegen
+    import parser
+    import semantic_analyzer
+    import intermed_code
+    import assign_address
+
+    p = parser.Parser(parser_engine="rd")
+    p.build()
+    logging.disable(logging.CRITICAL)
+    try:
+        for shape in [(int(functions), int(statements)), (1, int(functions) * int(statements))]:
+            tree = p.parse(samplegen.generate_program(shape[0], shape[1], seed=0))
+            semantic_analyzer.Analyzer(tree, check_types=True).analyze(tree)
+            print("{0} functions x {1} statements:".format(*shape))
+            for recycle in (False, True):
+                def generate():
+                    generator = intermed_code.IntermedCodeGenerator(tree, recycle_temps=recycle)
+                    return generator, generator.intermed_code_generator()
+
+                elapsed, (generator, code) = timeit(generate, repeat=int(repeat))
+                code = assign_address.AssignAddress(code).assign_address()
+                fundefs = [item for item in code if isinstance(item, intermed_code.FunctionDefinition)]
+                print("  recycle={0!s:<5}: {1} temps created, {2} reused, frames {3} bytes total "
+                      "(largest {4}), intermed {5:.3f}s".format(
+                          recycle, generator.tvg.counter, generator.tvg.reused,
+                          sum(fundef.localvarsize for fundef in fundefs),
+                          max(fundef.localvarsize for fundef in fundefs), elapsed))
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+@benchmark
+def bench_ssa(max_statements=40000, statements=10000):
+    """1つの関数の文の数をstatementsからmax_statementsまで2倍ずつ増やし、
+       制御フローグラフの構築、SSA形式への変換、元に戻す変換の時間を表示する"""
+    import logging
+    import samplegen
+    import parser
+    import semantic_analyzer
+    import intermed_code
+    import cfg
+    import ssa
+
+    p = parser.Parser(parser_engine="rd")
+    p.build()
+    logging.disable(logging.CRITICAL)
+    try:
+        size = int(statements)
+        while size <= int(max_statements):
+            tree = p.parse(samplegen.generate_program(1, size, seed=0))
+            semantic_analyzer.Analyzer(tree, check_types=True).analyze(tree)
+            code = intermed_code.IntermedCodeGenerator(tree).intermed_code_generator()
+            fundef = max((item for item in code if isinstance(item, intermed_code.FunctionDefinition)),
+                         key=lambda item: len(item.body.stmts))
+
+            start = time.time()
+            graph = cfg.build_function(fundef)
+            build = time.time() - start
+            start = time.time()
+            form = ssa.construct(graph)
+            construct = time.time() - start
+            phis = form.phi_count()
+            start = time.time()
+            decls = ssa.destruct(form)
+            destruct = time.time() - start
+            stmts = sum(len(block.stmts) for block in graph.blocks)
+            print("{0:>7} statements ({1} IR statements, {2} blocks, {3} phis): cfg {4:.3f}s, "
+                  "construct {5:.3f}s ({6:.2f}us/stmt), destruct {7:.3f}s, {8} new variables".format(
+                      size, stmts, len(graph.blocks), phis, build, construct,
+                      construct * 1e6 / stmts, destruct, len(decls)))
+            del tree, code, fundef, graph, form
+            size *= 2
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+@benchmark
+def bench_diagnostics(errors=100000, max_errors=100):
+    """エラーが多いファイルで、診断メッセージの記録と出力にかかる時間を表示する"""
+    import logging
+    import parser
+    import semantic_analyzer
+    import diagnostics
+
+    errors = int(errors)
+    semantic = "int main() {\n" + "    u;\n" * errors + "    return 0;\n}\n"
+    syntax = "int main() {\n" + "    x = ;\n" * errors + "    return 0;\n}\n"
+    p = parser.Parser()
+    p.build()
+
+    def analyze(diag):
+        tree = p.parse(semantic)
+        start = time.time()
+        try:
+            semantic_analyzer.Analyzer(tree, diagnostics=diag).analyze(tree)
+        except diagnostics.TooManyErrors:
+            pass
+        return time.time() - start
+
+    # loggingへの出力はこれまでと同じく1件ずつ書式化してストリームに書き出す
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    devnull = open(os.devnull, "w")
+    root.handlers = [logging.StreamHandler(devnull)]
+    try:
+        elapsed = analyze(diagnostics.Diagnostics())
+        print("semantic, logging   : {0:.3f}s ({1:.0f} errors/s)".format(elapsed, errors / elapsed))
+        diag = diagnostics.Diagnostics(echo=False)
+        elapsed = analyze(diag)
+        start = time.time()
+        devnull.write(diag.format())
+        written = time.time() - start
+        print("semantic, collected : {0:.3f}s ({1:.0f} errors/s), format {2:.3f}s".format(
+            elapsed, errors / elapsed, written))
+        elapsed = analyze(diagnostics.Diagnostics(max_errors=int(max_errors), echo=False))
+        print("semantic, max {0:<5}: {1:.3f}s".format(max_errors, elapsed))
+
+        diag = diagnostics.Diagnostics(echo=False)
+        syntax_parser = parser.Parser(diagnostics=diag)
+        syntax_parser.build()
+        start = time.time()
+        syntax_parser.parse(syntax)
+        elapsed = time.time() - start
+        print("syntax, recovered   : {0:.3f}s ({1} errors in one run)".format(elapsed, diag.error_count))
+    finally:
+        root.handlers = handlers
+        devnull.close()
+
+
+def main(argv):
+    if len(argv) < 2 or argv[1] not in BENCHMARKS:
+        print("usage: python benchmark.py <benchmark> [args...]")
+        for name, func in BENCHMARKS.items():
+            print("    {0:<16} {1}".format(name, func.__doc__.splitlines()[0]))
+        return 1
+
+    return BENCHMARKS[argv[1]](*argv[2:]) or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,221 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""中間命令の木を基本ブロックの列と制御フローグラフに変換するモジュール
+
+   IntermedCodeGeneratorが作る中間命令は、IfStatementやWhileStatementの中に
+   文の並び(CompoundStatement)が入れ子になった木である。build()はこれを
+   基本ブロック(BasicBlock)の列にする。
+
+   - 基本ブロックは分岐を含まない文の並び(stmts)と、最後に実行する終端命令
+     (terminator)からなる。終端命令は次のいずれか
+       Jump(target)                   : targetのブロックへ移る
+       Branch(var, if_true, if_false) : varが0でなければif_true、0ならif_falseへ移る
+       Return(var)                    : varの値を返して関数を終える
+   - blocksはコードを並べる順のブロックのリスト。終端命令の移り先が次のブロック
+     ならジャンプ命令はいらない(そのまま次のブロックに進む)
+   - 各ブロックのsuccsは移り先のブロック、predsは移ってくる元のブロック。
+     関数の終わりはexit(文を持たないブロック)で表し、Returnのブロックと
+     最後のブロックはexitに移る
+   - ジャンプ命令で移る先のブロックにはラベルの名前(label)を付ける。名前は
+     nextlabel()で作り、入れ子の内側の文のものから順に付ける
+
+   return文の後の文は、どこからも移ってこない(predsが空の)ブロックになる。
+   入れ子の深い文でもPythonのスタックが深くならないように、文の変換は
+   ジェネレータで書いてvisitor.run()で実行する。"""
+
+import itertools
+import intermed_code as ic
+import visitor
+
+
+class BasicBlock(object):
+
+    """基本ブロック
+       indexはblocksの中での位置(exitは-1)、labelはラベルの名前(ジャンプ命令で
+       移ってこないブロックはNone)。phisはSSA形式のときにブロックの先頭に置く
+       φ関数のリスト(ssaモジュールを参照)"""
+
+    __slots__ = ("index", "label", "phis", "stmts", "terminator", "preds", "succs")
+
+    def __init__(self, index, label=None):
+        self.index = index
+        self.label = label
+        self.phis = []
+        self.stmts = []
+        self.terminator = None
+        self.preds = []
+        self.succs = []
+
+    def __repr__(self):
+        return "BasicBlock({0}, {1!r})".format(self.index, self.label)
+
+
+# 終端命令
+class Jump(ic.Fields):
+
+    __slots__ = _fields = ("target",)
+
+    def __init__(self, target):
+        self.target = target
+
+
+class Branch(ic.Fields):
+
+    __slots__ = _fields = ("var", "if_true", "if_false")
+
+    def __init__(self, var, if_true, if_false):
+        self.var = var
+        self.if_true = if_true
+        self.if_false = if_false
+
+
+class Return(ic.Fields):
+
+    __slots__ = _fields = ("var",)
+
+    def __init__(self, var):
+        self.var = var
+
+
+class ControlFlowGraph(object):
+
+    """基本ブロックの列(blocks)と、関数の終わりを表すブロック(exit)
+       entryは最初に実行するブロック"""
+
+    def __init__(self, blocks, exit):
+        self.blocks = blocks
+        self.exit = exit
+
+    @property
+    def entry(self):
+        return self.blocks[0]
+
+    def successors(self, block):
+        """blockの終端命令の移り先のブロックのリストを返す"""
+        term = block.terminator
+        if isinstance(term, Jump):
+            return [term.target]
+        elif isinstance(term, Branch):
+            if term.if_true is term.if_false:
+                return [term.if_true]
+            return [term.if_true, term.if_false]
+        return [self.exit]
+
+    def link(self):
+        """各ブロックのpredsとsuccsを終端命令から求め直す"""
+        for block in self.blocks:
+            block.preds = []
+        self.exit.preds = []
+        for block in self.blocks:
+            block.succs = self.successors(block)
+            for succ in block.succs:
+                succ.preds.append(block)
+
+    def reachable(self):
+        """entryからたどれるブロックを、blocksの順に並べたリストを返す"""
+        seen = set([self.entry.index])
+        stack = [self.entry]
+        while stack:
+            for succ in stack.pop().succs:
+                if succ.index not in seen:
+                    seen.add(succ.index)
+                    stack.append(succ)
+        return [block for block in self.blocks if block.index in seen]
+
+
+def label_names(prefix="L"):
+    """prefix + 番号 のラベルの名前を順に返す関数を作る"""
+    counter = itertools.count()
+    return lambda: prefix + str(next(counter))
+
+
+def body_statements(stmt):
+    """if文やwhile文の本体(CompoundStatementまたは文のリスト)の文のリストを返す"""
+    if isinstance(stmt, ic.CompoundStatement):
+        return stmt.stmts
+    return stmt
+
+
+class GraphBuilder(object):
+
+    """中間命令の文を順に基本ブロックに振り分けるもの
+       currentは今文を加えているブロック"""
+
+    # 文の中間命令のクラスに応じてlower_<クラス名>を呼び出す
+    # (制御の流れを変えない文はlower_statementで今のブロックに加える)
+    lower = visitor.dispatcher("lower_", "lower_statement")
+
+    def __init__(self, nextlabel=None):
+        self.nextlabel = nextlabel or label_names()
+        self.blocks = []
+        self.exit = BasicBlock(-1)
+        self.current = self.new_block()
+
+    def new_block(self):
+        """新しいブロックをblocksの最後に加え、currentにして返す"""
+        block = BasicBlock(len(self.blocks))
+        self.blocks.append(block)
+        self.current = block
+        return block
+
+    def build(self, stmts):
+        for stmt in stmts:
+            visitor.run(self.lower(stmt))
+        self.current.terminator = Jump(self.exit)
+        graph = ControlFlowGraph(self.blocks, self.exit)
+        graph.link()
+        return graph
+
+    def lower_statement(self, stmt):
+        self.current.stmts.append(stmt)
+
+    def lower_CompoundStatement(self, stmt):
+        for child in stmt.stmts:
+            yield self.lower(child)
+
+    def lower_ReturnStatement(self, stmt):
+        self.current.terminator = Return(stmt.var)
+        self.new_block()
+
+    def lower_IfStatement(self, stmt):
+        branch_block = self.current
+        then_block = self.new_block()
+        for child in body_statements(stmt.then_stmt):
+            yield self.lower(child)
+        then_exit = self.current
+        else_block = self.new_block()
+        for child in body_statements(stmt.else_stmt):
+            yield self.lower(child)
+        else_exit = self.current
+        join_block = self.new_block()
+
+        else_block.label = self.nextlabel()
+        join_block.label = self.nextlabel()
+        branch_block.terminator = Branch(stmt.var, then_block, else_block)
+        then_exit.terminator = Jump(join_block)
+        else_exit.terminator = Jump(join_block)
+
+    def lower_WhileStatement(self, stmt):
+        # 条件の式を評価する文は、while文の前と本体の最後に置かれている
+        entry_block = self.current
+        loop_block = self.new_block()
+        for child in body_statements(stmt.stmt):
+            yield self.lower(child)
+        body_exit = self.current
+        break_block = self.new_block()
+
+        loop_block.label = self.nextlabel()
+        break_block.label = self.nextlabel()
+        entry_block.terminator = Branch(stmt.var, loop_block, break_block)
+        body_exit.terminator = Branch(stmt.var, loop_block, break_block)
+
+
+def build(stmts, nextlabel=None):
+    """中間命令の文のリストstmtsの制御フローグラフを作って返す"""
+    return GraphBuilder(nextlabel).build(stmts)
+
+
+def build_function(fundef, nextlabel=None):
+    """中間命令の関数定義fundefの本体の制御フローグラフを作って返す"""
+    return build(fundef.body.stmts, nextlabel)
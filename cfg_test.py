@@ -0,0 +1,62 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+import nose
+import cfg
+import intermed_code as ic
+import semantic_analyzer as sa
+from parser import Parser
+
+
+class ControlFlowGraphTest(TestCase):
+
+    def setUp(self):
+        self.parser = Parser()
+        self.parser.build()
+
+    def tearDown(self):
+        pass
+
+    def build(self, data):
+        tree = self.parser.parse(data)
+        sa.Analyzer(tree, check_types=True).analyze(tree)
+        code = ic.IntermedCodeGenerator(tree).intermed_code_generator()
+        return cfg.build_function(code[-1])
+
+    def test_blocks(self):
+        """if文、while文、return文が基本ブロックと終端命令に分けられるかのテスト"""
+        graph = self.build("int main() { int a; a = 1; if (a) a = 2; else a = 3; "
+                           "while (a) a = a - 1; return a; }")
+        blocks = graph.blocks
+
+        nose.tools.eq_([cfg.Branch, cfg.Jump, cfg.Jump, cfg.Branch, cfg.Branch, cfg.Return, cfg.Jump],
+                       [type(block.terminator) for block in blocks])
+        nose.tools.eq_([None, None, "L0", "L1", "L2", "L3", None], [block.label for block in blocks])
+        nose.tools.eq_([blocks[1], blocks[2]], blocks[0].succs)
+        nose.tools.eq_([blocks[1], blocks[2]], blocks[3].preds)
+        nose.tools.eq_([blocks[4], blocks[5]], blocks[4].succs)
+        nose.tools.eq_([blocks[3], blocks[4]], blocks[4].preds)
+        nose.tools.eq_([blocks[5], blocks[6]], graph.exit.preds)
+        nose.tools.ok_(all(isinstance(stmt, ic.LetStatement) for stmt in blocks[4].stmts))
+
+    def test_unreachable(self):
+        """return文の後の文が、どこからも移ってこないブロックになるかのテスト"""
+        graph = self.build("int main() { int a; return 1; a = 2; }")
+
+        nose.tools.eq_(2, len(graph.blocks))
+        nose.tools.eq_([], graph.blocks[1].preds)
+        nose.tools.eq_([graph.entry], graph.reachable())
+
+    def test_nested_labels(self):
+        """ラベルの名前が入れ子の内側の文から順に付けられるかのテスト"""
+        graph = self.build("int main() { int a; a = 1; if (a) { if (a) a = 1; } a = 2; return a; }")
+        outer, inner = graph.blocks[0].terminator, graph.blocks[1].terminator
+
+        nose.tools.eq_(("L0", "L2"), (inner.if_false.label, outer.if_false.label))
+        nose.tools.eq_(outer.if_true, graph.blocks[1])
+        nose.tools.ok_(all(block.terminator is not None for block in graph.blocks))
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])
@@ -3,69 +3,54 @@
 
 import semantic_analyzer as sa
 import intermed_code as ic
-import collections
+import cfg
+import visitor
+import typetable
+import gcpause
 
 
-def flatten(l):
-    i = 0
-    while i < len(l):
-        while isinstance(l[i], collections.Iterable):
-            if not l[i]:
-                l.pop(i)
-                i -= 1
-                break
-            else:
-                l[i:i + 1] = l[i]
-        i += 1
-    return l
-
-
-class Instruction(object):
+class Instruction(ic.Fields):
 
     """命令を表すクラス。opはMIPSアセンブリの命令に対応する文字列であり、argsは命令を
        実行する際の引数のリストである。"""
 
+    __slots__ = _fields = ("op", "args")
+
     def __init__(self, op, args):
         self.op = op
         self.args = args
 
-    def __eq__(self, other):
-        return self.__dict__ == other.__dict__
 
-
-class Label(object):
+class Label(ic.Fields):
 
     """ラベル(main:, L0:など)を表すクラス。nameはラベル名を表す。"""
 
+    __slots__ = _fields = ("name",)
+
     def __init__(self, name):
         self.name = name
 
-    def __eq__(self, other):
-        return self.__dict__ == other.__dict__
-
 
-class Directive(object):
+class Directive(ic.Fields):
 
     """ディレクティブ(.textなど)を表すクラス"""
 
+    __slots__ = _fields = ("label", "args")
+
     def __init__(self, label, args):
         self.label = label
         self.args = args
 
-    def __eq__(self, other):
-        return self.__dict__ == other.__dict__
-
 
-class Comment(object):
+class Comment(ic.Fields):
 
     """デバッグの際生成するコードにつけるコメントを表すクラス"""
 
+    __slots__ = _fields = ("arg",)
+
     def __init__(self, arg):
         self.arg = arg
 
-    def __eq__(self, other):
-        return self.__dict__ == other.__dict__
-
 
 class CodeGenerator(object):
 
@@ -82,6 +67,23 @@ class CodeGenerator(object):
         self.labelman = LabelManager()
         self.wordsize = 4
 
+    # 中間命令のクラスに応じてexp_<クラス名>、stmt_<クラス名>を呼び出す
+    # (対応するメソッドのない文は何も出力しない。式は値を書き込まないと誤ったコードに
+    # なるので、対応するメソッドのない式はTypeErrorにする)
+    # 各メソッドは生成した命令を、引数codeのリストの末尾に順に追加する。
+    # 文を含む文(if、while、複文)とreturn文はcfgで基本ブロックに分けるので、
+    # stmt_<クラス名>は基本ブロックの中の文だけを、term_<クラス名>は
+    # 基本ブロックの終端命令を変換する
+    exp_to_code = visitor.dispatcher("exp_", "no_exp_code")
+    stmt_to_code = visitor.dispatcher("stmt_", "no_code")
+    term_to_code = visitor.dispatcher("term_", "no_code")
+
+    def no_code(self, itmd, *args):
+        pass
+
+    def no_exp_code(self, exp, *args):
+        raise TypeError("no code for {0}".format(type(exp).__name__))
+
     def allocate_frame(self, localvarsize, paramsize):
         """関数呼び出しの先頭で実行される。局所変数のワードサイズlocalvarsizeと
            パラメータのワードサイズparamsizeからその関数のために確保する
@@ -129,260 +131,245 @@ class CodeGenerator(object):
     def intermed_exp_to_code(self, dest, exp):
         """VarExpression型の値destと中間命令式expを受け取って、eを評価しdestに結果を書き込む
            アセンブリ命令列を返す"""
-        instr_list = []
-
-        if isinstance(exp, ic.IntExpression):
-            value = exp.num
-            destaddr = self.varofs_to_fp(dest)
-            instr_list = [Instruction("li", (self.reg0, value)),
-                          Instruction("sw", (self.reg0, destaddr))]
-
-        elif isinstance(exp, ic.VarExpression):
-            arg = exp.var
-            argaddr = self.varofs_to_fp(arg)
-            destaddr = self.varofs_to_fp(dest)
-            if isinstance(exp.var.objtype, tuple) and exp.var.objtype[0] == "array":
-                instr_list = [Instruction("la", (self.reg0, argaddr)),
-                              Instruction("sw", (self.reg0, destaddr))]
-            else:
-                instr_list = [Instruction("lw", (self.reg0, argaddr)),
-                              Instruction("sw", (self.reg0, destaddr))]
-
-        elif isinstance(exp, ic.ArithmeticOperation):
-            if exp.op == "PLUS":
-                op = "add"
-            elif exp.op == "MINUS":
-                op = "sub"
-            elif exp.op == "TIMES":
-                op = "mul"
-            elif exp.op == "DIVIDE":
-                op = "div"
-
-            addr_left = self.varofs_to_fp(exp.var_left)
-            addr_right = self.varofs_to_fp(exp.var_right)
-            destaddr = self.varofs_to_fp(dest)
-
-            instr_list = [Instruction("lw", (self.reg0, addr_left)),
-                          Instruction("lw", (self.reg1, addr_right)),
-                          Instruction(op, (self.reg0, self.reg0, self.reg1)),
-                          Instruction("sw", (self.reg0, destaddr))]
-
-        elif isinstance(exp, ic.RelationalExpression):
-            if exp.op == "LEQ":
-                op = "sle"
-            elif exp.op == "GEQ":
-                op = "sge"
-            elif exp.op == "LT":
-                op = "slt"
-            elif exp.op == "GT":
-                op = "sgt"
-            elif exp.op == "EQUAL":
-                op = "seq"
-            elif exp.op == "NEQ":
-                op = "sne"
-            elif exp.op == "AND":
-                op = "and"
-            elif exp.op == "OR":
-                op = "or"
-
-            addr_left = self.varofs_to_fp(exp.var_left)
-            addr_right = self.varofs_to_fp(exp.var_right)
-            destaddr = self.varofs_to_fp(dest)
-
-            instr_list = [Instruction("lw", (self.reg0, addr_left)),
-                          Instruction("lw", (self.reg1, addr_right)),
-                          Instruction(op, (self.reg0, self.reg0, self.reg1)),
-                          Instruction("sw", (self.reg0, destaddr))]
-
-        elif isinstance(exp, ic.AddressExpression):
-            arg = exp.var
-            argaddr = self.varofs_to_fp(arg)
-            destaddr = self.varofs_to_fp(dest)
+        code = []
+        self.exp_to_code(exp, dest, code)
+        return code
+
+    def exp_Decl(self, exp, dest, code):
+        # *p の中間表現(intermed_code.IntermedCodeGenerator.exp_Pointer)は、アドレスを
+        # 入れた一時変数をそのまま式にする。stmt_ReadStatementと同じくそのアドレスから読む
+        srcaddr = self.varofs_to_fp(exp)
+        destaddr = self.varofs_to_fp(dest)
+        reg0deref = "0(" + self.reg0 + ")"
+        instr_list = [Instruction("lw", (self.reg0, srcaddr)),
+                      Instruction("lw", (self.reg0, reg0deref)),
+                      Instruction("sw", (self.reg0, destaddr))]
+        code.extend(instr_list)
+
+    def exp_IntExpression(self, exp, dest, code):
+        value = exp.num
+        destaddr = self.varofs_to_fp(dest)
+        instr_list = [Instruction("li", (self.reg0, value)),
+                      Instruction("sw", (self.reg0, destaddr))]
+        code.extend(instr_list)
+
+    def exp_VarExpression(self, exp, dest, code):
+        arg = exp.var
+        argaddr = self.varofs_to_fp(arg)
+        destaddr = self.varofs_to_fp(dest)
+        if exp.var.objtype.is_array:
             instr_list = [Instruction("la", (self.reg0, argaddr)),
                           Instruction("sw", (self.reg0, destaddr))]
-
-        elif isinstance(exp, ic.ReadExpression):
-            arg = exp.var
-            argaddr = self.varofs_to_fp(arg)
-            destaddr = self.varofs_to_fp(dest)
-            argderef = "0(" + self.reg0 + ")"
+        else:
             instr_list = [Instruction("lw", (self.reg0, argaddr)),
-                          Instruction("lw", (self.reg0, argderef)),
                           Instruction("sw", (self.reg0, destaddr))]
-
-        return instr_list
-
-    def intermed_stmt_to_code(self, localvarsize, paramsize, stmt):
+        code.extend(instr_list)
+
+    def exp_ArithmeticOperation(self, exp, dest, code):
+        if exp.op == "PLUS":
+            op = "add"
+        elif exp.op == "MINUS":
+            op = "sub"
+        elif exp.op == "TIMES":
+            op = "mul"
+        elif exp.op == "DIVIDE":
+            op = "div"
+
+        addr_left = self.varofs_to_fp(exp.var_left)
+        addr_right = self.varofs_to_fp(exp.var_right)
+        destaddr = self.varofs_to_fp(dest)
+
+        instr_list = [Instruction("lw", (self.reg0, addr_left)),
+                      Instruction("lw", (self.reg1, addr_right)),
+                      Instruction(op, (self.reg0, self.reg0, self.reg1)),
+                      Instruction("sw", (self.reg0, destaddr))]
+        code.extend(instr_list)
+
+    def exp_RelationalExpression(self, exp, dest, code):
+        if exp.op == "LEQ":
+            op = "sle"
+        elif exp.op == "GEQ":
+            op = "sge"
+        elif exp.op == "LT":
+            op = "slt"
+        elif exp.op == "GT":
+            op = "sgt"
+        elif exp.op == "EQUAL":
+            op = "seq"
+        elif exp.op == "NEQ":
+            op = "sne"
+        elif exp.op == "AND":
+            op = "and"
+        elif exp.op == "OR":
+            op = "or"
+
+        addr_left = self.varofs_to_fp(exp.var_left)
+        addr_right = self.varofs_to_fp(exp.var_right)
+        destaddr = self.varofs_to_fp(dest)
+
+        instr_list = [Instruction("lw", (self.reg0, addr_left)),
+                      Instruction("lw", (self.reg1, addr_right)),
+                      Instruction(op, (self.reg0, self.reg0, self.reg1)),
+                      Instruction("sw", (self.reg0, destaddr))]
+        code.extend(instr_list)
+
+    def exp_AddressExpression(self, exp, dest, code):
+        arg = exp.var
+        argaddr = self.varofs_to_fp(arg)
+        destaddr = self.varofs_to_fp(dest)
+        instr_list = [Instruction("la", (self.reg0, argaddr)),
+                      Instruction("sw", (self.reg0, destaddr))]
+        code.extend(instr_list)
+
+    def exp_ReadExpression(self, exp, dest, code):
+        arg = exp.var
+        argaddr = self.varofs_to_fp(arg)
+        destaddr = self.varofs_to_fp(dest)
+        argderef = "0(" + self.reg0 + ")"
+        instr_list = [Instruction("lw", (self.reg0, argaddr)),
+                      Instruction("lw", (self.reg0, argderef)),
+                      Instruction("sw", (self.reg0, destaddr))]
+        code.extend(instr_list)
+
+    def intermed_stmt_to_code(self, localvarsize, paramsize, stmt, code=None):
         """中間命令文と、return文を変換するための局所変数サイズとパラメータサイズを
-           受け取り、アセンブリに変換して返す"""
-        instr_list = []
-
-        if isinstance(stmt, ic.EmptyStatement):
-            instr_list = [Instruction("nop", ())]
-
-        elif isinstance(stmt, ic.WriteStatement):
-            destaddr = self.varofs_to_fp(stmt.dest)
-            destderef = "0(" + str(self.reg1) + ")"
-            if isinstance(stmt.src, ic.IntExpression):
-                instr_list = [Instruction("li", (self.reg0, stmt.src.num)),
-                              Instruction("lw", (self.reg1, destaddr)),
-                              Instruction("sw", (self.reg0, destderef))]
-            else:
-                srcaddr = self.varofs_to_fp(stmt.src)
-                instr_list = [Instruction("lw", (self.reg0, srcaddr)),
-                              Instruction("lw", (self.reg1, destaddr)),
-                              Instruction("sw", (self.reg0, destderef))]
-
-        elif isinstance(stmt, ic.ReadStatement):
-            destaddr = self.varofs_to_fp(stmt.dest)
+           受け取り、アセンブリに変換して返す(codeを与えたときはその末尾に追加してcodeを返す)"""
+        if code is None:
+            code = []
+        graph = cfg.build([stmt], self.labelman.nextlabel)
+        self.blocks_to_code(graph, localvarsize, paramsize, code)
+        return code
+
+    def stmt_EmptyStatement(self, stmt, localvarsize, paramsize, code):
+        instr_list = [Instruction("nop", ())]
+        code.extend(instr_list)
+
+    def stmt_WriteStatement(self, stmt, localvarsize, paramsize, code):
+        destaddr = self.varofs_to_fp(stmt.dest)
+        destderef = "0(" + str(self.reg1) + ")"
+        if isinstance(stmt.src, ic.IntExpression):
+            instr_list = [Instruction("li", (self.reg0, stmt.src.num)),
+                          Instruction("lw", (self.reg1, destaddr)),
+                          Instruction("sw", (self.reg0, destderef))]
+        else:
             srcaddr = self.varofs_to_fp(stmt.src)
-            reg0deref = "0(" + self.reg0 + ")"
             instr_list = [Instruction("lw", (self.reg0, srcaddr)),
-                          Instruction("lw", (self.reg0, reg0deref)),
-                          Instruction("sw", (self.reg0, destaddr))]
-
-        elif isinstance(stmt, ic.LetStatement):
-            dest = stmt.var
-            exp = stmt.exp
-            if isinstance(exp, ic.VarExpression) and isinstance(exp.var.objtype, tuple) and exp.var.objtype[0] == "array":
-                dest.objtype = "array"
-            instr_list = self.intermed_exp_to_code(dest, exp)
-
-        elif isinstance(stmt, ic.IfStatement):
-            expaddr = self.varofs_to_fp(stmt.var)
-
-            if isinstance(stmt.then_stmt, ic.CompoundStatement):
-                then_code = flatten([self.intermed_stmt_to_code(
-                    localvarsize, paramsize, tstmt) for tstmt in stmt.then_stmt.stmts])
-            else:
-                then_code = flatten([self.intermed_stmt_to_code(
-                    localvarsize, paramsize, tstmt) for tstmt in stmt.then_stmt])
-
-            if isinstance(stmt.else_stmt, ic.CompoundStatement):
-                else_code = flatten([self.intermed_stmt_to_code(
-                    localvarsize, paramsize, estmt) for estmt in stmt.else_stmt.stmts])
+                          Instruction("lw", (self.reg1, destaddr)),
+                          Instruction("sw", (self.reg0, destderef))]
+        code.extend(instr_list)
+
+    def stmt_ReadStatement(self, stmt, localvarsize, paramsize, code):
+        destaddr = self.varofs_to_fp(stmt.dest)
+        srcaddr = self.varofs_to_fp(stmt.src)
+        reg0deref = "0(" + self.reg0 + ")"
+        instr_list = [Instruction("lw", (self.reg0, srcaddr)),
+                      Instruction("lw", (self.reg0, reg0deref)),
+                      Instruction("sw", (self.reg0, destaddr))]
+        code.extend(instr_list)
+
+    def stmt_LetStatement(self, stmt, localvarsize, paramsize, code):
+        dest = stmt.var
+        exp = stmt.exp
+        if isinstance(exp, ic.VarExpression) and exp.var.objtype.is_array:
+            # 一時変数には配列の先頭のアドレスが入る
+            dest.objtype = typetable.pointer(exp.var.objtype.target)
+        self.exp_to_code(exp, dest, code)
+
+    def stmt_CallStatement(self, stmt, localvarsize, paramsize, code):
+        # if not stmt.dest == None:
+        destaddr = self.varofs_to_fp(stmt.dest)
+        func = stmt.function.name
+
+        for i, argvar in enumerate(stmt.variables):
+            if isinstance(argvar, ic.AddressExpression):
+                code.append(
+                    Instruction("la", (self.reg0, self.varofs_to_fp(argvar))))
+                code.append(
+                    Instruction("sw", (self.reg0, str(-4 * (len(stmt.variables) - i)) + "($sp)")))
             else:
-                else_code = flatten([self.intermed_stmt_to_code(
-                    localvarsize, paramsize, estmt) for estmt in stmt.else_stmt])
-
-            label1 = self.labelman.nextlabel()
-            label2 = self.labelman.nextlabel()
-
-            instr_list = flatten([Instruction("lw", (self.reg0, expaddr)),
-                                  Instruction("beqz", (self.reg0, label1))])
-            for then_codeelem in then_code:
-                instr_list.append(then_codeelem)
-
-            instr_list.append(Instruction("j", label2))
-            instr_list.append(Label(label1))
-
-            for else_codeelem in else_code:
-                instr_list.append(else_codeelem)
-
-            instr_list.append(Label(label2))
-
-            flatten(instr_list)  # 一応
-
-        elif isinstance(stmt, ic.WhileStatement):
-            expaddr = self.varofs_to_fp(stmt.var)
-            if isinstance(stmt.stmt, ic.CompoundStatement):
-                code_true = flatten([self.intermed_stmt_to_code(
-                    localvarsize, paramsize, tstmt) for tstmt in stmt.stmt.stmts])
-            else:
-                code_true = flatten(
-                    [self.intermed_stmt_to_code(localvarsize, paramsize, tstmt) for tstmt in stmt.stmt])
-            loop_label = self.labelman.nextlabel()
-            break_label = self.labelman.nextlabel()
-
-            instr_list = flatten([Instruction("lw", (self.reg0, expaddr)),
-                                  Instruction(
-                                      "beqz", (self.reg0, break_label)),
-                                  Label(loop_label)])
-
-            for code_true_elem in code_true:
-                instr_list.append(code_true_elem)
-
-            instr_list.append(Instruction("lw", (self.reg0, expaddr)))
-            instr_list.append(Instruction("beqz", (self.reg0, break_label)))
-            instr_list.append(Instruction("j", loop_label))
-            instr_list.append(Label(break_label))
-
-        elif isinstance(stmt, ic.ReturnStatement):
-            retaddr = self.varofs_to_fp(stmt.var)
-            instr_list = flatten([Instruction("lw", (self.reg0, retaddr)),
-                                  Instruction(
-                                      "move", (self.return_reg, self.reg0)),
-                                  self.restore_frame(localvarsize, paramsize)])
-
-        elif isinstance(stmt, ic.CallStatement):
-            # if not stmt.dest == None:
-            destaddr = self.varofs_to_fp(stmt.dest)
-            func = stmt.function.name
-            args_control = []
-
-            for i, argvar in enumerate(stmt.variables):
-                if isinstance(argvar, ic.AddressExpression):
-                    args_control.append(
-                        Instruction("la", (self.reg0, self.varofs_to_fp(argvar))))
-                    args_control.append(
-                        Instruction("sw", (self.reg0, str(-4 * (len(stmt.variables) - i)) + "($sp)")))
-                else:
-                    args_control.append(
-                        Instruction("lw", (self.reg0, self.varofs_to_fp(argvar))))
-                    args_control.append(
-                        Instruction("sw", (self.reg0, str(-4 * (len(stmt.variables) - i)) + "($sp)")))
-
-            instr_list = flatten([args_control,
-                                  Instruction("jal", func),
-                                  Instruction("sw", (self.return_reg, destaddr))])
-
-        elif isinstance(stmt, ic.PrintStatement):
-            varaddr = self.varofs_to_fp(stmt.var)
-            instr_list = [Instruction("li", (self.return_reg, 1)),
-                          Instruction("lw", (self.reg0, varaddr)),
-                          Instruction("move", ("$a0", self.reg0)),
-                          Instruction("syscall", ()),
-                          Instruction("li", ("$v0", 4)),  # 改行を呼び出し
-                          Instruction("la", ("$a0", "nl")),
-                          Instruction("syscall", ())]
-
-        elif isinstance(stmt, ic.CompoundStatement):
-            instr_list = flatten([self.intermed_stmt_to_code(
-                localvarsize, paramsize, stmtelem) for stmtelem in stmt.stmts])
-
-        return instr_list
-
-    def intermed_fundef_to_code(self, fundef):
+                code.append(
+                    Instruction("lw", (self.reg0, self.varofs_to_fp(argvar))))
+                code.append(
+                    Instruction("sw", (self.reg0, str(-4 * (len(stmt.variables) - i)) + "($sp)")))
+
+        code.append(Instruction("jal", func))
+        code.append(Instruction("sw", (self.return_reg, destaddr)))
+
+    def stmt_PrintStatement(self, stmt, localvarsize, paramsize, code):
+        varaddr = self.varofs_to_fp(stmt.var)
+        instr_list = [Instruction("li", (self.return_reg, 1)),
+                      Instruction("lw", (self.reg0, varaddr)),
+                      Instruction("move", ("$a0", self.reg0)),
+                      Instruction("syscall", ()),
+                      Instruction("li", ("$v0", 4)),  # 改行を呼び出し
+                      Instruction("la", ("$a0", "nl")),
+                      Instruction("syscall", ())]
+        code.extend(instr_list)
+
+    def blocks_to_code(self, graph, localvarsize, paramsize, code):
+        """制御フローグラフgraphの基本ブロックを順にアセンブリに変換して、codeの末尾に追加する"""
+        blocks = graph.blocks
+        for block in blocks:
+            following = blocks[block.index + 1] if block.index + 1 < len(blocks) else graph.exit
+            if block.label is not None:
+                code.append(Label(block.label))
+            for stmt in block.stmts:
+                self.stmt_to_code(stmt, localvarsize, paramsize, code)
+            self.term_to_code(block.terminator, following, localvarsize, paramsize, code)
+
+    def term_Jump(self, term, following, localvarsize, paramsize, code):
+        # 移り先が次のブロックならそのまま進む
+        if term.target is not following:
+            code.append(Instruction("j", term.target.label))
+
+    def term_Branch(self, term, following, localvarsize, paramsize, code):
+        expaddr = self.varofs_to_fp(term.var)
+        code.append(Instruction("lw", (self.reg0, expaddr)))
+        code.append(Instruction("beqz", (self.reg0, term.if_false.label)))
+        if term.if_true is not following:
+            code.append(Instruction("j", term.if_true.label))
+
+    def term_Return(self, term, following, localvarsize, paramsize, code):
+        retaddr = self.varofs_to_fp(term.var)
+        code.append(Instruction("lw", (self.reg0, retaddr)))
+        code.append(Instruction("move", (self.return_reg, self.reg0)))
+        code.extend(self.restore_frame(localvarsize, paramsize))
+
+    def intermed_fundef_to_code(self, fundef, code=None):
         """関数定義の中間命令を受け取って、その中の宣言と複文、関数定義本体をアセンブリに
-           変換した結果を返す"""
+           変換した結果を返す(codeを与えたときはその末尾に追加してcodeを返す)"""
+        if code is None:
+            code = []
         funcvar = fundef.var
-        code = [self.intermed_stmt_to_code(
-            fundef.localvarsize, fundef.paramsize, stmt) for stmt in fundef.body.stmts]
-
-        instr_list = flatten([Label(funcvar.name),
-                              self.allocate_frame(
-                                  fundef.localvarsize, fundef.paramsize),
-                              flatten(code),
-                              self.restore_frame(fundef.localvarsize, fundef.paramsize)])
+        graph = fundef.graph
+        if graph is None:
+            graph = cfg.build_function(fundef, self.labelman.nextlabel)
+        else:
+            # 前もって作られたグラフのラベルは関数の中でしか区別されないので付け直す
+            for block in graph.blocks:
+                if block.label is not None:
+                    block.label = self.labelman.nextlabel()
+        code.append(Label(funcvar.name))
+        code.extend(self.allocate_frame(fundef.localvarsize, fundef.paramsize))
+        self.blocks_to_code(graph, fundef.localvarsize, fundef.paramsize, code)
+        code.extend(self.restore_frame(fundef.localvarsize, fundef.paramsize))
 
-        return instr_list
+        return code
 
     def intermed_code_to_code(self):
         localvarsize = 0
-        code = []
-
-        for itmd in self.intermed_code:
-            if isinstance(itmd, ic.VarDecl):
-                localvarsize += 4
-            elif isinstance(itmd, ic.FunctionDefinition):
-                localvarsize += itmd.localvarsize
-                code.append(self.intermed_fundef_to_code(itmd))
-
-        instr_list = flatten([Directive(".text", ()),
-                              Directive(".globl", ("main")),
-                              code])
-
-        return instr_list
+        code = [Directive(".text", ()),
+                Directive(".globl", ("main"))]
+
+        with gcpause.paused():
+            for itmd in self.intermed_code:
+                if isinstance(itmd, ic.VarDecl):
+                    localvarsize += 4
+                elif isinstance(itmd, ic.FunctionDefinition):
+                    localvarsize += itmd.localvarsize
+                    self.intermed_fundef_to_code(itmd, code)
+
+        return code
 
 
 class LabelManager(object):
@@ -7,6 +7,8 @@ import collections
 import semantic_analyzer as sa
 import intermed_code as ic
 import codegen
+import assign_address
+from parser import Parser
 
 def flatten(l):
     i = 0
@@ -126,18 +128,36 @@ class CodegenTest(TestCase):
 
         nose.tools.ok_(expected == actual)
 
-    # def test_pointer_to_code(self):
-    #     """ポインタ型変数*xの中間表現をアセンブリに変換するテスト""" # readstmt?
-    #     expected = [codegen.Instruction("lw", ("$t0", "-4($fp)")),
-    #                 codegen.Instruction("lw", ("$t0", "0($t0)")),
-    #                 codegen.Instruction("sw", ("$t0", "-12($fp)"))]  #
+    def test_pointer_to_code(self):
+        """ポインタ型変数*xの中間表現をアセンブリに変換するテスト"""
+        expected = [codegen.Instruction("lw", ("$t0", "-4($fp)")),
+                    codegen.Instruction("lw", ("$t0", "0($t0)")),
+                    codegen.Instruction("sw", ("$t0", "-12($fp)"))]
 
-    #     destvar = sa.Decl("_t0", 2, "var", "int", -12)
-    #     pointerexp = ic.VarExpression(
-    #         sa.Decl("x", 2, "var", ("pointer", "int"), -4))
-    #     actual = self.code_generator.intermed_exp_to_code(destvar, pointerexp)
+        destvar = sa.Decl("_t0", 2, "var", "int", -12)
+        pointer = sa.Decl("x", 2, "var", ("pointer", "int"), -4)
+        actual = self.code_generator.intermed_exp_to_code(destvar, pointer)
+
+        nose.tools.ok_(expected == actual)
 
-    #     nose.tools.ok_(expected == actual)
+    def test_unknown_exp_to_code(self):
+        """変換できない中間表現の式でTypeErrorになるかのテスト"""
+        destvar = sa.Decl("_t0", 2, "var", "int", -12)
+        nose.tools.assert_raises(TypeError, self.code_generator.intermed_exp_to_code,
+                                 destvar, ic.EmptyStatement())
+
+    def test_array_read_program(self):
+        """配列の要素を読むプログラム(print(a[1]))で、要素のアドレスから値を読むかのテスト"""
+        parser = Parser()
+        parser.build()
+        tree = parser.parse("void print(int v); int main() { int a[2]; a[1] = 2; print(a[1]); }")
+        env, _ = sa.Analyzer(tree).analyze(tree)
+        sa.TypeChecker(env).check_type(tree)
+        code = ic.IntermedCodeGenerator(tree).intermed_code_generator()
+        code = assign_address.AssignAddress(code).assign_address()
+        asm = codegen.CodeGenerator(code).intermed_code_to_code()
+
+        nose.tools.ok_(codegen.Instruction("lw", ("$t0", "0($t0)")) in asm)
 
     def test_address_to_code(self):
         """アドレス取得&xの中間表現をアセンブリに変換するテスト"""
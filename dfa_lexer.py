@@ -0,0 +1,320 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""トークン規則から作ったDFAの遷移表で字句解析を行うモジュール
+
+   lexer.Lexerの規則(固定文字列の規則、NUMBER、ID、COMMENT、newline、t_ignore)と
+   tokenrules.reservedから遷移表を組み立て、最長一致で走査する。
+   返すトークン列(型、値、行番号、位置)はPLYのLexerと同じになる。"""
+
+from __future__ import print_function
+import re
+import ply.lex as lex
+import tokenrules
+from lexer import Lexer
+
+DIGITS = "0123456789"
+LETTERS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_"
+
+# 受理状態の種類
+ACCEPT_FIXED = 1    # 固定文字列のトークン
+ACCEPT_NUMBER = 2
+ACCEPT_ID = 3
+ACCEPT_COMMENT = 4  # トークンを返さず、行番号だけ進める(コメントと改行)
+
+
+class Token(object):
+
+    """字句解析の結果のトークン。PLYのLexTokenと同じ属性を持つ"""
+
+    __slots__ = ("type", "value", "lineno", "lexpos", "lexer")
+
+    def __init__(self, toktype, value, lineno, lexpos):
+        self.type = toktype
+        self.value = value
+        self.lineno = lineno
+        self.lexpos = lexpos
+
+    def __str__(self):
+        return "LexToken(%s,%r,%d,%d)" % (self.type, self.value, self.lineno, self.lexpos)
+
+    def __repr__(self):
+        return str(self)
+
+
+class BufferToken(object):
+
+    """値を入力バッファの範囲として持ち、参照されたときに切り出すトークン"""
+
+    __slots__ = ("type", "lineno", "lexpos", "lexer", "buffer", "end", "_value")
+
+    def __init__(self, toktype, buf, lexpos, end, lineno):
+        self.type = toktype
+        self.buffer = buf
+        self.lexpos = lexpos
+        self.end = end
+        self.lineno = lineno
+        self._value = None
+
+    @property
+    def value(self):
+        if self._value is None:
+            value = self.buffer[self.lexpos:self.end]
+            self._value = int(value) if self.type == "NUMBER" else value
+            self.buffer = None
+        return self._value
+
+    def __str__(self):
+        return "LexToken(%s,%r,%d,%d)" % (self.type, self.value, self.lineno, self.lexpos)
+
+    def __repr__(self):
+        return str(self)
+
+
+class DFATable(object):
+
+    """DFAの遷移表。trans[state]は文字から次の状態への辞書で、辞書にない文字は
+       default[state]に遷移する(-1は遷移なし)。accept[state]は受理の種類、
+       types[state]は固定文字列のトークンの型を表す"""
+
+    def __init__(self):
+        self.trans = []
+        self.default = []
+        self.accept = []
+        self.types = []
+        self.skip = []
+        self.final = []
+        self.ignore = ""
+        self.skip_ignore = None
+        self.newstate()  # 開始状態
+
+    def newstate(self, accept=None, toktype=None):
+        self.trans.append({})
+        self.default.append(-1)
+        self.accept.append(accept)
+        self.types.append(toktype)
+        self.skip.append(None)
+        self.final.append(False)
+        return len(self.trans) - 1
+
+    def follow(self, string):
+        """開始状態からstringをたどった状態を返す。なければ状態を作る"""
+        state = 0
+        for ch in string:
+            nextstate = self.trans[state].get(ch)
+            if nextstate is None:
+                nextstate = self.newstate()
+                self.trans[state][ch] = nextstate
+            state = nextstate
+        return state
+
+    def add_literal(self, string, toktype):
+        """固定文字列stringをtoktypeのトークンとして受理する状態を加える"""
+        state = self.follow(string)
+        self.accept[state] = ACCEPT_FIXED
+        self.types[state] = toktype
+
+    def add_run(self, first, rest, accept):
+        """firstのいずれかの文字で始まり、restの文字が続く列を受理する状態を加える"""
+        state = self.newstate(accept)
+        for ch in first:
+            self.trans[0][ch] = state
+        for ch in rest:
+            self.trans[state][ch] = state
+
+    def add_comment(self, opener, closer):
+        """openerで始まりcloserで終わる最短の列をコメントとして受理する状態を加える
+           (2文字の区切りのみ対応)"""
+        body = self.follow(opener)
+        star = self.newstate()
+        end = self.newstate(ACCEPT_COMMENT)
+        self.default[body] = body
+        self.default[star] = body
+        self.trans[body][closer[0]] = star
+        self.trans[star][closer[0]] = star
+        self.trans[star][closer[1]] = end
+
+    def optimize(self):
+        """走査を速くするための情報を表に加える
+           - 自己遷移する文字が多い状態(ID、NUMBER、コメントの中身)には、その文字の
+             並びを一度に読み飛ばす正規表現を付ける
+           - 読み飛ばした後に他の状態へ遷移しない状態は、そこで走査を打ち切る"""
+        for state, row in enumerate(self.trans):
+            loop = [ch for ch, nextstate in row.items() if nextstate == state]
+            if self.default[state] == state:
+                others = [ch for ch, nextstate in row.items() if nextstate != state]
+                pattern = "[^" + "".join(re.escape(ch) for ch in others) + "]*"
+            elif len(loop) >= 8:
+                pattern = "[" + "".join(re.escape(ch) for ch in sorted(loop)) + "]*"
+            else:
+                pattern = None
+            if state != 0 and pattern is not None:
+                self.skip[state] = re.compile(pattern).match
+
+            exits = [ch for ch, nextstate in row.items() if nextstate != state]
+            self.final[state] = (not exits and self.default[state] < 0) or \
+                (self.skip[state] is not None and not exits)
+
+        self.skip_ignore = re.compile("[" + re.escape(self.ignore) + "]*").match
+
+
+def literal_rules(lexer_class):
+    """Lexerの文字列の規則から、固定文字列とトークンの型の組のリストを返す"""
+    literals = []
+    for name in dir(lexer_class):
+        if not name.startswith("t_") or name == "t_ignore":
+            continue
+        rule = getattr(lexer_class, name)
+        if callable(rule):
+            continue
+        # エスケープされていないメタ文字を含む規則は固定文字列ではない
+        if re.search(r"[.^$*+?{}\[\]|()]", re.sub(r"\\.", "", rule)):
+            raise ValueError("Token rule {0} is not a fixed string.".format(name))
+        literals.append((re.sub(r"\\(.)", r"\1", rule), name[2:]))
+    return literals
+
+
+_table_cache = {}
+
+
+def build_table(lexer_class=Lexer):
+    """lexer_classの規則から遷移表を組み立てて返す(一度作った表は使い回す)"""
+    if lexer_class in _table_cache:
+        return _table_cache[lexer_class]
+
+    table = DFATable()
+    for string, toktype in literal_rules(lexer_class):
+        table.add_literal(string, toktype)
+    table.add_run(DIGITS, DIGITS, ACCEPT_NUMBER)
+    table.add_run(LETTERS, LETTERS + DIGITS, ACCEPT_ID)
+    table.add_comment("/*", "*/")
+    table.add_run("\n", "\n \t", ACCEPT_COMMENT)
+    table.ignore = lexer_class.t_ignore
+    table.optimize()
+
+    _table_cache[lexer_class] = table
+    return table
+
+
+class DFAScanner(object):
+
+    """遷移表を使って入力を走査する字句解析器。PLYのLexerと同じく
+       input()で入力を与え、token()で次のトークンを取り出す"""
+
+    def __init__(self, table):
+        self.table = table
+        self.reserved = tokenrules.reserved
+        # token()で毎回属性を引かないように、走査に使う表をまとめておく
+        self.scan_tables = (table.trans[0], table.trans, table.default, table.accept,
+                            table.types, table.skip, table.final, table.skip_ignore)
+        self.lexdata = ""
+        self.lexpos = 0
+        self.lexlen = 0
+        self.lineno = 1
+        # 最後に返したトークンの行番号
+        self.last_lineno = 1
+        # 不正な文字を記録するもの(Noneなら不正な文字でLexErrorを送出する)
+        self.diagnostics = None
+
+    def input(self, data):
+        self.lexdata = data
+        self.lexpos = 0
+        self.lexlen = len(data)
+        self.stream = self.scan()
+
+    def token(self):
+        return next(self.stream, None)
+
+    def scan(self, lazy=False):
+        """lexposから入力の終わりまでのトークンを順に生成するジェネレータ
+           lazyがTrueのときは、NUMBERと固定文字列のトークンの値を参照されるまで
+           入力から切り出さない(入力がmmapのときに余分な複製を作らないため)"""
+        data = self.lexdata
+        pos = self.lexpos
+        end = self.lexlen
+        reserved = self.reserved
+        start, trans, default, accept, types, skip, final, skip_ignore = self.scan_tables
+        self.last_lineno = self.lineno
+
+        while True:
+            pos = skip_ignore(data, pos).end()
+            if pos >= end:
+                self.lexpos = pos
+                return
+
+            # 最長一致: 最後に受理状態を通った位置までをトークンにする
+            # 1文字目の遷移と、ID・NUMBERのような読み飛ばしで終わるトークンは先に処理する
+            state = start.get(data[pos], -1)
+            last_state = -1
+            if state >= 0:
+                i = pos + 1
+                if skip[state] is not None:
+                    i = skip[state](data, i).end()
+                if accept[state] is not None:
+                    last_state = state
+                    last_end = i
+                while not final[state] and i < end:
+                    state = trans[state].get(data[i], default[state])
+                    if state < 0:
+                        break
+                    i += 1
+                    if skip[state] is not None:
+                        i = skip[state](data, i).end()
+                    if accept[state] is not None:
+                        last_state = state
+                        last_end = i
+
+            if last_state < 0:
+                if self.diagnostics is not None:
+                    self.diagnostics.error("illegal-character", self.lineno,
+                                           "Line {0}: Illegal character \"{1}\".".format(self.lineno, data[pos]))
+                    pos += 1
+                    continue
+                self.lexpos = pos
+                print("Illegal Character: {0}".format(data[pos]))
+                # 入力が大きいときに残り全部を複製しないよう、行末までを渡す
+                rest = data[pos:pos + 80].split("\n")[0]
+                raise lex.LexError("Scanning error. Illegal character '%s'" % (data[pos]), rest)
+
+            kind = accept[last_state]
+            if kind == ACCEPT_COMMENT:
+                self.lineno += data[pos:last_end].count("\n")
+                pos = last_end
+                continue
+
+            if kind == ACCEPT_ID:
+                value = data[pos:last_end]
+                tok = Token(reserved.get(value, "ID"), value, self.lineno, pos)
+            elif lazy:
+                toktype = types[last_state] if kind == ACCEPT_FIXED else "NUMBER"
+                tok = BufferToken(toktype, data, pos, last_end, self.lineno)
+            elif kind == ACCEPT_FIXED:
+                tok = Token(types[last_state], data[pos:last_end], self.lineno, pos)
+            else:
+                tok = Token("NUMBER", int(data[pos:last_end]), self.lineno, pos)
+
+            pos = last_end
+            self.lexpos = pos
+            self.last_lineno = self.lineno
+            yield tok
+
+    def __iter__(self):
+        return iter(self.token, None)
+
+
+class DFALexer(object):
+
+    """lexer.Lexerと同じ使い方ができる、DFAを使った字句解析器"""
+
+    tokens = tokenrules.tokens
+
+    def build(self, **kwargs):
+        self.lexer = DFAScanner(build_table(Lexer))
+
+    @property
+    def diagnostics(self):
+        return self.lexer.diagnostics
+
+    @diagnostics.setter
+    def diagnostics(self, diagnostics):
+        self.lexer.diagnostics = diagnostics
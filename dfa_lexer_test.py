@@ -0,0 +1,78 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+import nose
+import ply.lex as lex
+import dfa_lexer
+import samplegen
+from lexer import Lexer
+
+
+def ply_tokens(data):
+    lexer = Lexer()
+    lexer.build()
+    lexer.lexer.input(data)
+    return [(tok.type, tok.value, tok.lineno, tok.lexpos)
+            for tok in iter(lexer.lexer.token, None)]
+
+
+def dfa_tokens(data):
+    lexer = dfa_lexer.DFALexer()
+    lexer.build()
+    lexer.lexer.input(data)
+    return [(tok.type, tok.value, tok.lineno, tok.lexpos)
+            for tok in iter(lexer.lexer.token, None)]
+
+
+class DFALexerTest(TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_operators(self):
+        """演算子と区切り記号の最長一致のテスト"""
+        data = "a<=b<c>=d>e==f!=g=h&&i&j||k++l--m+=n-=o+p-q*r/s(t)[u]{v},w;"
+
+        nose.tools.eq_(ply_tokens(data), dfa_tokens(data))
+
+    def test_reserved(self):
+        """予約語と識別子、整数の区別のテスト"""
+        data = "int intx if1 while whilex return void for else 12ab _a9 007"
+
+        nose.tools.eq_(ply_tokens(data), dfa_tokens(data))
+
+    def test_comment(self):
+        """コメントの読み飛ばしと行番号のテスト"""
+        data = "a /* one\ntwo\n * / ** */ b / c /**/ d\n/* x */\n*/ e /* unterminated"
+
+        nose.tools.eq_(ply_tokens(data), dfa_tokens(data))
+
+    def test_unicode(self):
+        """コメント中の非ASCII文字のテスト"""
+        data = u"int a; /* 初期化 */ a = 1;"
+
+        nose.tools.eq_(ply_tokens(data), dfa_tokens(data))
+
+    def test_illegal_character(self):
+        """不正な文字でLexErrorを送出するかのテスト"""
+        lexer = dfa_lexer.DFALexer()
+        lexer.build()
+        lexer.lexer.input("a = $;")
+
+        nose.tools.eq_("ID", lexer.lexer.token().type)
+        nose.tools.eq_("ASSIGN", lexer.lexer.token().type)
+        nose.tools.assert_raises(lex.LexError, lexer.lexer.token)
+
+    def test_generated_program(self):
+        """生成したプログラムのトークン列がPLYと一致するかのテスト"""
+        data = samplegen.generate_program(5, 30, seed=3, syntax_only=True)
+
+        nose.tools.eq_(ply_tokens(data), dfa_tokens(data))
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])
@@ -0,0 +1,130 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""コンパイラの各段階の診断メッセージ(エラーと警告)を集めるモジュール
+
+   字句解析、構文解析、意味解析、型検査はDiagnosticsに診断を記録する。
+   1件の診断(Diagnostic)は重大度、コード、行番号、メッセージを持つ。
+
+   - echoが真(既定)のときは、記録した診断をこれまでどおりloggingにも出力する。
+     多くのファイルをまとめてコンパイルするときはechoを偽にして、
+     recordsの診断を後からまとめて出力する
+   - max_errorsを与えると、エラーの数がその数に達したところでTooManyErrorsを
+     送出して、その段階の処理をすぐに打ち切る
+   - run_phases()は各段階を順に実行し、エラーが記録された段階の後の段階を
+     実行しない(エラーのある構文木を後の段階に渡さない)
+
+   構文エラーでは構文解析器が回復して解析を続けるので、1つのファイルの
+   構文エラーが1回の実行ですべて記録される。"""
+
+import logging
+
+ERROR = "error"
+WARNING = "warning"
+
+LOGGING_LEVELS = {ERROR: logging.ERROR, WARNING: logging.WARNING}
+
+
+class Diagnostic(object):
+
+    """1件の診断メッセージ
+       messageは"Line 行番号: "から始まる、loggingに出力するものと同じ文字列"""
+
+    __slots__ = ("severity", "code", "line", "message")
+
+    def __init__(self, severity, code, line, message):
+        self.severity = severity
+        self.code = code
+        self.line = line
+        self.message = message
+
+    def __eq__(self, other):
+        return isinstance(other, Diagnostic) and self.astuple() == other.astuple()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "Diagnostic({0!r}, {1!r}, {2!r}, {3!r})".format(*self.astuple())
+
+    def astuple(self):
+        return self.severity, self.code, self.line, self.message
+
+    def asdict(self):
+        return {"severity": self.severity, "code": self.code,
+                "line": self.line, "message": self.message}
+
+
+class TooManyErrors(Exception):
+
+    """エラーの数がmax_errorsに達したときに送出する例外"""
+    pass
+
+
+class Diagnostics(object):
+
+    """診断メッセージを記録するもの
+       エラーの数はerror_countに、警告の数はwarning_countに数える"""
+
+    def __init__(self, max_errors=None, echo=True):
+        self.max_errors = max_errors
+        self.echo = echo
+        self.clear()
+
+    def clear(self):
+        """記録した診断をすべて取り除く(同じものを次のファイルに使い回すとき)"""
+        self.records = []
+        self.error_count = 0
+        self.warning_count = 0
+        self.aborted = False
+
+    def error(self, code, line, message):
+        self.add(Diagnostic(ERROR, code, line, message))
+
+    def warning(self, code, line, message):
+        self.add(Diagnostic(WARNING, code, line, message))
+
+    def add(self, record):
+        """診断recordを記録する(ほかのDiagnosticsに記録したものを移すときにも使う)"""
+        self.records.append(record)
+        if self.echo:
+            logging.log(LOGGING_LEVELS[record.severity], record.message)
+        if record.severity == WARNING:
+            self.warning_count += 1
+            return
+        self.error_count += 1
+        if self.max_errors is not None and self.error_count >= self.max_errors:
+            self.aborted = True
+            raise TooManyErrors("Too many errors ({0}).".format(self.error_count))
+
+    def sorted_records(self):
+        """診断を行番号の順に(同じ行なら記録した順に)並べたリストを返す
+           行番号のない診断は最後に置く"""
+        order = [(record.line is None, record.line, i) for i, record in enumerate(self.records)]
+        order.sort()
+        return [self.records[i] for _, _, i in order]
+
+    def format(self, sort=False):
+        """診断を1行に1つずつ "error: メッセージ [コード]" の形にした文字列を返す"""
+        records = self.sorted_records() if sort else self.records
+        lines = ["{0}: {1} [{2}]\n".format(record.severity, record.message, record.code)
+                 for record in records]
+        return "".join(lines)
+
+    def summary(self):
+        return "{0} Errors and {1} Warnings.".format(self.error_count, self.warning_count)
+
+
+def run_phases(diagnostics, phases, value=None):
+    """phasesの関数を順に呼び、前の関数の返り値を次の関数の引数として渡す
+       最後の関数の返り値を返す。ある段階でエラーが記録されたとき、またはエラーの数が
+       上限に達して処理を打ち切ったときは、それより後の段階を実行せずにNoneを返す"""
+    try:
+        for phase in phases:
+            errors = diagnostics.error_count
+            value = phase(value)
+            if diagnostics.error_count > errors:
+                return None
+    except TooManyErrors:
+        return None
+    return value
@@ -0,0 +1,122 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import logging
+from unittest import TestCase
+import nose
+import diagnostics
+import semantic_analyzer as sa
+from parser import Parser
+from semantic_analyzer_test import MessageHandler
+
+PROGRAM = """int g;
+int f(int *p) { return *g; }
+int main() { int x; int x; return f(g, 1) + h(); }
+"""
+
+
+class DiagnosticsTest(TestCase):
+
+    def setUp(self):
+        self.handler = MessageHandler()
+        logging.getLogger().addHandler(self.handler)
+
+    def tearDown(self):
+        logging.getLogger().removeHandler(self.handler)
+
+    def analyze(self, data, diag):
+        parser = Parser(diagnostics=diag)
+        parser.build()
+        tree = parser.parse(data)
+        analyzer = sa.Analyzer(tree, check_types=True, diagnostics=diag)
+        analyzer.analyze(tree)
+        return analyzer
+
+    def test_records(self):
+        """意味解析と型検査の診断が、コードと行番号とともに記録されるかのテスト"""
+        diag = diagnostics.Diagnostics(echo=False)
+        analyzer = self.analyze(PROGRAM, diag)
+
+        nose.tools.eq_(["dereference-type", "duplicate-variable", "too-many-arguments",
+                        "undeclared-function", "arithmetic-type"], [record.code for record in diag.records])
+        nose.tools.eq_(analyzer.error_count + analyzer.checker.error_count, diag.error_count)
+        nose.tools.eq_(diagnostics.Diagnostic("error", "duplicate-variable", 3,
+                                              "Line 3: Duplicate declaration of variable - \"x\""),
+                       diag.records[1])
+        nose.tools.eq_([], self.handler.messages)
+
+    def test_hidden_parameter(self):
+        """引数を隠す変数宣言が警告として記録され、解析が続くかのテスト"""
+        diag = diagnostics.Diagnostics(echo=False)
+        self.analyze("int f(int a) { int a; a = 1; return a; }\nint main() { return x; }", diag)
+
+        nose.tools.eq_(["hidden-parameter", "undeclared-variable"], [record.code for record in diag.records])
+        nose.tools.eq_(diagnostics.Diagnostic("warning", "hidden-parameter", 1,
+                                              "Line 1: Variable declaration \"a\" will hide parameter \"a\"."),
+                       diag.records[0])
+
+    def test_prototype_conflict(self):
+        """関数定義と型の食い違うプロトタイプ宣言がエラーとして記録されるかのテスト"""
+        diag = diagnostics.Diagnostics(echo=False)
+        self.analyze("int f(int a) { return a; } int f(int a, int b);", diag)
+
+        nose.tools.eq_(["prototype-conflict"], [record.code for record in diag.records])
+        nose.tools.ok_("function \"f\"" in diag.records[0].message)
+
+    def test_argument_count_message(self):
+        """引数の個数に関するメッセージが関数名を含むかのテスト"""
+        diag = diagnostics.Diagnostics(echo=False)
+        self.analyze("int f(int a, int b) { return a; } int main() { return f(1); }", diag)
+
+        nose.tools.eq_(diagnostics.Diagnostic("error", "too-few-arguments", 1,
+                                              "Line 1: Too few arguments for function f."),
+                       diag.records[0])
+
+    def test_echo(self):
+        """既定ではこれまでどおりloggingにも同じメッセージを出力するかのテスト"""
+        diag = diagnostics.Diagnostics()
+        self.analyze(PROGRAM, diag)
+
+        nose.tools.eq_([record.message for record in diag.records], self.handler.messages)
+
+    def test_syntax_errors(self):
+        """構文エラーと不正な文字が1回の解析ですべて記録され、後の段階を実行しないかのテスト"""
+        diag = diagnostics.Diagnostics(echo=False)
+        parser = Parser(diagnostics=diag)
+        parser.build()
+        phases = [lambda _: parser.parse("int a b;\nint f() { x = 1 +; y = @2; return; }\n"),
+                  lambda tree: self.fail("analysis after syntax errors")]
+
+        nose.tools.eq_(None, diagnostics.run_phases(diag, phases))
+        nose.tools.eq_(["syntax-error", "syntax-error", "illegal-character"],
+                       [record.code for record in diag.records])
+
+    def test_max_errors(self):
+        """エラーの数が上限に達したところで処理を打ち切るかのテスト"""
+        diag = diagnostics.Diagnostics(max_errors=2, echo=False)
+        data = "int main() {" + " x;" * 10 + " }"
+
+        nose.tools.assert_raises(diagnostics.TooManyErrors, self.analyze, data, diag)
+        nose.tools.eq_(2, diag.error_count)
+        nose.tools.ok_(diag.aborted)
+
+        diag.clear()
+        phases = [lambda _: self.analyze(data, diag), lambda _: self.fail("after abort")]
+        nose.tools.eq_(None, diagnostics.run_phases(diag, phases))
+        nose.tools.eq_(2, len(diag.records))
+
+    def test_format(self):
+        """診断を行番号の順に並べて出力できるかのテスト"""
+        diag = diagnostics.Diagnostics(echo=False)
+        diag.warning("hidden-parameter", 3, "Line 3: b")
+        diag.error("syntax-error", None, "a")
+        diag.error("duplicate-variable", 1, "Line 1: c")
+
+        nose.tools.eq_("error: Line 1: c [duplicate-variable]\n"
+                       "warning: Line 3: b [hidden-parameter]\n"
+                       "error: a [syntax-error]\n", diag.format(sort=True))
+        nose.tools.eq_("2 Errors and 1 Warnings.", diag.summary())
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])
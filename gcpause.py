@@ -0,0 +1,50 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""循環参照のGCを一時的に止めるためのモジュール
+
+   中間命令や構文木のノードのように、循環参照を作らないオブジェクトを大量に作る
+   あいだにGCが走っても、回収できるものはない。しかも生きているオブジェクトが
+   増えるほど1回のGCが遅くなるので、全体の手間が作る数に比例しなくなる。
+   そのような処理はpaused()の中で行う。
+
+       with gcpause.paused():
+           ...
+
+   GCの有効・無効はプロセス全体の状態なので、止めているあいだはほかのスレッドでも
+   GCは走らない。paused()は入れ子にでき(スレッドをまたいでもよい)、一番外側の
+   paused()を抜けるときに、入ったときにGCが有効だった場合だけ有効に戻す。
+   コンパイラを組み込んだアプリケーションでGCを止めたくないときは、ENABLEDを
+   Falseにすれば何もしなくなる。"""
+
+import gc
+import threading
+from contextlib import contextmanager
+
+# Falseにするとpaused()はGCを止めない
+ENABLED = True
+
+_lock = threading.Lock()
+_depth = 0
+_restore = False
+
+
+@contextmanager
+def paused():
+    """withの中で循環参照のGCを止める"""
+    global _depth, _restore
+    if not ENABLED:
+        yield
+        return
+    with _lock:
+        if _depth == 0:
+            _restore = gc.isenabled()
+            gc.disable()
+        _depth += 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _depth -= 1
+            if _depth == 0 and _restore:
+                gc.enable()
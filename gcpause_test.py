@@ -0,0 +1,59 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import gc
+from unittest import TestCase
+import nose
+import gcpause
+
+
+class GCPauseTest(TestCase):
+
+    def setUp(self):
+        self.enabled = gc.isenabled()
+        gc.enable()
+
+    def tearDown(self):
+        gcpause.ENABLED = True
+        if not self.enabled:
+            gc.disable()
+
+    def test_paused(self):
+        """withの中でGCが止まり、抜けたら元に戻るかのテスト"""
+        with gcpause.paused():
+            nose.tools.ok_(not gc.isenabled())
+        nose.tools.ok_(gc.isenabled())
+
+    def test_nested(self):
+        """入れ子のpaused()では、一番外側を抜けたときにだけGCを戻すかのテスト"""
+        with gcpause.paused():
+            with gcpause.paused():
+                pass
+            nose.tools.ok_(not gc.isenabled())
+        nose.tools.ok_(gc.isenabled())
+
+    def test_exception(self):
+        """例外で抜けてもGCを戻すかのテスト"""
+        try:
+            with gcpause.paused():
+                raise ValueError()
+        except ValueError:
+            pass
+        nose.tools.ok_(gc.isenabled())
+
+    def test_disabled_before(self):
+        """入る前にGCが止まっていたときは、抜けても止めたままにするかのテスト"""
+        gc.disable()
+        with gcpause.paused():
+            pass
+        nose.tools.ok_(not gc.isenabled())
+
+    def test_opt_out(self):
+        """ENABLEDがFalseならGCを止めないかのテスト"""
+        gcpause.ENABLED = False
+        with gcpause.paused():
+            nose.tools.ok_(gc.isenabled())
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])
@@ -0,0 +1,172 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""トップレベルの宣言(external-declaration)単位で再解析を行うモジュール
+
+   入力をトップレベルの宣言ごとの区間に区切っておき、新しい入力と前回の入力を
+   区間ごとに比べて、変わった区間だけを構文解析し直す。得られたノードは
+   前回のExternalDeclarationListに差し込むので、変わっていない宣言のノードは
+   そのまま使い回される。後ろの宣言の行番号がずれるときも、そのノードは
+   書き換えずに宣言ごとのずれとして覚えておく(ast.ExternalDeclarationListを参照)。"""
+
+import ply.lex as lex
+import dfa_lexer
+
+
+def split_declarations(data, lineno=1):
+    """dataをトップレベルの宣言ごとに区切る
+
+       各宣言の終わりの位置のリスト、各区間の始まり(先頭と各宣言の終わり)での
+       行番号のリスト、data全体を読んだ後の行番号を返す。宣言の途中で
+       dataが終わっているときはNoneを返す。
+       宣言はブロックの外の SEMICOLON か、ブロックを閉じる RBRACE で終わる"""
+    scanner = dfa_lexer.DFAScanner(dfa_lexer.build_table())
+    scanner.input(data)
+    scanner.lineno = lineno
+    ends = []
+    linenos = [lineno]
+    depth = 0
+    closed = True
+    for tok in scanner.scan():
+        toktype = tok.type
+        if toktype == "LBRACE":
+            depth += 1
+        elif toktype == "RBRACE":
+            depth -= 1
+            if depth < 0:
+                return None
+        if (toktype == "SEMICOLON" or toktype == "RBRACE") and depth == 0:
+            ends.append(tok.lexpos + 1)
+            linenos.append(scanner.lineno)
+            closed = True
+        else:
+            closed = False
+    if not closed:
+        return None
+    return ends, linenos, scanner.lineno
+
+
+class IncrementalParser(object):
+
+    """前回の入力と構文木を覚えておき、変わった宣言だけを解析し直す構文解析器
+       parserはbuild()済みのparser.Parser"""
+
+    def __init__(self, parser):
+        self.parser = parser
+        self.data = None
+        self.tree = None
+        self.ends = []     # 各宣言の終わりの位置。宣言iの区間は ends[i-1](または0) から ends[i]
+        self.linenos = []  # 各区間の始まりでの行番号(最後の要素は末尾の空白・コメントの区間)
+        self.reparsed = 0  # 直前の解析で解析し直した宣言の数
+
+    def parse(self, data):
+        diagnostics = self.parser.diagnostics
+        errors = diagnostics.error_count
+        if self.tree is None or not self.update(data):
+            self.parse_all(data)
+        self.data = data
+        tree = self.tree
+        if diagnostics.error_count > errors:
+            # 構文エラーから回復した構文木は宣言の区間と対応しないことがあるので、
+            # 次の解析では全体を解析し直す
+            self.tree = None
+        return tree
+
+    def parse_all(self, data):
+        """入力全体を解析し直す"""
+        self.tree = None
+        self.parser.lexer.lexer.lineno = 1
+        errors = self.parser.diagnostics.error_count
+        tree = self.parser.parse_source(data)
+        self.ends, self.linenos = [], [1]
+        if self.parser.diagnostics.error_count == errors:
+            self.ends, self.linenos, _ = split_declarations(data)
+        self.tree = tree
+        self.reparsed = len(self.ends)
+
+    def chunk(self, i, length):
+        """i番目の区間(末尾の空白・コメントの区間を含む)の始まりと終わりを返す"""
+        start = self.ends[i - 1] if i > 0 else 0
+        end = self.ends[i] if i < len(self.ends) else length
+        return start, end
+
+    def update(self, data):
+        """変わった区間だけを解析し直して構文木を更新する。
+           変わった部分が宣言の区切りをまたいで閉じていないときはFalseを返す"""
+        old = self.data
+        count = len(self.ends)
+        delta = len(data) - len(old)
+
+        # 前から変わっていない区間を飛ばす
+        first = 0
+        while first <= count:
+            start, end = self.chunk(first, len(old))
+            if old[start:end] != data[start:end]:
+                break
+            first += 1
+        if first > count:
+            if len(old) == len(data):
+                self.reparsed = 0
+                return True
+            first = count
+
+        # 後ろから変わっていない区間を飛ばす
+        region_start = self.chunk(first, len(old))[0]
+        last = count
+        while last > first:
+            start, end = self.chunk(last, len(old))
+            if start + delta < region_start or old[start:end] != data[start + delta:end + delta]:
+                break
+            last -= 1
+        region_end = self.chunk(last, len(old))[1] + delta
+
+        # 変わった区間を区切り直し、宣言の途中で終わっていないか確かめる
+        region = data[region_start:region_end]
+        try:
+            split = split_declarations(region, self.linenos[first])
+        except lex.LexError:
+            return False
+        if split is None:
+            return False
+        region_ends, region_linenos, region_lineno = split
+
+        removed = min(last, count - 1) - first + 1
+        if len(self.tree.nodes) - removed + len(region_ends) == 0:
+            return False
+
+        nodes = []
+        if region_ends:
+            self.parser.lexer.lexer.lineno = self.linenos[first]
+            region_tree = self.parser.parse_source(region)
+            if region_tree is None:
+                # 構文エラーで構文木がない(記録したエラーを全体の解析でもう一度出さない)
+                self.tree = None
+                return True
+            nodes = region_tree.nodes
+
+        # 後ろの区間の位置と行番号をずらす
+        line_delta = 0
+        if last < count:
+            line_delta = region_lineno - self.linenos[last + 1]
+        self.ends[first:last + 1] = [region_start + end for end in region_ends]
+        self.ends[first + len(region_ends):] = [end + delta for end in
+                                                 self.ends[first + len(region_ends):]]
+        self.linenos[first:last + 2] = region_linenos
+        if line_delta != 0:
+            after = first + len(region_linenos)
+            self.linenos[after:] = [lineno + line_delta for lineno in self.linenos[after:]]
+
+        # 後ろの宣言のノードは書き換えず、宣言ごとの行番号のずれに足しておく
+        # (ノードに反映するのは、行番号を読むときのExternalDeclarationList.resolve_lines())
+        tree = self.tree
+        offsets = getattr(tree, "_line_offsets", None)
+        if offsets is not None or line_delta != 0:
+            if offsets is None:
+                offsets = tree._line_offsets = [0] * len(tree.nodes)
+            offsets[first:first + removed] = [0] * len(nodes)
+            for i in range(first + len(nodes), len(offsets)):
+                offsets[i] += line_delta
+        tree.nodes[first:first + removed] = nodes
+
+        self.reparsed = len(nodes)
+        return True
@@ -0,0 +1,274 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""変わった関数定義だけを意味解析し直すモジュール
+
+   IncrementalAnalyzerは、各関数定義の本体が大域の有効範囲で探した名前
+   (グローバル変数、プロトタイプ宣言、関数の名前)を覚えておき、名前から
+   その名前を参照する関数定義への依存関係の表を作る。構文木が変わったとき
+   (parser.Parser.parse_incremental()で変わったトップレベルの宣言だけを
+   解析し直したときなど)は、新しくなった関数定義と、大域の宣言が変わった
+   名前を参照している関数定義だけを、名前解析と型検査をし直す。
+
+   - 変わったトップレベルの宣言はノードの同一性で見つける(変わっていない
+     宣言は前回と同じノードのオブジェクトであること)
+   - 変わったものがすべて関数定義で、関数の型が前と同じなら(本体だけの変更)、
+     大域の環境も関数の宣言(Decl)もそのまま使い、その本体だけを解析する。
+     この場合の手間はファイルの大きさによらない
+   - そうでなければトップレベルの宣言を解析し直し、変わっていない宣言の
+     Declは前回のオブジェクトに戻す。登録された宣言が変わった名前を参照して
+     いた関数定義は、前回の解析の結果を取り除いてから解析し直す
+   - 関数定義の本体はparallel_analyzerと同じく、ソースでその関数より前にある
+     大域の宣言だけが見える環境で解析し、パラメータと変数は関数ごとに取り除く
+
+   診断メッセージは解析し直した部分のものだけを記録する。"""
+
+import sys
+import ast
+import visitor
+import diagnostics as dg
+import semantic_analyzer as sa
+from parallel_analyzer import DiagnosticCollector
+
+
+class PrefixEnvironment(sa.Environment):
+
+    """大域の宣言のうち、登録した順番がlimitより前のものだけが見える環境
+       大域の有効範囲まで探した名前(見つからなかった名前も含む)をreferencedに集める"""
+
+    def __init__(self):
+        sa.Environment.__init__(self)
+        self.order = {}  # 大域の宣言のidから登録した順番
+        self.limit = sys.maxint
+        self.referenced = set()
+
+    def add(self, decl):
+        if len(self.scopes) == 1:
+            self.order[id(decl)] = len(self.scopes[0])
+        sa.Environment.add(self, decl)
+
+    def lookup(self, name, index=0):
+        for decl in reversed(self.chains.get(name, ())):
+            position = self.order.get(id(decl))
+            if position is None:
+                return decl
+            if position < self.limit:
+                self.referenced.add(name)
+                return decl
+        self.referenced.add(name)
+        return None
+
+    def replace(self, old, new):
+        """大域の宣言oldを、同じ名前の宣言newに置き換える"""
+        position = self.order.pop(id(old))
+        self.order[id(new)] = position
+        self.scopes[0][position] = new
+        chain = self.chains[old.name]
+        for i, decl in enumerate(chain):
+            if decl is old:
+                chain[i] = new
+
+
+def signature(decl):
+    return decl.name, decl.level, decl.kind, decl.objtype
+
+
+def header_identifiers(node):
+    """トップレベルの宣言nodeの、(関数定義なら関数の本体とパラメータ以外の)Identifierを返す"""
+    if isinstance(node, ast.FunctionDefinition):
+        return [node.function_declarator.identifier]
+    result = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Identifier):
+            result.append(node)
+        elif isinstance(node, ast.NodeList):
+            stack.extend(node.nodes)
+        else:
+            stack.extend(value for _, value in ast.iter_fields(node) if isinstance(value, ast.Node))
+    return result
+
+
+class IncrementalAnalyzer(object):
+
+    """前回解析した構文木と依存関係を覚えておき、変わった部分だけを解析し直す解析器
+
+       analyze(tree)を構文木が変わるたびに呼ぶ(最初の呼び出しではすべてを解析する)。
+       エラーの数はerror_count(名前解析)とtype_error_count(型検査)に、
+       直前の呼び出しで解析した関数定義の本体の数はreanalyzedに入る。
+       診断メッセージはdiagnostics(省略したときはloggingに出力する
+       diagnostics.Diagnostics)に記録する"""
+
+    def __init__(self, diagnostics=None):
+        self.diagnostics = diagnostics if diagnostics is not None else dg.Diagnostics()
+        self.collector = DiagnosticCollector()
+        self.nodes = []         # 前回のトップレベルの宣言
+        self.limits = []        # 各トップレベルの宣言までに登録した大域の宣言の数
+        self.declared = {}      # トップレベルの宣言のidから、それが登録した大域の宣言のリスト
+        self.functions = {}     # 関数定義のidから(参照した名前の集合, エラーの数)
+        self.dependents = {}    # 名前から、それを参照した関数定義のidの集合
+        self.env = None
+        self.analyzer = None
+        self.global_counts = (0, 0, 0)
+        self.function_counts = [0, 0, 0]
+        self.error_count = 0
+        self.type_error_count = 0
+        self.warning_count = 0
+        self.reanalyzed = 0
+
+    def analyze(self, tree):
+        """treeを前回の構文木と比べて、変わった部分を解析し直す
+           (大域の環境, 取り除いた宣言のリスト)を返す"""
+        nodes = tree.nodes
+        old_count = len(self.nodes)
+        first = 0
+        while first < min(old_count, len(nodes)) and nodes[first] is self.nodes[first]:
+            first += 1
+        old_stop = old_count
+        new_stop = len(nodes)
+        while old_stop > first and new_stop > first and nodes[new_stop - 1] is self.nodes[old_stop - 1]:
+            old_stop -= 1
+            new_stop -= 1
+        removed = self.nodes[first:old_stop]
+        inserted = nodes[first:new_stop]
+
+        collector = self.collector
+        collector.clear()
+        self.reanalyzed = 0
+        if removed or inserted:
+            if not self.replace_bodies(first, removed, inserted, collector):
+                # 宣言をすべて解析し直すので、たまっている行番号のずれをノードに反映する
+                tree.resolve_lines()
+                self.redeclare(nodes, first, removed, inserted, collector)
+        self.nodes = list(nodes)
+
+        for record in collector.sorted_records():
+            self.diagnostics.add(record)
+        self.error_count = self.global_counts[0] + self.function_counts[0]
+        self.type_error_count = self.global_counts[1] + self.function_counts[1]
+        self.warning_count = self.global_counts[2] + self.function_counts[2]
+        return self.env, self.env.deleted
+
+    def replace_bodies(self, first, removed, inserted, collector):
+        """変わったものが本体だけの関数定義なら、その本体だけを解析してTrueを返す"""
+        if self.env is None or len(removed) != len(inserted):
+            return False
+        pairs = zip(removed, inserted)
+        for old, new in pairs:
+            if not (isinstance(old, ast.FunctionDefinition) and isinstance(new, ast.FunctionDefinition)):
+                return False
+            decls = self.declared[id(old)]
+            if len(decls) != 1 or \
+                    signature(decls[0]) != signature(self.analyzer.analyze_func_definition(new, 0)):
+                return False
+
+        for position, (old, new) in enumerate(pairs, first):
+            decl = self.declared.pop(id(old))[0]
+            new.function_declarator.identifier.identifier = decl
+            self.declared[id(new)] = [decl]
+            self.forget_function(old)
+            self.analyze_function(new, position, collector)
+        return True
+
+    def redeclare(self, nodes, first, removed, inserted, collector):
+        """トップレベルの宣言を解析し直し、大域の宣言が変わった名前を参照していた
+           関数定義と、新しい関数定義を解析する"""
+        old_chains = self.env.chains if self.env is not None else {}
+        names = set()
+        for node in removed:
+            self.forget_function(node)
+            names.update(decl.name for decl in self.declared[id(node)])
+
+        # 変わっていない宣言の名前も、解析し直せるように宣言から名前に戻しておく
+        for node in nodes:
+            for identifier in header_identifiers(node):
+                if isinstance(identifier.identifier, sa.Decl):
+                    identifier.identifier = identifier.identifier.name
+
+        env = PrefixEnvironment()
+        analyzer = sa.Analyzer(None, env=env, diagnostics=collector)
+        targets = set(id(node) for node in inserted)
+        declared = {}
+        limits = []
+        for position, node in enumerate(nodes):
+            collector.position = position
+            start = len(env.scopes[0])
+            if isinstance(node, ast.FunctionDefinition):
+                analyzer.define_function(node, 0)
+            else:
+                visitor.run(analyzer.visit(node, 0, 0))
+            decls = env.scopes[0][start:]
+            limits.append(len(env.scopes[0]))
+
+            old_decls = self.declared.get(id(node))
+            if old_decls is not None and \
+                    [signature(decl) for decl in old_decls] == [signature(decl) for decl in decls]:
+                # 前回と同じ宣言なら前回のDeclに戻す(本体の解析の結果がそのまま使える)
+                for old, new in zip(old_decls, decls):
+                    env.replace(new, old)
+                for identifier in header_identifiers(node):
+                    for old, new in zip(old_decls, decls):
+                        if identifier.identifier is new:
+                            identifier.identifier = old
+                decls = old_decls
+            else:
+                names.update(decl.name for decl in old_decls or ())
+                names.update(decl.name for decl in decls)
+                targets.add(id(node))
+            declared[id(node)] = list(decls)
+
+        self.env = env
+        self.analyzer = sa.Analyzer(None, check_types=True, env=env, diagnostics=collector)
+        self.declared = declared
+        self.limits = limits
+        self.global_counts = (analyzer.error_count, 0, analyzer.warning_count)
+
+        # 新しい宣言、登録した宣言が変わった宣言、登録された宣言の並びが変わった
+        # 名前を参照していた関数定義を解析し直す
+        for name in names:
+            old_chain = [id(decl) for decl in old_chains.get(name, ())]
+            if old_chain != [id(decl) for decl in env.chains.get(name, ())]:
+                targets.update(self.dependents.get(name, ()))
+        for position, node in enumerate(nodes):
+            if id(node) in targets and isinstance(node, ast.FunctionDefinition):
+                if id(node) in self.functions:
+                    self.forget_function(node)
+                    sa.clear_analysis(node.function_declarator.parameter_type_list)
+                    sa.clear_analysis(node.compound_statement)
+                self.analyze_function(node, position, collector)
+
+    def analyze_function(self, node, position, collector):
+        """position番目のトップレベルの宣言である関数定義nodeの本体を解析して、
+           参照した名前とエラーの数を記録する"""
+        analyzer = self.analyzer
+        env = self.env
+        counts = (analyzer.error_count, analyzer.checker.error_count, analyzer.warning_count)
+        collector.position = position
+        env.limit = self.limits[position]
+        env.referenced = set()
+        env.enter_scope()
+        visitor.run(analyzer.analyze_function_body(node, 0))
+        env.exit_scope()
+        env.deleted = []
+        env.limit = sys.maxint
+
+        counts = (analyzer.error_count - counts[0], analyzer.checker.error_count - counts[1],
+                  analyzer.warning_count - counts[2])
+        self.functions[id(node)] = (env.referenced, counts)
+        for name in env.referenced:
+            self.dependents.setdefault(name, set()).add(id(node))
+        for i, count in enumerate(counts):
+            self.function_counts[i] += count
+        self.reanalyzed += 1
+
+    def forget_function(self, node):
+        """関数定義nodeの依存関係とエラーの数を取り除く"""
+        record = self.functions.pop(id(node), None)
+        if record is None:
+            return
+        names, counts = record
+        for name in names:
+            self.dependents[name].discard(id(node))
+        for i, count in enumerate(counts):
+            self.function_counts[i] -= count
@@ -0,0 +1,148 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import re
+from unittest import TestCase
+import random
+import nose
+import diagnostics as dg
+import incremental_analyzer
+import parallel_analyzer
+import samplegen
+from parser import Parser
+from parser_test import dump
+
+PROGRAM = """int g;
+int f(int a) {
+    a = a + 1;
+    return a;
+}
+int h(int *b) {
+    return *(b - g) * 2;
+}
+int main() {
+    g = f(1) + h(&g);
+    return g + n;
+}
+"""
+
+NUMBER_ONE = re.compile(r"\b1")
+
+
+def full_analysis(data):
+    """構文解析と意味解析をすべてやり直し、構文木とエラーの数を返す"""
+    parser = Parser()
+    parser.build()
+    tree = parser.parse(data)
+    analyzer = parallel_analyzer.ParallelAnalyzer(tree, processes=1)
+    analyzer.analyze()
+    return tree, analyzer.error_count, analyzer.type_error_count
+
+
+class IncrementalAnalyzerTest(TestCase):
+
+    def setUp(self):
+        self.parser = Parser()
+        self.parser.build()
+        self.analyzer = incremental_analyzer.IncrementalAnalyzer()
+        self.tree = self.reanalyze(PROGRAM)
+
+    def tearDown(self):
+        pass
+
+    def reanalyze(self, data):
+        """変わった部分だけを解析し直し、すべてを解析し直したときと同じ結果になるか確かめる"""
+        tree = self.parser.parse_incremental(data)
+        self.analyzer.analyze(tree)
+        expected, errors, type_errors = full_analysis(data)
+        nose.tools.eq_((errors, type_errors),
+                       (self.analyzer.error_count, self.analyzer.type_error_count))
+        tree.resolve_lines()
+        nose.tools.eq_(dump(expected), dump(tree))
+        return tree
+
+    def test_body_edit(self):
+        """本体だけを変えた関数定義だけが、同じ関数の宣言のまま解析し直されるかのテスト"""
+        f = self.tree.nodes[1].function_declarator.identifier.identifier
+        h = self.tree.nodes[2]
+        tree = self.reanalyze(PROGRAM.replace("a + 1", "a + 2"))
+        call = tree.nodes[3].compound_statement.statement_list.nodes[0].expression.right.left
+
+        nose.tools.eq_(1, self.analyzer.reanalyzed)
+        nose.tools.ok_(tree.nodes[1].function_declarator.identifier.identifier is f)
+        nose.tools.ok_(call.identifier.identifier is f)
+        nose.tools.ok_(tree.nodes[2] is h)
+
+    def test_new_global(self):
+        """グローバル変数を加えると、その名前を参照していた関数定義が解析し直されるかのテスト"""
+        nose.tools.eq_((1, 1), (self.analyzer.error_count, self.analyzer.type_error_count))
+        tree = self.reanalyze(PROGRAM.replace("int main", "int n;\nint main"))
+
+        nose.tools.eq_(1, self.analyzer.reanalyzed)
+        nose.tools.eq_((0, 0), (self.analyzer.error_count, self.analyzer.type_error_count))
+        nose.tools.ok_(self.analyzer.env.lookup("n") is
+                       tree.nodes[4].compound_statement.statement_list.nodes[1]
+                       .return_statement.right.identifier)
+
+    def test_signature_change(self):
+        """関数の型を変えると、その関数を呼び出している関数定義も解析し直されるかのテスト"""
+        self.reanalyze(PROGRAM.replace("int h(int *b)", "int h(int b)"))
+        nose.tools.eq_(2, self.analyzer.reanalyzed)
+
+        self.reanalyze(PROGRAM)
+        nose.tools.eq_(2, self.analyzer.reanalyzed)
+
+    def test_rewritten_dependent(self):
+        """ポインタの引き算を書き換えた関数定義を、書き換えを重ねずに解析し直せるかのテスト"""
+        h = self.tree.nodes[2]
+        for data in [PROGRAM.replace("int g;", "int *g;"), PROGRAM] * 2:
+            tree = self.reanalyze(data)
+            nose.tools.ok_(tree.nodes[2] is h)
+            nose.tools.eq_(2, self.analyzer.reanalyzed)
+
+    def test_generated_edits(self):
+        """生成したプログラムの本体、グローバル変数、関数の型を順に書き換えたときに
+           すべてを解析し直したときと一致するかのテスト"""
+        rand = random.Random(0)
+        lines = samplegen.generate_program(6, 10, seed=4).splitlines(True)
+        self.reanalyze("".join(lines))
+        variants = {"int g0, g1;\n": ["int g0, g1, g2;\n", "int *g0, g1;\n", "int g1, g0;\n"],
+                    "int f1() {\n": ["void f1() {\n", "int f1(int a) {\n"]}
+        declarations = [(i, line) for i, line in enumerate(lines) if line in variants]
+        for _ in range(20):
+            if rand.randint(0, 2) == 0:
+                i, original = rand.choice(declarations)
+                lines[i] = rand.choice(variants[original] + [original])
+            else:
+                i = rand.randrange(len(lines))
+                lines[i] = NUMBER_ONE.sub("7", lines[i])
+            self.reanalyze("".join(lines))
+
+    def test_line_shift(self):
+        """行番号のずれをまだ反映していない宣言を解析し直したときに、
+           ずれた後の行を報告するかのテスト"""
+        data = PROGRAM.replace("a = a + 1;", "a = a + 1;\n\n")
+        self.reanalyze(data)
+        nose.tools.eq_(1, self.analyzer.reanalyzed)
+
+        self.analyzer.diagnostics = dg.Diagnostics(echo=False)
+        data = data.replace("int g;", "int *g;")
+        self.analyzer.analyze(self.parser.parse_incremental(data))
+        expected = dg.Diagnostics(echo=False)
+        parser = Parser()
+        parser.build()
+        tree = parser.parse(data)
+        parallel_analyzer.ParallelAnalyzer(tree, processes=1, diagnostics=expected).analyze()
+
+        nose.tools.ok_(expected.records)
+        nose.tools.eq_([record.line for record in expected.records],
+                       [record.line for record in self.analyzer.diagnostics.records])
+
+    def test_no_change(self):
+        """構文木が変わっていなければ何も解析し直さないかのテスト"""
+        self.reanalyze(PROGRAM)
+        nose.tools.eq_(0, self.analyzer.reanalyzed)
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])
@@ -0,0 +1,190 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+import random
+import nose
+import ast
+import incremental
+import samplegen
+from parser import Parser
+from parser_test import dump
+
+PROGRAM = """int g;
+/* first
+   function */
+int f(int a) {
+    a = a + 1;
+    return a;
+}
+int h(int b) {
+    /* comment */
+    return b * 2;
+}
+int main() {
+    g = f(1) + h(2);
+    return g;
+}
+"""
+
+
+def full_parse(data):
+    parser = Parser()
+    parser.build()
+    return parser.parse(data)
+
+
+def linenos(tree):
+    """tree以下のノードの行番号を前順に並べたリスト(深い構文木でも再帰しない)"""
+    result = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.NodeList):
+            stack.extend(reversed(node.nodes))
+            continue
+        fields = list(ast.iter_fields(node))
+        result.extend(value for name, value in fields if name == "lineno")
+        stack.extend(reversed([value for _, value in fields if isinstance(value, ast.Node)]))
+    return result
+
+
+class IncrementalParserTest(TestCase):
+
+    def setUp(self):
+        self.parser = Parser()
+        self.parser.build()
+        self.tree = self.parser.parse_incremental(PROGRAM)
+        self.nodes = list(self.tree.nodes)
+
+    def tearDown(self):
+        pass
+
+    def reparse(self, data):
+        tree = self.parser.parse_incremental(data)
+        tree.resolve_lines()
+        nose.tools.eq_(dump(full_parse(data)), dump(tree))
+        return tree
+
+    def test_split_declarations(self):
+        """トップレベルの宣言の区切りと行番号のテスト"""
+        ends, linenos, lineno = incremental.split_declarations(PROGRAM)
+
+        nose.tools.eq_(4, len(ends))
+        nose.tools.eq_("int g;", PROGRAM[:ends[0]])
+        nose.tools.eq_([1, 1, 7, 11, 15], linenos)
+        nose.tools.eq_(None, incremental.split_declarations("int f() { return 1;"))
+
+    def test_edit_function(self):
+        """1つの関数の中を変えたときに、その関数だけを解析し直すかのテスト"""
+        tree = self.reparse(PROGRAM.replace("a = a + 1;", "a = a + 2;"))
+
+        nose.tools.ok_(tree is self.tree)
+        nose.tools.eq_(1, self.parser.incremental.reparsed)
+        nose.tools.ok_(tree.nodes[0] is self.nodes[0])
+        nose.tools.ok_(tree.nodes[1] is not self.nodes[1])
+        nose.tools.ok_(tree.nodes[2] is self.nodes[2])
+        nose.tools.ok_(tree.nodes[3] is self.nodes[3])
+
+    def test_line_shift(self):
+        """コメントの行数が変わったときに、後ろの宣言の行番号がずれるかのテスト"""
+        tree = self.reparse(PROGRAM.replace("/* comment */", "/* comment\n\n */"))
+
+        nose.tools.eq_(1, self.parser.incremental.reparsed)
+        nose.tools.ok_(tree.nodes[3] is self.nodes[3])
+
+        # ずれた後の状態からさらに編集する
+        data = PROGRAM.replace("/* comment */", "/* comment\n\n */").replace("g = f(1)", "g = f(3)")
+        self.reparse(data)
+
+    def test_lazy_line_shift(self):
+        """後ろの宣言のノードは書き換えず、行番号のずれを読むときに反映するかのテスト"""
+        identifier = self.nodes[3].function_declarator.identifier
+        lineno = identifier.lineno
+        tree = self.parser.parse_incremental(PROGRAM.replace("/* comment */", "/* comment\n\n */"))
+
+        nose.tools.eq_(lineno, identifier.lineno)
+        nose.tools.eq_(0, tree.line_offset(0))
+        nose.tools.eq_(2, tree.line_offset(3))
+
+        # 反映する前に次の編集をしても、ずれは宣言ごとに足される
+        tree = self.parser.parse_incremental(PROGRAM.replace("/* comment */", "/* comment\n\n\n */"))
+        nose.tools.eq_(3, tree.line_offset(3))
+        tree.resolve_lines()
+        nose.tools.eq_(lineno + 3, identifier.lineno)
+        nose.tools.eq_(0, tree.line_offset(3))
+
+    def test_deep_line_shift(self):
+        """深い式を含む宣言の行番号を、スタックの深さを増やさずにずらせるかのテスト"""
+        data = "int g;\n" + samplegen.generate_deep_program("expression", 5000)
+        before = set(linenos(self.parser.parse_incremental(data).nodes[1]))
+        data = data.replace("int g;", "/* a\n b */\nint g;")
+        tree = self.parser.parse_incremental(data)
+        tree.resolve_lines()
+
+        nose.tools.eq_(1, self.parser.incremental.reparsed)
+        nose.tools.eq_(linenos(full_parse(data)), linenos(tree))
+        nose.tools.eq_(set(lineno + 2 for lineno in before), set(linenos(tree.nodes[1])))
+
+    def test_add_and_remove(self):
+        """宣言を加えたり消したりしたときのテスト"""
+        added = PROGRAM.replace("int main()", "int k;\nint *p;\nint main()")
+        tree = self.reparse(added)
+        nose.tools.eq_(6, len(tree.nodes))
+
+        removed = added.replace("int h(int b) {\n    /* comment */\n    return b * 2;\n}\n", "")
+        tree = self.reparse(removed)
+        nose.tools.eq_(5, len(tree.nodes))
+
+        self.reparse(removed + "/* trailing\n */\nint z;\n")
+
+    def test_merge_functions(self):
+        """宣言の区切りをまたぐ編集で、2つの関数を1つにまとめたときのテスト"""
+        data = PROGRAM.replace("    return a;\n}\nint h(int b) {\n", "    return a;\n")
+        tree = self.reparse(data)
+
+        nose.tools.eq_(3, len(tree.nodes))
+        nose.tools.ok_(tree.nodes[2] is self.nodes[3])
+
+    def test_unclosed_edit(self):
+        """宣言が閉じていない編集のときに、全体を解析し直して構文エラーを記録するかのテスト"""
+        data = PROGRAM.replace("    return b * 2;\n}", "    return b * 2;\n")
+        errors = self.parser.diagnostics.error_count
+
+        self.reparse(data)
+        nose.tools.eq_(errors + 1, self.parser.diagnostics.error_count)
+        self.reparse(PROGRAM)
+
+    def test_syntax_error_edit(self):
+        """構文エラーのある宣言の編集の後で、次の解析では全体を解析し直すかのテスト"""
+        errors = self.parser.diagnostics.error_count
+        tree = self.reparse(PROGRAM.replace("a + 1;", "a + ;"))
+
+        nose.tools.eq_(errors + 1, self.parser.diagnostics.error_count)
+        nose.tools.ok_(tree.nodes[0] is self.nodes[0])
+        self.reparse(PROGRAM)
+        nose.tools.eq_(4, self.parser.incremental.reparsed)
+
+    def test_generated_edits(self):
+        """生成したプログラムの行を順に書き換えたときに全体の解析と一致するかのテスト"""
+        rand = random.Random(0)
+        lines = samplegen.generate_program(6, 10, seed=4, syntax_only=True).splitlines(True)
+        self.parser.parse_incremental("".join(lines))
+        for _ in range(20):
+            i = rand.randrange(len(lines))
+            if lines[i].strip().endswith(";") and rand.randint(0, 1) == 0:
+                lines[i] = lines[i].replace(";", "; /* edit\n */", 1)
+            else:
+                lines[i] = lines[i].replace("1", "7")
+            self.reparse("".join(lines))
+
+    def test_unchanged(self):
+        """入力が変わらないときは何も解析し直さないかのテスト"""
+        tree = self.parser.parse_incremental(PROGRAM)
+
+        nose.tools.ok_(tree is self.tree)
+        nose.tools.eq_(0, self.parser.incremental.reparsed)
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])
@@ -1,43 +1,103 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+import operator
 import ast
 import semantic_analyzer as sa
+import visitor
+import typetable
+import trace
+import gcpause
 # import assign_address
-import collections
 
-# リストを平らにする関数の定義
+TRACE = trace.channel("intermed")
 
+# 中間命令を表現するクラス群
 
-def flatten(l):
-    i = 0
-    while i < len(l):
-        while isinstance(l[i], collections.Iterable):
-            if not l[i]:
-                l.pop(i)
-                i -= 1
-                break
-            else:
-                l[i:i + 1] = l[i]
-        i += 1
-    return l
+_field_getters = {}
 
 
-# 中間命令を表現するクラス群
+def field_getter(cls):
+    """clsの_fieldsの属性の値を取り出す関数を返す(比較とハッシュに使う)
+       属性が2つ以上なら値のタプル、1つならその値、なければ()を返す"""
+    getter = _field_getters.get(cls)
+    if getter is None:
+        if cls._fields:
+            getter = operator.attrgetter(*cls._fields)
+        else:
+            getter = lambda item: ()
+        _field_getters[cls] = getter
+    return getter
+
+
+class Fields(object):
+
+    """_fieldsに並べた属性で比較とハッシュをするクラスの基底クラス
+       中間命令やアセンブリの命令は大量に作られるので、各クラスは属性を__slots__で
+       宣言し、インスタンスごとの__dict__を持たない。比較はクラスが同じかを
+       確かめてから、_fieldsの属性の値をまとめて比べる。同じオブジェクトや同じリストは
+       中をたどらないので、共有した部分の多い命令の列どうしの比較は安く済む
+
+       ハッシュはリストの属性(文の並びなど)を要素の数だけで数えるので、入れ子の
+       命令をたどらずに済む。属性を書き換えるとハッシュも変わるので、書き換えない
+       あいだだけ辞書や集合のキーに使うこと"""
+
+    __slots__ = ()
+    _fields = ()
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        cls = type(self)
+        if type(other) is not cls:
+            return False
+        getter = _field_getters.get(cls) or field_getter(cls)
+        mine = getter(self)
+        theirs = getter(other)
+        # 属性が1つならその値どうしを比べるので、同じリストなら要素をたどらない
+        # (値のタプルどうしの比較では、要素ごとに同じオブジェクトかを先に確かめる)
+        return mine is theirs or mine == theirs
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        values = [type(self)]
+        for name in self._fields:
+            value = getattr(self, name)
+            values.append(len(value) if type(value) is list else value)
+        return hash(tuple(values))
+
+    def __repr__(self):
+        return "{0}({1})".format(type(self).__name__, ", ".join(
+            "{0}={1!r}".format(name, getattr(self, name)) for name in self._fields))
+
 
 # 変数宣言
-class VarDecl(object):
+class VarDecl(Fields):
+
+    __slots__ = _fields = ("var",)
 
     def __init__(self, var):
         self.var = var
 
-    def __eq__(self, other):
-        # return self.var == other.var
-        return self.__dict__ == other.__dict__
+    # 割り当てたアドレスは宣言(Decl)のoffsetに置く
+    @property
+    def offset(self):
+        return self.var.offset
+
+    @offset.setter
+    def offset(self, value):
+        self.var.offset = value
 
 
 # 関数宣言
-class FunctionDefinition(object):
+class FunctionDefinition(Fields):
+
+    # graphには本体を変換した制御フローグラフ(ssa.transform()などで作ったもの)を
+    # 置くことができ、コード生成はbodyの代わりにそれを使う(比較には使わない)
+    _fields = ("var", "params", "body", "localvarsize", "paramsize")
+    __slots__ = _fields + ("graph",)
 
     def __init__(self, var, params, body):
         self.var = var
@@ -45,183 +105,140 @@ class FunctionDefinition(object):
         self.body = body
         self.localvarsize = 0
         self.paramsize = 0
-
-    def __eq__(self, other):
-        # return self.var == other.var and self.params == other.params and
-        # self.body == other.body
-        return self.__dict__ == other.__dict__
+        self.graph = None
 
 
 # 文
-class EmptyStatement(object):
+class EmptyStatement(Fields):
 
-    def __init__(self):
-        pass
+    __slots__ = _fields = ()
 
-    def __eq__(self, other):
-        if isinstance(other, EmptyStatement):
-            return True
-        else:
-            return False
 
+class LetStatement(Fields):
 
-class LetStatement(object):
+    __slots__ = _fields = ("var", "exp")
 
     def __init__(self, var, exp):
         self.var = var
         self.exp = exp
 
-    def __eq__(self, other):
-        # return self.var == other.var and self.exp == other.exp
-        return self.__dict__ == other.__dict__
 
+class WriteStatement(Fields):
 
-class WriteStatement(object):
+    __slots__ = _fields = ("dest", "src")
 
     def __init__(self, dest, src):
         self.dest = dest
         self.src = src
 
-    def __eq__(self, other):
-        # return self.dest == other.dest and self.src == other.src
-        return self.__dict__ == other.__dict__
 
+class ReadStatement(Fields):
 
-class ReadStatement(object):
+    __slots__ = _fields = ("dest", "src")
 
     def __init__(self, dest, src):
         self.dest = dest
         self.src = src
 
-    def __eq__(self, other):
-        # return self.dest == other.dest and self.src == other.src
-        return self.__dict__ == other.__dict__
 
+class IfStatement(Fields):
 
-class IfStatement(object):
+    __slots__ = _fields = ("var", "then_stmt", "else_stmt")
 
     def __init__(self, var, then_stmt, else_stmt):
         self.var = var
         self.then_stmt = then_stmt
         self.else_stmt = else_stmt
 
-    def __eq__(self, other):
-        # return self.var == other.var and self.then_stmt == other.then_stmt
-        # and self.else_stmt == other.else_stmt
-        return self.__dict__ == other.__dict__
 
+class WhileStatement(Fields):
 
-class WhileStatement(object):
+    __slots__ = _fields = ("var", "stmt")
 
     def __init__(self, var, stmt):
         self.var = var
         self.stmt = stmt
 
-    def __eq__(self, other):
-        # return self.var == other.var and self.stmt == other.stmt
-        return self.__dict__ == other.__dict__
 
+class CallStatement(Fields):
 
-class CallStatement(object):
+    __slots__ = _fields = ("dest", "function", "variables")
 
     def __init__(self, dest, function, variables):
         self.dest = dest
         self.function = function
         self.variables = variables
 
-    def __eq__(self, other):
-        # return self.dest == other.dest and self.function == other.function
-        # and self.variables == other.variables
-        return self.__dict__ == other.__dict__
 
+class ReturnStatement(Fields):
 
-class ReturnStatement(object):
+    __slots__ = _fields = ("var",)
 
     def __init__(self, var):
         self.var = var
 
-    def __eq__(self, other):
-        # return self.var == other.var
-        return self.__dict__ == other.__dict__
 
+class PrintStatement(Fields):
 
-class PrintStatement(object):
+    __slots__ = _fields = ("var",)
 
     def __init__(self, var):
         self.var = var
 
-    def __eq__(self, other):
-        # return self.var == other.var
-        return self.__dict__ == other.__dict__
 
+class CompoundStatement(Fields):
 
-class CompoundStatement(object):
+    __slots__ = _fields = ("decls", "stmts")
 
     def __init__(self, decls, stmts):
         self.decls = decls
         self.stmts = stmts
 
-    def __eq__(self, other):
-        # return self.decls == other.decls and self.stmts == other.stmts
-        return self.__dict__ == other.__dict__
-
 
 # 式
-class VarExpression(object):
+class VarExpression(Fields):
+
+    __slots__ = _fields = ("var",)
 
     def __init__(self, var):
         self.var = var
 
-    def __eq__(self, other):
-        # return self.var == other.var
-        return self.__dict__ == other.__dict__
 
+class IntExpression(Fields):
 
-class IntExpression(object):
+    __slots__ = _fields = ("num",)
 
     def __init__(self, num):
         self.num = num
 
-    def __eq__(self, other):
-        # return self.num == other.num
-        return self.__dict__ == other.__dict__
 
+class ArithmeticOperation(Fields):
 
-class ArithmeticOperation(object):
+    __slots__ = _fields = ("op", "var_left", "var_right")
 
     def __init__(self, op, var_left, var_right):
         self.op = op
         self.var_left = var_left
         self.var_right = var_right
 
-    def __eq__(self, other):
-        # return self.var_left == other.var_left and self.var_right ==
-        # other.var_right
-        return self.__dict__ == other.__dict__
 
+class RelationalExpression(Fields):
 
-class RelationalExpression(object):
+    __slots__ = _fields = ("op", "var_left", "var_right")
 
     def __init__(self, op, var_left, var_right):
         self.op = op
         self.var_left = var_left
         self.var_right = var_right
 
-    def __eq__(self, other):
-        # return self.var_left == other.var_left and self.var_right ==
-        # other.var_right
-        return self.__dict__ == other.__dict__
 
+class AddressExpression(Fields):
 
-class AddressExpression(object):
+    __slots__ = _fields = ("var",)
 
     def __init__(self, var):
         self.var = var
 
-    def __eq__(self, other):
-        # return self.var == other.var
-        return self.__dict__ == other.__dict__
-
 
 # 中間命令列を生成するためのクラス群
 class IntermedCodeGenerator(object):
@@ -229,13 +246,42 @@ class IntermedCodeGenerator(object):
     """中間命令列を生成するために必要なインスタンスとメソッドをまとめたクラス
        中間命令列を格納するリストと、変換関数からなる"""
 
-    def __init__(self, nodelist):
+    def __init__(self, nodelist, recycle_temps=True):
         self.ast_node = nodelist
         self.intermed_code_list = []
         self.tempdecl_list = []
-        self.tvg = TempVariableGenerator()
+        self.tvg = TempVariableGenerator(recycle_temps)
         # self.addr = assign_address.AssignAddress()
 
+    # ノードのクラスに応じてexp_<クラス名>、stmt_<クラス名>を呼び出す
+    # (対応するメソッドのないノードは何も出力しない)
+    # 各メソッドは生成した中間命令を、引数codeのリストの末尾に順に追加する。
+    # 入れ子のリストを作って後から平らにすることはしないので、生成の手間は
+    # 命令の数に比例する。子を持つノードのメソッドはジェネレータで、visitor.run()で実行する
+    convert_exp = visitor.dispatcher("exp_", "convert_nothing")
+    convert_statement = visitor.dispatcher("stmt_", "convert_nothing")
+
+    def convert_nothing(self, node, *args):
+        pass
+
+    def newtemp(self, exp):
+        """式expの値を入れる一時変数を返す
+           一時変数の型は、型検査で式のノードに記録した型(記録がなければint)。
+           同じ型の使い終わった一時変数があればそれを使い回し、なければ新しく作って
+           tempdecl_listに加える"""
+        objtype = sa.expression_type(exp, typetable.INT)
+        tempvar = self.tvg.reuse(objtype)
+        if tempvar is None:
+            tempvar = self.tvg.newvardecl(objtype)
+            self.tempdecl_list.append(VarDecl(tempvar))
+        return tempvar
+
+    def release(self, *tempvars):
+        """値を読む命令を出力し終えた一時変数を、後の式で使い回せるようにする
+           一時変数はそれを作ったメソッドが、値を読む命令をcodeに加えた後で返す
+           (子の式の変換中は返さないので、評価中の値を後の式が上書きすることはない)"""
+        for tempvar in tempvars:
+            self.tvg.release(tempvar)
 
     def intermed_code_generator(self):
         """抽象構文木を引数として受け取り(or インスタンス変数のast_nodeを更新し)、
@@ -243,20 +289,20 @@ class IntermedCodeGenerator(object):
            生成しリストに加える
            返り値として生成された中間表現列のリストを返す"""
         if isinstance(self.ast_node, ast.ExternalDeclarationList):
-            for node in self.ast_node.nodes:
-                self.ast_node = node
-                self.intermed_code_generator()
+            with gcpause.paused():
+                for node in self.ast_node.nodes:
+                    self.ast_node = node
+                    self.intermed_code_generator()
 
         elif isinstance(self.ast_node, ast.Declaration):
-            intermed_global_decl = self.intermed_code_vardecl(self.ast_node)
-            self.intermed_code_list.append(intermed_global_decl)
+            self.intermed_code_list.extend(self.intermed_code_vardecl(self.ast_node))
 
         elif isinstance(self.ast_node, ast.FunctionDefinition):
             self.intermed_code_list.append(
                 self.intermed_code_fundef(self.ast_node))
             self.tempdecl_list = [] # initialize
 
-        return flatten(self.intermed_code_list)
+        return self.intermed_code_list
 
     def intermed_code_vardecl(self, decl):
         """Declarationを表す抽象構文木のノードを中間命令列に変換する
@@ -276,282 +322,233 @@ class IntermedCodeGenerator(object):
                     decl_struct = declarator.direct_declarator.identifier.identifier
                     itmd_decllist.append(VarDecl(decl_struct))
 
-        return flatten(itmd_decllist)
+        return itmd_decllist
 
     def intermed_code_exp(self, x, exp):
         """Expressionを表す抽象構文木のノードを、
            expを評価してxに結果を代入する中間命令列に変換する
            引数として代入先の変数(生成された一時変数)と、変換するノードをとる
            返り値として変換結果の中間命令列のリストを返す"""
-        itmd_explist = []
-
-        if isinstance(exp, ast.Number):
-            intermed_num = IntExpression(exp.value)
-            let_num = LetStatement(x, intermed_num)
-            itmd_explist.append(let_num)
-
-        elif isinstance(exp, ast.Identifier):
-            intermed_var = VarExpression(exp.identifier)
-            let_var = LetStatement(x, intermed_var)
-            itmd_explist.append(let_var)
-
-        elif isinstance(exp, ast.Pointer):
-            p1 = self.tvg.newvardecl()
-            self.tempdecl_list.append(VarDecl(p1))
-            intermed_var = self.intermed_code_exp(p1, exp.expression)
-            let_var = LetStatement(x, p1)
-            itmd_explist.append(intermed_var)
-            itmd_explist.append(let_var)
-
-        elif isinstance(exp, ast.BinaryOperators):
-            p1 = self.tvg.newvardecl()
-            p2 = self.tvg.newvardecl()
-            self.tempdecl_list.append(VarDecl(p1))
-            self.tempdecl_list.append(VarDecl(p2))
-
-            if exp.op == "PLUS" or \
-               exp.op == "MINUS" or \
-               exp.op == "TIMES" or \
-               exp.op == "DIVIDE":
-
-                print("Dealing with Arithmetic Operation...")
-                print("op: {0}".format(exp.op))
-                print("left: {0}, {1}".format(exp.left, exp.left.__dict__))
-                print("right: {0}, {1}".format(exp.right, exp.right.__dict__))
-                itmd_left = self.intermed_code_exp(p1, exp.left)
-                itmd_right = self.intermed_code_exp(p2, exp.right)
-                itmd_aop = ArithmeticOperation(exp.op, p1, p2)
-                itmd_aop_let = LetStatement(x, itmd_aop)
-                itmd_explist.append(itmd_left)
-                itmd_explist.append(itmd_right)
-                itmd_explist.append(itmd_aop_let)
-
-            elif exp.op == "EQUAL" or \
-                    exp.op == "NEQ" or \
-                    exp.op == "LT" or \
-                    exp.op == "GT" or \
-                    exp.op == "LEQ" or \
-                    exp.op == "GEQ" or \
-                    exp.op == "AND" or \
-                    exp.op == "OR":
-
-                itmd_left = self.intermed_code_exp(p1, exp.left)
-                itmd_right = self.intermed_code_exp(p2, exp.right)
-                itmd_relop = RelationalExpression(exp.op, p1, p2)
-                itmd_relop_let = LetStatement(x, itmd_relop)
-                itmd_explist.append(itmd_left)
-                itmd_explist.append(itmd_right)
-                itmd_explist.append(itmd_relop_let)
+        code = []
+        visitor.run(self.convert_exp(exp, x, code))
+        return code
+
+    def exp_Number(self, exp, x, code):
+        intermed_num = IntExpression(exp.value)
+        code.append(LetStatement(x, intermed_num))
+
+    def exp_Identifier(self, exp, x, code):
+        intermed_var = VarExpression(exp.identifier)
+        code.append(LetStatement(x, intermed_var))
+
+    def exp_Pointer(self, exp, x, code):
+        p1 = self.newtemp(exp.expression)
+        yield self.convert_exp(exp.expression, p1, code)
+        code.append(LetStatement(x, p1))
+        self.release(p1)
+
+    def exp_BinaryOperators(self, exp, x, code):
+        p1 = self.newtemp(exp.left)
+        p2 = self.newtemp(exp.right)
+
+        if exp.op == "PLUS" or \
+           exp.op == "MINUS" or \
+           exp.op == "TIMES" or \
+           exp.op == "DIVIDE":
+
+            if TRACE.debug:
+                TRACE.emit(trace.DEBUG, "arithmetic operation", op=exp.op,
+                           left=dict(ast.iter_fields(exp.left)), right=dict(ast.iter_fields(exp.right)))
+            yield self.convert_exp(exp.left, p1, code)
+            yield self.convert_exp(exp.right, p2, code)
+            itmd_aop = ArithmeticOperation(exp.op, p1, p2)
+            code.append(LetStatement(x, itmd_aop))
+            self.release(p1, p2)
+
+        elif exp.op == "EQUAL" or \
+                exp.op == "NEQ" or \
+                exp.op == "LT" or \
+                exp.op == "GT" or \
+                exp.op == "LEQ" or \
+                exp.op == "GEQ" or \
+                exp.op == "AND" or \
+                exp.op == "OR":
+
+            yield self.convert_exp(exp.left, p1, code)
+            yield self.convert_exp(exp.right, p2, code)
+            itmd_relop = RelationalExpression(exp.op, p1, p2)
+            code.append(LetStatement(x, itmd_relop))
+            self.release(p1, p2)
 
-            else:
-                print("nanka akan with BinaryOperators : op = {0}".format(exp.op))
-
-        elif isinstance(exp, ast.Address):
-            p1 = self.tvg.newvardecl()
-            self.tempdecl_list.append(VarDecl(p1))
-            intermed_varp = self.intermed_code_exp(p1, exp.expression)
-            addr_xp = AddressExpression(p1)
-            itmd_explist.append(intermed_varp)
-            itmd_explist.append(addr_xp)
-
-        elif isinstance(exp, ast.FunctionExpression):
-            # print関数の呼び出し
-            print("function expression -> intermed code")
-            print(exp.identifier.identifier)
-            if isinstance(exp.identifier.identifier, sa.Decl):
-                print(exp.identifier.identifier.__dict__)
-            if exp.identifier.identifier.name == "print":
-                p1 = self.tvg.newvardecl()
-                self.tempdecl_list.append(VarDecl(p1))
-                let_arg = self.intermed_code_exp(p1, exp.argument_expression.nodes[0])  # 引数は1つと仮定してもいい？
-                intermed_print = PrintStatement(p1)
-                itmd_explist.append(let_arg)
-                itmd_explist.append(intermed_print)
-
-            # それ以外の関数呼び出し
-            else:
-                tempvars = [self.tvg.newvardecl()
-                            for _ in exp.argument_expression.nodes]
-                for tempvar in tempvars:
-                    self.tempdecl_list.append(VarDecl(tempvar))
-                let_args = [self.intermed_code_exp(tempvars[i], arg) for i, arg in enumerate(
-                    exp.argument_expression.nodes)]
-                intermed_funccall = CallStatement(
-                    x, exp.identifier.identifier, tempvars)
-                for let_arg in reversed(let_args):
-                    itmd_explist.append(let_arg)
-                itmd_explist.append(intermed_funccall)
-
-        return flatten(itmd_explist)
+        else:
+            TRACE.emit(trace.WARNING, "unsupported binary operator", op=exp.op)
+            self.release(p1, p2)
+
+    def exp_Address(self, exp, x, code):
+        p1 = self.newtemp(exp.expression)
+        yield self.convert_exp(exp.expression, p1, code)
+        code.append(AddressExpression(p1))
+        self.release(p1)
+
+    def exp_FunctionExpression(self, exp, x, code):
+        # print関数の呼び出し
+        if TRACE.debug:
+            TRACE.emit(trace.DEBUG, "function expression", function=exp.identifier.identifier)
+        if exp.identifier.identifier.name == "print":
+            p1 = self.newtemp(exp.argument_expression.nodes[0])
+            yield self.convert_exp(exp.argument_expression.nodes[0], p1, code)  # 引数は1つと仮定してもいい？
+            code.append(PrintStatement(p1))
+            self.release(p1)
+
+        # それ以外の関数呼び出し
+        else:
+            tempvars = [self.newtemp(arg) for arg in exp.argument_expression.nodes]
+            starts = []
+            for tempvar, arg in zip(tempvars, exp.argument_expression.nodes):
+                starts.append(len(code))
+                yield self.convert_exp(arg, tempvar, code)
+            # 引数を評価する命令列は、後ろの引数のものから順に並べ替える
+            if len(starts) > 1:
+                ends = starts[1:] + [len(code)]
+                code[starts[0]:] = [instr for start, end in reversed(zip(starts, ends))
+                                    for instr in code[start:end]]
+            intermed_funccall = CallStatement(
+                x, exp.identifier.identifier, tempvars)
+            code.append(intermed_funccall)
+            self.release(*tempvars)
 
     def intermed_code_statement(self, statement):
         """Statementを表す抽象構文木のノードを中間命令列に変換する
            引数として変換する文のノードをとる
            返り値として変換結果の中間命令列のリストを返す"""
-        itmd_stmtlist = []
-        if isinstance(statement, ast.NullNode):
-            itmd_stmtlist.append(EmptyStatement())
-
-        elif isinstance(statement, ast.IfStatement):
-            print("converting if statement ast to intermed code...")
-            print("then: {0}".format(statement.then_statement))
-            print("else: {0}".format(statement.else_statement))
-            p1 = self.tvg.newvardecl()
-            self.tempdecl_list.append(VarDecl(p1))
-            let_exp = self.intermed_code_exp(p1, statement.expression)
-            then_stmt = self.intermed_code_statement(statement.then_statement)
-            else_stmt = self.intermed_code_statement(statement.else_statement)
-            print(then_stmt)
-            print(else_stmt)
-            intermed_if = IfStatement(
-                p1, then_stmt, else_stmt)  # リストになってるので[0]をつける…！？
-            itmd_stmtlist.append(let_exp)
-            itmd_stmtlist.append(intermed_if)
-
-        elif isinstance(statement, ast.WhileLoop):
-            p1 = self.tvg.newvardecl()
-            self.tempdecl_list.append(VarDecl(p1))
-            let_exp = self.intermed_code_exp(p1, statement.expression)
-            stmt = self.intermed_code_statement(statement.statement)
-            whilestmt = flatten([stmt, let_exp])
-            intermed_while = WhileStatement(p1, whilestmt)
-            itmd_stmtlist.append(let_exp)
-            itmd_stmtlist.append(intermed_while)
-
-        elif isinstance(statement, ast.ExpressionStatement):
-            if isinstance(statement.expression, ast.BinaryOperators) and \
-                statement.expression.op == "ASSIGN":
-                print("intermed_code: ASSIGN statement.")
-
-                # *x = y
-                if isinstance(statement.expression.left, ast.Pointer):
-                    p1 = self.tvg.newvardecl()
-                    self.tempdecl_list.append(VarDecl(p1))
-
-                    let_left = self.intermed_code_exp(
-                        p1, statement.expression.left.expression)
-                    itmd_stmtlist.append(let_left)
-
-                    # 定数代入の場合右辺をintermed_code_expで評価する必要がない
-                    if isinstance(statement.expression.right, ast.Number):
-                        intexp = IntExpression(statement.expression.right.value)
-                        itmd_stmtlist.append(WriteStatement(p1, intexp))
-                    else:
-                        p2 = self.tvg.newvardecl()
-                        self.tempdecl_list.append(VarDecl(p2))
-
-                        let_right = self.intermed_code_exp(p2, statement.expression.right)
-                        itmd_stmtlist.append(let_right)
-                        itmd_stmtlist.append(WriteStatement(p1, p2))
-
-                # x = *y
-                elif isinstance(statement.expression.right, ast.Pointer):
-                    p1 = self.tvg.newvardecl()
-                    p2 = self.tvg.newvardecl()
-                    self.tempdecl_list.append(VarDecl(p1))
-                    self.tempdecl_list.append(VarDecl(p2))
-
-                    let_left = self.intermed_code_exp(p1, statement.expression.left)
-                    let_right = self.intermed_code_exp(
-                        p2, statement.expression.right.expression)
-                    itmd_stmtlist.append(let_left)
-                    itmd_stmtlist.append(let_right)
-                    itmd_stmtlist.append(ReadStatement(p1, p2))
-
-                # x(ただの変数) = y
-                elif isinstance(statement.expression.left, ast.Identifier):
-                    print("left is tadano hensuu")
-                    print("op: {0}".format(statement.expression.op))
-                    print("left: {0}".format(statement.expression.left.identifier.__dict__))
-                    print("right: {0}".format(statement.expression.right.__dict__))
-                    p1 = self.tvg.newvardecl()
-                    self.tempdecl_list.append(VarDecl(p1))
-
-                    # 右辺が定数のとき、else節の方法で右辺を処理すると無駄なストア・ロードが生じる
-                    if isinstance(statement.expression.right, ast.Number):
-                        intexp = IntExpression(statement.expression.right.value)
-                        # let_stmt = self.intermed_code_exp(statement.expression.left, intexp)
-                        let_stmt = LetStatement(statement.expression.left.identifier, intexp)
-                        print("Let statement to add: {0}".format(let_stmt))
-                        itmd_stmtlist.append(let_stmt)
-                    else:
-                        let_right = self.intermed_code_exp(p1, statement.expression.right)
-                        let_stmt = LetStatement(statement.expression.left.identifier, VarExpression(p1))
-                        # let_stmt = self.intermed_code_exp(statement.expression.left, p1)
-                        itmd_stmtlist.append(let_right)
-                        print("Let statement to add: {0}".format(let_stmt))
-                        itmd_stmtlist.append(let_stmt)
-                        # itmd_stmtlist.append(let_stmt)
-                    # print("Let statement to add: {0}".format(let_stmt))
-                    # itmd_stmtlist.append(let_stmt)
-
-                # 存在するのか？
+        code = []
+        visitor.run(self.convert_statement(statement, code))
+        return code
+
+    def stmt_NullNode(self, statement, code):
+        code.append(EmptyStatement())
+
+    def stmt_IfStatement(self, statement, code):
+        p1 = self.newtemp(statement.expression)
+        yield self.convert_exp(statement.expression, p1, code)
+        # 条件の値は分岐するときに読み終わるので、then節とelse節で使い回してよい
+        self.release(p1)
+        then_stmt = []
+        yield self.convert_statement(statement.then_statement, then_stmt)
+        else_stmt = []
+        yield self.convert_statement(statement.else_statement, else_stmt)
+        if TRACE.debug:
+            TRACE.emit(trace.DEBUG, "if statement", then=then_stmt, else_=else_stmt)
+        intermed_if = IfStatement(
+            p1, then_stmt, else_stmt)  # リストになってるので[0]をつける…！？
+        code.append(intermed_if)
+
+    def stmt_WhileLoop(self, statement, code):
+        p1 = self.newtemp(statement.expression)
+        start = len(code)
+        yield self.convert_exp(statement.expression, p1, code)
+        # 条件の値は分岐するときに読み終わり、本体の最後で評価し直すので、
+        # 本体で使い回してよい(条件の式の中の一時変数も同じ)
+        self.release(p1)
+        whilestmt = []
+        yield self.convert_statement(statement.statement, whilestmt)
+        # 条件の式を評価する命令列は、本体の後ろにも置く
+        whilestmt.extend(code[start:])
+        code.append(WhileStatement(p1, whilestmt))
+
+    def stmt_ExpressionStatement(self, statement, code):
+        if isinstance(statement.expression, ast.BinaryOperators) and \
+            statement.expression.op == "ASSIGN":
+            # *x = y
+            if isinstance(statement.expression.left, ast.Pointer):
+                p1 = self.newtemp(statement.expression.left.expression)
+
+                yield self.convert_exp(statement.expression.left.expression, p1, code)
+
+                # 定数代入の場合右辺をintermed_code_expで評価する必要がない
+                if isinstance(statement.expression.right, ast.Number):
+                    intexp = IntExpression(statement.expression.right.value)
+                    code.append(WriteStatement(p1, intexp))
                 else:
-                    p1 = self.tvg.newvardecl()
-                    p2 = self.tvg.newvardecl()
-                    self.tempdecl_list.append(VarDecl(p1))
-                    self.tempdecl_list.append(VarDecl(p2))
-                    let_left = self.intermed_code_exp(p1, statement.expression.left)
-                    let_right = self.intermed_code_exp(p2, statement.expression.right)
-                    let_stmt = LetStatement(p1, p2)
-                    itmd_stmtlist.append(let_left)
-                    itmd_stmtlist.append(let_right)
-                    itmd_stmtlist.append(let_stmt)
-
-            else:
-                p1 = self.tvg.newvardecl()
-                self.tempdecl_list.append(VarDecl(p1))
-                intermed_exp = self.intermed_code_exp(p1, statement.expression)
-                itmd_stmtlist.append(
-                    intermed_exp)
-
-        elif isinstance(statement, ast.ReturnStatement):
-            if isinstance(statement.return_statement, ast.NullNode):
-                # return_stmt = EmptyStatement()
-                pass
+                    p2 = self.newtemp(statement.expression.right)
+
+                    yield self.convert_exp(statement.expression.right, p2, code)
+                    code.append(WriteStatement(p1, p2))
+                    self.release(p2)
+                self.release(p1)
+
+            # x = *y
+            elif isinstance(statement.expression.right, ast.Pointer):
+                p1 = self.newtemp(statement.expression.left)
+                p2 = self.newtemp(statement.expression.right.expression)
+
+                yield self.convert_exp(statement.expression.left, p1, code)
+                yield self.convert_exp(statement.expression.right.expression, p2, code)
+                code.append(ReadStatement(p1, p2))
+                self.release(p1, p2)
+
+            # x(ただの変数) = y
+            elif isinstance(statement.expression.left, ast.Identifier):
+                p1 = self.newtemp(statement.expression.right)
+
+                # 右辺が定数のとき、else節の方法で右辺を処理すると無駄なストア・ロードが生じる
+                if isinstance(statement.expression.right, ast.Number):
+                    intexp = IntExpression(statement.expression.right.value)
+                    # let_stmt = self.intermed_code_exp(statement.expression.left, intexp)
+                    let_stmt = LetStatement(statement.expression.left.identifier, intexp)
+                else:
+                    yield self.convert_exp(statement.expression.right, p1, code)
+                    let_stmt = LetStatement(statement.expression.left.identifier, VarExpression(p1))
+                    # let_stmt = self.intermed_code_exp(statement.expression.left, p1)
+                if TRACE.debug:
+                    TRACE.emit(trace.DEBUG, "let statement", left=let_stmt.var,
+                               right=dict(ast.iter_fields(statement.expression.right)))
+                code.append(let_stmt)
+                self.release(p1)
+
+            # 存在するのか？
             else:
-                p1 = self.tvg.newvardecl()
-                self.tempdecl_list.append(VarDecl(p1))
-                let_return = self.intermed_code_exp(
-                    p1, statement.return_statement)
-                intermed_return = ReturnStatement(p1)
-                itmd_stmtlist.append(let_return)
-                itmd_stmtlist.append(intermed_return)
+                p1 = self.newtemp(statement.expression.left)
+                p2 = self.newtemp(statement.expression.right)
+                yield self.convert_exp(statement.expression.left, p1, code)
+                yield self.convert_exp(statement.expression.right, p2, code)
+                code.append(LetStatement(p1, p2))
+                self.release(p1, p2)
 
-        elif isinstance(statement, ast.CompoundStatement):
-            intermed_compstmt = self.intermed_code_compstmt(statement)
-            itmd_stmtlist.append(intermed_compstmt)
+        else:
+            p1 = self.newtemp(statement.expression)
+            yield self.convert_exp(statement.expression, p1, code)
+            self.release(p1)
+
+    def stmt_ReturnStatement(self, statement, code):
+        if isinstance(statement.return_statement, ast.NullNode):
+            # return_stmt = EmptyStatement()
+            pass
+        else:
+            p1 = self.newtemp(statement.return_statement)
+            yield self.convert_exp(statement.return_statement, p1, code)
+            code.append(ReturnStatement(p1))
+            self.release(p1)
 
-        return flatten(itmd_stmtlist)
+    def stmt_CompoundStatement(self, statement, code):
+        code.append((yield self.convert_compstmt(statement)))
 
     def intermed_code_compstmt(self, compstmt):
         """CompoundStatementを表す抽象構文木のノードを中間命令列に変換する
            引数として変換対象の複文のノードを取り、返り値として生成された一時変数の
            宣言を加えた中間命令を返す"""
+        return visitor.run(self.convert_compstmt(compstmt))
+
+    def convert_compstmt(self, compstmt):
         decl_list = []
         stmt_list = []
         for decl in compstmt.declaration_list.nodes:
-            decls = self.intermed_code_vardecl(decl)
-            for intermed_decl in decls:
-                decl_list.append(intermed_decl)
+            decl_list.extend(self.intermed_code_vardecl(decl))
 
         for statement in compstmt.statement_list.nodes:
-            stmt_list.append(self.intermed_code_statement(statement))
-
-        # for stmtelem in flatten(stmt_list):
-        #     if isinstance(stmtelem, LetStatement):
-        #         if isinstance(stmtelem.var, sa.Decl) \
-        #                 and stmtelem.var.kind == "temp":
-        #             decl_list.append(
-        #                 VarDecl(stmtelem.var))
-
-            # elif isinstance(stmtelem, CompoundStatement):
-            #     self.intermed_code_compstmt(stmtelem)
+            yield self.convert_statement(statement, stmt_list)
 
-        itmd_compstmt = CompoundStatement(
-            flatten(decl_list), flatten(stmt_list))
-
-        return itmd_compstmt
+        yield visitor.Return(CompoundStatement(decl_list, stmt_list))
 
     def intermed_code_fundef(self, fundef):
         """FunctionDefinitionを表す抽象構文木のノードを中間命令列に変換する
@@ -569,17 +566,21 @@ class IntermedCodeGenerator(object):
         decl_list = []
         stmt_list = []
         for decl in compstmt.declaration_list.nodes:
-            decls = self.intermed_code_vardecl(decl)
-            for intermed_decl in decls:
-                decl_list.append(intermed_decl)
+            decl_list.extend(self.intermed_code_vardecl(decl))
 
+        # 一時変数の場所はフレームごとに割り当てるので、前の関数の一時変数は使い回さない
+        self.tvg.clear()
+        created, reused = self.tvg.counter, self.tvg.reused
         for statement in compstmt.statement_list.nodes:
-            stmt_list.append(self.intermed_code_statement(statement))
+            visitor.run(self.convert_statement(statement, stmt_list))
+        if TRACE.debug:
+            TRACE.emit(trace.DEBUG, "temporaries", function=funcvar.name,
+                       created=self.tvg.counter - created, reused=self.tvg.reused - reused)
 
         # TODO: decl_listとtempdecl_listを合わせてdecl_listとする
         decl_list.extend(self.tempdecl_list)
 
-        itmd_compstmt = CompoundStatement(flatten(decl_list), flatten(stmt_list))
+        itmd_compstmt = CompoundStatement(decl_list, stmt_list)
         itmd_fundef = FunctionDefinition(
             funcvar, itmd_paramlist, itmd_compstmt)
 
@@ -591,16 +592,40 @@ class TempVariableGenerator(object):
     """中間表現を生成する際に必要な一時変数を生成するクラス
        インスタンスとしてカウンタを持ち、メソッドとして新しい
        一時変数のdecl構造体を返すnewvardeclと、カウンタの値を0にリセットする
-       resetを持つ"""
+       resetを持つ
+
+       releaseで返された一時変数は型ごとの空きリストに入れ、reuseで取り出して
+       使い回す(recycleが偽のときは使い回さない)。配列の型の一時変数は
+       フレームに配列の大きさの場所を取り、コード生成で型が書き換えられるので
+       使い回さない。counterは作った一時変数の数、reusedは使い回した回数"""
 
-    def __init__(self):
+    def __init__(self, recycle=True):
         self.counter = 0
+        self.recycle = recycle
+        self.reused = 0
+        self.free = {}
 
-    def newvardecl(self):
+    def newvardecl(self, objtype=typetable.INT):
         tempvar_name = "_t" + str(self.counter)
-        tempvar_decl = sa.Decl(tempvar_name, 2, "temp", "int")
+        tempvar_decl = sa.Decl(tempvar_name, 2, "temp", objtype)
         self.counter += 1
         return tempvar_decl
 
+    def reuse(self, objtype=typetable.INT):
+        """型がobjtypeの使い終わった一時変数を返す(なければNone)"""
+        free = self.free.get(typetable.canonical(objtype))
+        if not free:
+            return None
+        self.reused += 1
+        return free.pop()
+
+    def release(self, tempvar):
+        if self.recycle and not tempvar.objtype.is_array:
+            self.free.setdefault(tempvar.objtype, []).append(tempvar)
+
+    def clear(self):
+        """空きリストを空にする"""
+        self.free = {}
+
     def reset(self):
         self.counter = 0
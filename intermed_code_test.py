@@ -7,6 +7,8 @@ from itertools import izip
 import intermed_code as ic
 import ast
 import semantic_analyzer as sa
+import typetable
+from parser import Parser
 
 # テスト
 
@@ -33,6 +35,21 @@ class TempVarTest(TestCase):
         actual = self.tvg.newvardecl()
         nose.tools.ok_(expected == actual)
 
+    def test_reuse(self):
+        """返した一時変数を同じ型のときだけ使い回すかのテスト"""
+        temp = self.tvg.newvardecl()
+        nose.tools.eq_(None, self.tvg.reuse())
+
+        self.tvg.release(temp)
+        nose.tools.eq_(None, self.tvg.reuse(typetable.INT_POINTER))
+        nose.tools.ok_(self.tvg.reuse("int") is temp)
+        nose.tools.eq_(None, self.tvg.reuse())
+        nose.tools.eq_((1, 1), (self.tvg.counter, self.tvg.reused))
+
+        self.tvg.release(temp)
+        self.tvg.clear()
+        nose.tools.eq_(None, self.tvg.reuse())
+
 
 class IntermedCodeTest(TestCase):
 
@@ -496,5 +513,107 @@ class IntermedCodeTest(TestCase):
         nose.tools.ok_(expected == actual)
 
 
+class TypedTempTest(TestCase):
+
+    def setUp(self):
+        self.parser = Parser()
+        self.parser.build()
+
+    def tearDown(self):
+        pass
+
+    def test_typed_temp(self):
+        """一時変数に、型検査で式のノードに記録した型が付くかのテスト"""
+        tree = self.parser.parse("int main() { int *p; int a; a = *(p + 1); return a; }")
+        sa.Analyzer(tree, check_types=True).analyze(tree)
+        icg = ic.IntermedCodeGenerator(tree, recycle_temps=False)
+        icg.intermed_code_fundef(tree.nodes[0])
+
+        objtypes = [vardecl.var.objtype for vardecl in icg.tempdecl_list]
+        nose.tools.eq_([typetable.INT, typetable.INT_POINTER, typetable.INT_POINTER,
+                        typetable.INT, typetable.INT], objtypes)
+
+    def test_recycled_temp(self):
+        """値を読み終えた一時変数が、同じ型の後の式で使い回されるかのテスト"""
+        tree = self.parser.parse("int main() { int *p; int a; a = *(p + 1); return a; }")
+        sa.Analyzer(tree, check_types=True).analyze(tree)
+        icg = ic.IntermedCodeGenerator(tree)
+        fundef = icg.intermed_code_fundef(tree.nodes[0])
+
+        objtypes = [vardecl.var.objtype for vardecl in icg.tempdecl_list]
+        nose.tools.eq_([typetable.INT, typetable.INT_POINTER, typetable.INT_POINTER, typetable.INT],
+                       objtypes)
+        nose.tools.eq_((4, 1), (icg.tvg.counter, icg.tvg.reused))
+        # return文の一時変数は、読み終えた左辺aの一時変数と同じもの
+        nose.tools.ok_(fundef.body.stmts[-1].var is fundef.body.stmts[0].var)
+
+    def test_live_temps(self):
+        """評価中の値を持つ一時変数(二項演算の左辺や関数の引数)が使い回されないかのテスト"""
+        tree = self.parser.parse("int f(int a, int b); int main() { int x; "
+                                 "x = f(x + 1, x * 2) + (x - 3); return x; }")
+        sa.Analyzer(tree, check_types=True).analyze(tree)
+        icg = ic.IntermedCodeGenerator(tree)
+        fundef = icg.intermed_code_generator()[-1]
+
+        call = fundef.body.stmts[6]
+        add = fundef.body.stmts[10].exp
+        nose.tools.ok_(call.variables[0] is not call.variables[1])
+        nose.tools.ok_(add.var_left is call.dest and add.var_right is not call.dest)
+        nose.tools.ok_(icg.tvg.reused > 0)
+
+
+class FieldsTest(TestCase):
+
+    def setUp(self):
+        self.decl_x = sa.Decl("x", 2, "var", "int")
+        self.decl_t = sa.Decl("_t0", 2, "temp", "int")
+
+    def tearDown(self):
+        pass
+
+    def test_slots(self):
+        """中間命令が__dict__を持たないかのテスト"""
+        let = ic.LetStatement(self.decl_t, ic.IntExpression(1))
+        nose.tools.ok_(not hasattr(let, "__dict__"))
+        nose.tools.ok_(not hasattr(ic.EmptyStatement(), "__dict__"))
+        nose.tools.assert_raises(AttributeError, setattr, let, "other", 1)
+
+    def test_equality(self):
+        """中間命令が_fieldsの属性で比較され、等しいものはハッシュも等しいかのテスト"""
+        def make(num):
+            body = [ic.LetStatement(sa.Decl("_t0", 2, "temp", "int"), ic.IntExpression(num)),
+                    ic.WriteStatement(self.decl_x, self.decl_t)]
+            return ic.IfStatement(self.decl_t, body, [ic.EmptyStatement()])
+
+        nose.tools.eq_(make(1), make(1))
+        nose.tools.eq_(hash(make(1)), hash(make(1)))
+        nose.tools.ok_(make(1) != make(2))
+        nose.tools.ok_(ic.VarExpression(self.decl_x) != ic.VarDecl(self.decl_x))
+        nose.tools.ok_(ic.WriteStatement(self.decl_x, self.decl_t) !=
+                       ic.WriteStatement(self.decl_x, ic.IntExpression(0)))
+        nose.tools.eq_(2, len(set([ic.IntExpression(1), ic.IntExpression(1), ic.IntExpression(2)])))
+        nose.tools.eq_("IntExpression(num=1)", repr(ic.IntExpression(1)))
+
+    def test_shared_equality(self):
+        """同じ命令や同じリストを比べるときに、中の命令をたどらないかのテスト"""
+        class Uncomparable(object):
+            def __eq__(self, other):
+                raise AssertionError("compared nested statement")
+
+        body = [Uncomparable()]
+        stmt = ic.IfStatement(self.decl_t, body, [])
+        nose.tools.ok_(stmt == stmt)
+        nose.tools.ok_(ic.IfStatement(self.decl_t, body, []) == stmt)
+        nose.tools.ok_(ic.CompoundStatement([], body) == ic.CompoundStatement([], body))
+        nose.tools.ok_(ic.ReturnStatement(body) == ic.ReturnStatement(body))
+        nose.tools.ok_(self.decl_x == self.decl_x)
+
+    def test_vardecl_offset(self):
+        """VarDeclのoffsetが宣言のoffsetを読み書きするかのテスト"""
+        vardecl = ic.VarDecl(self.decl_x)
+        vardecl.offset = -8
+        nose.tools.eq_(-8, self.decl_x.offset)
+
+
 if __name__ == '__main__':
     nose.main(argv=['nose', '-v'])
@@ -6,10 +6,15 @@
 from __future__ import unicode_literals
 import ply.lex as lex
 import tokenrules
+import tables
 
 class Lexer(object):
     tokens = tokenrules.tokens
 
+    # 不正な文字を記録するもの(diagnostics.Diagnostics)
+    # Noneのときは不正な文字でply.lex.LexErrorを送出する
+    diagnostics = None
+
     # 正規表現によるルール
     t_PLUS = r'\+'
     t_MINUS = r'-'
@@ -60,21 +65,31 @@ class Lexer(object):
         r'/\*[\w\W]*?\*/'
         t.lexer.lineno += t.value.count('\n')
 
-    # スペース、タブ、改行を無視
-    t_ignore = " \t\n"
+    # スペース、タブを無視(改行はt_newlineで行番号を数えてから捨てる)
+    t_ignore = " \t"
 
-    # 行番号をたどる
+    # 行番号をたどる(続く字下げもまとめて読み飛ばす)
     def t_newline(self, t):
-        r'\n+'
+        r'\n[ \t\n]*'
         t.lexer.lineno += t.value.count("\n")
 
     # エラー処理
     def t_error(self, t):
-        print("Illegal Character: {0}".format(t.value[0]))
+        if self.diagnostics is None:
+            print("Illegal Character: {0}".format(t.value[0]))
+            return
+        self.diagnostics.error("illegal-character", t.lineno, "Line {0}: Illegal character \"{1}\".".format(
+            t.lineno, t.value[0]))
+        t.lexer.skip(1)
 
     def build(self, **kwargs):
         # Lexer構築
-        self.lexer = lex.lex(module=self, **kwargs)
+        # 同梱の字句解析表が規則と一致すれば、規則の検査と正規表現の組み立てを省く
+        lextab = tables.load_lextab(self)
+        if lextab is not None:
+            self.lexer = lex.lex(module=self, optimize=1, lextab=lextab, **kwargs)
+        else:
+            self.lexer = lex.lex(module=self, **kwargs)
 
         # ここからテスト
         if __name__ == '__main__':
@@ -94,5 +109,23 @@ class Lexer(object):
                 except EOFError:
                     break
 
-mylexer = Lexer()
-mylexer.build()
\ No newline at end of file
+
+class LastTokenLexer(object):
+
+    """PLYの字句解析器lexerのトークンをそのまま返し、最後に返したトークンの
+       行番号をlast_linenoに覚えておく(入力の終わりの構文エラーの行番号に使う)"""
+
+    def __init__(self, lexer):
+        self.lexer = lexer
+        self.last_lineno = lexer.lineno
+
+    def token(self):
+        tok = self.lexer.token()
+        if tok is not None:
+            self.last_lineno = tok.lineno
+        return tok
+
+
+if __name__ == '__main__':
+    mylexer = Lexer()
+    mylexer.build()
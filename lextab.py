@@ -0,0 +1,11 @@
+# lextab.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('ADDRESS', 'AND', 'ASSIGN', 'COMMA', 'DEC', 'DIVIDE', 'ELSE', 'EQUAL', 'FOR', 'GEQ', 'GT', 'ID', 'IF', 'INC', 'INT', 'LBRACE', 'LBRACKET', 'LEQ', 'LPAREN', 'LT', 'MINUS', 'MINUS_EQ', 'NEQ', 'NUMBER', 'OR', 'PLUS', 'PLUS_EQ', 'RBRACE', 'RBRACKET', 'RETURN', 'RPAREN', 'SEMICOLON', 'TIMES', 'VOID', 'WHILE'))
+_lexreflags   = 64
+_lexliterals  = ''
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [(u'(?P<t_NUMBER>\\d+)|(?P<t_ID>[a-zA-Z_][a-zA-Z_0-9]*)|(?P<t_COMMENT>/\\*[\\w\\W]*?\\*/)|(?P<t_newline>\\n[ \\t\\n]*)|(?P<t_INC>\\+\\+)|(?P<t_OR>\\|\\|)|(?P<t_PLUS_EQ>\\+=)|(?P<t_RBRACE>\\})|(?P<t_RBRACKET>\\])|(?P<t_LBRACKET>\\[)|(?P<t_LPAREN>\\()|(?P<t_DEC>--)|(?P<t_MINUS_EQ>-=)|(?P<t_AND>&&)|(?P<t_LBRACE>\\{)|(?P<t_LEQ><=)|(?P<t_TIMES>\\*)|(?P<t_EQUAL>==)|(?P<t_GEQ>>=)|(?P<t_NEQ>!=)|(?P<t_RPAREN>\\))|(?P<t_PLUS>\\+)|(?P<t_MINUS>-)|(?P<t_COMMA>,)|(?P<t_LT><)|(?P<t_ADDRESS>&)|(?P<t_DIVIDE>/)|(?P<t_ASSIGN>=)|(?P<t_SEMICOLON>;)|(?P<t_GT>>)', [None, (u't_NUMBER', 'NUMBER'), (u't_ID', 'ID'), (u't_COMMENT', 'COMMENT'), (u't_newline', 'newline'), (None, 'INC'), (None, 'OR'), (None, 'PLUS_EQ'), (None, 'RBRACE'), (None, 'RBRACKET'), (None, 'LBRACKET'), (None, 'LPAREN'), (None, 'DEC'), (None, 'MINUS_EQ'), (None, 'AND'), (None, 'LBRACE'), (None, 'LEQ'), (None, 'TIMES'), (None, 'EQUAL'), (None, 'GEQ'), (None, 'NEQ'), (None, 'RPAREN'), (None, 'PLUS'), (None, 'MINUS'), (None, 'COMMA'), (None, 'LT'), (None, 'ADDRESS'), (None, 'DIVIDE'), (None, 'ASSIGN'), (None, 'SEMICOLON'), (None, 'GT')])]}
+_lexstateignore = {'INITIAL': u' \t'}
+_lexstateerrorf = {'INITIAL': 't_error'}
+_lexstateeoff = {}
+_lexsignature = 'c68451d16dbec5ebe38ce318c88938dff79b2181'
@@ -0,0 +1,356 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""関数定義の本体の意味解析を複数のプロセスで並列に行うモジュール
+
+   まずこのプロセスでトップレベルの宣言(グローバル変数、プロトタイプ宣言、
+   関数名)だけを解析して大域の環境を作る。関数定義の本体は互いに独立なので、
+   ソースの順に連続した区間に分けて、プロセスプールで名前解析と型検査
+   (Analyzer(check_types=True)と同じもの)を行う。
+
+   - ワーカーはプールを作るときにforkしたプロセスなので、構文木と大域の宣言を
+     コピーとして持っている。親から送るのは関数定義の区間だけ
+   - ワーカーは解析した構文木そのものではなく、解析の結果(名前に結び付けた宣言と
+     式の型)だけを、関数定義のノードを前順にたどった順に並べてpickleして返す。
+     親は自分の構文木を同じ順にたどって結果を書き込む。部分木をまとめて送ると
+     その符号化が解析そのものより何倍も時間がかかり、並列にする効果が消える
+   - 結果を構文木に書き込めるのは構文木を持つ親だけなので、書き込み(apply_results())は
+     ワーカーの数によらず逐次に行う。その手間は関数定義のノードの数に比例し、
+     1つのプロセスで解析する時間の4分の1から5分の1ほどになるので、annotate=Trueの速度向上は
+     プロセスをいくら増やしても3〜4倍で頭打ちになる(benchmark.pyのparallelで
+     確かめられる)。プロセスの数に応じて速くなるのは、構文木に書き込まない
+     annotate=False(診断メッセージとエラーの数だけが必要な検査)だけである
+   - 大域の宣言はpickleのpersistent_idで番号として送り、親の側で親の宣言の
+     オブジェクトに戻すので、解析した構文木は逐次に解析したときと同じく
+     親の宣言を指す
+   - 各関数の本体は、ソースでその関数より前にある大域の宣言だけが見える環境で
+     解析する。パラメータと本体で宣言した変数は関数ごとに取り除くので、
+     Analyzerで逐次に解析したときと違い、前の関数の変数が見えたり、
+     前の関数の変数との重複がエラーになったりはしない
+   - 診断メッセージはいったん集めて、行番号(同じ行ならソースでの宣言の順、
+     出した順)で並べてからdiagnosticsに記録する。プロセスの数によらず同じ順になる"""
+
+import os
+import operator
+import cPickle as pickle
+from cStringIO import StringIO
+import multiprocessing
+import ast
+import visitor
+import typetable
+import diagnostics as dg
+import semantic_analyzer as sa
+
+# ワーカーがforkで受け継ぐ解析の状態(関数定義のノードのリスト、各関数から見える
+# 大域の宣言の数、大域の宣言のリスト)と、大域の宣言のidから番号への辞書
+_state = None
+_decl_index = None
+
+
+class DiagnosticCollector(dg.Diagnostics):
+
+    """診断メッセージを、並べ替えのためのキーと一緒に集めるもの
+       keyedには (行番号, トップレベルの宣言の番号, 記録した順, 診断) を集める。
+       positionには今解析しているトップレベルの宣言の番号を入れておく"""
+
+    def __init__(self):
+        dg.Diagnostics.__init__(self, echo=False)
+        self.position = 0
+
+    def clear(self):
+        dg.Diagnostics.clear(self)
+        self.keyed = []
+
+    def add(self, record):
+        self.keyed.append((record.line or 0, self.position, len(self.keyed), record))
+        dg.Diagnostics.add(self, record)
+
+    def sorted_records(self):
+        return [record for _, _, _, record in sorted(self.keyed)]
+
+
+def declare_globals(tree, collector):
+    """トップレベルの宣言だけを解析する(関数定義は関数名だけを登録する)
+
+       解析に使ったAnalyzer、関数定義のトップレベルでの番号のリスト、
+       各関数定義から見える大域の宣言の数のリストを返す"""
+    tree.resolve_lines()
+    analyzer = sa.Analyzer(tree, diagnostics=collector)
+    globals_scope = analyzer.env.scopes[0]
+    functions = []
+    visible = []
+    for position, node in enumerate(tree.nodes):
+        collector.position = position
+        if isinstance(node, ast.FunctionDefinition):
+            analyzer.define_function(node, 0)
+            functions.append(position)
+            visible.append(len(globals_scope))
+        else:
+            visitor.run(analyzer.visit(node, 0, 0))
+    return analyzer, functions, visible
+
+
+def analyze_functions(state, start, stop, collector):
+    """state[0][start:stop]の関数定義の本体を解析して型検査する
+
+       (名前解析のエラーの数, 型検査のエラーの数, 警告の数)を返す"""
+    nodes, positions, visible, global_decls = state
+    analyzer = sa.Analyzer(None, check_types=True, diagnostics=collector)
+    env = analyzer.env
+    added = 0
+    for i in range(start, stop):
+        # ソースでこの関数より前にある大域の宣言までを見えるようにする
+        while added < visible[i]:
+            env.add(global_decls[added])
+            added += 1
+        collector.position = positions[i]
+        env.enter_scope()
+        visitor.run(analyzer.analyze_function_body(nodes[i], 0))
+        env.exit_scope()
+    return analyzer.error_count, analyzer.checker.error_count, analyzer.warning_count
+
+
+# ノードのクラスごとの (結果の種類, 子を返す関数, 子の数)。結果の種類は
+# NO_RESULT(結果なし)、EXPRESSION(式の型)、IDENTIFIER(式の型と宣言)、
+# BINARY(式の型。右辺を4倍する式に書き換えることがある)
+NO_RESULT, EXPRESSION, IDENTIFIER, BINARY = range(4)
+_SCALAR_FIELDS = ("op", "kind", "value", "lineno", "exptype")
+_layouts = {}
+
+
+def layout(cls):
+    """ノードのクラスclsの (結果の種類, 子を返す関数, 子の数) を返す
+       (子を返す関数は、子の数が1なら子を、2以上なら子のタプルを後ろから順に返す。
+       NodeListでは子の数を-1にする)"""
+    result = _layouts.get(cls)
+    if result is None:
+        names = ast.field_names(cls)
+        if issubclass(cls, ast.NodeList):
+            fields = ()
+        else:
+            fields = tuple(name for name in reversed(names) if name not in _SCALAR_FIELDS
+                           and not (name == "identifier" and issubclass(cls, ast.Identifier)))
+        if issubclass(cls, ast.Identifier):
+            kind = IDENTIFIER
+        elif issubclass(cls, ast.BinaryOperators):
+            kind = BINARY
+        elif "exptype" in names:
+            kind = EXPRESSION
+        else:
+            kind = NO_RESULT
+        count = -1 if issubclass(cls, ast.NodeList) else len(fields)
+        result = (kind, operator.attrgetter(*fields) if fields else None, count)
+        _layouts[cls] = result
+    return result
+
+
+def preorder(nodes):
+    """nodesとその子孫を前順に返す(collect_results()とapply_results()と同じ順)
+
+       右辺を4倍する式に書き換えたMINUSの式(sa.scale_offset())では、書き換える前の
+       右辺をたどるので、書き換えた木と書き換える前の木で同じ順になる"""
+    stack = list(reversed(nodes))
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, ast.Node):
+            continue
+        yield node
+        kind, getter, count = layout(type(node))
+        if kind == BINARY and node.op == "MINUS" and node.exptype is typetable.INT_POINTER:
+            stack.append(node.right.left)
+            stack.append(node.left)
+        elif count == 1:
+            stack.append(getter(node))
+        elif count > 1:
+            stack.extend(getter(node))
+        elif count:
+            stack.extend(reversed(node.nodes))
+
+
+def collect_results(nodes):
+    """解析したnodes以下の式の型と、名前に結び付けた宣言(なければNone)を前順に並べた
+       リストを返す(式の型は式のノードごとに、宣言はast.Identifierごとに1つ)
+
+       関数定義の本体のノードはすべてここを通るので、preorder()を使わずに
+       1つのループでたどる"""
+    results = []
+    append = results.append
+    layouts = _layouts
+    int_pointer = typetable.INT_POINTER
+    stack = list(reversed(nodes))
+    pop = stack.pop
+    push = stack.append
+    extend = stack.extend
+    while stack:
+        node = pop()
+        entry = layouts.get(type(node))
+        if entry is None:
+            if not isinstance(node, ast.Node):
+                continue
+            entry = layout(type(node))
+        kind, getter, count = entry
+        if kind == IDENTIFIER:
+            append(node.exptype)
+            identifier = node.identifier
+            append(identifier if isinstance(identifier, sa.Decl) else None)
+            continue
+        if kind:
+            exptype = node.exptype
+            append(exptype)
+            if kind == BINARY and exptype is int_pointer and node.op == "MINUS":
+                push(node.right.left)
+                push(node.left)
+                continue
+        if count == 1:
+            push(getter(node))
+        elif count > 1:
+            extend(getter(node))
+        elif count:
+            extend(reversed(node.nodes))
+    return results
+
+
+def apply_results(nodes, results):
+    """collect_results()で集めた結果を、まだ解析していない同じ形のnodes以下に書き込む"""
+    values = iter(results).next
+    layouts = _layouts
+    int_pointer = typetable.INT_POINTER
+    stack = list(reversed(nodes))
+    pop = stack.pop
+    push = stack.append
+    extend = stack.extend
+    while stack:
+        node = pop()
+        entry = layouts.get(type(node))
+        if entry is None:
+            if not isinstance(node, ast.Node):
+                continue
+            entry = layout(type(node))
+        kind, getter, count = entry
+        if kind == IDENTIFIER:
+            node.exptype = values()
+            decl = values()
+            if decl is not None:
+                node.identifier = decl
+            continue
+        if kind:
+            exptype = values()
+            if kind == BINARY and exptype is int_pointer and node.op == "MINUS":
+                # 構文木の中で共有された式は2度目には書き換え済み
+                if node.exptype is None:
+                    sa.scale_offset(node)
+                node.exptype = exptype
+                push(node.right.left)
+                push(node.left)
+                continue
+            node.exptype = exptype
+        if count == 1:
+            push(getter(node))
+        elif count > 1:
+            extend(getter(node))
+        elif count:
+            extend(reversed(node.nodes))
+
+
+def dump_result(nodes, records, counts, decl_index):
+    """解析した関数定義のノードnodesの結果と診断メッセージをpickleする
+       (decl_indexにある大域の宣言は番号にする)"""
+    out = StringIO()
+    pickler = pickle.Pickler(out, pickle.HIGHEST_PROTOCOL)
+    pickler.persistent_id = lambda obj: decl_index.get(id(obj))
+    pickler.dump((collect_results(nodes), records, counts))
+    return out.getvalue()
+
+
+def load_result(data, global_decls):
+    """dump_result()でpickleした結果を戻し、(解析の結果, 診断メッセージ, エラーの数)を返す
+       (大域の宣言はglobal_declsのものにする)"""
+    unpickler = pickle.Unpickler(StringIO(data))
+    unpickler.persistent_load = global_decls.__getitem__
+    return unpickler.load()
+
+
+def init_worker():
+    global _decl_index
+    _decl_index = dict((id(decl), i) for i, decl in enumerate(_state[3]))
+
+
+def analyze_chunk(task):
+    """ワーカーで区間 task = (start, stop, annotate) の関数定義を解析し、診断メッセージと
+       (annotateが真なら)解析の結果をpickleして返す"""
+    start, stop, annotate = task
+    collector = DiagnosticCollector()
+    counts = analyze_functions(_state, start, stop, collector)
+    nodes = _state[0][start:stop] if annotate else []
+    return dump_result(nodes, collector.keyed, counts, _decl_index)
+
+
+class ParallelAnalyzer(object):
+
+    """大域の宣言を解析した後、関数定義の本体の名前解析と型検査を
+       プロセスプールで並列に行うクラス
+
+       processesはプロセスの数(Noneならmultiprocessing.cpu_count()、1ならプールを
+       使わずにこのプロセスで解析する)。関数定義は processes * chunks_per_process
+       個の区間に分けてワーカーに渡す。ワーカーから戻した解析の結果は、
+       区間ごとに、ほかのワーカーが解析している間に構文木に書き込む。
+       annotateが偽ならワーカーからは診断メッセージとエラーの数だけを戻し、
+       構文木には書き込まない(検査だけをする場合)。親での書き込みが逐次に
+       残るので、プロセスの数に応じて速くなるのはannotateが偽のときだけである。
+       エラーの数はerror_count(名前解析)とtype_error_count(型検査)に数える。
+       診断メッセージは並べ替えてからdiagnostics(省略したときはloggingに出力する
+       diagnostics.Diagnostics)に記録する"""
+
+    def __init__(self, ast_top, processes=None, chunks_per_process=4, annotate=True,
+                 diagnostics=None):
+        self.nodelist = ast_top
+        self.diagnostics = diagnostics if diagnostics is not None else dg.Diagnostics()
+        self.processes = processes or multiprocessing.cpu_count()
+        self.chunks_per_process = chunks_per_process
+        self.annotate = annotate
+        self.error_count = 0
+        self.type_error_count = 0
+        self.warning_count = 0
+
+    def analyze(self):
+        """構文木を解析して(大域の環境, 取り除いた宣言のリスト)を返す"""
+        global _state
+        tree = self.nodelist
+        collector = DiagnosticCollector()
+        analyzer, positions, visible = declare_globals(tree, collector)
+        self.error_count += analyzer.error_count
+        self.warning_count += analyzer.warning_count
+
+        state = ([tree.nodes[position] for position in positions],
+                 positions, visible, analyzer.env.scopes[0])
+        count = len(positions)
+        if self.processes <= 1 or count <= 1 or not hasattr(os, "fork"):
+            self.add_counts(analyze_functions(state, 0, count, collector))
+        else:
+            chunks = min(count, self.processes * self.chunks_per_process)
+            tasks = [(count * k // chunks, count * (k + 1) // chunks, self.annotate)
+                     for k in range(chunks)]
+            _state = state
+            pool = multiprocessing.Pool(self.processes, init_worker)
+            try:
+                for (start, stop, _), data in zip(tasks, pool.imap(analyze_chunk, tasks)):
+                    results, records, counts = load_result(data, state[3])
+                    if self.annotate:
+                        apply_results(state[0][start:stop], results)
+                    collector.keyed.extend(records)
+                    self.add_counts(counts)
+                pool.close()
+            finally:
+                pool.terminate()
+                pool.join()
+                _state = None
+
+        for record in collector.sorted_records():
+            self.diagnostics.add(record)
+        return analyzer.env, analyzer.env.deleted
+
+    def add_counts(self, counts):
+        errors, type_errors, warnings = counts
+        self.error_count += errors
+        self.type_error_count += type_errors
+        self.warning_count += warnings
@@ -0,0 +1,137 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import logging
+from unittest import TestCase
+import nose
+import samplegen
+import typetable
+import semantic_analyzer as sa
+import parallel_analyzer as pa
+from parser import Parser
+from semantic_analyzer_test import MessageHandler, declarations
+
+
+class ParallelAnalyzerTest(TestCase):
+
+    def setUp(self):
+        self.parser = Parser()
+        self.parser.build()
+        self.handler = MessageHandler()
+        logging.getLogger().addHandler(self.handler)
+
+    def tearDown(self):
+        logging.getLogger().removeHandler(self.handler)
+
+    def fused(self, data):
+        """1つのプロセスで名前解析と型検査を行い、構文木とエラーの数とメッセージを返す"""
+        self.handler.messages = []
+        tree = self.parser.parse(data)
+        analyzer = sa.Analyzer(tree, check_types=True)
+        analyzer.analyze(tree)
+        return tree, analyzer.error_count + analyzer.checker.error_count, self.handler.messages
+
+    def parallel(self, data, processes):
+        """関数定義ごとに並列に解析し、構文木とエラーの数とメッセージと環境を返す"""
+        self.handler.messages = []
+        tree = self.parser.parse(data)
+        analyzer = pa.ParallelAnalyzer(tree, processes, chunks_per_process=2)
+        env, _ = analyzer.analyze()
+        return (tree, analyzer.error_count + analyzer.type_error_count,
+                self.handler.messages, env)
+
+    def test_same_annotation(self):
+        """並列に解析しても、1つのプロセスで解析したときと同じ宣言が結び付けられるかのテスト"""
+        data = samplegen.generate_wide_program(100, 40)
+        tree, errors, _ = self.fused(data)
+        for processes in (1, 3):
+            parallel_tree, parallel_errors, _, _ = self.parallel(data, processes)
+            nose.tools.eq_(errors, parallel_errors)
+            nose.tools.eq_(declarations(tree), declarations(parallel_tree))
+
+    def test_global_identity(self):
+        """ワーカーから戻した構文木が、このプロセスの大域の宣言と型を指すかのテスト"""
+        tree, errors, _, env = self.parallel(
+            "int g; int f(int a) { return a + g; } int main() { int *p; p = &g; return f(g); }", 2)
+        body = tree.nodes[1].compound_statement.statement_list.nodes
+        plus = body[0].return_statement
+        main = tree.nodes[2].compound_statement.statement_list.nodes
+
+        nose.tools.eq_(0, errors)
+        nose.tools.ok_(plus.right.identifier is env.lookup("g"))
+        nose.tools.ok_(plus.exptype is typetable.INT)
+        nose.tools.ok_(main[0].expression.right.exptype is typetable.INT_POINTER)
+        nose.tools.ok_(main[1].return_statement.identifier.identifier is env.lookup("f"))
+
+    def test_same_types(self):
+        """ワーカーの結果を書き込んだ構文木が、1つのプロセスで解析したものと同じ式の型と
+           同じ形(ポインタから整数を引く式の書き換えを含む)になるかのテスト"""
+        data = samplegen.generate_wide_program(20, 20) + """
+int sub(int *p, int n) { int *q; q = p - n - 1; return *q - n; }
+"""
+        tree, _, _ = self.fused(data)
+        parallel_tree, _, _, _ = self.parallel(data, 3)
+        types = [(type(node).__name__, node.exptype) for node in pa.preorder(tree.nodes)]
+        parallel_types = [(type(node).__name__, node.exptype)
+                          for node in pa.preorder(parallel_tree.nodes)]
+
+        nose.tools.eq_(types, parallel_types)
+        minus = parallel_tree.nodes[-1].compound_statement.statement_list.nodes[0].expression.right
+        nose.tools.eq_("TIMES", minus.right.op)
+        nose.tools.eq_("TIMES", minus.left.right.op)
+        nose.tools.eq_(pa.collect_results(tree.nodes), pa.collect_results(parallel_tree.nodes))
+
+    def test_diagnostics_order(self):
+        """診断メッセージがプロセスの数によらず同じ順に出力されるかのテスト"""
+        data = """int print(int x);
+int g;
+int f(int *p) { int a; a = *p; if (p) a = 1; return a; }
+void h(int a) { *a; print(g, 1); return a; }
+int k(int a) { if (a) return; return b; }
+int m() { return n; }
+int main() { int x; f(&g, 2); f(x); return 0; }
+"""
+        _, errors, messages = self.fused(data)
+        for processes in (1, 2, 4):
+            _, parallel_errors, parallel_messages, _ = self.parallel(data, processes)
+            nose.tools.eq_(errors, parallel_errors)
+            nose.tools.eq_(sorted(messages), sorted(parallel_messages))
+            if processes == 1:
+                expected = parallel_messages
+            nose.tools.eq_(expected, parallel_messages)
+
+    def test_check_only(self):
+        """構文木を戻さない場合も、同じ診断メッセージが出力されるかのテスト"""
+        data = "int g; int f(int *p) { return *g; } int main() { return f(g, 1); }"
+        _, errors, messages, _ = self.parallel(data, 2)
+        self.handler.messages = []
+        check_tree = self.parser.parse(data)
+        analyzer = pa.ParallelAnalyzer(check_tree, 2, annotate=False)
+        analyzer.analyze()
+
+        nose.tools.eq_(2, errors)
+        nose.tools.eq_(errors, analyzer.error_count + analyzer.type_error_count)
+        nose.tools.eq_(messages, self.handler.messages)
+        nose.tools.eq_(None, check_tree.nodes[1].compound_statement.statement_list.nodes[0]
+                       .return_statement.exptype)
+
+    def test_later_global(self):
+        """関数より後で宣言されたグローバル変数が、その関数から見えないかのテスト"""
+        data = "int f() { return g; } int g; int main() { return g; }"
+        _, errors, messages = self.fused(data)
+        _, parallel_errors, parallel_messages, _ = self.parallel(data, 2)
+
+        nose.tools.eq_(1, errors)
+        nose.tools.eq_(messages, parallel_messages)
+
+    def test_function_scope(self):
+        """関数のパラメータと変数が、ほかの関数の解析に残らないかのテスト"""
+        _, errors, _, env = self.parallel(
+            "int f(int a) { int b; return a; } int main() { int a; int b; return a + b; }", 2)
+
+        nose.tools.eq_(0, errors)
+        nose.tools.eq_(["f", "main"], [decl.name for decl in env.decl_list])
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])
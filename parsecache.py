@@ -0,0 +1,210 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""構文解析の結果をディスクに保存しておくキャッシュのモジュール
+
+   ソースのバイト列と、文法の署名、astモジュールの版から求めたハッシュをキーにして、
+   構文木(ast.ExternalDeclarationList)をarena.Arenaに詰めて1つのバイト列にしたものを
+   ファイルに保存する。同じソースを解析するときは、字句解析と構文解析を行わずに
+   ファイルから読み込む。読み込みは配列をそのまま復元するだけで、ノードは作らない。
+
+   - 書き込みは一時ファイルに書いてからrenameするので、読み込み側が
+     書きかけのファイルを読むことはない
+   - 合計サイズがmax_bytesを超えたら、最後に使われた時刻(mtime)が古い順に消す
+   - 合計サイズは最後にディレクトリを調べたときの合計に、その後保存した分を足して
+     見積もっておき、見積もりがmax_bytesを超えたときか、EVICT_INTERVAL回保存する
+     ごと(ほかのプロセスが保存した分を数えるため)にだけディレクトリ全体を調べる
+   - 追い出しはロックファイルをflockして、複数のプロセスで同時に行わないようにする
+   - 保存の途中でプロセスが終わって残った一時ファイルは、STALE_TEMP_AGE秒より古ければ
+     追い出しのときに消す"""
+
+import os
+import time
+import errno
+import hashlib
+import inspect
+import tempfile
+import zlib
+import ast
+import arena
+import gcpause
+
+try:
+    import fcntl
+except ImportError:  # flockのない環境ではロックせずに追い出す
+    fcntl = None
+
+# 保存する形式を変えたときに上げる
+CACHE_VERSION = 3
+
+SUFFIX = ".ast"
+TEMP_SUFFIX = ".tmp"
+LOCK_FILE = "lock"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# この回数だけ保存するごとに、見積もりによらずディレクトリ全体を調べる
+EVICT_INTERVAL = 256
+# これより古い一時ファイルは、書き込んでいたプロセスが終わって残ったものとみなす
+STALE_TEMP_AGE = 3600
+
+
+def ast_signature():
+    """astモジュールのソースから署名を計算して返す(ノードの定義が変わると変わる)"""
+    return hashlib.sha1(inspect.getsource(ast)).hexdigest()
+
+
+def load_tree(stored):
+    """キャッシュから読み込んだアリーナstoredを、オブジェクトの構文木に戻す"""
+    with gcpause.paused():
+        return stored.to_tree()
+
+
+class ParseCache(object):
+
+    """構文木のディスクキャッシュ
+       signatureには文法の署名(tables.grammar_signature)を渡す"""
+
+    def __init__(self, directory, signature, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.prefix = "{0}\n{1}\n{2}\n".format(CACHE_VERSION, signature, ast_signature())
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.store_failures = 0
+        self.evictions = 0
+        # 合計サイズの見積もり(Noneなら次の保存のときにディレクトリを調べる)と、
+        # 最後に調べてから保存した回数
+        self.estimated_bytes = None
+        self.unscanned_stores = 0
+        try:
+            os.makedirs(directory)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+    def key(self, data):
+        """ソースのバイト列dataのキーを返す"""
+        if isinstance(data, unicode):
+            data = data.encode("utf-8")
+        sha1 = hashlib.sha1(self.prefix)
+        sha1.update(data)
+        return sha1.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def get(self, data):
+        """dataを解析した構文木がキャッシュにあればarena.Arenaで返し、なければNoneを返す"""
+        path = self.path(self.key(data))
+        try:
+            with open(path, "rb") as f:
+                blob = zlib.decompress(f.read())
+            stored = arena.Arena.frombytes(blob)
+        except (IOError, OSError):
+            self.misses += 1
+            return None
+        except Exception:
+            # 壊れたファイルは消して、解析し直させる
+            self.remove(path)
+            self.misses += 1
+            return None
+        try:
+            # 最後に使われた時刻を更新する(LRUの順序に使う)。読み込み専用の共有キャッシュや、
+            # 読んだ後にほかのプロセスが消したときは更新できないが、読んだ構文木は使える
+            os.utime(path, None)
+        except OSError:
+            pass
+        self.hits += 1
+        return stored
+
+    def put(self, data, tree):
+        """dataを解析した構文木tree(オブジェクトの構文木かarena.Arena)を保存する"""
+        if not isinstance(tree, arena.Arena):
+            tree = arena.Arena.from_tree(tree)
+        blob = zlib.compress(tree.tobytes(), 1)
+        # ディスクが一杯だったり書き込めないディレクトリだったりしても、解析は済んで
+        # いるので例外は出さず、保存できなかった回数だけ数えておく
+        tmppath = None
+        try:
+            fd, tmppath = tempfile.mkstemp(dir=self.directory, suffix=TEMP_SUFFIX)
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.rename(tmppath, self.path(self.key(data)))
+        except (IOError, OSError):
+            if tmppath is not None:
+                self.remove(tmppath)
+            self.store_failures += 1
+            return
+        self.stores += 1
+        self.unscanned_stores += 1
+        if self.estimated_bytes is not None:
+            # 同じキーを上書きしたときは多めに見積もるが、次に調べるときに正される
+            self.estimated_bytes += len(blob)
+        if self.estimated_bytes is None or self.estimated_bytes > self.max_bytes \
+                or self.unscanned_stores >= EVICT_INTERVAL:
+            self.evict()
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def entries(self):
+        """キャッシュのファイルの(mtime, サイズ, パス)のリストを返す"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:  # 他のプロセスが消した
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def stale_temporaries(self):
+        """保存の途中で残った一時ファイルのパスのリストを返す(書き込み中のものは含めない)"""
+        limit = time.time() - STALE_TEMP_AGE
+        stale = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(TEMP_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if os.stat(path).st_mtime < limit:
+                    stale.append(path)
+            except OSError:  # 書き込んでいたプロセスがrenameした
+                continue
+        return stale
+
+    def evict(self):
+        """合計サイズがmax_bytes以下になるまで、古いものから消す"""
+        with open(os.path.join(self.directory, LOCK_FILE), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            for path in self.stale_temporaries():
+                self.remove(path)
+                self.evictions += 1
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self.remove(path)
+                total -= size
+                self.evictions += 1
+            self.estimated_bytes = total
+            self.unscanned_stores = 0
+
+    def clear(self):
+        for _, _, path in self.entries():
+            self.remove(path)
+        for path in self.stale_temporaries():
+            self.remove(path)
+        self.estimated_bytes = None
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "stores": self.stores,
+                "store_failures": self.store_failures, "evictions": self.evictions}
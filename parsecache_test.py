@@ -0,0 +1,201 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+import os
+import time
+import errno
+import shutil
+import tempfile
+import multiprocessing
+import nose
+import parsecache
+import samplegen
+from parser import Parser
+from parser_test import dump
+
+
+def full_parse(data):
+    parser = Parser()
+    parser.build()
+    return parser.parse(data)
+
+
+def parse_in_process(args):
+    cache_dir, data = args
+    parser = Parser(cache_dir=cache_dir)
+    parser.build()
+    return dump(parser.parse(data))
+
+
+class ParseCacheTest(TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.data = samplegen.generate_program(3, 10, seed=5, syntax_only=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def build(self, **kwargs):
+        parser = Parser(cache_dir=self.cache_dir, **kwargs)
+        parser.build()
+        return parser
+
+    def test_hit(self):
+        """2回目の解析でキャッシュから同じ構文木を読み込むかのテスト"""
+        parser = self.build()
+        first = parser.parse(self.data)
+        second = parser.parse(self.data)
+
+        nose.tools.eq_(dump(first), dump(second))
+        nose.tools.ok_(first is not second)
+        nose.tools.eq_({"hits": 1, "misses": 1, "stores": 1, "store_failures": 0, "evictions": 0},
+                       parser.cache.stats())
+
+    def test_shared_between_parsers(self):
+        """別のParserでも同じディレクトリのキャッシュを使うかのテスト"""
+        self.build().parse(self.data)
+        parser = self.build(parser_engine="rd")
+
+        nose.tools.eq_(dump(full_parse(self.data)), dump(parser.parse(self.data)))
+        nose.tools.eq_(1, parser.cache.hits)
+
+    def test_parse_file(self):
+        """mmapしたファイルの解析でもキャッシュを使うかのテスト"""
+        path = os.path.join(self.cache_dir, "source.c")
+        with open(path, "wb") as f:
+            f.write(self.data)
+        parser = self.build()
+        parser.parse(self.data)
+
+        nose.tools.eq_(dump(full_parse(self.data)), dump(parser.parse_file(path)))
+        nose.tools.eq_(1, parser.cache.hits)
+
+    def test_key(self):
+        """ソースと文法の署名でキーが変わるかのテスト"""
+        cache = parsecache.ParseCache(self.cache_dir, "grammar")
+
+        nose.tools.eq_(cache.key("int a;"), cache.key(u"int a;"))
+        nose.tools.ok_(cache.key("int a;") != cache.key("int b;"))
+        nose.tools.ok_(cache.key("int a;") !=
+                       parsecache.ParseCache(self.cache_dir, "other").key("int a;"))
+
+    def test_corrupted(self):
+        """壊れたファイルを読んだときに、消して解析し直すかのテスト"""
+        parser = self.build()
+        parser.parse(self.data)
+        path = parser.cache.path(parser.cache.key(self.data))
+        with open(path, "wb") as f:
+            f.write("broken")
+
+        nose.tools.eq_(dump(full_parse(self.data)), dump(parser.parse(self.data)))
+        nose.tools.eq_(2, parser.cache.misses)
+
+    def test_utime_failure(self):
+        """読み込んだ後に最後に使われた時刻を更新できなくても、読んだ構文木を使うかのテスト"""
+        cache = parsecache.ParseCache(self.cache_dir, "grammar")
+        cache.put(self.data, full_parse(self.data))
+
+        def utime(path, times):
+            raise OSError(errno.EACCES, "Permission denied", path)
+
+        original = os.utime
+        os.utime = utime
+        try:
+            stored = cache.get(self.data)
+        finally:
+            os.utime = original
+
+        nose.tools.eq_(dump(full_parse(self.data)), dump(stored.root_view()))
+        nose.tools.eq_((1, 0), (cache.hits, cache.misses))
+
+    def test_store_failure(self):
+        """保存に失敗しても解析した構文木を返し、一時ファイルを残さないかのテスト"""
+        parser = self.build()
+
+        def rename(src, dst):
+            raise OSError(errno.ENOSPC, "No space left on device", dst)
+
+        original = os.rename
+        os.rename = rename
+        try:
+            tree = parser.parse(self.data)
+        finally:
+            os.rename = original
+
+        nose.tools.eq_(dump(full_parse(self.data)), dump(tree))
+        nose.tools.eq_((0, 1), (parser.cache.stores, parser.cache.store_failures))
+        nose.tools.eq_([], [name for name in os.listdir(self.cache_dir)
+                            if name.endswith(parsecache.TEMP_SUFFIX)])
+
+    def test_stale_temporaries(self):
+        """保存の途中で残った古い一時ファイルだけを追い出しのときに消すかのテスト"""
+        cache = parsecache.ParseCache(self.cache_dir, "grammar")
+        stale = os.path.join(self.cache_dir, "stale" + parsecache.TEMP_SUFFIX)
+        writing = os.path.join(self.cache_dir, "writing" + parsecache.TEMP_SUFFIX)
+        for path in (stale, writing):
+            with open(path, "wb") as f:
+                f.write("x" * 100)
+        old = time.time() - parsecache.STALE_TEMP_AGE - 1
+        os.utime(stale, (old, old))
+
+        cache.put(self.data, full_parse(self.data))
+
+        nose.tools.ok_(not os.path.exists(stale))
+        nose.tools.ok_(os.path.exists(writing))
+        nose.tools.eq_(1, cache.evictions)
+
+    def test_eviction(self):
+        """合計サイズを超えたときに最後に使われたのが古いものから消すかのテスト"""
+        cache = parsecache.ParseCache(self.cache_dir, "grammar")
+        tree = full_parse(self.data)
+        for i, source in enumerate(("a", "b", "c")):
+            cache.put(source, tree)
+            os.utime(cache.path(cache.key(source)), (i, i))
+        size = os.path.getsize(cache.path(cache.key("a")))
+        cache.max_bytes = size * 3
+        cache.get("a")  # aを最後に使ったことにする
+
+        cache.put("d", tree)
+
+        nose.tools.eq_(1, cache.evictions)
+        nose.tools.ok_(cache.get("a") is not None)
+        nose.tools.ok_(cache.get("b") is None)
+        nose.tools.ok_(cache.get("c") is not None)
+        nose.tools.ok_(cache.get("d") is not None)
+
+    def test_scan_interval(self):
+        """保存のたびにディレクトリ全体を調べず、見積もりが上限を超えたときと
+           EVICT_INTERVAL回ごとにだけ調べるかのテスト"""
+        cache = parsecache.ParseCache(self.cache_dir, "grammar")
+        scans = []
+        entries = cache.entries
+        cache.entries = lambda: scans.append(1) or entries()
+        tree = full_parse(self.data)
+        for i in range(parsecache.EVICT_INTERVAL + 1):
+            cache.put(str(i), tree)
+        nose.tools.eq_(2, len(scans))
+
+        cache.max_bytes = cache.estimated_bytes
+        cache.put("over", tree)
+        nose.tools.eq_(3, len(scans))
+        nose.tools.eq_(1, cache.evictions)
+
+    def test_concurrent(self):
+        """複数のプロセスから同時に同じキャッシュを使えるかのテスト"""
+        pool = multiprocessing.Pool(4)
+        try:
+            results = pool.map(parse_in_process, [(self.cache_dir, self.data)] * 8)
+        finally:
+            pool.close()
+            pool.join()
+
+        expected = dump(full_parse(self.data))
+        for result in results:
+            nose.tools.eq_(expected, result)
+        nose.tools.eq_(1, len(parsecache.ParseCache(self.cache_dir, "").entries()))
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])
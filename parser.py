@@ -3,25 +3,43 @@
 
 """構文解析モジュール"""
 
-import ply.lex as lex
-import ply.yacc as yacc
-import sys
+import os
 import tokenrules
-from lexer import Lexer
+import tables
 import ast
-import restorecode
-import parsertest
-import semantic_analyzer
-import intermed_code
-import assign_address
-import codegen
-import printcode
+import diagnostics as dg
+
+# 字句解析器や構文解析の各エンジン、キャッシュなどのモジュールは、
+# 構文解析だけを行うプロセスの起動を軽くするため、使うときに読み込む
 
 
 class Parser(object):
 
-    def __init__(self, program=""):
+    def __init__(self, program="", lexer_engine="ply", token_buffer=False, parser_engine="lalr",
+                 cache_dir=None, ast_storage="object", diagnostics=None):
         self.program = program
+        # 字句解析と構文解析のエラーを記録するもの(diagnostics.Diagnostics)
+        # 構文エラーのときは記録してから回復し、解析を続ける
+        self.diagnostics = diagnostics if diagnostics is not None else dg.Diagnostics()
+        # 字句解析器の種類: "ply"(lexer.Lexer) または "dfa"(dfa_lexer.DFALexer)
+        self.lexer_engine = lexer_engine
+        # 構文解析器の種類: "lalr"(PLYのyacc) または "rd"(rdparser.RecursiveDescentParser)
+        self.parser_engine = parser_engine
+        # parse_incremental()で前回の入力と構文木を覚えておくためのもの
+        self.incremental = None
+        # 構文木のディスクキャッシュを置くディレクトリ(Noneなら使わない)
+        self.cache_dir = cache_dir
+        self.cache = None
+        # 構文木の持ち方: "object"(astのオブジェクト) または "arena"(arena.Arenaのビュー)
+        self.ast_storage = ast_storage
+        # Trueのときは字句解析の結果をTokenBufferに詰めてから構文解析する
+        # (バッファは解析ごとに使い回す)
+        self.token_buffer = None
+        # 構文解析中の字句解析器(最後に読んだトークンの行番号last_linenoを持つもの)
+        self.scanner = None
+        if token_buffer:
+            import tokenbuffer
+            self.token_buffer = tokenbuffer.TokenBuffer()
 
     tokens = tokenrules.tokens
 
@@ -43,6 +61,12 @@ class Parser(object):
                                 | function-definition'''
         p[0] = p[1]
 
+    def p_external_declaration_error(self, p):
+        '''external-declaration : error SEMICOLON
+                                | error compound-statement'''
+        # 構文エラーからの回復: 次の ; か { } までを読み飛ばす
+        p[0] = ast.NullNode()
+
     def p_declaration(self, p):
         '''declaration : type-specifier declarator-list SEMICOLON'''
         p[0] = ast.Declaration(p[1], p[2])
@@ -144,6 +168,11 @@ class Parser(object):
         '''statement : compound-statement'''
         p[0] = p[1]
 
+    def p_statement_error(self, p):
+        '''statement : error SEMICOLON'''
+        # 構文エラーからの回復: 次の ; までを読み飛ばす
+        p[0] = ast.NullNode()
+
 
     # if statement
     def p_statement_if(self, p):
@@ -453,22 +482,135 @@ class Parser(object):
     #     p[0] = ast.NullNode()
 
     def p_error(self, p):
+        """構文エラーを記録する(PLYの構文解析器はerrorの規則で回復して解析を続ける)"""
         if p:
-            sys.exit("Syntax error at token", p.type)
-            # Just discard the token and tell the parser it's okay.
-            self.parser.errok()
+            self.diagnostics.error("syntax-error", p.lineno, "Line {0}: Syntax error at \"{1}\".".format(
+                p.lineno, p.value))
         else:
-            sys.exit("Syntax error at EOF")
+            # 字句解析器の行番号は末尾の空白やコメントの分だけ進んでいるので、
+            # 最後に読んだトークンの行番号を使う
+            lineno = self.scanner.last_lineno if self.scanner is not None else 1
+            self.diagnostics.error("syntax-error", lineno, "Line {0}: Syntax error at end of input.".format(
+                lineno))
 
     # 解析実行部
     def build(self, debug=False, **kwargs):
         # 字句解析
-        self.lexer = Lexer()
+        if self.lexer_engine == "dfa":
+            import dfa_lexer
+            self.lexer = dfa_lexer.DFALexer()
+        else:
+            from lexer import Lexer
+            self.lexer = Lexer()
         self.lexer.build(debug=debug)
+        # 不正な文字も同じところに記録し、読み飛ばして字句解析を続ける
+        self.lexer.diagnostics = self.diagnostics
 
         # 構文解析
-        self.parser = yacc.yacc(module=self, debug=debug)
+        if self.parser_engine == "rd":
+            import rdparser
+            self.parser = rdparser.RecursiveDescentParser(self.p_error)
+        else:
+            self.build_lalr(debug)
+
+        if self.cache_dir is not None:
+            import parsecache
+            self.cache = parsecache.ParseCache(self.cache_dir, tables.grammar_signature(self))
+
+    def build_lalr(self, debug=False):
+        import ply.yacc as yacc
+
+        # 同梱の構文解析表があれば、文法の署名が一致する限りLALR表の生成を省く
+        parsetab = tables.load_parsetab()
+        if parsetab is not None:
+            self.parser = yacc.yacc(module=self, debug=debug, tabmodule=parsetab,
+                                    write_tables=False)
+        else:
+            self.parser = yacc.yacc(module=self, debug=debug,
+                                    tabmodule=tables.PARSETAB, outputdir=tables.TABLE_DIR)
 
     def parse(self, data):
-        result = self.parser.parse(data)
-        return result
\ No newline at end of file
+        if self.cache is None:
+            self.lexer.lexer.lineno = 1
+            return self.store(self.parse_source(data))
+        return self.parse_cached(data, lambda: self.parse_source(data))
+
+    def store(self, tree):
+        """解析したオブジェクトの構文木treeを、ast_storageの持ち方にして返す
+           (構文エラーで構文木がないときはNoneのまま返す)"""
+        if self.ast_storage == "arena" and tree is not None:
+            import arena
+            return arena.Arena.from_tree(tree).root_view()
+        return tree
+
+    def parse_cached(self, data, parse):
+        """dataの構文木がキャッシュにあればそれを返し、なければparse()で解析して保存する
+           キャッシュの構文木は入力だけで決まるので、行番号は1から数え直す"""
+        import arena
+        import parsecache
+
+        stored = self.cache.get(data)
+        if stored is not None:
+            if self.ast_storage == "arena":
+                return stored.root_view()
+            return parsecache.load_tree(stored)
+        self.lexer.lexer.lineno = 1
+        errors = self.diagnostics.error_count
+        tree = parse()
+        if self.diagnostics.error_count > errors:
+            # 構文エラーのあった入力は、次も診断メッセージが出るようにキャッシュしない
+            return self.store(tree)
+        stored = arena.Arena.from_tree(tree)
+        self.cache.put(data, stored)
+        if self.ast_storage == "arena":
+            return stored.root_view()
+        return tree
+
+    def parse_source(self, data):
+        if self.token_buffer is not None:
+            self.token_buffer.fill(self.lexer.lexer, data)
+            cursor = self.scanner = self.token_buffer.cursor()
+            return self.parser.parse(lexer=cursor, tokenfunc=cursor.token)
+        if self.lexer_engine == "dfa":
+            self.scanner = self.lexer.lexer
+            return self.parser.parse(data, lexer=self.lexer.lexer)
+        import lexer
+        scanner = self.scanner = lexer.LastTokenLexer(self.lexer.lexer)
+        return self.parser.parse(data, lexer=self.lexer.lexer, tokenfunc=scanner.token)
+
+    def parse_incremental(self, data):
+        """前回parse_incremental()に渡した入力と比べて、変わったトップレベルの
+           宣言だけを解析し直し、前回の構文木に差し込んで返す"""
+        if self.incremental is None:
+            import incremental
+            self.incremental = incremental.IncrementalParser(self)
+        return self.incremental.parse(data)
+
+    def parse_file(self, path):
+        """pathのファイルをメモリに読み込まずにmmapして構文解析する
+           トークンはDFAの字句解析器で必要になるたびに生成し、値は構文規則で
+           参照されたときにだけバッファから切り出す"""
+        import mmap
+
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return self.parse("")
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self.cache is None:
+                return self.store(self.parse_buffer(buf))
+            return self.parse_cached(buf, lambda: self.parse_buffer(buf))
+        finally:
+            buf.close()
+
+    def parse_buffer(self, buf):
+        """mmapしたバッファbufを構文解析する"""
+        import dfa_lexer
+
+        scanner = dfa_lexer.DFAScanner(dfa_lexer.build_table())
+        scanner.diagnostics = self.diagnostics
+        scanner.lexdata = buf
+        scanner.lexlen = len(buf)
+        self.scanner = scanner
+        stream = scanner.scan(lazy=True)
+        return self.parser.parse(lexer=scanner, tokenfunc=lambda: next(stream, None))
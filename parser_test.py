@@ -0,0 +1,140 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+import os
+import sys
+import subprocess
+import tempfile
+import nose
+import ast
+import dfa_lexer
+import diagnostics
+import samplegen
+from parser import Parser
+
+
+def dump(node):
+    """抽象構文木を比較できるタプルとリストに変換する"""
+    if isinstance(node, ast.Node):
+        return (type(node).__name__,
+                sorted((k, dump(v)) for k, v in ast.iter_fields(node)))
+    if isinstance(node, (list, tuple)):
+        return [dump(n) for n in node]
+    return node
+
+
+def flat_dump(node):
+    """抽象構文木を、ノードの(クラス名, 属性名と値)を前順に並べたリストに変換する
+       dump()と違って再帰しないので、深い構文木も比較できる"""
+    result = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Node):
+            fields = sorted(ast.iter_fields(node))
+            result.append((type(node).__name__, [name for name, _ in fields]))
+            stack.extend(value for _, value in reversed(fields))
+        elif isinstance(node, (list, tuple)):
+            result.append(len(node))
+            stack.extend(reversed(node))
+        else:
+            result.append(node)
+    return result
+
+
+class ParseFileTest(TestCase):
+
+    def setUp(self):
+        self.parser = Parser()
+        self.parser.build()
+        fd, self.path = tempfile.mkstemp(suffix=".c")
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write(self, data):
+        with open(self.path, "wb") as f:
+            f.write(data)
+
+    def test_same_tree(self):
+        """ファイルから解析した構文木が、文字列から解析した構文木と一致するかのテスト"""
+        data = samplegen.generate_program(5, 30, seed=1, syntax_only=True)
+        self.write(data)
+
+        expected = dump(self.parser.parse(data))
+        actual = dump(self.parser.parse_file(self.path))
+
+        nose.tools.eq_(expected, actual)
+
+    def test_lineno(self):
+        """ファイルから解析したときもコメントの改行で行番号が進むかのテスト"""
+        data = "int a;\n/* one\ntwo */\nint main() { a = 1; return a; }\n"
+        self.write(data)
+
+        nose.tools.eq_(dump(self.parser.parse(data)),
+                       dump(self.parser.parse_file(self.path)))
+
+    def test_end_of_input_lineno(self):
+        """関数の本体の途中で終わる入力の構文エラーが、最後のトークンの行で記録されるかのテスト"""
+        data = "void print(int v);\nint main() {\n  int a;\n  a = 1;\n  /* unterminated */\n  print(a);\n\n"
+        self.write(data)
+        expected = "Line 6: Syntax error at end of input."
+
+        for options in ({}, {"lexer_engine": "dfa"}, {"parser_engine": "rd"}, {"token_buffer": True}):
+            parser = Parser(diagnostics=diagnostics.Diagnostics(echo=False), **options)
+            parser.build()
+            parser.parse(data)
+            parser.parse_file(self.path)
+
+            nose.tools.eq_([expected, expected],
+                           [record.message for record in parser.diagnostics.records])
+
+    def test_lazy_value(self):
+        """値を参照するまでバッファから切り出さないトークンのテスト"""
+        scanner = dfa_lexer.DFAScanner(dfa_lexer.build_table())
+        scanner.input("x = 42;")
+        tokens = list(scanner.scan(lazy=True))
+
+        nose.tools.eq_(["ID", "ASSIGN", "NUMBER", "SEMICOLON"], [t.type for t in tokens])
+        nose.tools.eq_(None, tokens[2]._value)
+        nose.tools.eq_(42, tokens[2].value)
+        nose.tools.eq_(None, tokens[2].buffer)
+
+
+def loaded_modules(code):
+    """新しいプロセスでcodeを実行した後に読み込まれているモジュールの名前を返す"""
+    code += "\nimport sys\nprint(' '.join(m for m in sys.modules if sys.modules[m]))"
+    output = subprocess.check_output([sys.executable, "-c", code],
+                                     cwd=os.path.dirname(os.path.abspath(__file__)))
+    return set(output.split())
+
+
+class ImportTest(TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_parser_import(self):
+        """parserのimportで字句解析器や後段のモジュールを読み込まないかのテスト"""
+        modules = loaded_modules("import parser")
+
+        for name in ("ply.lex", "ply.yacc", "lexer", "dfa_lexer", "rdparser", "parsecache",
+                     "semantic_analyzer", "intermed_code", "assign_address", "codegen",
+                     "printcode", "restorecode", "parsertest", "arena"):
+            nose.tools.ok_(name not in modules, name)
+
+    def test_lexer_import(self):
+        """lexerのimportで字句解析器を構築しないかのテスト"""
+        # ply.lexのlexerはlex()で字句解析器を構築したときに作られる
+        modules = loaded_modules("import lexer, ply.lex\nassert not hasattr(ply.lex, 'lexer')")
+
+        nose.tools.ok_("lextab" not in modules)
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])
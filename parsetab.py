@@ -0,0 +1,123 @@
+
+# parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'ADDRESS AND ASSIGN COMMA DEC DIVIDE ELSE EQUAL FOR GEQ GT ID IF INC INT LBRACE LBRACKET LEQ LPAREN LT MINUS MINUS_EQ NEQ NUMBER OR PLUS PLUS_EQ RBRACE RBRACKET RETURN RPAREN SEMICOLON TIMES VOID WHILEprogram : external-declarationprogram : program external-declarationexternal-declaration : declaration\n                                | function-prototype\n                                | function-definitionexternal-declaration : error SEMICOLON\n                                | error compound-statementdeclaration : type-specifier declarator-list SEMICOLONdeclarator-list : declaratordeclarator-list : declarator-list COMMA declaratordeclarator : direct-declaratordeclarator : TIMES direct-declaratordirect-declarator : identifierdirect-declarator : identifier LBRACKET constant RBRACKETfunction-prototype : type-specifier function-declarator SEMICOLONfunction-declarator : identifier LPAREN parameter-type-list RPARENfunction-declarator : identifier LPAREN RPARENfunction-declarator : TIMES identifier LPAREN parameter-type-list RPARENfunction-declarator : TIMES identifier LPAREN RPARENfunction-definition : type-specifier function-declarator compound-statementparameter-type-list : parameter-declarationparameter-type-list : parameter-type-list COMMA parameter-declarationparameter-declaration : type-specifier parameter-declaratorparameter-declarator : identifierparameter-declarator : TIMES identifiertype-specifier : INT\n                          | VOIDstatement : SEMICOLONstatement : expression SEMICOLONstatement : compound-statementstatement : error SEMICOLONstatement : IF LPAREN expression RPAREN statementstatement : IF LPAREN expression RPAREN statement ELSE statementstatement : WHILE LPAREN expression RPAREN statementstatement : FOR LPAREN expression SEMICOLON expression SEMICOLON expression RPAREN statementstatement : FOR LPAREN SEMICOLON expression SEMICOLON expression RPAREN statementstatement : FOR LPAREN expression SEMICOLON SEMICOLON expression RPAREN statementstatement : FOR LPAREN expression SEMICOLON expression SEMICOLON RPAREN statementstatement : FOR LPAREN expression SEMICOLON SEMICOLON RPAREN statementstatement : FOR LPAREN SEMICOLON expression SEMICOLON RPAREN statementstatement : FOR LPAREN SEMICOLON SEMICOLON expression RPAREN statementstatement : FOR LPAREN SEMICOLON SEMICOLON RPAREN statementstatement : RETURN SEMICOLONstatement : RETURN expression SEMICOLONcompound-statement : LBRACE RBRACEcompound-statement : LBRACE declaration-list RBRACEcompound-statement : LBRACE statement-list RBRACEcompound-statement : LBRACE declaration-list statement-list RBRACEdeclaration-list : declarationdeclaration-list : declaration-list declarationstatement-list : statementstatement-list : statement-list statementexpression : assign-exprexpression : expression COMMA assign-exprassign-expr : logical-OR-exprassign-expr : logical-OR-expr ASSIGN assign-exprassign-expr : logical-OR-expr PLUS_EQ assign-exprassign-expr : logical-OR-expr MINUS_EQ assign-exprlogical-OR-expr : logical-AND-exprlogical-OR-expr : logical-OR-expr OR logical-AND-exprlogical-AND-expr : equality-exprlogical-AND-expr : logical-AND-expr AND equality-exprequality-expr : relational-exprequality-expr : equality-expr EQUAL relational-exprequality-expr : equality-expr NEQ relational-exprrelational-expr : add-exprrelational-expr : relational-expr LT add-exprrelational-expr : relational-expr GT add-exprrelational-expr : relational-expr LEQ add-exprrelational-expr : relational-expr GEQ add-expradd-expr : mult-expradd-expr : add-expr PLUS mult-expradd-expr : add-expr MINUS mult-exprmult-expr : unary-exprmult-expr : mult-expr TIMES unary-exprmult-expr : mult-expr DIVIDE unary-exprunary-expr : postfix-exprunary-expr : MINUS unary-exprunary-expr : ADDRESS unary-exprunary-expr : TIMES unary-exprunary-expr : identifier INCunary-expr : identifier DECpostfix-expr : primary-exprpostfix-expr : postfix-expr LBRACKET expression RBRACKETpostfix-expr : identifier LPAREN RPARENpostfix-expr : identifier LPAREN argument-expression-list RPARENprimary-expr : identifierprimary-expr : constantprimary-expr : LPAREN expression RPARENargument-expression-list : assign-exprargument-expression-list : argument-expression-list COMMA assign-expridentifier : IDconstant : NUMBER'
+    
+_lr_action_items = {'DIVIDE':([19,21,24,29,30,33,34,49,66,68,74,92,94,108,109,112,122,123,128,140,146,],[-92,-77,65,-88,-83,-74,-93,-87,-78,-79,-80,-82,-81,-75,-76,-89,65,65,-85,-84,-86,]),'RETURN':([11,26,28,31,37,40,45,46,53,61,84,85,86,87,88,89,96,106,126,141,145,151,152,157,159,160,161,163,166,167,168,169,170,171,172,174,175,176,177,178,179,],[22,-28,-51,-45,-49,-30,22,22,-8,-43,-46,-50,22,-52,-47,-31,-29,-44,-48,22,22,-34,22,-32,-42,22,22,22,22,-41,-40,22,-39,22,22,-33,-36,-37,-38,22,-35,]),'VOID':([0,1,4,5,6,7,10,11,12,13,31,37,45,53,54,55,59,84,85,88,99,126,136,],[3,-1,-3,-4,3,-5,-2,3,-6,-7,-45,-49,3,-8,-15,-20,3,-46,-50,-47,3,-48,3,]),'NUMBER':([11,22,25,26,28,31,35,36,37,39,40,45,46,53,58,60,61,63,64,65,67,70,71,72,73,75,76,77,78,79,80,81,82,83,84,85,86,87,88,89,93,95,96,97,106,110,126,141,142,144,145,147,151,152,154,155,157,159,160,161,163,165,166,167,168,169,170,171,172,174,175,176,177,178,179,],[34,34,34,-28,-51,-45,34,34,-49,34,-30,34,34,-8,34,34,-43,34,34,34,34,34,34,34,34,34,34,34,34,34,34,34,34,34,-46,-50,34,-52,-47,-31,34,34,-29,34,-44,34,-48,34,34,34,34,34,-34,34,34,34,-32,-42,34,34,34,34,34,-41,-40,34,-39,34,34,-33,-36,-37,-38,34,-35,]),'LBRACKET':([19,20,21,29,30,34,49,57,91,112,128,140,146,],[-92,58,60,-88,-83,-93,-87,58,58,-89,-85,-84,-86,]),'WHILE':([11,26,28,31,37,40,45,46,53,61,84,85,86,87,88,89,96,106,126,141,145,151,152,157,159,160,161,163,166,167,168,169,170,171,172,174,175,176,177,178,179,],[23,-28,-51,-45,-49,-30,23,23,-8,-43,-46,-50,23,-52,-47,-31,-29,-44,-48,23,23,-34,23,-32,-42,23,23,23,23,-41,-40,23,-39,23,23,-33,-36,-37,-38,23,-35,]),'MINUS_EQ':([19,21,24,29,30,33,34,38,42,43,44,49,51,66,68,74,92,94,108,109,112,114,118,119,120,121,122,123,124,125,128,131,140,146,],[-92,-77,-71,-88,-83,-74,-93,72,-63,-66,-61,-87,-59,-78,-79,-80,-82,-81,-75,-76,-89,-60,-70,-68,-69,-67,-72,-73,-65,-64,-85,-62,-84,-86,]),'DEC':([19,49,],[-92,92,]),'MINUS':([11,19,21,22,24,25,26,28,29,30,31,33,34,35,36,37,39,40,43,45,46,49,53,60,61,63,64,65,66,67,68,70,71,72,73,74,75,76,77,78,79,80,81,82,83,84,85,86,87,88,89,92,93,94,95,96,97,106,108,109,110,112,118,119,120,121,122,123,126,128,140,141,142,144,145,146,147,151,152,154,155,157,159,160,161,163,165,166,167,168,169,170,171,172,174,175,176,177,178,179,],[25,-92,-77,25,-71,25,-28,-51,-88,-83,-45,-74,-93,25,25,-49,25,-30,81,25,25,-87,-8,25,-43,25,25,25,-78,25,-79,25,25,25,25,-80,25,25,25,25,25,25,25,25,25,-46,-50,25,-52,-47,-31,-82,25,-81,25,-29,25,-44,-75,-76,25,-89,81,81,81,81,-72,-73,-48,-85,-84,25,25,25,25,-86,25,-34,25,25,25,-32,-42,25,25,25,25,25,-41,-40,25,-39,25,25,-33,-36,-37,-38,25,-35,]),'NEQ':([19,21,24,29,30,33,34,42,43,44,49,66,68,74,92,94,108,109,112,118,119,120,121,122,123,124,125,128,131,140,146,],[-92,-77,-71,-88,-83,-74,-93,-63,-66,82,-87,-78,-79,-80,-82,-81,-75,-76,-89,-70,-68,-69,-67,-72,-73,-65,-64,-85,82,-84,-86,]),'GEQ':([19,21,24,29,30,33,34,42,43,49,66,68,74,92,94,108,109,112,118,119,120,121,122,123,124,125,128,140,146,],[-92,-77,-71,-88,-83,-74,-93,76,-66,-87,-78,-79,-80,-82,-81,-75,-76,-89,-70,-68,-69,-67,-72,-73,76,76,-85,-84,-86,]),'RPAREN':([19,21,24,27,29,30,33,34,38,42,43,44,49,51,59,66,68,69,74,92,93,94,99,102,103,107,108,109,112,113,114,115,116,117,118,119,120,121,122,123,124,125,127,128,129,130,131,133,137,138,140,142,146,149,150,153,154,155,158,162,164,165,173,],[-92,-77,-71,-53,-88,-83,-74,-93,-55,-63,-66,-61,-87,-59,101,-78,-79,112,-80,-82,128,-81,132,135,-21,141,-75,-76,-89,-57,-60,-58,-56,145,-70,-68,-69,-67,-72,-73,-65,-64,146,-85,-90,-54,-62,148,-23,-24,-84,152,-86,-22,-25,160,161,163,-91,169,171,172,178,]),'SEMICOLON':([8,11,14,15,17,18,19,20,21,22,24,26,27,28,29,30,31,33,34,37,38,40,42,43,44,45,46,47,49,50,51,53,56,57,61,62,66,67,68,74,84,85,86,87,88,89,91,92,94,96,98,101,106,108,109,110,111,112,113,114,115,116,118,119,120,121,122,123,124,125,126,128,130,131,132,134,135,140,141,143,144,145,146,148,151,152,156,157,159,160,161,163,166,167,168,169,170,171,172,174,175,176,177,178,179,],[12,26,53,54,-11,-9,-92,-13,-77,61,-71,-28,-53,-51,-88,-83,-45,-74,-93,-49,-55,-30,-63,-66,-61,26,26,89,-87,96,-59,-8,-12,-13,-43,106,-78,110,-79,-80,-46,-50,26,-52,-47,-31,-13,-82,-81,-29,-10,-17,-44,-75,-76,142,144,-89,-57,-60,-58,-56,-70,-68,-69,-67,-72,-73,-65,-64,-48,-85,-54,-62,-19,-14,-16,-84,26,154,155,26,-86,-18,-34,26,165,-32,-42,26,26,26,26,-41,-40,26,-39,26,26,-33,-36,-37,-38,26,-35,]),'LT':([19,21,24,29,30,33,34,42,43,49,66,68,74,92,94,108,109,112,118,119,120,121,122,123,124,125,128,140,146,],[-92,-77,-71,-88,-83,-74,-93,79,-66,-87,-78,-79,-80,-82,-81,-75,-76,-89,-70,-68,-69,-67,-72,-73,79,79,-85,-84,-86,]),'COMMA':([14,17,18,19,20,21,24,27,29,30,33,34,38,42,43,44,49,50,51,56,57,62,66,68,69,74,91,92,94,98,102,103,105,107,108,109,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,127,128,129,130,131,133,134,137,138,140,143,146,149,150,153,156,158,162,164,173,],[52,-11,-9,-92,-13,-77,-71,-53,-88,-83,-74,-93,-55,-63,-66,-61,-87,95,-59,-12,-13,95,-78,-79,95,-80,-13,-82,-81,-10,136,-21,95,95,-75,-76,95,-89,-57,-60,-58,-56,95,-70,-68,-69,-67,-72,-73,-65,-64,147,-85,-90,-54,-62,136,-14,-23,-24,-84,95,-86,-22,-25,95,95,-91,95,95,95,]),'PLUS':([19,21,24,29,30,33,34,43,49,66,68,74,92,94,108,109,112,118,119,120,121,122,123,128,140,146,],[-92,-77,-71,-88,-83,-74,-93,80,-87,-78,-79,-80,-82,-81,-75,-76,-89,80,80,80,80,-72,-73,-85,-84,-86,]),'ASSIGN':([19,21,24,29,30,33,34,38,42,43,44,49,51,66,68,74,92,94,108,109,112,114,118,119,120,121,122,123,124,125,128,131,140,146,],[-92,-77,-71,-88,-83,-74,-93,73,-63,-66,-61,-87,-59,-78,-79,-80,-82,-81,-75,-76,-89,-60,-70,-68,-69,-67,-72,-73,-65,-64,-85,-62,-84,-86,]),'$end':([1,4,5,6,7,10,12,13,31,53,54,55,84,88,126,],[-1,-3,-4,0,-5,-2,-6,-7,-45,-8,-15,-20,-46,-47,-48,]),'GT':([19,21,24,29,30,33,34,42,43,49,66,68,74,92,94,108,109,112,118,119,120,121,122,123,124,125,128,140,146,],[-92,-77,-71,-88,-83,-74,-93,77,-66,-87,-78,-79,-80,-82,-81,-75,-76,-89,-70,-68,-69,-67,-72,-73,77,77,-85,-84,-86,]),'RBRACE':([11,26,28,31,37,40,45,46,53,61,84,85,86,87,88,89,96,106,126,151,157,159,167,168,170,174,175,176,177,179,],[31,-28,-51,-45,-49,-30,84,88,-8,-43,-46,-50,126,-52,-47,-31,-29,-44,-48,-34,-32,-42,-41,-40,-39,-33,-36,-37,-38,-35,]),'FOR':([11,26,28,31,37,40,45,46,53,61,84,85,86,87,88,89,96,106,126,141,145,151,152,157,159,160,161,163,166,167,168,169,170,171,172,174,175,176,177,178,179,],[32,-28,-51,-45,-49,-30,32,32,-8,-43,-46,-50,32,-52,-47,-31,-29,-44,-48,32,32,-34,32,-32,-42,32,32,32,32,-41,-40,32,-39,32,32,-33,-36,-37,-38,32,-35,]),'EQUAL':([19,21,24,29,30,33,34,42,43,44,49,66,68,74,92,94,108,109,112,118,119,120,121,122,123,124,125,128,131,140,146,],[-92,-77,-71,-88,-83,-74,-93,-63,-66,83,-87,-78,-79,-80,-82,-81,-75,-76,-89,-70,-68,-69,-67,-72,-73,-65,-64,-85,83,-84,-86,]),'error':([0,1,4,5,6,7,10,11,12,13,26,28,31,37,40,45,46,53,54,55,61,84,85,86,87,88,89,96,106,126,141,145,151,152,157,159,160,161,163,166,167,168,169,170,171,172,174,175,176,177,178,179,],[8,-1,-3,-4,8,-5,-2,47,-6,-7,-28,-51,-45,-49,-30,47,47,-8,-15,-20,-43,-46,-50,47,-52,-47,-31,-29,-44,-48,47,47,-34,47,-32,-42,47,47,47,47,-41,-40,47,-39,47,47,-33,-36,-37,-38,47,-35,]),'TIMES':([2,3,9,11,19,21,22,24,25,26,28,29,30,31,33,34,35,36,37,39,40,45,46,48,49,52,53,60,61,63,64,65,66,67,68,70,71,72,73,74,75,76,77,78,79,80,81,82,83,84,85,86,87,88,89,92,93,94,95,96,97,104,106,108,109,110,112,122,123,126,128,140,141,142,144,145,146,147,151,152,154,155,157,159,160,161,163,165,166,167,168,169,170,171,172,174,175,176,177,178,179,],[-26,-27,16,39,-92,-77,39,64,39,-28,-51,-88,-83,-45,-74,-93,39,39,-49,39,-30,39,39,90,-87,90,-8,39,-43,39,39,39,-78,39,-79,39,39,39,39,-80,39,39,39,39,39,39,39,39,39,-46,-50,39,-52,-47,-31,-82,39,-81,39,-29,39,139,-44,-75,-76,39,-89,64,64,-48,-85,-84,39,39,39,39,-86,39,-34,39,39,39,-32,-42,39,39,39,39,39,-41,-40,39,-39,39,39,-33,-36,-37,-38,39,-35,]),'LPAREN':([11,19,20,22,23,25,26,28,31,32,35,36,37,39,40,41,45,46,49,53,57,60,61,63,64,65,67,70,71,72,73,75,76,77,78,79,80,81,82,83,84,85,86,87,88,89,93,95,96,97,106,110,126,141,142,144,145,147,151,152,154,155,157,159,160,161,163,165,166,167,168,169,170,171,172,174,175,176,177,178,179,],[36,-92,59,36,63,36,-28,-51,-45,67,36,36,-49,36,-30,75,36,36,93,-8,99,36,-43,36,36,36,36,36,36,36,36,36,36,36,36,36,36,36,36,36,-46,-50,36,-52,-47,-31,36,36,-29,36,-44,36,-48,36,36,36,36,36,-34,36,36,36,-32,-42,36,36,36,36,36,-41,-40,36,-39,36,36,-33,-36,-37,-38,36,-35,]),'ELSE':([26,31,40,61,84,88,89,96,106,126,151,157,159,167,168,170,174,175,176,177,179,],[-28,-45,-30,-43,-46,-47,-31,-29,-44,-48,-34,166,-42,-41,-40,-39,-33,-36,-37,-38,-35,]),'ID':([2,3,9,11,16,22,25,26,28,31,35,36,37,39,40,45,46,48,52,53,60,61,63,64,65,67,70,71,72,73,75,76,77,78,79,80,81,82,83,84,85,86,87,88,89,90,93,95,96,97,104,106,110,126,139,141,142,144,145,147,151,152,154,155,157,159,160,161,163,165,166,167,168,169,170,171,172,174,175,176,177,178,179,],[-26,-27,19,19,19,19,19,-28,-51,-45,19,19,-49,19,-30,19,19,19,19,-8,19,-43,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,-46,-50,19,-52,-47,-31,19,19,19,-29,19,19,-44,19,-48,19,19,19,19,19,19,-34,19,19,19,-32,-42,19,19,19,19,19,-41,-40,19,-39,19,19,-33,-36,-37,-38,19,-35,]),'IF':([11,26,28,31,37,40,45,46,53,61,84,85,86,87,88,89,96,106,126,141,145,151,152,157,159,160,161,163,166,167,168,169,170,171,172,174,175,176,177,178,179,],[41,-28,-51,-45,-49,-30,41,41,-8,-43,-46,-50,41,-52,-47,-31,-29,-44,-48,41,41,-34,41,-32,-42,41,41,41,41,-41,-40,41,-39,41,41,-33,-36,-37,-38,41,-35,]),'AND':([19,21,24,29,30,33,34,42,43,44,49,51,66,68,74,92,94,108,109,112,114,118,119,120,121,122,123,124,125,128,131,140,146,],[-92,-77,-71,-88,-83,-74,-93,-63,-66,-61,-87,97,-78,-79,-80,-82,-81,-75,-76,-89,97,-70,-68,-69,-67,-72,-73,-65,-64,-85,-62,-84,-86,]),'LBRACE':([8,11,15,26,28,31,37,40,45,46,53,61,84,85,86,87,88,89,96,101,106,126,132,135,141,145,148,151,152,157,159,160,161,163,166,167,168,169,170,171,172,174,175,176,177,178,179,],[11,11,11,-28,-51,-45,-49,-30,11,11,-8,-43,-46,-50,11,-52,-47,-31,-29,-17,-44,-48,-19,-16,11,11,-18,-34,11,-32,-42,11,11,11,11,-41,-40,11,-39,11,11,-33,-36,-37,-38,11,-35,]),'INT':([0,1,4,5,6,7,10,11,12,13,31,37,45,53,54,55,59,84,85,88,99,126,136,],[2,-1,-3,-4,2,-5,-2,2,-6,-7,-45,-49,2,-8,-15,-20,2,-46,-50,-47,2,-48,2,]),'PLUS_EQ':([19,21,24,29,30,33,34,38,42,43,44,49,51,66,68,74,92,94,108,109,112,114,118,119,120,121,122,123,124,125,128,131,140,146,],[-92,-77,-71,-88,-83,-74,-93,70,-63,-66,-61,-87,-59,-78,-79,-80,-82,-81,-75,-76,-89,-60,-70,-68,-69,-67,-72,-73,-65,-64,-85,-62,-84,-86,]),'LEQ':([19,21,24,29,30,33,34,42,43,49,66,68,74,92,94,108,109,112,118,119,120,121,122,123,124,125,128,140,146,],[-92,-77,-71,-88,-83,-74,-93,78,-66,-87,-78,-79,-80,-82,-81,-75,-76,-89,-70,-68,-69,-67,-72,-73,78,78,-85,-84,-86,]),'ADDRESS':([11,22,25,26,28,31,35,36,37,39,40,45,46,53,60,61,63,64,65,67,70,71,72,73,75,76,77,78,79,80,81,82,83,84,85,86,87,88,89,93,95,96,97,106,110,126,141,142,144,145,147,151,152,154,155,157,159,160,161,163,165,166,167,168,169,170,171,172,174,175,176,177,178,179,],[35,35,35,-28,-51,-45,35,35,-49,35,-30,35,35,-8,35,-43,35,35,35,35,35,35,35,35,35,35,35,35,35,35,35,35,35,-46,-50,35,-52,-47,-31,35,35,-29,35,-44,35,-48,35,35,35,35,35,-34,35,35,35,-32,-42,35,35,35,35,35,-41,-40,35,-39,35,35,-33,-36,-37,-38,35,-35,]),'RBRACKET':([19,21,24,27,29,30,33,34,38,42,43,44,49,51,66,68,74,92,94,100,105,108,109,112,113,114,115,116,118,119,120,121,122,123,124,125,128,130,131,140,146,],[-92,-77,-71,-53,-88,-83,-74,-93,-55,-63,-66,-61,-87,-59,-78,-79,-80,-82,-81,134,140,-75,-76,-89,-57,-60,-58,-56,-70,-68,-69,-67,-72,-73,-65,-64,-85,-54,-62,-84,-86,]),'OR':([19,21,24,29,30,33,34,38,42,43,44,49,51,66,68,74,92,94,108,109,112,114,118,119,120,121,122,123,124,125,128,131,140,146,],[-92,-77,-71,-88,-83,-74,-93,71,-63,-66,-61,-87,-59,-78,-79,-80,-82,-81,-75,-76,-89,-60,-70,-68,-69,-67,-72,-73,-65,-64,-85,-62,-84,-86,]),'INC':([19,49,],[-92,94,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'postfix-expr':([11,22,25,35,36,39,45,46,60,63,64,65,67,70,71,72,73,75,76,77,78,79,80,81,82,83,86,93,95,97,110,141,142,144,145,147,152,154,155,160,161,163,165,166,169,171,172,178,],[21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,]),'constant':([11,22,25,35,36,39,45,46,58,60,63,64,65,67,70,71,72,73,75,76,77,78,79,80,81,82,83,86,93,95,97,110,141,142,144,145,147,152,154,155,160,161,163,165,166,169,171,172,178,],[29,29,29,29,29,29,29,29,100,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,]),'argument-expression-list':([93,],[127,]),'function-prototype':([0,6,],[5,5,]),'mult-expr':([11,22,36,45,46,60,63,67,70,71,72,73,75,76,77,78,79,80,81,82,83,86,93,95,97,110,141,142,144,145,147,152,154,155,160,161,163,165,166,169,171,172,178,],[24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,122,123,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,24,]),'declarator-list':([9,48,],[14,14,]),'function-declarator':([9,],[15,]),'logical-OR-expr':([11,22,36,45,46,60,63,67,70,72,73,75,86,93,95,110,141,142,144,145,147,152,154,155,160,161,163,165,166,169,171,172,178,],[38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,]),'relational-expr':([11,22,36,45,46,60,63,67,70,71,72,73,75,82,83,86,93,95,97,110,141,142,144,145,147,152,154,155,160,161,163,165,166,169,171,172,178,],[42,42,42,42,42,42,42,42,42,42,42,42,42,124,125,42,42,42,42,42,42,42,42,42,42,42,42,42,42,42,42,42,42,42,42,42,42,]),'assign-expr':([11,22,36,45,46,60,63,67,70,72,73,75,86,93,95,110,141,142,144,145,147,152,154,155,160,161,163,165,166,169,171,172,178,],[27,27,27,27,27,27,27,27,113,115,116,27,27,129,130,27,27,27,27,27,158,27,27,27,27,27,27,27,27,27,27,27,27,]),'parameter-type-list':([59,99,],[102,133,]),'direct-declarator':([9,16,48,52,90,],[17,56,17,17,56,]),'program':([0,],[6,]),'statement':([11,45,46,86,141,145,152,160,161,163,166,169,171,172,178,],[28,28,87,87,151,157,159,167,168,170,174,175,176,177,179,]),'equality-expr':([11,22,36,45,46,60,63,67,70,71,72,73,75,86,93,95,97,110,141,142,144,145,147,152,154,155,160,161,163,165,166,169,171,172,178,],[44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,131,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,]),'primary-expr':([11,22,25,35,36,39,45,46,60,63,64,65,67,70,71,72,73,75,76,77,78,79,80,81,82,83,86,93,95,97,110,141,142,144,145,147,152,154,155,160,161,163,165,166,169,171,172,178,],[30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,]),'unary-expr':([11,22,25,35,36,39,45,46,60,63,64,65,67,70,71,72,73,75,76,77,78,79,80,81,82,83,86,93,95,97,110,141,142,144,145,147,152,154,155,160,161,163,165,166,169,171,172,178,],[33,33,66,68,33,74,33,33,33,33,108,109,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,]),'parameter-declarator':([104,],[137,]),'declaration':([0,6,11,45,],[4,4,37,85,]),'compound-statement':([8,11,15,45,46,86,141,145,152,160,161,163,166,169,171,172,178,],[13,40,55,40,40,40,40,40,40,40,40,40,40,40,40,40,40,]),'external-declaration':([0,6,],[1,10,]),'add-expr':([11,22,36,45,46,60,63,67,70,71,72,73,75,76,77,78,79,82,83,86,93,95,97,110,141,142,144,145,147,152,154,155,160,161,163,165,166,169,171,172,178,],[43,43,43,43,43,43,43,43,43,43,43,43,43,118,119,120,121,43,43,43,43,43,43,43,43,43,43,43,43,43,43,43,43,43,43,43,43,43,43,43,43,]),'parameter-declaration':([59,99,136,],[103,103,149,]),'declaration-list':([11,],[45,]),'function-definition':([0,6,],[7,7,]),'statement-list':([11,45,],[46,86,]),'declarator':([9,48,52,],[18,18,98,]),'type-specifier':([0,6,11,45,59,99,136,],[9,9,48,48,104,104,104,]),'identifier':([9,11,16,22,25,35,36,39,45,46,48,52,60,63,64,65,67,70,71,72,73,75,76,77,78,79,80,81,82,83,86,90,93,95,97,104,110,139,141,142,144,145,147,152,154,155,160,161,163,165,166,169,171,172,178,],[20,49,57,49,49,49,49,49,49,49,91,91,49,49,49,49,49,49,49,49,49,49,49,49,49,49,49,49,49,49,49,91,49,49,49,138,49,150,49,49,49,49,49,49,49,49,49,49,49,49,49,49,49,49,49,]),'expression':([11,22,36,45,46,60,63,67,75,86,110,141,142,144,145,152,154,155,160,161,163,165,166,169,171,172,178,],[50,62,69,50,50,105,107,111,117,50,143,50,153,156,50,50,162,164,50,50,50,173,50,50,50,50,50,]),'logical-AND-expr':([11,22,36,45,46,60,63,67,70,71,72,73,75,86,93,95,110,141,142,144,145,147,152,154,155,160,161,163,165,166,169,171,172,178,],[51,51,51,51,51,51,51,51,51,114,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> program","S'",1,None,None,None),
+  ('program -> external-declaration','program',1,'p_program_ex','parser.py',48),
+  ('program -> program external-declaration','program',2,'p_program_prog','parser.py',52),
+  ('external-declaration -> declaration','external-declaration',1,'p_external_declaration','parser.py',59),
+  ('external-declaration -> function-prototype','external-declaration',1,'p_external_declaration','parser.py',60),
+  ('external-declaration -> function-definition','external-declaration',1,'p_external_declaration','parser.py',61),
+  ('external-declaration -> error SEMICOLON','external-declaration',2,'p_external_declaration_error','parser.py',65),
+  ('external-declaration -> error compound-statement','external-declaration',2,'p_external_declaration_error','parser.py',66),
+  ('declaration -> type-specifier declarator-list SEMICOLON','declaration',3,'p_declaration','parser.py',71),
+  ('declarator-list -> declarator','declarator-list',1,'p_declarator_list','parser.py',77),
+  ('declarator-list -> declarator-list COMMA declarator','declarator-list',3,'p_declarator_list_list','parser.py',81),
+  ('declarator -> direct-declarator','declarator',1,'p_declarator','parser.py',86),
+  ('declarator -> TIMES direct-declarator','declarator',2,'p_declarator_val','parser.py',90),
+  ('direct-declarator -> identifier','direct-declarator',1,'p_direct_declarator','parser.py',94),
+  ('direct-declarator -> identifier LBRACKET constant RBRACKET','direct-declarator',4,'p_direct_declarator_array','parser.py',98),
+  ('function-prototype -> type-specifier function-declarator SEMICOLON','function-prototype',3,'p_function_prototype','parser.py',104),
+  ('function-declarator -> identifier LPAREN parameter-type-list RPAREN','function-declarator',4,'p_function_declarator','parser.py',108),
+  ('function-declarator -> identifier LPAREN RPAREN','function-declarator',3,'p_function_declarator_noparam','parser.py',112),
+  ('function-declarator -> TIMES identifier LPAREN parameter-type-list RPAREN','function-declarator',5,'p_function_declarator_pointer','parser.py',116),
+  ('function-declarator -> TIMES identifier LPAREN RPAREN','function-declarator',4,'p_function_declarator_pointer_noparam','parser.py',120),
+  ('function-definition -> type-specifier function-declarator compound-statement','function-definition',3,'p_fuction_definition','parser.py',124),
+  ('parameter-type-list -> parameter-declaration','parameter-type-list',1,'p_parameter_type_list_declaration','parser.py',130),
+  ('parameter-type-list -> parameter-type-list COMMA parameter-declaration','parameter-type-list',3,'p_parameter_type_list_list','parser.py',134),
+  ('parameter-declaration -> type-specifier parameter-declarator','parameter-declaration',2,'p_parameter_declaration','parser.py',139),
+  ('parameter-declarator -> identifier','parameter-declarator',1,'p_parameter_declarator','parser.py',143),
+  ('parameter-declarator -> TIMES identifier','parameter-declarator',2,'p_paramenter_declarator_pointer','parser.py',147),
+  ('type-specifier -> INT','type-specifier',1,'p_type_specifier','parser.py',153),
+  ('type-specifier -> VOID','type-specifier',1,'p_type_specifier','parser.py',154),
+  ('statement -> SEMICOLON','statement',1,'p_statement_semicolon','parser.py',160),
+  ('statement -> expression SEMICOLON','statement',2,'p_statement_expression','parser.py',164),
+  ('statement -> compound-statement','statement',1,'p_statement_compound_statement','parser.py',168),
+  ('statement -> error SEMICOLON','statement',2,'p_statement_error','parser.py',172),
+  ('statement -> IF LPAREN expression RPAREN statement','statement',5,'p_statement_if','parser.py',179),
+  ('statement -> IF LPAREN expression RPAREN statement ELSE statement','statement',7,'p_statement_if_else','parser.py',183),
+  ('statement -> WHILE LPAREN expression RPAREN statement','statement',5,'p_statement_while','parser.py',188),
+  ('statement -> FOR LPAREN expression SEMICOLON expression SEMICOLON expression RPAREN statement','statement',9,'p_statement_for','parser.py',193),
+  ('statement -> FOR LPAREN SEMICOLON expression SEMICOLON expression RPAREN statement','statement',8,'p_statement_for_noinit','parser.py',198),
+  ('statement -> FOR LPAREN expression SEMICOLON SEMICOLON expression RPAREN statement','statement',8,'p_statement_for_noend','parser.py',203),
+  ('statement -> FOR LPAREN expression SEMICOLON expression SEMICOLON RPAREN statement','statement',8,'p_statement_for_novar','parser.py',208),
+  ('statement -> FOR LPAREN expression SEMICOLON SEMICOLON RPAREN statement','statement',7,'p_statement_for_onlyinit','parser.py',212),
+  ('statement -> FOR LPAREN SEMICOLON expression SEMICOLON RPAREN statement','statement',7,'p_statement_for_onlyend','parser.py',216),
+  ('statement -> FOR LPAREN SEMICOLON SEMICOLON expression RPAREN statement','statement',7,'p_statement_for_onlyvar','parser.py',220),
+  ('statement -> FOR LPAREN SEMICOLON SEMICOLON RPAREN statement','statement',6,'p_statement_for_noexp','parser.py',225),
+  ('statement -> RETURN SEMICOLON','statement',2,'p_statement_return_void','parser.py',231),
+  ('statement -> RETURN expression SEMICOLON','statement',3,'p_statement_return','parser.py',235),
+  ('compound-statement -> LBRACE RBRACE','compound-statement',2,'p_compound_statement_empty','parser.py',241),
+  ('compound-statement -> LBRACE declaration-list RBRACE','compound-statement',3,'p_compound_statement_declaration','parser.py',245),
+  ('compound-statement -> LBRACE statement-list RBRACE','compound-statement',3,'p_compound_statement_statement','parser.py',250),
+  ('compound-statement -> LBRACE declaration-list statement-list RBRACE','compound-statement',4,'p_compound_statement_declaration_statement','parser.py',255),
+  ('declaration-list -> declaration','declaration-list',1,'p_declaration_list','parser.py',262),
+  ('declaration-list -> declaration-list declaration','declaration-list',2,'p_declaration_list_declaration_list','parser.py',266),
+  ('statement-list -> statement','statement-list',1,'p_statement_list','parser.py',273),
+  ('statement-list -> statement-list statement','statement-list',2,'p_statement_list_statement_list','parser.py',281),
+  ('expression -> assign-expr','expression',1,'p_expression_assign_expr','parser.py',288),
+  ('expression -> expression COMMA assign-expr','expression',3,'p_expression_expression','parser.py',292),
+  ('assign-expr -> logical-OR-expr','assign-expr',1,'p_assign_expr_or','parser.py',298),
+  ('assign-expr -> logical-OR-expr ASSIGN assign-expr','assign-expr',3,'p_assign_expr_assign','parser.py',302),
+  ('assign-expr -> logical-OR-expr PLUS_EQ assign-expr','assign-expr',3,'p_plus_equal','parser.py',306),
+  ('assign-expr -> logical-OR-expr MINUS_EQ assign-expr','assign-expr',3,'p_minus_equal','parser.py',310),
+  ('logical-OR-expr -> logical-AND-expr','logical-OR-expr',1,'p_logical_OR_expr_and','parser.py',316),
+  ('logical-OR-expr -> logical-OR-expr OR logical-AND-expr','logical-OR-expr',3,'p_logical_OR_expr_or','parser.py',320),
+  ('logical-AND-expr -> equality-expr','logical-AND-expr',1,'p_logical_AND_expr_equal','parser.py',324),
+  ('logical-AND-expr -> logical-AND-expr AND equality-expr','logical-AND-expr',3,'p_logical_AND_expr_and','parser.py',328),
+  ('equality-expr -> relational-expr','equality-expr',1,'p_equality_expr_rel','parser.py',334),
+  ('equality-expr -> equality-expr EQUAL relational-expr','equality-expr',3,'p_equality_expr_eq','parser.py',338),
+  ('equality-expr -> equality-expr NEQ relational-expr','equality-expr',3,'p_equality_expr_neq','parser.py',342),
+  ('relational-expr -> add-expr','relational-expr',1,'p_relational_expr_add','parser.py',346),
+  ('relational-expr -> relational-expr LT add-expr','relational-expr',3,'p_relational_expr_lt','parser.py',350),
+  ('relational-expr -> relational-expr GT add-expr','relational-expr',3,'p_relational_expr_gt','parser.py',354),
+  ('relational-expr -> relational-expr LEQ add-expr','relational-expr',3,'p_relational_expr_leq','parser.py',358),
+  ('relational-expr -> relational-expr GEQ add-expr','relational-expr',3,'p_relational_expr_geq','parser.py',362),
+  ('add-expr -> mult-expr','add-expr',1,'p_add_expr_mult','parser.py',368),
+  ('add-expr -> add-expr PLUS mult-expr','add-expr',3,'p_add_expr_plus','parser.py',372),
+  ('add-expr -> add-expr MINUS mult-expr','add-expr',3,'p_add_expr_minus','parser.py',376),
+  ('mult-expr -> unary-expr','mult-expr',1,'p_mult_expr_unary','parser.py',380),
+  ('mult-expr -> mult-expr TIMES unary-expr','mult-expr',3,'p_mult_expr_times','parser.py',384),
+  ('mult-expr -> mult-expr DIVIDE unary-expr','mult-expr',3,'p_mult_expr_divide','parser.py',388),
+  ('unary-expr -> postfix-expr','unary-expr',1,'p_unary_expr_post','parser.py',394),
+  ('unary-expr -> MINUS unary-expr','unary-expr',2,'p_unary_expr_minus','parser.py',398),
+  ('unary-expr -> ADDRESS unary-expr','unary-expr',2,'p_unary_expr_addr','parser.py',403),
+  ('unary-expr -> TIMES unary-expr','unary-expr',2,'p_unary_expr_val','parser.py',410),
+  ('unary-expr -> identifier INC','unary-expr',2,'p_unary_expr_inc','parser.py',414),
+  ('unary-expr -> identifier DEC','unary-expr',2,'p_unary_expr_dec','parser.py',419),
+  ('postfix-expr -> primary-expr','postfix-expr',1,'p_postfix_expr_primary','parser.py',426),
+  ('postfix-expr -> postfix-expr LBRACKET expression RBRACKET','postfix-expr',4,'p_postfix_expr_array','parser.py',430),
+  ('postfix-expr -> identifier LPAREN RPAREN','postfix-expr',3,'p_postfix_expr_nullarg','parser.py',435),
+  ('postfix-expr -> identifier LPAREN argument-expression-list RPAREN','postfix-expr',4,'p_postfix_expr_arg','parser.py',439),
+  ('primary-expr -> identifier','primary-expr',1,'p_primary_expr_id','parser.py',445),
+  ('primary-expr -> constant','primary-expr',1,'p_primary_expr_const','parser.py',449),
+  ('primary-expr -> LPAREN expression RPAREN','primary-expr',3,'p_primary_expr_expr','parser.py',453),
+  ('argument-expression-list -> assign-expr','argument-expression-list',1,'p_argument_expression_list_assign','parser.py',459),
+  ('argument-expression-list -> argument-expression-list COMMA assign-expr','argument-expression-list',3,'p_argument_expression_list_list','parser.py',463),
+  ('identifier -> ID','identifier',1,'p_identifier','parser.py',470),
+  ('constant -> NUMBER','constant',1,'p_constant','parser.py',476),
+]
@@ -43,7 +43,6 @@ class PrintCode(object):
     def code_to_string(self):
         """アセンブリコードを表すクラスインスタンスのリストを受け取り、
            それらを文字列に変換したものを返す関数"""
-        for struct in self.code:
-            self.strcode += self.struct_to_string(struct)
+        self.strcode += "".join([self.struct_to_string(struct) for struct in self.code])
 
         return self.strcode
\ No newline at end of file
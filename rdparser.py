@@ -0,0 +1,457 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""再帰下降法で構文解析を行うモジュール
+
+   parser.Parserの文法と同じ言語を受理し、同じastのノードを組み立てる。
+   式は優先順位法(precedence climbing)で解析するので、add-expr : mult-expr の
+   ような1つの規則だけの還元は起こらない。
+   parse()の引数はPLYのyacc.LRParser.parse()と同じにしてあるので、
+   Parser.parserを置き換えるだけで使える。
+   構文エラーのときはerrorを呼んでから、Parserの error SEMICOLON などの
+   規則と同じように次の ; (トップレベルでは { } のブロック)までを読み飛ばし、
+   その宣言や文をNullNodeにして解析を続ける。
+   文の入れ子は明示的なスタックで解析するので、深く入れ子になった複文やif文でも
+   Pythonのスタックは深くならない(括弧や単項演算子の入れ子の式は再帰で解析する)。"""
+
+import ast
+
+# 二項演算子の優先順位(大きいほど強く結合する)。すべて左結合
+BINARY_PRECEDENCE = {
+    "OR": 1,
+    "AND": 2,
+    "EQUAL": 3, "NEQ": 3,
+    "LT": 4, "GT": 4, "LEQ": 4, "GEQ": 4,
+    "PLUS": 5, "MINUS": 5,
+    "TIMES": 6, "DIVIDE": 6,
+}
+
+# 代入演算子と、複合代入のときに右辺を組み立てる演算子
+ASSIGN_OPERATORS = {
+    "ASSIGN": None,
+    "PLUS_EQ": "PLUS",
+    "MINUS_EQ": "MINUS",
+}
+
+TYPE_SPECIFIERS = ("INT", "VOID")
+
+# 先読みをまだしていないことを表す値(Noneは入力の終わりを表す)
+NOT_PEEKED = object()
+
+# 子の文を待っている文の種類(RecursiveDescentParser.statements()のスタックに積む)
+COMPOUND, IF, ELSE, WHILE, FOR = range(5)
+
+
+class ParseAbort(Exception):
+
+    """エラー処理関数が例外を送出せずに戻ったときに、解析を打ち切るための例外"""
+    pass
+
+
+class RecursiveDescentParser(object):
+
+    """SmallCの再帰下降構文解析器
+       errorは構文エラーのときに問題のトークン(入力の終わりではNone)を渡して
+       呼び出す関数で、Parser.p_errorと同じものを想定している"""
+
+    def __init__(self, error=None):
+        self.error = error
+
+    def parse(self, input=None, lexer=None, debug=False, tracking=False, tokenfunc=None):
+        if input is not None:
+            lexer.input(input)
+        self.get_token = tokenfunc if tokenfunc is not None else lexer.token
+        self.peeked = NOT_PEEKED
+        self.tok = self.get_token()
+        self.type = self.tok.type if self.tok is not None else None
+        try:
+            return self.program()
+        except ParseAbort:
+            return None
+
+    # トークンの操作
+    def advance(self):
+        """現在のトークンを返し、次のトークンに進む"""
+        tok = self.tok
+        if self.peeked is NOT_PEEKED:
+            self.tok = self.get_token()
+        else:
+            self.tok = self.peeked
+            self.peeked = NOT_PEEKED
+        self.type = self.tok.type if self.tok is not None else None
+        return tok
+
+    def peek_type(self):
+        """現在のトークンの次のトークンの種類を返す"""
+        if self.peeked is NOT_PEEKED:
+            self.peeked = self.get_token()
+        return self.peeked.type if self.peeked is not None else None
+
+    def expect(self, toktype):
+        if self.type != toktype:
+            self.fail()
+        return self.advance()
+
+    def fail(self):
+        if self.error is not None:
+            self.error(self.tok)
+        raise ParseAbort()
+
+    def recover(self, parse, block=False):
+        """parse()を呼んで返す。構文エラーのときはskip()で読み飛ばしてNullNodeを返す"""
+        try:
+            return parse()
+        except ParseAbort:
+            if self.error is None:
+                raise
+        return self.skip(block)
+
+    def skip(self, block):
+        """次の ; まで(blockが真なら先に現れた { } のブロックの終わりまで)を読み飛ばして
+           NullNodeを返す。入力の終わりまで回復できなければ解析を打ち切る"""
+        depth = 0
+        while self.type is not None:
+            toktype = self.advance().type
+            if toktype == "LBRACE" and block:
+                depth += 1
+            elif toktype == "RBRACE" and depth > 0:
+                depth -= 1
+                if depth == 0:
+                    return ast.NullNode()
+            elif toktype == "SEMICOLON" and depth == 0:
+                return ast.NullNode()
+        raise ParseAbort()
+
+    # program
+    def program(self):
+        program = ast.ExternalDeclarationList(self.recover(self.external_declaration, True))
+        while self.tok is not None:
+            program.append(self.recover(self.external_declaration, True))
+        return program
+
+    # declaration, function-prototype, function-definition
+    def external_declaration(self):
+        type_specifier = self.type_specifier()
+        kind = "NORMAL"
+        if self.type == "TIMES":
+            self.advance()
+            kind = "POINTER"
+        identifier = self.identifier()
+
+        if self.type == "LPAREN":
+            function_declarator = ast.FunctionDeclarator(kind, identifier,
+                                                         self.parameters())
+            if self.type == "SEMICOLON":
+                self.advance()
+                return ast.FunctionPrototype(type_specifier, function_declarator)
+            return ast.FunctionDefinition(type_specifier, function_declarator,
+                                          self.compound_statement())
+
+        declarator = ast.Declarator(kind, self.direct_declarator(identifier))
+        return self.declaration_rest(type_specifier, declarator)
+
+    def declaration(self):
+        type_specifier = self.type_specifier()
+        return self.declaration_rest(type_specifier, self.declarator())
+
+    def declaration_rest(self, type_specifier, declarator):
+        """最初の宣言子の後ろから宣言の終わりまでを解析する"""
+        declarator_list = ast.DeclaratorList(declarator)
+        while self.type == "COMMA":
+            self.advance()
+            declarator_list.append(self.declarator())
+        self.expect("SEMICOLON")
+        return ast.Declaration(type_specifier, declarator_list)
+
+    def declarator(self):
+        if self.type == "TIMES":
+            self.advance()
+            return ast.Declarator("POINTER", self.direct_declarator(self.identifier()))
+        return ast.Declarator("NORMAL", self.direct_declarator(self.identifier()))
+
+    def direct_declarator(self, identifier):
+        if self.type == "LBRACKET":
+            self.advance()
+            constant = ast.Number(self.expect("NUMBER").value)
+            self.expect("RBRACKET")
+            return ast.DirectArrayDeclarator(identifier, constant)
+        return ast.DirectDeclarator(identifier)
+
+    def type_specifier(self):
+        if self.type not in TYPE_SPECIFIERS:
+            self.fail()
+        return ast.TypeSpecifier(self.advance().value)
+
+    # parameter
+    def parameters(self):
+        """( parameter-type-list ) または ( ) を解析する"""
+        self.expect("LPAREN")
+        if self.type == "RPAREN":
+            self.advance()
+            return ast.NullNode()
+        parameter_type_list = ast.ParameterTypeList(self.parameter_declaration())
+        while self.type == "COMMA":
+            self.advance()
+            parameter_type_list.append(self.parameter_declaration())
+        self.expect("RPAREN")
+        return parameter_type_list
+
+    def parameter_declaration(self):
+        type_specifier = self.type_specifier()
+        kind = "NORMAL"
+        if self.type == "TIMES":
+            self.advance()
+            kind = "POINTER"
+        return ast.ParameterDeclaration(type_specifier,
+                                        ast.ParameterDeclarator(kind, self.identifier()))
+
+    # statement
+    # 文の入れ子(複文、if文、while文、for文)はPythonの再帰ではなく明示的な
+    # スタックで解析するので、深く入れ子になったプログラムでもPythonのスタックの
+    # 深さは一定になる。スタックには、子の文を待っている文の途中の状態を積む
+    def compound_statement(self):
+        return self.statements(self.begin_compound)
+
+    def statement(self):
+        return self.statements(self.begin_statement)
+
+    def statements(self, begin):
+        """begin()で始まる文を1つ解析して返す
+
+           begin()とbegin_statement()は、文が完成すればそれを返し、子の文を待つときは
+           状態をstackに積んでNoneを返す。完成した文はcomplete()で親に渡していく。
+           構文エラーのときは、再帰で解析したときと同じく、エラーの起きた文を含む
+           一番内側の複文の中でその文をNullNodeにして解析を続ける"""
+        stack = []
+        parse = begin
+        while True:
+            try:
+                node = parse(stack)
+            except ParseAbort:
+                node = self.recover_statement(stack)
+            while node is not None:
+                if not stack:
+                    return node
+                node = self.complete(stack, node)
+            parse = self.begin_statement
+
+    def recover_statement(self, stack):
+        """構文エラーの起きた文を含む一番内側の複文まで戻り、次の ; までを読み飛ばして
+           NullNodeを返す。スタックに複文がなければ呼び出し元のrecover()に任せる"""
+        for i in range(len(stack) - 1, -1, -1):
+            if stack[i][0] == COMPOUND:
+                break
+        else:
+            raise ParseAbort()
+        del stack[i + 1:]
+        if self.error is None:
+            raise ParseAbort()
+        return self.skip(False)
+
+    def begin_compound(self, stack):
+        self.expect("LBRACE")
+
+        declaration_list = ast.DeclarationList(ast.NullNode())
+        if self.type in TYPE_SPECIFIERS:
+            declaration_list = ast.DeclarationList(self.recover(self.declaration))
+            while self.type in TYPE_SPECIFIERS:
+                declaration_list.append(self.recover(self.declaration))
+
+        if self.type == "RBRACE":
+            self.advance()
+            return ast.CompoundStatement(declaration_list, ast.StatementList(ast.NullNode()))
+        stack.append([COMPOUND, declaration_list, None])
+        return None
+
+    def begin_statement(self, stack):
+        toktype = self.type
+        if toktype == "SEMICOLON":
+            self.advance()
+            return ast.NullNode()
+        elif toktype == "LBRACE":
+            return self.begin_compound(stack)
+        elif toktype == "IF":
+            lineno = self.advance().lineno
+            stack.append([IF, lineno, self.condition()])
+            return None
+        elif toktype == "WHILE":
+            lineno = self.advance().lineno
+            stack.append([WHILE, lineno, self.condition()])
+            return None
+        elif toktype == "FOR":
+            return self.begin_for(stack)
+        elif toktype == "RETURN":
+            self.advance()
+            if self.type == "SEMICOLON":
+                self.advance()
+                return ast.ReturnStatement(ast.NullNode())
+            expression = self.expression()
+            self.expect("SEMICOLON")
+            return ast.ReturnStatement(expression)
+
+        expression = self.expression()
+        self.expect("SEMICOLON")
+        return ast.ExpressionStatement(expression)
+
+    def complete(self, stack, node):
+        """スタックの一番上の文に子の文nodeを渡す。その文が完成すれば返し、
+           まだ子の文を待つときはNoneを返す"""
+        frame = stack[-1]
+        kind = frame[0]
+        if kind == COMPOUND:
+            if frame[2] is None:
+                frame[2] = ast.StatementList(node)
+            else:
+                frame[2].append(node)
+            if self.type != "RBRACE":
+                return None
+            self.advance()
+            stack.pop()
+            return ast.CompoundStatement(frame[1], frame[2])
+        elif kind == IF:
+            # elseは最も近いifに対応させる
+            if self.type == "ELSE":
+                self.advance()
+                stack[-1] = [ELSE, frame[1], frame[2], node]
+                return None
+            stack.pop()
+            return ast.IfStatement(frame[2], node, ast.NullNode(), frame[1])
+        elif kind == ELSE:
+            stack.pop()
+            return ast.IfStatement(frame[2], frame[3], node, frame[1])
+        elif kind == WHILE:
+            stack.pop()
+            return ast.WhileLoop(frame[2], node, frame[1])
+        stack.pop()
+        return self.end_for(frame, node)
+
+    def condition(self):
+        """( expression ) を解析する"""
+        self.expect("LPAREN")
+        expression = self.expression()
+        self.expect("RPAREN")
+        return expression
+
+    def begin_for(self, stack):
+        lineno = self.advance().lineno
+        self.expect("LPAREN")
+        first = None
+        if self.type != "SEMICOLON":
+            first = self.expression()
+        self.expect("SEMICOLON")
+        condition = None
+        if self.type != "SEMICOLON":
+            condition = self.expression()
+        self.expect("SEMICOLON")
+        last = None
+        if self.type != "RPAREN":
+            last = self.expression()
+        self.expect("RPAREN")
+        stack.append([FOR, lineno, first, condition, last])
+        return None
+
+    def end_for(self, frame, statement):
+        _, lineno, first, condition, last = frame
+        # Parserと同じく、3つ目の式を本体の末尾に加えたwhile文に変換する
+        if last is not None:
+            statement.statement_list.append(ast.ExpressionStatement(last))
+        if first is not None:
+            first = ast.ExpressionStatement(first)
+        else:
+            first = ast.NullNode()
+        if condition is None:
+            condition = ast.Number(1)
+        return ast.ForLoop(first, ast.WhileLoop(condition, statement, lineno))
+
+    # expression
+    def expression(self):
+        expression = self.assign_expr()
+        while self.type == "COMMA":
+            self.advance()
+            # Parser.p_expression_expressionと同じ結果にする
+            expression = expression.append(self.assign_expr())
+        return expression
+
+    def assign_expr(self):
+        left = self.binary_expr(1)
+        operator = ASSIGN_OPERATORS.get(self.type, False)
+        if operator is False:
+            return left
+        lineno = self.advance().lineno
+        right = self.assign_expr()
+        if operator is not None:
+            right = ast.BinaryOperators(operator, left, right, lineno)
+        return ast.BinaryOperators("ASSIGN", left, right, lineno)
+
+    def binary_expr(self, min_precedence):
+        """優先順位がmin_precedence以上の二項演算子からなる式を解析する"""
+        left = self.unary_expr()
+        while True:
+            precedence = BINARY_PRECEDENCE.get(self.type)
+            if precedence is None or precedence < min_precedence:
+                return left
+            optok = self.advance()
+            right = self.binary_expr(precedence + 1)
+            left = ast.BinaryOperators(optok.type, left, right, optok.lineno)
+
+    def unary_expr(self):
+        toktype = self.type
+        if toktype == "MINUS":
+            self.advance()
+            # Parserでは非終端記号の行番号(常に0)を使っている
+            return ast.BinaryOperators("MINUS", ast.Number(0), self.unary_expr(), 0)
+        elif toktype == "ADDRESS":
+            lineno = self.advance().lineno
+            expression = self.unary_expr()
+            if isinstance(expression, ast.Pointer):
+                return expression.expression
+            return ast.Address(expression, lineno)
+        elif toktype == "TIMES":
+            lineno = self.advance().lineno
+            return ast.Pointer(self.unary_expr(), lineno)
+        elif toktype == "ID":
+            nexttype = self.peek_type()
+            if nexttype == "INC" or nexttype == "DEC":
+                identifier = self.identifier()
+                lineno = self.advance().lineno
+                operator = "PLUS" if nexttype == "INC" else "MINUS"
+                return ast.BinaryOperators("ASSIGN", identifier, ast.BinaryOperators(
+                    operator, identifier, ast.Number(1), lineno), lineno)
+        return self.postfix_expr()
+
+    def postfix_expr(self):
+        if self.type == "ID" and self.peek_type() == "LPAREN":
+            identifier = self.identifier()
+            self.advance()
+            if self.type == "RPAREN":
+                arguments = ast.ArgumentExpressionList()
+            else:
+                arguments = ast.ArgumentExpressionList(self.assign_expr())
+                while self.type == "COMMA":
+                    self.advance()
+                    arguments.append(self.assign_expr())
+            self.expect("RPAREN")
+            expression = ast.FunctionExpression(identifier, arguments, identifier.lineno)
+        else:
+            expression = self.primary_expr()
+
+        while self.type == "LBRACKET":
+            lineno = self.advance().lineno
+            index = self.expression()
+            self.expect("RBRACKET")
+            expression = ast.Pointer(ast.BinaryOperators("PLUS", expression, index, lineno), lineno)
+        return expression
+
+    def primary_expr(self):
+        toktype = self.type
+        if toktype == "ID":
+            return self.identifier()
+        elif toktype == "NUMBER":
+            return ast.Number(self.advance().value)
+        elif toktype == "LPAREN":
+            return self.condition()
+        self.fail()
+
+    def identifier(self):
+        tok = self.expect("ID")
+        return ast.Identifier(tok.value, tok.lineno)
@@ -0,0 +1,122 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+import nose
+import ast
+import samplegen
+import diagnostics
+from parser import Parser
+from parser_test import dump, flat_dump
+
+
+class RecursiveDescentParserTest(TestCase):
+
+    def setUp(self):
+        self.lalr = Parser(diagnostics=diagnostics.Diagnostics(echo=False))
+        self.lalr.build()
+        self.rd = Parser(parser_engine="rd", diagnostics=diagnostics.Diagnostics(echo=False))
+        self.rd.build()
+
+    def tearDown(self):
+        pass
+
+    def assert_same_tree(self, data):
+        nose.tools.eq_(dump(self.lalr.parse(data)), dump(self.rd.parse(data)))
+
+    def test_declarations(self):
+        """宣言、プロトタイプ、関数定義の構文木のテスト"""
+        self.assert_same_tree("""
+            int a, *b, c[10];
+            void f();
+            int *g(int x, int *y);
+            int h() {}
+            int main() { int i; int *p, q[3]; }
+            int k(int x) { x = 1; }
+        """)
+
+    def test_statements(self):
+        """if、while、for、return文の構文木のテスト"""
+        self.assert_same_tree("""
+            int main() {
+                int i;
+                ;
+                if (i) if (i < 1) i = 2; else i = 3;
+                if (i) { i = 1; } else { i = 2; }
+                while (i > 0) { i--; }
+                for (i = 0; i < 10; i++) { i = i; }
+                for (; i < 10; i++) { }
+                for (i = 0; ; i++) { }
+                for (i = 0; i < 10; ) i = 1;
+                for (i = 0; ; ) i = 1;
+                for (; i < 10; ) i = 1;
+                for (; ; i++) { }
+                for (; ; ) i = 1;
+                { i = 1; }
+                return;
+                return i;
+            }
+        """)
+
+    def test_expressions(self):
+        """演算子の優先順位と結合性、単項演算子、後置式の構文木のテスト"""
+        self.assert_same_tree("""
+            int main() {
+                a = b = c + d * e - f / g;
+                a = b || c && d == e != f < g > h <= i >= j;
+                a = (b + c) * -d - - - e;
+                a += b -= c;
+                p = &*q; p = &a; p = **q; x = a[1][b + 2];
+                x = f() + g(1) + h(a, b = 2, -c)[3];
+                x = a++ + b-- * c;
+            }
+        """)
+
+    def test_generated_programs(self):
+        """生成したプログラムの構文木がPLYの構文解析器と一致するかのテスト"""
+        for seed in range(5):
+            self.assert_same_tree(samplegen.generate_program(4, 30, seed=seed, syntax_only=True))
+
+    def test_deep_nesting(self):
+        """深く入れ子になった複文、if文、while文を、Pythonのスタックを深くせずに解析できるかのテスト"""
+        for shape in ("block", "if", "while"):
+            data = samplegen.generate_deep_program(shape, 2000)
+            nose.tools.eq_(flat_dump(self.lalr.parse(data)), flat_dump(self.rd.parse(data)))
+
+    def test_deep_syntax_error(self):
+        """深く入れ子になった文の中の構文エラーから、一番内側の複文で回復するかのテスト"""
+        data = "int main() { int a; " + "{ if (a) " * 600 + "a = ; a = 1; " + "} " * 600 + "return a; }"
+        statement = self.rd.parse(data).nodes[0].compound_statement.statement_list.nodes[0]
+        for _ in range(599):
+            nose.tools.ok_(isinstance(statement, ast.CompoundStatement))
+            statement = statement.statement_list.nodes[0]
+            nose.tools.ok_(isinstance(statement, ast.IfStatement))
+            statement = statement.then_statement
+        # エラーの起きた最も内側のif文は ; まで読み飛ばされてNullNodeになる
+        nose.tools.ok_(isinstance(statement, ast.CompoundStatement))
+        nose.tools.eq_(["NullNode", "ExpressionStatement"],
+                       [type(node).__name__ for node in statement.statement_list.nodes])
+        nose.tools.eq_(['Line 1: Syntax error at ";".'],
+                       [record.message for record in self.rd.diagnostics.records])
+
+    def test_syntax_error(self):
+        """構文エラーを記録して、PLYの構文解析器と同じように回復するかのテスト"""
+        self.assert_same_tree("""
+            int a b;
+            int f(int x) { x = 1 +; return x; }
+            int g( { return 1; }
+            int main() { return 0; }
+        """)
+        nose.tools.eq_(None, self.rd.parse("int a"))
+        nose.tools.eq_(None, self.rd.parse(""))
+
+        messages = [record.message for record in self.rd.diagnostics.records]
+        nose.tools.eq_([record.message for record in self.lalr.diagnostics.records], messages[:3])
+        nose.tools.eq_(['Line 2: Syntax error at "b".', 'Line 3: Syntax error at ";".',
+                        'Line 4: Syntax error at "{".',
+                        "Line 1: Syntax error at end of input.",
+                        "Line 1: Syntax error at end of input."], messages)
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])
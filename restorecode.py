@@ -6,27 +6,35 @@
 
 from __future__ import unicode_literals, print_function
 import ast
+import visitor
 
 
 # code analysis and restoration section
 def restore_code(nodelist, indent=1):
-    if isinstance(nodelist, ast.NullNode):
+    restorer.visit(nodelist, indent)
+
+
+class CodeRestorer(visitor.NodeVisitor):
+
+    """ノードのクラスごとに元のコードを出力するビジター"""
+
+    def visit_NullNode(self, nodelist, indent):
         pass
 
     # top level
-    elif isinstance(nodelist, ast.ExternalDeclarationList):
+    def visit_ExternalDeclarationList(self, nodelist, indent):
         for i in range(len(nodelist.nodes)):
             restore_code(nodelist.nodes[i])
         print("")
 
     # declaration
-    elif isinstance(nodelist, ast.Declaration):
+    def visit_Declaration(self, nodelist, indent):
         print_type_specifier(nodelist.type_specifier)
         restore_code(nodelist.declarator_list)
         print("; ", end="")
         print("")
 
-    elif isinstance(nodelist, ast.DeclaratorList):
+    def visit_DeclaratorList(self, nodelist, indent):
         if nodelist.length() > 1:
             for i in range(nodelist.length() - 1):
                 restore_code(nodelist.nodes[i])
@@ -35,31 +43,31 @@ def restore_code(nodelist, indent=1):
         elif nodelist.length() == 1: # declarator-list := <declarator>
             restore_code(nodelist.nodes[0]) # declarator
 
-    elif isinstance(nodelist, ast.Declarator):
+    def visit_Declarator(self, nodelist, indent):
         print_kind(nodelist.kind)
         restore_code(nodelist.direct_declarator)
 
-    elif isinstance(nodelist, ast.DirectDeclarator):
+    def visit_DirectDeclarator(self, nodelist, indent):
         print_identifier(nodelist.identifier)
 
-    elif isinstance(nodelist, ast.DirectArrayDeclarator):
+    def visit_DirectArrayDeclarator(self, nodelist, indent):
         print_identifier(nodelist.identifier)
         print("[", end="")
         print_number(nodelist.constant)
         print("]", end="")
 
     # function
-    elif isinstance(nodelist, ast.FunctionPrototype):
+    def visit_FunctionPrototype(self, nodelist, indent):
         print_type_specifier(nodelist.type_specifier)
         restore_code(nodelist.function_declarator)
         print(";")
 
-    elif isinstance(nodelist, ast.FunctionDefinition):
+    def visit_FunctionDefinition(self, nodelist, indent):
         print_type_specifier(nodelist.type_specifier)
         restore_code(nodelist.function_declarator)
         restore_code(nodelist.compound_statement, indent=0)
 
-    elif isinstance(nodelist, ast.FunctionDeclarator):
+    def visit_FunctionDeclarator(self, nodelist, indent):
         print_kind(nodelist.kind)
         restore_code(nodelist.identifier)
         print("(", end="")
@@ -67,7 +75,7 @@ def restore_code(nodelist, indent=1):
         print(") ", end="")
 
     # parameter
-    elif isinstance(nodelist, ast.ParameterTypeList):
+    def visit_ParameterTypeList(self, nodelist, indent):
         if nodelist.length() > 1:
             for i in range(nodelist.length() - 1):
                 restore_code(nodelist.nodes[i])
@@ -76,27 +84,27 @@ def restore_code(nodelist, indent=1):
         else: # parameter-type-list := <parameter-declaration>
             restore_code(nodelist.nodes[0]) # parameter-declaration
 
-    elif isinstance(nodelist, ast.ParameterDeclaration):
+    def visit_ParameterDeclaration(self, nodelist, indent):
         print_type_specifier(nodelist.type_specifier)
         restore_code(nodelist.parameter_declarator)
 
-    elif isinstance(nodelist, ast.ParameterDeclarator):
+    def visit_ParameterDeclarator(self, nodelist, indent):
         print_kind(nodelist.kind)
         print_identifier(nodelist.identifier)
 
     # type specifier
-    elif isinstance(nodelist, ast.TypeSpecifier):
+    def visit_TypeSpecifier(self, nodelist, indent):
         print_type_specifier(nodelist)
 
     # statement
-    elif isinstance(nodelist, ast.ExpressionStatement):
+    def visit_ExpressionStatement(self, nodelist, indent):
         if isinstance(nodelist.expression, ast.NullNode):
             print("; ", end="")
         else:
             restore_code(nodelist.expression)
             print("; ", end="")
 
-    elif isinstance(nodelist, ast.IfStatement):
+    def visit_IfStatement(self, nodelist, indent):
         if isinstance(nodelist.else_statement, ast.NullNode):
             print("    if (", end="")
             restore_code(nodelist.expression, indent=0)
@@ -110,18 +118,18 @@ def restore_code(nodelist, indent=1):
             print("else ", end="")
             restore_code(nodelist.else_statement, indent=1)
 
-    elif isinstance(nodelist, ast.WhileLoop):
+    def visit_WhileLoop(self, nodelist, indent):
         print("    while (", end="")
         restore_code(nodelist.expression, indent=0)
         print(") ", end="")
         restore_code(nodelist.statement, indent=1)
 
-    elif isinstance(nodelist, ast.ForLoop):
+    def visit_ForLoop(self, nodelist, indent):
         restore_code(nodelist.firstexp_statement)
         print("")
         restore_code(nodelist.whileloop_node, indent=1)
 
-    elif isinstance(nodelist, ast.ReturnStatement):
+    def visit_ReturnStatement(self, nodelist, indent):
         print("    ", end="")
         if isinstance(nodelist.return_statement, ast.NullNode):
             print("return ; ", end="")
@@ -131,7 +139,7 @@ def restore_code(nodelist, indent=1):
             print("; ", end="")
 
     # compound statement
-    elif isinstance(nodelist, ast.CompoundStatement):
+    def visit_CompoundStatement(self, nodelist, indent):
         print("{ ")
         restore_code(nodelist.declaration_list)
         restore_code(nodelist.statement_list, indent=indent)
@@ -139,18 +147,18 @@ def restore_code(nodelist, indent=1):
             print("    ", end="")
         print("} ", end="")
 
-    elif isinstance(nodelist, ast.DeclarationList):
+    def visit_DeclarationList(self, nodelist, indent):
         for i in range(nodelist.length()):
             print("    ", end="")
             restore_code(nodelist.nodes[i])
 
-    elif isinstance(nodelist, ast.StatementList):
+    def visit_StatementList(self, nodelist, indent):
         for i in range(nodelist.length()):
             restore_code(nodelist.nodes[i], indent=indent)
             print("")
 
     # expression
-    elif isinstance(nodelist, ast.BinaryOperators):
+    def visit_BinaryOperators(self, nodelist, indent):
         if indent == 1:
             print("    ", end="")
         if nodelist.op == "ASSIGN":
@@ -215,56 +223,59 @@ def restore_code(nodelist, indent=1):
             restore_code(nodelist.right, indent=0)
 
     # unary operators
-    # elif isinstance(nodelist, ast.Negative):
+    # def visit_Negative(self, nodelist, indent):
     #     print("-", end="")
     #     restore_code(nodelist.expression)
 
-    elif isinstance(nodelist, ast.Address):
+    def visit_Address(self, nodelist, indent):
         print("&", end="")
         restore_code(nodelist.expression)
 
-    elif isinstance(nodelist, ast.Pointer):
+    def visit_Pointer(self, nodelist, indent):
         print("*(", end="")
         restore_code(nodelist.expression, indent=0)
         print(")", end="")
 
-    # elif isinstance(nodelist, ast.Increment):
+    # def visit_Increment(self, nodelist, indent):
     #     restore_code(nodelist.expression)
     #     print("++", end="")
 
-    # elif isinstance(nodelist, ast.Decrement):
+    # def visit_Decrement(self, nodelist, indent):
     #     restore_code(nodelist.expression)
     #     print("--", end="")
 
-    elif isinstance(nodelist, ast.FunctionExpression):
+    def visit_FunctionExpression(self, nodelist, indent):
         print("    ", end="")
         print_identifier(nodelist.identifier)
         print("(", end="")
         restore_code(nodelist.argument_expression)
         print(")", end="")
 
-    elif isinstance(nodelist, ast.ArrayExpression):
+    def visit_ArrayExpression(self, nodelist, indent):
         restore_code(nodelist.postfix_expr)
         print("[", end="")
         restore_code(nodelist.expression, indent=0)
         print("]", end="")
 
-    elif isinstance(nodelist, ast.ArgumentExpressionList):
+    def visit_ArgumentExpressionList(self, nodelist, indent):
         if nodelist.length() > 1:
             for i in range(nodelist.length() - 1):
                 restore_code(nodelist.nodes[i])
                 print(", ", end="")
             restore_code(nodelist.nodes[nodelist.length()-1])
-        else:
+        elif nodelist.length() == 1:
             restore_code(nodelist.nodes[0])
 
-    elif isinstance(nodelist, ast.Number):
+    def visit_Number(self, nodelist, indent):
         print_number(nodelist)
 
-    elif isinstance(nodelist, ast.Identifier):
+    def visit_Identifier(self, nodelist, indent):
         print_identifier(nodelist)
 
 
+restorer = CodeRestorer()
+
+
 # print section
 def print_number(class_number):
     print("{0}".format(class_number.value), end="")
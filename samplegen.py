@@ -0,0 +1,156 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""ベンチマークとテストに使うSmallCのプログラムを生成するモジュール"""
+
+import random
+
+ARITH_OPS = ["+", "-", "*", "/"]
+REL_OPS = ["<", ">", "<=", ">=", "==", "!="]
+
+
+class ProgramGenerator(object):
+
+    """乱数でSmallCのプログラムを生成するクラス
+       syntax_onlyがFalseのときは、意味解析からコード生成まで通る構文だけを使う。
+       Trueのときはfor文、ポインタ、++/--、+=/-=、コメントも使う"""
+
+    def __init__(self, seed=0, syntax_only=False):
+        self.random = random.Random(seed)
+        self.syntax_only = syntax_only
+        self.functions = []  # (関数名, 引数の個数)
+
+    def program(self, functions=10, statements=20):
+        lines = ["void print(int v);"]
+        lines.append("int g0, g1;")
+        for i in range(functions):
+            lines.extend(self.function("f{0}".format(i), statements))
+        lines.extend(self.main_function(statements))
+        return "\n".join(lines) + "\n"
+
+    def function(self, name, statements):
+        nparams = self.random.randint(0, 3)
+        params = ["a{0}".format(i) for i in range(nparams)]
+        lines = ["int {0}({1}) {{".format(name, ", ".join("int " + p for p in params))]
+        lines.extend(self.body(params, statements))
+        lines.append("}")
+        self.functions.append((name, nparams))
+        return lines
+
+    def main_function(self, statements):
+        lines = ["int main() {"]
+        lines.extend(self.body([], statements))
+        lines.append("}")
+        return lines
+
+    def body(self, params, statements):
+        local_vars = ["x", "y", "z"]
+        lines = ["    int x, y, z;"]
+        if self.syntax_only:
+            lines.append("    int *p;")
+            lines.append("    /* locals */")
+        variables = params + local_vars + ["g0", "g1"]
+        for var in local_vars:
+            lines.append("    {0} = {1};".format(var, self.random.randint(0, 9)))
+        for _ in range(statements):
+            lines.extend(self.statement(variables, 1, 2))
+        lines.append("    return {0};".format(self.expression(variables, 2)))
+        return lines
+
+    def statement(self, variables, indent, depth):
+        pad = "    " * indent
+        choice = self.random.randint(0, 9)
+        if depth > 0 and choice == 0:
+            lines = [pad + "if ({0}) {{".format(self.condition(variables))]
+            lines.extend(self.block(variables, indent, depth))
+            lines.append(pad + "} else {")
+            lines.extend(self.block(variables, indent, depth))
+            lines.append(pad + "}")
+            return lines
+        elif depth > 0 and choice == 1:
+            lines = [pad + "while ({0}) {{".format(self.condition(variables))]
+            lines.extend(self.block(variables, indent, depth))
+            lines.append(pad + "}")
+            return lines
+        elif depth > 0 and choice == 2 and self.syntax_only:
+            var = self.random.choice(variables)
+            lines = [pad + "for ({0} = 0; {0} < {1}; {0}++) {{".format(var, self.random.randint(1, 9))]
+            lines.extend(self.block(variables, indent, depth))
+            lines.append(pad + "}")
+            return lines
+        elif choice == 3 and self.functions:
+            name, nparams = self.random.choice(self.functions)
+            args = ", ".join(self.expression(variables, 1) for _ in range(nparams))
+            return [pad + "{0} = {1}({2});".format(self.random.choice(variables), name, args)]
+        elif choice == 4:
+            return [pad + "print({0});".format(self.random.choice(variables))]
+        elif choice == 5 and self.syntax_only:
+            var = self.random.choice(variables)
+            return [pad + "p = &{0};".format(var),
+                    pad + "*p = {0};".format(self.expression(variables, 1)),
+                    pad + "{0} += *p;".format(var),
+                    pad + "{0}--;".format(var)]
+        else:
+            return [pad + "{0} = {1};".format(self.random.choice(variables),
+                                              self.expression(variables, 3))]
+
+    def block(self, variables, indent, depth):
+        lines = []
+        for _ in range(self.random.randint(1, 3)):
+            lines.extend(self.statement(variables, indent + 1, depth - 1))
+        return lines
+
+    def condition(self, variables):
+        return "{0} {1} {2}".format(self.expression(variables, 1),
+                                    self.random.choice(REL_OPS),
+                                    self.expression(variables, 1))
+
+    def expression(self, variables, depth):
+        if depth <= 0 or self.random.randint(0, 2) == 0:
+            if self.random.randint(0, 1) == 0:
+                return str(self.random.randint(0, 100))
+            return self.random.choice(variables)
+        left = self.expression(variables, depth - 1)
+        right = self.expression(variables, depth - 1)
+        expr = "{0} {1} {2}".format(left, self.random.choice(ARITH_OPS), right)
+        if self.random.randint(0, 2) == 0:
+            expr = "(" + expr + ")"
+        return expr
+
+
+def generate_program(functions=10, statements=20, seed=0, syntax_only=False):
+    """functions個の関数(それぞれ約statements個の文を持つ)とmainからなるプログラムを返す"""
+    return ProgramGenerator(seed, syntax_only).program(functions, statements)
+
+
+def generate_sized_program(size, seed=0, syntax_only=False):
+    """おおよそsizeバイトのプログラムを返す"""
+    functions = max(1, size // 2000)
+    return generate_program(functions, 40, seed, syntax_only)
+
+
+def generate_deep_program(shape, depth):
+    """構文木がdepth段の深さになるプログラムを返す
+       shapeは "expression"(a + a + ... の長い式)、"block"(入れ子の複文)、
+       "if"(入れ子のif文)、"while"(入れ子のwhile文)のいずれか"""
+    if shape == "expression":
+        body = "a = " + " + ".join(["a"] * depth) + "; "
+    elif shape == "block":
+        body = "{ " * depth + "a = a + 1; " + "} " * depth
+    elif shape == "if":
+        body = "if (a) " * depth + "a = a + 1; "
+    elif shape == "while":
+        body = "while (a) " * depth + "a = a - 1; "
+    else:
+        raise ValueError("Unknown shape: {0}".format(shape))
+    return "int main() { int a; a = 1; " + body + "return a; }\n"
+
+
+def generate_wide_program(globals_count, functions):
+    """globals_count個のグローバル変数と、それらを参照するfunctions個の関数からなるプログラムを返す"""
+    lines = ["int g{0};".format(i) for i in range(globals_count)]
+    for i in range(functions):
+        names = ["g{0}".format((i * 7 + j) % globals_count) for j in range(4)]
+        lines.append("int f{0}(int x) {{ return {1} + x; }}".format(i, " + ".join(names)))
+    lines.append("int main() {{ return f{0}(1); }}".format(functions - 1))
+    return "\n".join(lines) + "\n"
@@ -5,75 +5,141 @@
 
 import sys
 import ast
-import logging
+import visitor
+import typetable
+import trace
+import diagnostics as dg
+
+TRACE = trace.channel("analyzer")
 
 
 class Decl(object):
 
+    # objtypeは以前の表現(文字列やタプル)で渡してもtypetableの型に変換する
     def __init__(self, name, level, kind, objtype, offset=-1):
         self.name = name
         self.level = level
         self.kind = kind
-        self.objtype = objtype
+        self.objtype = typetable.canonical(objtype)
         self.offset = offset
 
     def __eq__(self, other):
-        return self.__dict__ == other.__dict__
+        # 中間命令の比較では、Declと__dict__を持たない中間命令(IntExpressionなど)を比べることがある
+        return self is other or isinstance(other, Decl) and self.__dict__ == other.__dict__
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        # objtypeとoffsetは後から書き換えられるので、ハッシュには使わない
+        return hash((self.name, self.level, self.kind))
 
 
 class Environment(Decl):
 
+    """名前から宣言を引く記号表
+
+       名前ごとに、その名前の宣言を登録した順に並べたリスト(後のものが前のものを
+       隠す)を辞書で持つので、名前を引くのは表の大きさによらず一定の手間で済む。
+       有効範囲(複文)ごとに、そこで登録した宣言をスタックに積んでおき、
+       有効範囲を出るときにまとめて取り除いてdeletedに移す。"""
+
     def __init__(self, decl=None):
-        if decl is None:
-            self.decl_list = []
-        else:
-            self.decl_list = [decl]
+        self.chains = {}
+        self.scopes = [[]]
         self.deleted = []
+        if decl is not None:
+            self.add(decl)
+
+    @property
+    def decl_list(self):
+        """有効な宣言を登録した順に並べたリスト(宣言は常に一番内側の有効範囲に
+           登録されるので、有効範囲を外側から順につなげたものになる)"""
+        return [decl for scope in self.scopes for decl in scope]
 
     def add(self, decl):
-        self.decl_list.append(decl)
+        self.chains.setdefault(decl.name, []).append(decl)
+        self.scopes[-1].append(decl)
+
+    def __contains__(self, decl):
+        return decl in self.chains.get(decl.name, ())
 
     # if the object which has the same name is found, returns the Decl class
     # object. Otherwise, returns None.
     def lookup(self, name, index=0):
+        chain = self.chains.get(name)
+        if not chain:
+            return None
+        if index == 0:
+            return chain[-1]
         for decl in reversed(self.decl_list[index:]):
             if name == decl.name:
                 return decl
 
+    def enter_scope(self):
+        self.scopes.append([])
+
+    def exit_scope(self):
+        """一番内側の有効範囲で登録した宣言を取り除き、取り除いた宣言のリストを返す"""
+        scope = self.scopes.pop()
+        for decl in reversed(scope):
+            self.chains[decl.name].pop()
+        self.deleted.extend(scope)
+        return scope
+
 
-class Analyzer(object):
+class Analyzer(visitor.NodeVisitor):
 
-    def __init__(self, ast_top):
+    """名前解析を行うクラス
+
+       check_types=Trueのときは、同じ走査の中でTypeCheckerの規則による型検査と
+       返り値の型の検査も行う(式のノードのvisit_*が式の型を返す)。型検査の
+       エラーの数はself.checker.error_countに数える。
+       envを与えるとその環境に宣言を登録する。
+       診断メッセージはdiagnostics(diagnostics.Diagnostics)に記録する。
+       省略したときはloggingに出力するものを作る。"""
+
+    def __init__(self, ast_top, check_types=False, env=None, diagnostics=None):
         self.nodelist = ast_top
-        self.env = Environment()
+        self.env = env if env is not None else Environment()
+        self.diagnostics = diagnostics if diagnostics is not None else dg.Diagnostics()
+        self.checker = TypeChecker(self.env, self.diagnostics) if check_types else None
         # self.last = False
         # self.error_msg = ""
         # self.warning_msg = ""
         self.error_count = 0
         self.warning_count = 0
 
+    # 診断メッセージの記録("Line 行番号: "に続けて、messageを(lineno, *args)で書式化する)
+    def error(self, code, lineno, message, *args):
+        self.error_count += 1
+        self.diagnostics.error(code, lineno, ("Line {0}: " + message).format(lineno, *args))
+
+    def warning(self, code, lineno, message, *args):
+        self.warning_count += 1
+        self.diagnostics.warning(code, lineno, ("Line {0}: " + message).format(lineno, *args))
+
     def analyze_declaration(self, declaration_node, declarator, level):
         # 抽象構文木をたどって変数名を取ってくる
         name = declarator.direct_declarator.identifier.identifier
 
         # void型変数をはねる(型検査を埋め込み)
         if declaration_node.type_specifier.type_specifier == "void":
-            logging.error("Line {0}: Type of variable {0} must not be \"void\"".format(
-                declarator.direct_declarator.identifier.lineno, name))
-            self.error_count += 1
+            self.error("void-variable", declarator.direct_declarator.identifier.lineno, "Type of variable {1} must not be \"void\"",
+                       name)
 
         if declarator.kind == "NORMAL":
             if isinstance(declarator.direct_declarator, ast.DirectDeclarator):
-                objtype = "int"
+                objtype = typetable.INT
             elif isinstance(declarator.direct_declarator, ast.DirectArrayDeclarator):
-                objtype = (
-                    "array", "int", declarator.direct_declarator.constant.value)
+                objtype = typetable.array(
+                    typetable.INT, declarator.direct_declarator.constant.value)
         elif declarator.kind == "POINTER":
             if isinstance(declarator.direct_declarator, ast.DirectDeclarator):
-                objtype = ("pointer", "int")
+                objtype = typetable.INT_POINTER
             elif isinstance(declarator.direct_declarator, ast.DirectArrayDeclarator):
-                objtype = (
-                    "pointer", ("array", "int", declarator.direct_declarator.constant.value))
+                objtype = typetable.pointer(typetable.array(
+                    typetable.INT, declarator.direct_declarator.constant.value))
 
         decl_decl = Decl(name, level, "var", objtype)
         # declarator.direct_declarator.identifier.identifier = decl_decl
@@ -85,51 +151,47 @@ class Analyzer(object):
 
     def analyze_func_prototype(self, proto_node, level):
         if level != 0:
-            logging.error(
-                "Line {0}: Prototype function declaration is available only at top-level.".format(proto_node.function_declarator.identifier.lineno))
-            self.error_count += 1
+            self.error("nested-prototype", proto_node.function_declarator.identifier.lineno, "Prototype function declaration is available only at top-level.")
         else:
             # 抽象構文木をたどって関数名を取ってくる
             name = proto_node.function_declarator.identifier.identifier
 
             kind = "proto"
-            return_type = proto_node.type_specifier.type_specifier
+            return_type = typetable.primitive(proto_node.type_specifier.type_specifier)
 
-            objtype = ["fun", return_type]
+            param_types = []
             # 引数タイプを検査して追加
             if not isinstance(proto_node.function_declarator.parameter_type_list, ast.NullNode):
                 for param in proto_node.function_declarator.parameter_type_list.nodes:
                     if param.parameter_declarator.kind == "NORMAL":
-                        objtype.append(param.type_specifier.type_specifier)
+                        param_types.append(typetable.primitive(param.type_specifier.type_specifier))
                     elif param.parameter_declarator.kind == "POINTER":
-                        objtype.append(
-                            ("pointer", param.type_specifier.type_specifier))
+                        param_types.append(typetable.pointer(
+                            typetable.primitive(param.type_specifier.type_specifier)))
 
-        decl_proto = Decl(name, level, kind, tuple(objtype))
+        decl_proto = Decl(name, level, kind, typetable.function(return_type, param_types))
 
         return decl_proto
 
     def analyze_func_definition(self, funcdef_node, level):
         if level != 0:
-            logging.error(
-                "Line {0}: Function definition is available only at top-level.".format(funcdef_node.function_declarator.identifier.lineno))
-            error_count += 1
+            self.error("nested-function", funcdef_node.function_declarator.identifier.lineno, "Function definition is available only at top-level.")
         else:
             # 抽象構文木をたどって関数名を取ってくる
             name = funcdef_node.function_declarator.identifier.identifier
             kind = "fun"
-            return_type = funcdef_node.type_specifier.type_specifier
-            objtype = ["fun", return_type]
+            return_type = typetable.primitive(funcdef_node.type_specifier.type_specifier)
+            param_types = []
 
             if not isinstance(funcdef_node.function_declarator.parameter_type_list, ast.NullNode):
                 for param in funcdef_node.function_declarator.parameter_type_list.nodes:
                     if param.parameter_declarator.kind == "NORMAL":
-                        objtype.append(param.type_specifier.type_specifier)
+                        param_types.append(typetable.primitive(param.type_specifier.type_specifier))
                     elif param.parameter_declarator.kind == "POINTER":
-                        objtype.append(
-                            ("pointer", param.type_specifier.type_specifier))
+                        param_types.append(typetable.pointer(
+                            typetable.primitive(param.type_specifier.type_specifier)))
 
-        decl_funcdef = Decl(name, level, kind, tuple(objtype))
+        decl_funcdef = Decl(name, level, kind, typetable.function(return_type, param_types))
 
         return decl_funcdef
 
@@ -138,570 +200,657 @@ class Analyzer(object):
         name = paramdec_node.parameter_declarator.identifier.identifier
 
         if paramdec_node.parameter_declarator.kind == "NORMAL":
-            objtype = "int"
+            objtype = typetable.INT
         elif paramdec_node.parameter_declarator.kind == "POINTER":
-            objtype = ("pointer", "int")
+            objtype = typetable.INT_POINTER
 
         decl_param = Decl(name, level, "param", objtype)
 
         return decl_param
 
     def analyze(self, nodelist, level=0, scope_index=0):
-        """抽象構文木のノードを受け取り、主に名前解析を行う(式の形の検査も含む)"""
-        if isinstance(nodelist, ast.ExternalDeclarationList):
-            for node in nodelist.nodes:
-                print("Analyzing external declaration list...")
-                print(node)
-                print(node.__dict__)
-                self.analyze(node, level)
-
-        # 変数宣言の解析
-        elif isinstance(nodelist, ast.Declaration):
-            for declarator in nodelist.declarator_list.nodes:
-                decl_decl = self.analyze_declaration(
-                        nodelist, declarator, level)
-
-                if isinstance(declarator.direct_declarator.identifier.identifier, Decl):
-                    declname = declarator.direct_declarator.identifier.identifier.name
-                    # break
-                elif isinstance(declarator.direct_declarator.identifier.identifier, str):
-                    declname = declarator.direct_declarator.identifier.identifier
-
-                if self.env.lookup(declname, scope_index) is None:
-                    self.env.add(decl_decl)
-                    declarator.direct_declarator.identifier.identifier = decl_decl
-                else:
-                    existing_decl = self.env.lookup(
-                        declname, scope_index)
-
-                    # if existing_decl.level > level:
-                        # scope_i = self.env.index(existing_decl)
-                        # self.analyze(nodelist, level, scope_i+1)
-
-                    declarator.direct_declarator.identifier.identifier = decl_decl
-
-                    if existing_decl.kind == "fun" or existing_decl.kind == "proto":
-                        if level == 0:
-                            logging.error("Line {0}: {1} is defined as a function.".format(
-                                declarator.direct_declarator.identifier.lineno, decl_decl.name))
-                            self.error_count += 1
-                        else:
-                            self.env.add(decl_decl)
-                            # declarator.direct_declarator.identifier.identifier = decl_decl
-
-                    elif existing_decl.kind == "var":
-                        if existing_decl.level == level:
-                            logging.error("Line {0}: Duplicate declaration of variable - \"{1}\"".format(
-                                declarator.direct_declarator.identifier.lineno, decl_decl.name))
-                            self.error_count += 1
-                        else:
-                            self.env.add(decl_decl)
-                            # declarator.direct_declarator.identifier.identifier = decl_decl
-
-                    elif existing_decl.kind == "param":
-                        self.env.add(decl_decl)
-                        logging.warning("Line {0}: Variable declaration \"{1}\" will hide parameter \"{2}\".".format(
-                            declarator.direct_declarator.identifier.lineno, funcdef_node.function_declarator.direct_declarator.identifier.identifier, existing_decl.name))
-                        self.warning_count += 1
-
-        # プロトタイプ宣言の解析
-        elif isinstance(nodelist, ast.FunctionPrototype):
-            decl_proto = self.analyze_func_prototype(nodelist, level)
-            if self.env.lookup(decl_proto.name) is None:
-                self.env.add(decl_proto)
-                nodelist.function_declarator.identifier.identifier = decl_proto
+        """抽象構文木のノードを受け取り、主に名前解析を行う(式の形の検査も含む)
+           check_types=Trueで作ったときは型検査も同時に行う"""
+        visitor.run(self.visit(nodelist, level, scope_index))
+        return self.env, self.env.deleted
+
+    def visit_ExternalDeclarationList(self, nodelist, level, scope_index):
+        nodelist.resolve_lines()
+        for node in nodelist.nodes:
+            if TRACE.debug:
+                TRACE.emit(trace.DEBUG, "external declaration", node=node,
+                           fields=dict(ast.iter_fields(node)))
+            yield self.visit(node, level, 0)
+
+    # 変数宣言の解析
+    def visit_Declaration(self, nodelist, level, scope_index):
+        for declarator in nodelist.declarator_list.nodes:
+            decl_decl = self.analyze_declaration(
+                    nodelist, declarator, level)
+
+            if isinstance(declarator.direct_declarator.identifier.identifier, Decl):
+                declname = declarator.direct_declarator.identifier.identifier.name
+                # break
+            elif isinstance(declarator.direct_declarator.identifier.identifier, str):
+                declname = declarator.direct_declarator.identifier.identifier
+
+            if self.env.lookup(declname, scope_index) is None:
+                self.env.add(decl_decl)
+                declarator.direct_declarator.identifier.identifier = decl_decl
             else:
-                existing_decl = self.env.lookup(decl_proto.name)
+                existing_decl = self.env.lookup(
+                    declname, scope_index)
 
-                if existing_decl.kind == "fun":
-                    if existing_decl.objtype != decl_proto.objtype:
-                        logging.error("Line {0}: Type \"{1}\" of prototype definition \"{2}\" is conflicting with type \"{3}\" of function \"{4}\".".format(
-                            nodelist.function_declarator.identifier.lineno, decl_proto.type, nodelist.function_declarator.identifier.identifier, existing_decl.type, existing_decl.name))
-                        self.error_count += 1
-                    else:
-                        self.env.add(decl_proto)
-                        nodelist.function_declarator.identifier.identifier = decl_proto
-                elif existing_decl.kind == "proto":
-                    if existing_decl.objtype[1] != decl_proto.objtype[1]:
-                        logging.error("Line {0}: Type inconsintency of same named prototype definition {1}.".format(
-                            nodelist.function_declarator.identifier.lineno, decl_proto.name))
-                        self.error_count += 1
+                # if existing_decl.level > level:
+                    # scope_i = self.env.index(existing_decl)
+                    # self.analyze(nodelist, level, scope_i+1)
+
+                declarator.direct_declarator.identifier.identifier = decl_decl
+
+                if existing_decl.kind == "fun" or existing_decl.kind == "proto":
+                    if level == 0:
+                        self.error("variable-redefines-function", declarator.direct_declarator.identifier.lineno, "{1} is defined as a function.",
+                                   decl_decl.name)
                     else:
-                        self.env.add(decl_proto)
-                        nodelist.function_declarator.identifier.identifier = decl_proto
+                        self.env.add(decl_decl)
+                        # declarator.direct_declarator.identifier.identifier = decl_decl
+
                 elif existing_decl.kind == "var":
-                    if existing_decl.level == 0:
-                        logging.error("Line {0}: Duplicate prototype declaration \"{1}\" with global variable \"{2}\"".format(
-                            nodelist.function_declarator.identifier.lineno, nodelist.function_declarator.identifier.identifier, decl_proto.name))
-                        self.error_count += 1
+                    if existing_decl.level == level:
+                        self.error("duplicate-variable", declarator.direct_declarator.identifier.lineno, "Duplicate declaration of variable - \"{1}\"",
+                                   decl_decl.name)
                     else:
-                        self.env.add(decl_proto)
-                        nodelist.function_declarator.identifier.identifier = decl_proto
+                        self.env.add(decl_decl)
+                        # declarator.direct_declarator.identifier.identifier = decl_decl
 
-            # self.analyze(
-                # nodelist.function_declarator.parameter_type_list, level+1)
+                elif existing_decl.kind == "param":
+                    self.env.add(decl_decl)
+                    self.warning("hidden-parameter", declarator.direct_declarator.identifier.lineno, "Variable declaration \"{1}\" will hide parameter \"{2}\".",
+                                 decl_decl.name, existing_decl.name)
+
+    # プロトタイプ宣言の解析
+    def visit_FunctionPrototype(self, nodelist, level, scope_index):
+        decl_proto = self.analyze_func_prototype(nodelist, level)
+        if self.env.lookup(decl_proto.name) is None:
+            self.env.add(decl_proto)
+            nodelist.function_declarator.identifier.identifier = decl_proto
+        else:
+            existing_decl = self.env.lookup(decl_proto.name)
 
-            param_list = []
+            if existing_decl.kind == "fun":
+                if existing_decl.objtype is not decl_proto.objtype:
+                    self.error("prototype-conflict", nodelist.function_declarator.identifier.lineno, "Type \"{1}\" of prototype definition \"{2}\" is conflicting with type \"{3}\" of function \"{4}\".",
+                               decl_proto.objtype, nodelist.function_declarator.identifier.identifier, existing_decl.objtype, existing_decl.name)
+                else:
+                    self.env.add(decl_proto)
+                    nodelist.function_declarator.identifier.identifier = decl_proto
+            elif existing_decl.kind == "proto":
+                if existing_decl.objtype.result is not decl_proto.objtype.result:
+                    self.error("prototype-mismatch", nodelist.function_declarator.identifier.lineno, "Type inconsintency of same named prototype definition {1}.",
+                               decl_proto.name)
+                else:
+                    self.env.add(decl_proto)
+                    nodelist.function_declarator.identifier.identifier = decl_proto
+            elif existing_decl.kind == "var":
+                if existing_decl.level == 0:
+                    self.error("prototype-redefines-variable", nodelist.function_declarator.identifier.lineno, "Duplicate prototype declaration \"{1}\" with global variable \"{2}\"",
+                               nodelist.function_declarator.identifier.identifier, decl_proto.name)
+                else:
+                    self.env.add(decl_proto)
+                    nodelist.function_declarator.identifier.identifier = decl_proto
 
-            for paramdec in nodelist.function_declarator.parameter_type_list.nodes:
-                decl_param = self.analyze_param_declaration(paramdec, level)
+        # self.analyze(
+            # nodelist.function_declarator.parameter_type_list, level+1)
 
-                # 重複チェック
-                for existing_param in param_list:
-                    if decl_param.name == existing_param.name:
-                        logging.error("Line {0}: Parameter declaration \"{1}\" in function prototype declaration \"{2}\" is duplicated.".format(
-                            paramdec.parameter_declarator.identifier.lineno, decl_param.name, existing_param.name))
-                        self.error_count += 1
-                param_list.append(decl_param)
-                paramdec.parameter_declarator.identifier.identifier = decl_param
+        param_list = []
 
-        elif isinstance(nodelist, ast.FunctionDefinition):
-            decl_funcdef = self.analyze_func_definition(nodelist, level)
+        for paramdec in nodelist.function_declarator.parameter_type_list.nodes:
+            decl_param = self.analyze_param_declaration(paramdec, level)
 
-            if self.env.lookup(nodelist.function_declarator.identifier.identifier) is None:
-                self.env.add(decl_funcdef)
-                nodelist.function_declarator.identifier.identifier = decl_funcdef
-            else:
-                existing_decl = self.env.lookup(decl_funcdef.name)
-
-                if existing_decl.kind == "fun":
-                    logging.error("Line {0}: Function definition \"{1}\" is duplicated with existing function \"{2}\".".format(
-                        nodelist.function_declarator.identifier.lineno, nodelist.function_declarator.identifier.identifier, existing_decl.name))
-                    self.error_count += 1
-
-                elif existing_decl.kind == "proto":
-                    if existing_decl.objtype != decl_funcdef.objtype:
-                        logging.error("Line {0}: Type of function prototype \"{1}\" is \"{2}\" , but type of function definition \"{3}\" is \"{4}\"".format(
-                            nodelist.function_declarator.identifier.lineno, nodelist.function_declarator.identifier.identifier, decl_funcdef.objtype, existing_decl.name, existing_decl.objtype))
-                        self.error_count += 1
-                    else:
-                        self.env.add(decl_funcdef)
-                        nodelist.function_declarator.identifier.identifier = decl_funcdef
+            # 重複チェック
+            for existing_param in param_list:
+                if decl_param.name == existing_param.name:
+                    self.error("duplicate-parameter", paramdec.parameter_declarator.identifier.lineno, "Parameter declaration \"{1}\" in function prototype declaration \"{2}\" is duplicated.",
+                               decl_param.name, existing_param.name)
+            param_list.append(decl_param)
+            paramdec.parameter_declarator.identifier.identifier = decl_param
 
-                elif existing_decl.kind == "var":
-                    if existing_decl.level == 0:
-                        logging.error("Line {0}: Function definition \"{1}\" is duplicated with global variable \"{2}\".".format(
-                            nodelist.function_declarator.identifier.lineno, nodelist.function_declarator.identifier.identifier, existing_decl.name))
-                        self.error_count += 1
-                    else:
-                        self.env.add(decl_funcdef)
-                        nodelist.function_declarator.identifier.identifier = decl_funcdef
-
-            try:
-                func_index = self.env.decl_list.index(decl_funcdef)
-                self.analyze(
-                    nodelist.function_declarator.parameter_type_list, level+1)
-                # self.analyze(nodelist.compound_statement, level+1)
-                self.analyze(nodelist.compound_statement.declaration_list, level+2)
-                self.analyze(nodelist.compound_statement.statement_list, level+2)
-            except ValueError:
-                sys.exit("Failed to get index of function {0} in environment.\n".format(
-                    decl_funcdef.name))
-
-        # 関数定義内のパラメータ解析
-        elif isinstance(nodelist, ast.ParameterTypeList):
-            param_list = []
-
-            for paramdec in nodelist.nodes:
-                decl_param = self.analyze_param_declaration(paramdec, level)
-
-                # 重複チェック
-                for param_into_env in param_list:
-                    if decl_param.name == param_into_env.name:
-                        logging.error("Line {0}: Parameter declaration \"{1}\" is duplicated with other parameter \"{2}\".".format(
-                            paramdec.parameter_declarator.identifier.lineno, decl_param.name, param_into_env.name))
-                        self.error_count += 1
-                param_list.append(decl_param)
-                paramdec.parameter_declarator.identifier.identifier = decl_param
-
-            # 重複のなかったパラメータ宣言を環境に登録
-            for param in param_list:
-                self.env.add(param)
-
-            # 何者？
-            # for paramdec in nodelist.nodes:
-            #     self.analyze(paramdec.parameter_declarator.identifier, level)
-
-        elif isinstance(nodelist, ast.CompoundStatement):
-            comp_level = level + 1
-            for declaration in nodelist.declaration_list.nodes:
-                self.analyze(declaration, level+1, scope_index)
-
-            for statement in nodelist.statement_list.nodes:
-                self.analyze(statement, level+1, scope_index)
-
-            # 後始末
-            for i, envelem in enumerate(self.env.decl_list):
-                if envelem.level == comp_level:
-                    self.env.deleted.append(self.env.decl_list.pop(i))
-
-        elif isinstance(nodelist, ast.DeclarationList):
-            for declaration in nodelist.nodes:
-                self.analyze(declaration, level, scope_index)
-
-        elif isinstance(nodelist, ast.StatementList):
-            for statement in nodelist.nodes:
-                self.analyze(statement, level, scope_index)
-
-        elif isinstance(nodelist, ast.ExpressionStatement):
-            self.analyze(nodelist.expression, level, scope_index)
-
-        elif isinstance(nodelist, ast.FunctionExpression):
-            # print("analyzing function expression nowwwwwwwwwww")
-            # print(nodelist.__dict__)
-            # print(nodelist.identifier.__dict__)
-            # 関数名解析
-            if self.env.lookup(nodelist.identifier.identifier) is None:
-                logging.error("Line {0}: Referencing undeclared function \"{1}\".".format(
-                    nodelist.identifier.lineno, nodelist.identifier.identifier))
-                self.error_count += 1
-            else:
-                existing_decl = self.env.lookup(
-                    nodelist.identifier.identifier)
-                if existing_decl.kind == "fun" or existing_decl.kind == "proto":
-                    nodelist.identifier.identifier = existing_decl
-                elif existing_decl.kind == "proto" and existing_decl.name == "print":
-                    print("found print expression!")
-                    nodelist.identifier.identifier = existing_decl
-                    print(nodelist.__dict__)
-                    print(nodelist.identifier.identifier)
-                elif existing_decl.kind == "var" or existing_decl.kind == "param":
-                    logging.error("Line {0}: Referencing variable {1} as a function.".format(
-                        nodelist.identifier.lineno, nodelist.identifier.identifier))
-                    self.error_count += 1
-
-            # パラメータ解析
-            self.analyze(nodelist.argument_expression)
-
-        elif isinstance(nodelist, ast.ArgumentExpressionList):
-            for argnode in nodelist.nodes:
-                self.analyze(argnode, level, scope_index)
-
-        elif isinstance(nodelist, ast.BinaryOperators):
-            self.analyze(nodelist.left, level, scope_index)
-            self.analyze(nodelist.right, level, scope_index)
-
-            # 式の形の検査
-            if isinstance(nodelist.left, ast.Identifier):
-                binop_left = self.env.lookup(nodelist.left.identifier.name)
-
-                if nodelist.op == "ASSIGN":
-                    if binop_left.kind == "fun" or binop_left.kind == "proto":
-                        logging.error("Line {0}: Left-hand side of assignment should be variable, but \"{1}\" is a {2}.".format(
-                            nodelist.left.lineno, binop_left.name, binop_left.kind))
-                        self.error_count += 1
-                    elif isinstance(binop_left.objtype, tuple) and binop_left.objtype[0] == "array":
-                        logging.error("Line {0}: Variable at left-hand side of assignment must not be array type - about variable \"{1}\".".format(
-                            nodelist.left.lineno, binop_left.name))
-                        self.error_count += 1
-
-        elif isinstance(nodelist, ast.Address):
-            self.analyze(nodelist.expression, level, scope_index)
-
-            # 式の形の検査
-            if isinstance(nodelist.expression.identifier, str):
-                exp = self.env.lookup(
-                    nodelist.expression.identifier)
-            elif isinstance(nodelist.expression.identifier, Decl):
-                exp = self.env.lookup(
-                    nodelist.expression.identifier.name)
-
-            if exp is None:
-                logging.error("Line {0}: Referencing undeclared variable \"{1}\".".format(
-                    nodelist.expression.identifier.lineno, nodelist.expression.identifier.identifier))
-            elif exp.kind != "var":
-                logging.error("Line {0}: Illegal operand type \"{1}\" of pointer expression.".format(
-                    nodelist.expression.identifier.lineno, exp.name))
-                self.error_count += 1
-
-        elif isinstance(nodelist, ast.Pointer):
-            self.analyze(nodelist.expression, level, scope_index)
-
-        elif isinstance(nodelist, ast.Identifier):
-            if isinstance(nodelist.identifier, str):
-                id_name = nodelist.identifier
-            elif isinstance(nodelist.identifier, Decl):
-                id_name = nodelist.identifier.name
-
-            if self.env.lookup(id_name) is None:
-                logging.error("Line {0}: Referencing undeclared variable \"{0}\".".format(
-                    nodelist.lineno, id_name))
-                self.error_count += 1
-            else:
-                existing_decl = self.env.lookup(id_name)
-
-                if existing_decl.kind == "fun":
-                    logging.error("Line {0}: Referencing function \"{1}\" as a variable.".format(
-                        nodelist.lineno, existing_decl.name))
-                    self.error_count += 1
-                elif existing_decl.kind == "var" or existing_decl.kind == "param":
-                    if isinstance(nodelist.identifier, str):
-                        nodelist.identifier = existing_decl
-
-        elif isinstance(nodelist, ast.IfStatement):
-            print("analyzer if statement")
-            print("then: {0}".format(nodelist.then_statement))
-            print("else: {0}".format(nodelist.else_statement))
-            self.analyze(nodelist.expression, level+1, scope_index)
-            self.analyze(nodelist.then_statement, level+1, scope_index)
-            self.analyze(nodelist.else_statement, level+1, scope_index)
-
-        elif isinstance(nodelist, ast.WhileLoop):
-            self.analyze(nodelist.expression, level+1, scope_index)
-            self.analyze(nodelist.statement, level+1, scope_index)
-
-        elif isinstance(nodelist, ast.ForLoop):
-            self.analyze(nodelist.firstexp_statement, level, scope_index)
-            self.analyze(nodelist.whileloop_node, level, scope_index)
-
-        elif isinstance(nodelist, ast.ReturnStatement):
-            self.analyze(nodelist.return_statement, level, scope_index)
+    def visit_FunctionDefinition(self, nodelist, level, scope_index):
+        self.define_function(nodelist, level)
+        yield self.analyze_function_body(nodelist, level)
 
-        return self.env, self.env.deleted
+    # 関数定義の関数名を解析して環境に登録し、関数の宣言を返す
+    def define_function(self, nodelist, level):
+        decl_funcdef = self.analyze_func_definition(nodelist, level)
 
+        if self.env.lookup(nodelist.function_declarator.identifier.identifier) is None:
+            self.env.add(decl_funcdef)
+            nodelist.function_declarator.identifier.identifier = decl_funcdef
+        else:
+            existing_decl = self.env.lookup(decl_funcdef.name)
 
-class TypeChecker(object):
-    """型検査のための関数をまとめたクラス"""
-    def __init__(self, env):
-        self.env = env
+            if existing_decl.kind == "fun":
+                self.error("duplicate-function", nodelist.function_declarator.identifier.lineno, "Function definition \"{1}\" is duplicated with existing function \"{2}\".",
+                           nodelist.function_declarator.identifier.identifier, existing_decl.name)
 
-    # 型検査の本体関数
-    def check_type(self, nodelist):
-        if isinstance(nodelist, ast.NullNode):
-            pass
-
-        # top level
-        elif isinstance(nodelist, ast.ExternalDeclarationList):
-            for node in nodelist.nodes:
-                self.check_type(node)
-
-        # declaration
-        elif isinstance(nodelist, ast.Declaration):
-            self.check_type(nodelist.declarator_list)
-
-        elif isinstance(nodelist, ast.DeclaratorList):
-            for declarator in nodelist.nodes:
-                self.check_type(declarator)
-
-        elif isinstance(nodelist, ast.Declarator):
-            self.check_type(nodelist.direct_declarator)
-
-        elif isinstance(nodelist, ast.DirectDeclarator):
-            pass
-
-        elif isinstance(nodelist, ast.FunctionPrototype):
-            pass
-
-        elif isinstance(nodelist, ast.FunctionDefinition):
-            # 返り値の型の整合性チェック
-            return_exists, func_return = self.check_return(nodelist.compound_statement)
-            if return_exists: # returnがあれば型チェックが発生
-                if not nodelist.type_specifier.type_specifier == "void" and func_return == "void":
-                    logging.error("Line {0}: Function \"{1}\" returns void, but defined as {2} type.".format(
-                        nodelist.function_declarator.identifier.lineno, nodelist.function_declarator.identifier.identifier.name, nodelist.type_specifier.type_specifier))
-                    self.error_count += 1
-
-                elif nodelist.type_specifier.type_specifier == "void" and not func_return == "void":
-                        logging.error("Line {0}: Function \"{1}\" returns {2}, but defined as void type.".format(
-                            nodelist.function_declarator.identifier.lineno, nodelist.function_declarator.identifier.identifier.name, func_return))
-                        self.error_count += 1
-
-            # 関数定義内の複文の型チェック
-            self.check_type(nodelist.compound_statement)
-
-        elif isinstance(nodelist, ast.CompoundStatement):
-            self.check_type(nodelist.declaration_list)
-            self.check_type(nodelist.statement_list)
-
-        elif isinstance(nodelist, ast.DeclarationList):
-            for node in nodelist.nodes:
-                self.check_type(node)
-
-        elif isinstance(nodelist, ast.StatementList):
-            for node in nodelist.nodes:
-                self.check_type(node)
-
-        elif isinstance(nodelist, ast.ExpressionStatement):
-            self.check_type(nodelist.expression)
-
-        elif isinstance(nodelist, ast.IfStatement):
-            if not self.check_type(nodelist.expression) == "int":
-                logging.error(
-                    "Line {0}: Expression of if statement must return int-type.".format(nodelist.lineno))
-                self.error_count += 1
-            self.check_type(nodelist.then_statement)
-            self.check_type(nodelist.else_statement)
-
-        elif isinstance(nodelist, ast.WhileLoop):
-            if not self.check_type(nodelist.expression) == "int":
-                logging.error(
-                    "Line {0}: Expression of while statement must return int-type.".format(nodelist.lineno))
-                self.error_count += 1
-            self.check_type(nodelist.statement)
-
-        elif isinstance(nodelist, ast.ReturnStatement):
-            # print(type(nodelist.return_statement))
-            self.check_type(nodelist.return_statement)
-
-        elif isinstance(nodelist, ast.BinaryOperators):
-            if nodelist.op == "ASSIGN":
-                if self.check_type(nodelist.left) == self.check_type(nodelist.right):
-                    return self.check_type(nodelist.left)
+            elif existing_decl.kind == "proto":
+                if existing_decl.objtype is not decl_funcdef.objtype:
+                    self.error("definition-conflict", nodelist.function_declarator.identifier.lineno, "Type of function prototype \"{1}\" is \"{2}\" , but type of function definition \"{3}\" is \"{4}\"",
+                               nodelist.function_declarator.identifier.identifier, decl_funcdef.objtype, existing_decl.name, existing_decl.objtype)
                 else:
-                    logging.error(
-                        "Line {0}: Type inconsintency between left-hand {1} and right-hand {2} of assign expression.".format(nodelist.lineno, nodelist.left, nodelist.right))
-                    self.error_count += 1
+                    self.env.add(decl_funcdef)
+                    nodelist.function_declarator.identifier.identifier = decl_funcdef
 
-            elif nodelist.op == "AND" or nodelist.op == "OR":
-                if self.check_type(nodelist.left) == "int" and self.check_type(nodelist.right) == "int":
-                    return "int"
+            elif existing_decl.kind == "var":
+                if existing_decl.level == 0:
+                    self.error("function-redefines-variable", nodelist.function_declarator.identifier.lineno, "Function definition \"{1}\" is duplicated with global variable \"{2}\".",
+                               nodelist.function_declarator.identifier.identifier, existing_decl.name)
                 else:
-                    logging.error("Line {0}: Type inconsisntency of logical expression.".format(nodelist.lineno))
-                    # print("Type of logical left: {0}".format(
-                    #     self.check_type(nodelist.left)))
-                    # print("Type of logical right: {0}".format(
-                    #     self.check_type(nodelist.right)))
-                    self.error_count += 1
-
-            elif nodelist.op == "EQUAL" \
-                    or nodelist.op == "NEQ" \
-                    or nodelist.op == "LT" \
-                    or nodelist.op == "GT" \
-                    or nodelist.op == "LEQ" \
-                    or nodelist.op == "GEQ":
-                if self.check_type(nodelist.left) == self.check_type(nodelist.right):
-                    return "int"
-                else:
-                    logging.error(
-                        "Line {0}: Type inconsintency between left-hand {1} and right-hand {2} of relational expression.".format(nodelist.lineno, nodelist.left, nodelist.right))
-                    # print("Type of relational left: {0}".format(
-                    #     self.check_type(nodelist.left)))
-                    # print("Type of relational right: {0}".format(
-                    #     self.check_type(nodelist.right)))
-                    self.error_count += 1
-
-            elif nodelist.op == "PLUS" \
-                    or nodelist.op == "TIMES" \
-                    or nodelist.op == "DIVIDE":
-                if self.check_type(nodelist.left) == self.check_type(nodelist.right) == "int":
-                    return "int"
-                elif self.check_type(nodelist.left) == "int" and self.check_type(nodelist.right) == ("pointer", "int"):
-                    # nodelist.left = ast.BinaryOperators(
-                        # "TIMES", nodelist.left, ast.Number(4))
-                    return ("pointer", "int")
-                elif self.check_type(nodelist.left) == ("pointer", "int") and self.check_type(nodelist.right) == "int":
-                    # nodelist.right = ast.BinaryOperators(
-                        # "TIMES", nodelist.right, ast.Number(4), nodelist.left.lineno)
-                    return ("pointer", "int")
-                else:
-                    logging.error(
-                        "Line {0}: Type inconsintency between left-hand and right-hand of calculation.".format(nodelist.lineno))
-                    self.error_count += 1
-
-            elif nodelist.op == "MINUS":
-                if self.check_type(nodelist.left) == self.check_type(nodelist.right) == "int":
-                    return "int"
-                elif self.check_type(nodelist.left) == ("pointer", "int") and self.check_type(nodelist.right) == "int":
-                    nodelist.right = ast.BinaryOperators(
-                        "TIMES", nodelist.right, ast.Number(4))
-                    return ("pointer", "int")
-                else:
-                    logging.error(
-                        "Line {0}: Type inconsintency between left-hand and right-hand of calculation.".format(nodelist.lineno))
-                    self.error_count += 1
+                    self.env.add(decl_funcdef)
+                    nodelist.function_declarator.identifier.identifier = decl_funcdef
 
-        elif isinstance(nodelist, ast.Address):
-            if self.check_type(nodelist.expression) == "int":
-                return ("pointer", "int")
-            else:
-                logging.error(
-                    "Line {0}: Invalid type for operand of pointer expression.".format(nodelist.lineno))
-                self.error_count += 1
+        if decl_funcdef not in self.env:
+            sys.exit("Failed to get index of function {0} in environment.\n".format(
+                decl_funcdef.name))
+        return decl_funcdef
 
-        elif isinstance(nodelist, ast.Pointer):
-            if self.check_type(nodelist.expression) == ("pointer", "int"):
-                return "int"
-            else:
-                logging.error("Line {0}: Invalid operand of *( ), not a pointer type.".format(nodelist.lineno))
-                self.error_count += 1
-
-        elif isinstance(nodelist, ast.FunctionExpression):
-            if isinstance(nodelist.identifier.identifier, str):
-                funcname = nodelist.identifier.identifier
-            elif isinstance(nodelist.identifier.identifier, Decl):
-                funcname = nodelist.identifier.identifier.name
-
-            func_decl = self.env.lookup(funcname)
-            # 引数の個数チェック
-            if isinstance(nodelist.argument_expression, ast.NullNode):
-                arglen = 0
-            else:
-                arglen = len(nodelist.argument_expression.nodes)
-                if arglen > len(func_decl.objtype[2:]):
-                    logging.error("Line {0}: Too many arguments for function {1}.".format(
-                        nodelist.lineno, func_decl.name))
-                    self.error_count += 1
-                elif arglen < len(func_decl.objtype[2:]):
-                    logging.error("Line {0}: Too few arguments for function {0}.".format(
-                        nodelist.lineno, func_decl.name))
-                    self.error_count += 1
-                else:  # 引数の個数が一致したとき
-                    # 引数の型チェック
-                    # if arglen == 0:
-                        # return func_decl.objtype[1]
-                    # else:
-                    for i, argnode in enumerate(nodelist.argument_expression.nodes):
-                        if not self.check_type(argnode) == func_decl.objtype[2+i]:
-                            ill_type = self.check_type(argnode)
-                            logging.error("Line {0}: Taking {1} type argument for function {2} - correct type is {2}.".format(
-                                nodelist.lineno, ill_type, func_decl.name. func_decl.objtype[2+i]))
-                            self.error_count += 1
-
-                    # print("Type checking of function expression and returning {0}...".format(
-                    #     func_decl.objtype[1]))
-                    return func_decl.objtype[1]
-
-        elif isinstance(nodelist, ast.Identifier):
-            if isinstance(nodelist.identifier, Decl):
-                id_decl = self.env.lookup(nodelist.identifier.name)
-            else:
-                id_decl = self.env.lookup(nodelist.identifier)
-            if id_decl.objtype == "int":
-                return "int"
-            else:
-                return ("pointer", "int")
+    # 関数定義のパラメータと本体の解析(define_function()で関数名を登録した後に行う)
+    def analyze_function_body(self, nodelist, level):
+        if self.checker is not None:
+            self.checker.return_types = []
+        yield self.visit(nodelist.function_declarator.parameter_type_list, level+1, 0)
+        # self.analyze(nodelist.compound_statement, level+1)
+        yield self.visit(nodelist.compound_statement.declaration_list, level+2, 0)
+        yield self.visit(nodelist.compound_statement.statement_list, level+2, 0)
+        if self.checker is not None:
+            self.checker.check_return(nodelist, self.checker.return_types)
+
+    # 関数定義内のパラメータ解析
+    def visit_ParameterTypeList(self, nodelist, level, scope_index):
+        param_list = []
+
+        for paramdec in nodelist.nodes:
+            decl_param = self.analyze_param_declaration(paramdec, level)
+
+            # 重複チェック
+            for param_into_env in param_list:
+                if decl_param.name == param_into_env.name:
+                    self.error("duplicate-parameter", paramdec.parameter_declarator.identifier.lineno, "Parameter declaration \"{1}\" is duplicated with other parameter \"{2}\".",
+                               decl_param.name, param_into_env.name)
+            param_list.append(decl_param)
+            paramdec.parameter_declarator.identifier.identifier = decl_param
+
+        # 重複のなかったパラメータ宣言を環境に登録
+        for param in param_list:
+            self.env.add(param)
+
+        # 何者？
+        # for paramdec in nodelist.nodes:
+        #     self.analyze(paramdec.parameter_declarator.identifier, level)
+
+    def visit_CompoundStatement(self, nodelist, level, scope_index):
+        self.env.enter_scope()
+        for declaration in nodelist.declaration_list.nodes:
+            yield self.visit(declaration, level+1, scope_index)
+
+        for statement in nodelist.statement_list.nodes:
+            yield self.visit(statement, level+1, scope_index)
+
+        # 後始末(この複文で宣言したものを取り除く)
+        self.env.exit_scope()
+
+    def visit_DeclarationList(self, nodelist, level, scope_index):
+        for declaration in nodelist.nodes:
+            yield self.visit(declaration, level, scope_index)
+
+    def visit_StatementList(self, nodelist, level, scope_index):
+        for statement in nodelist.nodes:
+            yield self.visit(statement, level, scope_index)
+
+    def visit_ExpressionStatement(self, nodelist, level, scope_index):
+        yield self.visit(nodelist.expression, level, scope_index)
+
+    def visit_Number(self, nodelist, level, scope_index):
+        if self.checker is not None:
+            return self.checker.check_Number(nodelist)
+
+    def visit_FunctionExpression(self, nodelist, level, scope_index):
+        # print("analyzing function expression nowwwwwwwwwww")
+        # print(nodelist.__dict__)
+        # print(nodelist.identifier.__dict__)
+        self.bind_function(nodelist)
+
+        # パラメータ解析
+        arg_types = yield self.visit(nodelist.argument_expression, 0, 0)
+        if self.checker is not None:
+            yield visitor.Return(self.checker.typed(nodelist, self.checker.call_type, arg_types or []))
+
+    # 関数呼び出しの関数名解析
+    def bind_function(self, nodelist):
+        if self.env.lookup(nodelist.identifier.identifier) is None:
+            self.error("undeclared-function", nodelist.identifier.lineno, "Referencing undeclared function \"{1}\".",
+                       nodelist.identifier.identifier)
+        else:
+            existing_decl = self.env.lookup(
+                nodelist.identifier.identifier)
+            if existing_decl.kind == "fun" or existing_decl.kind == "proto":
+                nodelist.identifier.identifier = existing_decl
+            elif existing_decl.kind == "proto" and existing_decl.name == "print":
+                nodelist.identifier.identifier = existing_decl
+                if TRACE.debug:
+                    TRACE.emit(trace.DEBUG, "print expression", fields=dict(ast.iter_fields(nodelist)),
+                               decl=existing_decl)
+            elif existing_decl.kind == "var" or existing_decl.kind == "param":
+                self.error("variable-as-function", nodelist.identifier.lineno, "Referencing variable {1} as a function.",
+                           nodelist.identifier.identifier)
+
+    def visit_ArgumentExpressionList(self, nodelist, level, scope_index):
+        arg_types = []
+        for argnode in nodelist.nodes:
+            arg_types.append((yield self.visit(argnode, level, scope_index)))
+        yield visitor.Return(arg_types)
+
+    def visit_BinaryOperators(self, nodelist, level, scope_index):
+        left = yield self.visit(nodelist.left, level, scope_index)
+        right = yield self.visit(nodelist.right, level, scope_index)
+        self.check_assign_target(nodelist)
+
+        if self.checker is not None:
+            yield visitor.Return(self.checker.typed(nodelist, self.checker.binary_type, left, right))
+
+    # 二項演算の式の形の検査(代入の左辺)
+    def check_assign_target(self, nodelist):
+        if isinstance(nodelist.left, ast.Identifier):
+            binop_left = self.env.lookup(nodelist.left.identifier.name)
 
-        elif isinstance(nodelist, ast.Number):
-            return "int"
+            if nodelist.op == "ASSIGN":
+                if binop_left.kind == "fun" or binop_left.kind == "proto":
+                    self.error("assign-to-function", nodelist.left.lineno, "Left-hand side of assignment should be variable, but \"{1}\" is a {2}.",
+                               binop_left.name, binop_left.kind)
+                elif binop_left.objtype.is_array:
+                    self.error("assign-to-array", nodelist.left.lineno, "Variable at left-hand side of assignment must not be array type - about variable \"{1}\".",
+                               binop_left.name)
+
+    def visit_Address(self, nodelist, level, scope_index):
+        exptype = yield self.visit(nodelist.expression, level, scope_index)
+        self.check_address_operand(nodelist)
+
+        if self.checker is not None:
+            yield visitor.Return(self.checker.typed(nodelist, self.checker.address_type, exptype))
+
+    # &( )の式の形の検査(被演算子は宣言された変数)
+    def check_address_operand(self, nodelist):
+        if isinstance(nodelist.expression.identifier, str):
+            exp = self.env.lookup(
+                nodelist.expression.identifier)
+        elif isinstance(nodelist.expression.identifier, Decl):
+            exp = self.env.lookup(
+                nodelist.expression.identifier.name)
+
+        if exp is None:
+            self.error("undeclared-variable", nodelist.expression.identifier.lineno, "Referencing undeclared variable \"{1}\".",
+                       nodelist.expression.identifier.identifier)
+        elif exp.kind != "var":
+            self.error("invalid-address-operand", nodelist.expression.identifier.lineno, "Illegal operand type \"{1}\" of pointer expression.",
+                       exp.name)
+
+    def visit_Pointer(self, nodelist, level, scope_index):
+        exptype = yield self.visit(nodelist.expression, level, scope_index)
+        if self.checker is not None:
+            yield visitor.Return(self.checker.typed(nodelist, self.checker.pointer_type, exptype))
+
+    def visit_Identifier(self, nodelist, level, scope_index):
+        if isinstance(nodelist.identifier, str):
+            id_name = nodelist.identifier
+        elif isinstance(nodelist.identifier, Decl):
+            id_name = nodelist.identifier.name
+
+        if self.env.lookup(id_name) is None:
+            self.error("undeclared-variable", nodelist.lineno, "Referencing undeclared variable \"{1}\".",
+                       id_name)
+        else:
+            existing_decl = self.env.lookup(id_name)
+
+            if existing_decl.kind == "fun":
+                self.error("function-as-variable", nodelist.lineno, "Referencing function \"{1}\" as a variable.",
+                           existing_decl.name)
+            elif existing_decl.kind == "var" or existing_decl.kind == "param":
+                if isinstance(nodelist.identifier, str):
+                    nodelist.identifier = existing_decl
+
+        if self.checker is not None:
+            return self.checker.check_Identifier(nodelist)
+
+    def visit_IfStatement(self, nodelist, level, scope_index):
+        if TRACE.debug:
+            TRACE.emit(trace.DEBUG, "if statement", then=nodelist.then_statement,
+                       else_=nodelist.else_statement)
+        exptype = yield self.visit(nodelist.expression, level+1, scope_index)
+        if self.checker is not None:
+            self.checker.condition_type(nodelist, exptype, "if")
+        yield self.visit(nodelist.then_statement, level+1, scope_index)
+        yield self.visit(nodelist.else_statement, level+1, scope_index)
+
+    def visit_WhileLoop(self, nodelist, level, scope_index):
+        exptype = yield self.visit(nodelist.expression, level+1, scope_index)
+        if self.checker is not None:
+            self.checker.condition_type(nodelist, exptype, "while")
+        yield self.visit(nodelist.statement, level+1, scope_index)
+
+    def visit_ForLoop(self, nodelist, level, scope_index):
+        yield self.visit(nodelist.firstexp_statement, level, scope_index)
+        yield self.visit(nodelist.whileloop_node, level, scope_index)
+
+    def visit_ReturnStatement(self, nodelist, level, scope_index):
+        exptype = yield self.visit(nodelist.return_statement, level, scope_index)
+        if self.checker is not None:
+            self.checker.add_return(nodelist, exptype)
+
+
+def expression_type(node, default=None):
+    """型検査で式のノードnodeに記録した型を返す(型検査をしていないか、型が
+       求まらなかったときはdefaultを返す)"""
+    exptype = getattr(node, "exptype", None)
+    if exptype is None:
+        return default
+    return exptype
+
+
+def scale_offset(node):
+    """ポインタから整数を引く式nodeの右辺を、右辺を4倍する式に書き換える"""
+    size = ast.Number(4)
+    size.exptype = typetable.INT
+    node.right = ast.BinaryOperators("TIMES", node.right, size, node.lineno)
+    node.right.exptype = typetable.INT
+
+
+def clear_analysis(node):
+    """意味解析と型検査でnode以下に書き込んだもの(名前に結び付けた宣言、式の型、
+       ポインタから整数を引く式の書き換え)を取り除き、解析し直せるようにする"""
+    stack = [node]
+    visited = set()
+    while stack:
+        node = stack.pop()
+        if id(node) in visited:
+            continue
+        visited.add(id(node))
+        if isinstance(node, ast.Identifier) and isinstance(node.identifier, Decl):
+            node.identifier = node.identifier.name
+        if node.exptype is not None:
+            # MINUSの式の型がポインタになるのは、右辺を4倍する式に書き換えたときだけ
+            if isinstance(node, ast.BinaryOperators) and node.op == "MINUS" \
+                    and node.exptype is typetable.INT_POINTER:
+                node.right = node.right.left
+            node.exptype = None
+        if isinstance(node, ast.NodeList):
+            stack.extend(node.nodes)
+        else:
+            stack.extend(value for _, value in ast.iter_fields(node) if isinstance(value, ast.Node))
 
-        # return self.error_count, self.warning_count
 
-    # 関数の返り値の型を返す関数
-    def check_return(self, stmtnode):
-        return_exists = False
-        return_strtype = "void"
-        if isinstance(stmtnode, ast.ReturnStatement):
-            return_exists = True
-            if not isinstance(stmtnode.return_statement, ast.NullNode):
-                # voidじゃない
-                return_strtype = self.check_type(stmtnode.return_statement)
+class TypeChecker(object):
+    """型検査のための関数をまとめたクラス
 
-        elif isinstance(stmtnode, ast.CompoundStatement):
-            for stmt in stmtnode.statement_list.nodes:
-                self.check_return(stmt)
+       式の型の規則は、子の式の型を受け取るメソッド(binary_type()など)にまとめてある。
+       Analyzer(tree, check_types=True)は、名前解析と同じ走査の中でこれらのメソッドを
+       呼んで型検査を行う。求めた式の型はノードのexptypeに記録され、後のパスからも
+       expression_type()で読める。"""
+    def __init__(self, env, diagnostics=None):
+        self.env = env
+        self.diagnostics = diagnostics if diagnostics is not None else dg.Diagnostics()
+        self.error_count = 0
+        # 検査中の関数定義の本体にあるreturn文の型のリスト
+        self.return_types = []
 
-        elif isinstance(stmtnode, ast.IfStatement):
-            self.check_return(stmtnode.then_statement)
-            self.check_return(stmtnode.else_statement)
+    # 型検査の本体関数(ノードのクラスに応じてcheck_<クラス名>を呼び出す)
+    # 式のノードでは式の型を返す。型が記録された式のノードは、部分木をたどらずにその型を返す
+    # 子を持つノードのメソッドはジェネレータで、check_type()がvisitor.run()で実行する
+    check = visitor.dispatcher("check_", memo="exptype")
+
+    def check_type(self, nodelist):
+        return visitor.run(self.check(nodelist))
+
+    # 診断メッセージの記録(Analyzer.error()と同じ)
+    def error(self, code, lineno, message, *args):
+        self.error_count += 1
+        self.diagnostics.error(code, lineno, ("Line {0}: " + message).format(lineno, *args))
+
+    def check_NullNode(self, nodelist):
+        pass
+
+    # top level
+    def check_ExternalDeclarationList(self, nodelist):
+        nodelist.resolve_lines()
+        for node in nodelist.nodes:
+            yield self.check(node)
+
+    # declaration
+    def check_Declaration(self, nodelist):
+        yield self.check(nodelist.declarator_list)
+
+    def check_DeclaratorList(self, nodelist):
+        for declarator in nodelist.nodes:
+            yield self.check(declarator)
+
+    def check_Declarator(self, nodelist):
+        yield self.check(nodelist.direct_declarator)
+
+    def check_DirectDeclarator(self, nodelist):
+        pass
+
+    def check_FunctionPrototype(self, nodelist):
+        pass
+
+    def check_FunctionDefinition(self, nodelist):
+        # 関数定義内の複文の型チェック(return文の型はreturn_typesに集まる)
+        self.return_types = []
+        yield self.check(nodelist.compound_statement)
+
+        # 返り値の型の整合性チェック
+        self.check_return(nodelist, self.return_types)
+
+    def check_CompoundStatement(self, nodelist):
+        yield self.check(nodelist.declaration_list)
+        yield self.check(nodelist.statement_list)
+
+    def check_DeclarationList(self, nodelist):
+        for node in nodelist.nodes:
+            yield self.check(node)
+
+    def check_StatementList(self, nodelist):
+        for node in nodelist.nodes:
+            yield self.check(node)
+
+    def check_ExpressionStatement(self, nodelist):
+        yield self.check(nodelist.expression)
+
+    def check_IfStatement(self, nodelist):
+        self.condition_type(nodelist, (yield self.check(nodelist.expression)), "if")
+        yield self.check(nodelist.then_statement)
+        yield self.check(nodelist.else_statement)
+
+    def check_WhileLoop(self, nodelist):
+        self.condition_type(nodelist, (yield self.check(nodelist.expression)), "while")
+        yield self.check(nodelist.statement)
+
+    def check_ForLoop(self, nodelist):
+        yield self.check(nodelist.firstexp_statement)
+        yield self.check(nodelist.whileloop_node)
+
+    def check_ReturnStatement(self, nodelist):
+        # print(type(nodelist.return_statement))
+        self.add_return(nodelist, (yield self.check(nodelist.return_statement)))
+
+    # 式のノードのメソッドは、求めた型をノードのexptypeに記録してから返す
+    def check_BinaryOperators(self, nodelist):
+        left = yield self.check(nodelist.left)
+        right = yield self.check(nodelist.right)
+        nodelist.exptype = exptype = self.binary_type(nodelist, left, right)
+        yield visitor.Return(exptype)
+
+    def check_Address(self, nodelist):
+        operand = yield self.check(nodelist.expression)
+        nodelist.exptype = exptype = self.address_type(nodelist, operand)
+        yield visitor.Return(exptype)
+
+    def check_Pointer(self, nodelist):
+        operand = yield self.check(nodelist.expression)
+        nodelist.exptype = exptype = self.pointer_type(nodelist, operand)
+        yield visitor.Return(exptype)
+
+    def check_FunctionExpression(self, nodelist):
+        arg_types = []
+        if not isinstance(nodelist.argument_expression, ast.NullNode):
+            for argnode in nodelist.argument_expression.nodes:
+                arg_types.append((yield self.check(argnode)))
+        nodelist.exptype = exptype = self.call_type(nodelist, arg_types)
+        yield visitor.Return(exptype)
+
+    def check_Identifier(self, nodelist):
+        id_decl = self.lookup(nodelist.identifier)
+        if id_decl is None:
+            exptype = None
+        elif id_decl.objtype is typetable.INT:
+            exptype = typetable.INT
+        else:
+            exptype = typetable.INT_POINTER
+        nodelist.exptype = exptype
+        return exptype
+
+    def check_Number(self, nodelist):
+        nodelist.exptype = typetable.INT
+        return typetable.INT
+
+    # 記録がなければ規則ruleで式の型を求めてノードに記録し、その型を返す
+    # (子の型を別に求めている、名前解析と同じ走査での型検査で使う)
+    def typed(self, nodelist, rule, *args):
+        exptype = nodelist.exptype
+        if exptype is None:
+            nodelist.exptype = exptype = rule(nodelist, *args)
+        return exptype
+
+    # 名前の宣言を返す(名前解析で結び付けた宣言があればそれを使う)
+    def lookup(self, identifier):
+        if isinstance(identifier, Decl):
+            return identifier
+        return self.env.lookup(identifier)
+
+    # if文、while文の条件式の型の検査
+    def condition_type(self, nodelist, exptype, statement):
+        if exptype is not typetable.INT:
+            self.error("condition-type", nodelist.lineno, "Expression of {1} statement must return int-type.",
+                       statement)
+
+    # 二項演算の式の型を左辺と右辺の型から求める
+    def binary_type(self, nodelist, left, right):
+        if nodelist.op == "ASSIGN":
+            if left is right:
+                return left
+            else:
+                self.error("assign-type", nodelist.lineno, "Type inconsintency between left-hand {1} and right-hand {2} of assign expression.",
+                           nodelist.left, nodelist.right)
 
-        elif isinstance(stmtnode, ast.WhileLoop):
-            self.check_return(stmtnode.statement)
+        elif nodelist.op == "AND" or nodelist.op == "OR":
+            if left is typetable.INT and right is typetable.INT:
+                return typetable.INT
+            else:
+                self.error("logical-type", nodelist.lineno, "Type inconsisntency of logical expression.")
+
+        elif nodelist.op == "EQUAL" \
+                or nodelist.op == "NEQ" \
+                or nodelist.op == "LT" \
+                or nodelist.op == "GT" \
+                or nodelist.op == "LEQ" \
+                or nodelist.op == "GEQ":
+            if left is right:
+                return typetable.INT
+            else:
+                self.error("relational-type", nodelist.lineno, "Type inconsintency between left-hand {1} and right-hand {2} of relational expression.",
+                           nodelist.left, nodelist.right)
+
+        elif nodelist.op == "PLUS" \
+                or nodelist.op == "TIMES" \
+                or nodelist.op == "DIVIDE":
+            if left is right is typetable.INT:
+                return typetable.INT
+            elif left is typetable.INT and right is typetable.INT_POINTER:
+                # nodelist.left = ast.BinaryOperators(
+                    # "TIMES", nodelist.left, ast.Number(4))
+                return typetable.INT_POINTER
+            elif left is typetable.INT_POINTER and right is typetable.INT:
+                # nodelist.right = ast.BinaryOperators(
+                    # "TIMES", nodelist.right, ast.Number(4), nodelist.left.lineno)
+                return typetable.INT_POINTER
+            else:
+                self.error("arithmetic-type", nodelist.lineno, "Type inconsintency between left-hand and right-hand of calculation.")
+
+        elif nodelist.op == "MINUS":
+            if left is right is typetable.INT:
+                return typetable.INT
+            elif left is typetable.INT_POINTER and right is typetable.INT:
+                scale_offset(nodelist)
+                return typetable.INT_POINTER
+            else:
+                self.error("arithmetic-type", nodelist.lineno, "Type inconsintency between left-hand and right-hand of calculation.")
 
-        elif isinstance(stmtnode, ast.StatementList):
-            for stmt in stmtnode.nodes:
-                self.check_return(stmt)
+    # &( )の式の型を被演算子の型から求める
+    def address_type(self, nodelist, exptype):
+        if exptype is typetable.INT:
+            return typetable.INT_POINTER
+        else:
+            self.error("address-type", nodelist.lineno, "Invalid type for operand of pointer expression.")
 
-        return return_exists, return_strtype
+    # *( )の式の型を被演算子の型から求める
+    def pointer_type(self, nodelist, exptype):
+        if exptype is typetable.INT_POINTER:
+            return typetable.INT
+        else:
+            self.error("dereference-type", nodelist.lineno, "Invalid operand of *( ), not a pointer type.")
+
+    # 関数呼び出しの式の型を引数の型のリストから求める
+    def call_type(self, nodelist, arg_types):
+        func_decl = self.lookup(nodelist.identifier.identifier)
+        if func_decl is None:
+            return None
+        # 引数の個数チェック
+        if isinstance(nodelist.argument_expression, ast.NullNode):
+            arglen = 0
+        else:
+            arglen = len(nodelist.argument_expression.nodes)
+            if arglen > len(func_decl.objtype.params):
+                self.error("too-many-arguments", nodelist.lineno, "Too many arguments for function {1}.",
+                           func_decl.name)
+            elif arglen < len(func_decl.objtype.params):
+                self.error("too-few-arguments", nodelist.lineno, "Too few arguments for function {1}.",
+                           func_decl.name)
+            else:  # 引数の個数が一致したとき
+                # 引数の型チェック
+                for i, ill_type in enumerate(arg_types):
+                    if ill_type is not func_decl.objtype.params[i]:
+                        self.error("argument-type", nodelist.lineno, "Taking {1} type argument for function {2} - correct type is {3}.",
+                                   ill_type, func_decl.name, func_decl.objtype.params[i])
+
+                return func_decl.objtype.result
+
+    # return文の型を記録する(式のないreturn文はvoid)
+    def add_return(self, nodelist, exptype):
+        if isinstance(nodelist.return_statement, ast.NullNode):
+            exptype = typetable.VOID
+        self.return_types.append(exptype)
+
+    # 関数定義の返り値の型と、本体のreturn文の型の整合性を検査する
+    def check_return(self, funcdef_node, return_types):
+        type_specifier = funcdef_node.type_specifier.type_specifier
+        for func_return in return_types:  # returnがあれば型チェックが発生
+            if not type_specifier == "void" and func_return is typetable.VOID:
+                self.error("missing-return-value", funcdef_node.function_declarator.identifier.lineno, "Function \"{1}\" returns void, but defined as {2} type.",
+                           funcdef_node.function_declarator.identifier.identifier.name, type_specifier)
+                break
+
+            elif type_specifier == "void" and func_return is not typetable.VOID:
+                self.error("void-return-value", funcdef_node.function_declarator.identifier.lineno, "Function \"{1}\" returns {2}, but defined as void type.",
+                           funcdef_node.function_declarator.identifier.identifier.name, func_return)
+                break
 
 
 class ErrorManager(object):
@@ -0,0 +1,242 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import logging
+from unittest import TestCase
+import nose
+import ast
+import samplegen
+import typetable
+import semantic_analyzer as sa
+from parser import Parser
+
+
+class EnvironmentTest(TestCase):
+
+    def setUp(self):
+        self.env = sa.Environment()
+
+    def tearDown(self):
+        pass
+
+    def test_shadowing(self):
+        """同じ名前の宣言は後に登録したものが見え、有効範囲を出ると前のものに戻るかのテスト"""
+        outer = sa.Decl("a", 0, "var", "int")
+        inner = sa.Decl("a", 3, "var", "int")
+        self.env.add(outer)
+        self.env.enter_scope()
+        self.env.add(inner)
+
+        nose.tools.ok_(self.env.lookup("a") is inner)
+        nose.tools.eq_([inner], self.env.exit_scope())
+        nose.tools.ok_(self.env.lookup("a") is outer)
+        nose.tools.eq_(None, self.env.lookup("b"))
+        nose.tools.eq_([inner], self.env.deleted)
+
+    def test_decl_list(self):
+        """decl_listが有効な宣言を登録した順に返すかのテスト"""
+        decls = [sa.Decl(name, 0, "var", "int") for name in ("a", "b", "c", "d")]
+        self.env.add(decls[0])
+        self.env.enter_scope()
+        self.env.add(decls[1])
+        self.env.add(decls[2])
+        self.env.exit_scope()
+        self.env.add(decls[3])
+
+        nose.tools.eq_([decls[0], decls[3]], self.env.decl_list)
+        nose.tools.ok_(decls[3] in self.env)
+        nose.tools.ok_(decls[1] not in self.env)
+
+
+class AnalyzerTest(TestCase):
+
+    def setUp(self):
+        self.parser = Parser()
+        self.parser.build()
+
+    def tearDown(self):
+        pass
+
+    def analyze(self, data):
+        tree = self.parser.parse(data)
+        analyzer = sa.Analyzer(tree)
+        env, deleted = analyzer.analyze(tree)
+        return analyzer, env, deleted
+
+    def test_block_scope(self):
+        """複文で宣言したものが(2つ以上あっても)複文を出るとすべて取り除かれるかのテスト"""
+        analyzer, env, deleted = self.analyze(
+            "int main() { int a; { int b; int c; int d; } return a; }")
+
+        nose.tools.eq_(0, analyzer.error_count)
+        nose.tools.eq_(["main", "a"], [decl.name for decl in env.decl_list])
+        nose.tools.eq_(["b", "c", "d"], [decl.name for decl in deleted])
+
+    def test_redeclaration(self):
+        """同じ有効範囲での再宣言はエラーになり、内側の有効範囲では隠すだけになるかのテスト"""
+        analyzer, _, _ = self.analyze("int main() { int a; int a; return a; }")
+        nose.tools.eq_(1, analyzer.error_count)
+
+        analyzer, _, _ = self.analyze("int a; int main() { int a; { int a; a = 1; } return a; }")
+        nose.tools.eq_(0, analyzer.error_count)
+
+    def test_many_globals(self):
+        """グローバル変数と関数の多いプログラムで、すべての参照が宣言に解決されるかのテスト"""
+        data = samplegen.generate_wide_program(500, 200)
+        analyzer, env, _ = self.analyze(data)
+
+        nose.tools.eq_(0, analyzer.error_count)
+        nose.tools.eq_(500 + 200 + 1, len([decl for decl in env.decl_list if decl.level == 0]))
+
+
+class MessageHandler(logging.Handler):
+
+    """ログに出力されたメッセージを集めるハンドラ"""
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class FusedTest(TestCase):
+
+    def setUp(self):
+        self.parser = Parser()
+        self.parser.build()
+        self.handler = MessageHandler()
+        logging.getLogger().addHandler(self.handler)
+
+    def tearDown(self):
+        logging.getLogger().removeHandler(self.handler)
+
+    def two_pass(self, data):
+        """名前解析と型検査を別々の走査で行い、エラーの数とメッセージを返す"""
+        self.handler.messages = []
+        tree = self.parser.parse(data)
+        analyzer = sa.Analyzer(tree)
+        env, _ = analyzer.analyze(tree)
+        checker = sa.TypeChecker(env)
+        checker.check_type(tree)
+        return tree, analyzer.error_count + checker.error_count, sorted(self.handler.messages)
+
+    def fused(self, data):
+        """名前解析と型検査を1回の走査で行い、エラーの数とメッセージを返す"""
+        self.handler.messages = []
+        tree = self.parser.parse(data)
+        analyzer = sa.Analyzer(tree, check_types=True)
+        analyzer.analyze(tree)
+        return tree, analyzer.error_count + analyzer.checker.error_count, sorted(self.handler.messages)
+
+    def test_same_diagnostics(self):
+        """1回の走査でも、別々の走査と同じエラーが報告されるかのテスト"""
+        data = """int print(int x);
+int g;
+int f(int *p) { int a; a = *p; if (p) a = 1; return a; }
+void h(int a) { *a; print(g, 1); return a; }
+int k(int a) { if (a) return; return a; }
+int main() { int x; f(&g, 2); f(x); return 0; }
+"""
+        _, errors, messages = self.two_pass(data)
+        _, fused_errors, fused_messages = self.fused(data)
+
+        nose.tools.eq_(7, errors)
+        nose.tools.eq_(errors, fused_errors)
+        nose.tools.eq_(messages, fused_messages)
+
+    def test_return_type(self):
+        """関数の返り値の型とreturn文の型の食い違いが(入れ子の文の中でも)検出されるかのテスト"""
+        _, errors, messages = self.fused(
+            "int g; void f() { while (g) { if (g) return g; } } int main() { return 0; }")
+        nose.tools.eq_(1, errors)
+        nose.tools.eq_(['Line 1: Function "f" returns int, but defined as void type.'], messages)
+
+    def test_same_annotation(self):
+        """1回の走査でも、式の名前に別々の走査と同じ宣言が結び付けられるかのテスト"""
+        data = samplegen.generate_program(5, 30, seed=1)
+        tree, errors, _ = self.two_pass(data)
+        fused_tree, fused_errors, _ = self.fused(data)
+
+        nose.tools.eq_(errors, fused_errors)
+        nose.tools.eq_(declarations(tree), declarations(fused_tree))
+
+    def test_pointer_minus(self):
+        """ポインタから整数を引く式で、整数が1回だけ4倍されるかのテスト"""
+        tree, errors, _ = self.fused("int main() { int *p; int a; p = p - a; return 0; }")
+        statement = tree.nodes[0].compound_statement.statement_list.nodes[0]
+
+        nose.tools.eq_(0, errors)
+        nose.tools.eq_("TIMES", statement.expression.right.right.op)
+        nose.tools.eq_("a", statement.expression.right.right.left.identifier.name)
+
+
+class CountingChecker(sa.TypeChecker):
+
+    """check_Identifierが呼ばれた回数を数える型検査器"""
+
+    def __init__(self, env):
+        sa.TypeChecker.__init__(self, env)
+        self.identifiers = 0
+
+    def check_Identifier(self, nodelist):
+        self.identifiers += 1
+        return sa.TypeChecker.check_Identifier(self, nodelist)
+
+
+class ExpressionTypeTest(TestCase):
+
+    def setUp(self):
+        self.parser = Parser()
+        self.parser.build()
+
+    def tearDown(self):
+        pass
+
+    def test_annotation(self):
+        """型検査で式のノードに型が記録されるかのテスト"""
+        tree = self.parser.parse("int main() { int *p; int a; a = *p + 1; p = &a; return a; }")
+        env, _ = sa.Analyzer(tree).analyze(tree)
+        sa.TypeChecker(env).check_type(tree)
+        statements = tree.nodes[0].compound_statement.statement_list.nodes
+
+        plus = statements[0].expression.right
+        nose.tools.ok_(plus.exptype is typetable.INT)
+        nose.tools.ok_(plus.left.exptype is typetable.INT)
+        nose.tools.ok_(plus.left.expression.exptype is typetable.INT_POINTER)
+        nose.tools.ok_(statements[1].expression.right.exptype is typetable.INT_POINTER)
+        nose.tools.ok_(sa.expression_type(statements[2].return_statement) is typetable.INT)
+        nose.tools.eq_("default", sa.expression_type(ast.Number(1), "default"))
+
+    def test_no_retyping(self):
+        """共有された部分木や型検査済みの構文木の式を型検査し直さないかのテスト"""
+        tree = self.parser.parse("int main() { int a; a += 1; return a; }")
+        env, _ = sa.Analyzer(tree).analyze(tree)
+
+        checker = CountingChecker(env)
+        checker.check_type(tree)
+        nose.tools.eq_(2, checker.identifiers)
+
+        checker = CountingChecker(env)
+        checker.check_type(tree)
+        nose.tools.eq_(0, checker.identifiers)
+
+
+def declarations(node):
+    """構文木の名前に結び付けられた宣言の(名前, 型)を出現順に並べたリスト"""
+    result = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, sa.Decl):
+            result.append((node.name, node.objtype))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, ast.Node):
+            stack.extend(reversed([value for _, value in ast.iter_fields(node)]))
+    return result
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])
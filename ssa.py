@@ -0,0 +1,632 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""制御フローグラフ(cfgモジュール)の中間命令をSSA形式にし、元に戻すモジュール
+
+   SSA形式では各変数への代入ごとに新しい版(Decl)を作り、どの変数もただ1か所で
+   代入されるようにする。複数のブロックから値が合流するところには、ブロックの
+   先頭にφ関数(Phi)を置く。定数伝播、値番号付け、不要コードの削除などは
+   SSA形式の上ではそれぞれ1回の走査で書ける。
+
+   - SSA形式にする変数(候補)は、一時変数(_tN)と関数のローカル変数・引数のうち
+     配列でなく、アドレスを取る式(AddressExpression)などこのモジュールが
+     読み書きを解釈できない文に現れないもの。大域変数は関数呼び出しで
+     書き換えられることがあるので候補にしない
+   - construct()は支配木と支配辺境を求め(Cooper, Harvey, Kennedyの反復法)、
+     ブロックをまたいで使われる変数(semi-pruned形式)にだけφ関数を置き、
+     支配木をたどって変数の名前を付け替える。付け替えた文は新しく作り、
+     元の中間命令の木は書き換えない。最初の版は元のDecl自身で、関数の入口での
+     値(引数の値や代入前の値)を表す
+   - destruct()はφ関数を、移ってくる元のブロックの最後と、φ関数のあったブロックの
+     先頭に置くコピー(LetStatement)に置き換え(SreedharのMethod I)、生存区間が
+     重ならない同じ変数の版をまとめて1つの変数にする(コピーの合併)。まとめた
+     変数には元のDeclを使い、まとめられずに残った版にだけ新しいDeclを作る
+   - transform()は関数定義の本体をSSA形式にし、与えられた変換を行ってから元に戻し、
+     結果の制御フローグラフを関数定義のgraphに置く。コード生成はbodyの代わりに
+     graphを使い、新しく作った変数の宣言はbodyのdeclsに加えるので、
+     assign_addressがそのままアドレスを割り当てる
+
+   入れ子の深い文でもPythonのスタックが深くならないように、支配木の走査は
+   明示的なスタックで行う。どこからも移ってこないブロックの文は変換しない。"""
+
+import cfg
+import intermed_code as ic
+import semantic_analyzer as sa
+import gcpause
+
+# 候補になる変数の種類
+SSA_KINDS = ("var", "param", "temp")
+
+# 文のクラスごとに、代入する変数の属性と読む変数の属性の名前
+# (ここにないクラスの文は解釈できない文として扱い、その文に現れる変数を候補にしない)
+STATEMENT_OPERANDS = {
+    ic.EmptyStatement: (None, ()),
+    ic.ReadStatement: ("dest", ("src",)),
+    ic.WriteStatement: (None, ("dest", "src")),
+    ic.PrintStatement: (None, ("var",)),
+    ic.CallStatement: ("dest", ()),
+}
+
+# LetStatementの式のクラスごとに、読む変数の属性の名前
+EXPRESSION_OPERANDS = {
+    ic.IntExpression: (),
+    ic.VarExpression: ("var",),
+    ic.ArithmeticOperation: ("var_left", "var_right"),
+    ic.RelationalExpression: ("var_left", "var_right"),
+}
+
+
+class Phi(ic.Fields):
+
+    """φ関数 var = φ(args)
+       argsはブロックのpredsと同じ順に並べた、それぞれの元のブロックから来る版"""
+
+    __slots__ = _fields = ("var", "args")
+
+    def __init__(self, var, args):
+        self.var = var
+        self.args = args
+
+
+def operands(stmt):
+    """文stmtが代入する変数(なければNone)と読む変数のリストの組を返す
+       解釈できない文ならNoneを返す"""
+    cls = type(stmt)
+    if cls is ic.LetStatement:
+        names = EXPRESSION_OPERANDS.get(type(stmt.exp))
+        if names is None:
+            return None
+        exp = stmt.exp
+        return stmt.var, [getattr(exp, name) for name in names]
+    entry = STATEMENT_OPERANDS.get(cls)
+    if entry is None:
+        return None
+    dest, names = entry
+    reads = [getattr(stmt, name) for name in names]
+    if cls is ic.CallStatement:
+        reads = list(stmt.variables)
+    reads = [var for var in reads if isinstance(var, sa.Decl)]
+    return (getattr(stmt, dest) if dest else None), reads
+
+
+def mentioned(stmt):
+    """文stmt(とその式)の属性に現れるDeclのリストを返す"""
+    found = []
+    for item in [stmt] + [getattr(stmt, name) for name in type(stmt)._fields]:
+        if isinstance(item, ic.Fields):
+            values = [getattr(item, name) for name in type(item)._fields]
+        elif isinstance(item, list):
+            values = item
+        else:
+            values = [item]
+        found.extend(value for value in values if isinstance(value, sa.Decl))
+    return found
+
+
+def rewrite(stmt, read, write):
+    """文stmtの読む変数をread(var)、代入する変数をwrite(var)に置き換えた新しい文を返す
+       (stmtは解釈できる文であること)"""
+    cls = type(stmt)
+    if cls is ic.LetStatement:
+        exp = stmt.exp
+        expcls = type(exp)
+        if expcls is ic.VarExpression:
+            exp = ic.VarExpression(read(exp.var))
+        elif expcls is not ic.IntExpression:
+            exp = expcls(exp.op, read(exp.var_left), read(exp.var_right))
+        return ic.LetStatement(write(stmt.var), exp)
+    elif cls is ic.ReadStatement:
+        src = read(stmt.src)
+        return ic.ReadStatement(write(stmt.dest), src)
+    elif cls is ic.WriteStatement:
+        src = read(stmt.src) if isinstance(stmt.src, sa.Decl) else stmt.src
+        return ic.WriteStatement(read(stmt.dest), src)
+    elif cls is ic.PrintStatement:
+        return ic.PrintStatement(read(stmt.var))
+    elif cls is ic.CallStatement:
+        variables = [read(var) if isinstance(var, sa.Decl) else var for var in stmt.variables]
+        return ic.CallStatement(write(stmt.dest), stmt.function, variables)
+    return stmt
+
+
+def terminator_reads(term):
+    """終端命令termが読む変数のリストを返す"""
+    if isinstance(term, (cfg.Branch, cfg.Return)):
+        return [term.var]
+    return []
+
+
+def rewrite_terminator(term, read):
+    """終端命令termの読む変数をread(var)に置き換えた新しい終端命令を返す"""
+    if isinstance(term, cfg.Branch):
+        return cfg.Branch(read(term.var), term.if_true, term.if_false)
+    elif isinstance(term, cfg.Return):
+        return cfg.Return(read(term.var))
+    return term
+
+
+def is_copy(stmt):
+    return type(stmt) is ic.LetStatement and type(stmt.exp) is ic.VarExpression
+
+
+def reverse_postorder(graph):
+    """entryからたどれるブロックを逆後順に並べたリストを返す(exitは含めない)"""
+    order = []
+    seen = set([graph.entry.index])
+    stack = [(graph.entry, iter(graph.entry.succs))]
+    while stack:
+        block, succs = stack[-1]
+        for succ in succs:
+            if succ.index >= 0 and succ.index not in seen:
+                seen.add(succ.index)
+                stack.append((succ, iter(succ.succs)))
+                break
+        else:
+            stack.pop()
+            order.append(block)
+    order.reverse()
+    return order
+
+
+def dominators(order):
+    """逆後順のブロックのリストorderの各ブロックの直接支配ブロックを求める
+       ブロックの番号からorderの中での位置を引く辞書と、位置ごとの直接支配ブロックの
+       位置のリスト(entryは自分自身)の組を返す"""
+    position = dict((block.index, i) for i, block in enumerate(order))
+    idom = [None] * len(order)
+    idom[0] = 0
+    preds = [[position[pred.index] for pred in block.preds if pred.index in position]
+             for block in order]
+    changed = True
+    while changed:
+        changed = False
+        for i in range(1, len(order)):
+            new = None
+            for p in preds[i]:
+                if idom[p] is None:
+                    continue
+                if new is None:
+                    new = p
+                    continue
+                a, b = p, new
+                while a != b:
+                    while a > b:
+                        a = idom[a]
+                    while b > a:
+                        b = idom[b]
+                new = a
+            if idom[i] != new:
+                idom[i] = new
+                changed = True
+    return position, idom
+
+
+def frontiers(order, position, idom):
+    """各ブロックの支配辺境を、orderの中での位置の集合のリストで返す"""
+    df = [set() for _ in order]
+    for i, block in enumerate(order):
+        preds = [position[pred.index] for pred in block.preds if pred.index in position]
+        if len(preds) < 2:
+            continue
+        for runner in preds:
+            while runner != idom[i]:
+                df[runner].add(i)
+                runner = idom[runner]
+    return df
+
+
+class SSAForm(object):
+
+    """SSA形式にした制御フローグラフ
+       orderはentryからたどれるブロックを逆後順に並べたもの、originsは
+       版のDeclのidから元の変数のDeclを引く辞書(元の変数自身も含む)"""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.order = reverse_postorder(graph)
+        self.origins = {}
+        self.counts = {}
+
+    def is_candidate(self, var):
+        return id(var) in self.origins
+
+    def origin(self, var):
+        return self.origins[id(var)]
+
+    def new_version(self, origin):
+        """元の変数originの新しい版のDeclを作る"""
+        count = self.counts.get(id(origin), 0) + 1
+        self.counts[id(origin)] = count
+        var = sa.Decl("{0}.{1}".format(origin.name, count), origin.level, origin.kind, origin.objtype)
+        self.origins[id(var)] = origin
+        return var
+
+    def phi_count(self):
+        return sum(len(block.phis) for block in self.order)
+
+
+def find_candidates(form):
+    """候補になる変数をform.originsに加える
+       &xの中間命令はxを一時変数にコピーしてからそのアドレスを取るので、
+       アドレスを取る一時変数へのコピー元の変数も候補にしない"""
+    excluded = set()
+    found = {}
+    copied = {}
+    for block in form.order:
+        for stmt in block.stmts:
+            ops = operands(stmt)
+            if ops is None:
+                for var in mentioned(stmt):
+                    excluded.add(id(var))
+                    if type(stmt) is ic.AddressExpression and id(var) in copied:
+                        excluded.add(id(copied[id(var)]))
+                continue
+            if is_copy(stmt):
+                copied[id(stmt.var)] = stmt.exp.var
+            dest, reads = ops
+            for var in reads:
+                found[id(var)] = var
+            if dest is not None:
+                found[id(dest)] = dest
+        for var in terminator_reads(block.terminator):
+            found[id(var)] = var
+    for key, var in found.items():
+        if (key not in excluded and var.level >= 1 and var.kind in SSA_KINDS and
+                not var.objtype.is_array):
+            form.origins[key] = var
+
+
+def place_phis(form, df):
+    """ブロックをまたいで使われる候補の変数に、支配辺境をもとにφ関数を置く"""
+    order = form.order
+    nonlocal_names = set()
+    defsites = {}
+    defined_vars = []
+    for i, block in enumerate(order):
+        defined = set()
+        for stmt in block.stmts:
+            dest, reads = operands(stmt) or (None, [])
+            for var in reads:
+                if id(var) not in defined:
+                    nonlocal_names.add(id(var))
+            if dest is not None and form.is_candidate(dest):
+                defined.add(id(dest))
+                if id(dest) not in defsites:
+                    defsites[id(dest)] = []
+                    defined_vars.append(dest)
+                defsites[id(dest)].append(i)
+        for var in terminator_reads(block.terminator):
+            if id(var) not in defined:
+                nonlocal_names.add(id(var))
+
+    for origin in defined_vars:
+        key = id(origin)
+        if key not in nonlocal_names:
+            continue
+        sites = defsites[key]
+        has_phi = set()
+        work = list(sites)
+        queued = set(sites)
+        while work:
+            for j in df[work.pop()]:
+                if j in has_phi:
+                    continue
+                has_phi.add(j)
+                block = order[j]
+                block.phis.append(Phi(origin, [origin] * len(block.preds)))
+                if j not in queued:
+                    queued.add(j)
+                    work.append(j)
+
+
+def rename(form, idom):
+    """支配木を前順にたどり、代入ごとに新しい版を作って変数の名前を付け替える"""
+    order = form.order
+    children = [[] for _ in order]
+    for i in range(1, len(order)):
+        children[idom[i]].append(i)
+    stacks = dict((key, [origin]) for key, origin in form.origins.items())
+
+    def read(var):
+        stack = stacks.get(id(var))
+        return stack[-1] if stack else var
+
+    work = [(0, None)]
+    while work:
+        i, pushed = work.pop()
+        if pushed is not None:
+            for key in pushed:
+                stacks[key].pop()
+            continue
+        block = order[i]
+        pushed = []
+
+        def write(var):
+            key = id(var)
+            if key not in stacks:
+                return var
+            version = form.new_version(var)
+            stacks[key].append(version)
+            pushed.append(key)
+            return version
+
+        for phi in block.phis:
+            phi.var = write(phi.var)
+        stmts = []
+        for stmt in block.stmts:
+            stmts.append(rewrite(stmt, read, write) if operands(stmt) is not None else stmt)
+        block.stmts = stmts
+        block.terminator = rewrite_terminator(block.terminator, read)
+
+        for succ in block.succs:
+            if not succ.phis:
+                continue
+            j = succ.preds.index(block)
+            for phi in succ.phis:
+                phi.args[j] = read(phi.args[j])
+        work.append((i, pushed))
+        work.extend((child, None) for child in reversed(children[i]))
+
+
+def construct(graph):
+    """制御フローグラフgraphをSSA形式にし、SSAFormを返す(graphのブロックを書き換える)"""
+    with gcpause.paused():
+        form = SSAForm(graph)
+        find_candidates(form)
+        position, idom = dominators(form.order)
+        place_phis(form, frontiers(form.order, position, idom))
+        rename(form, idom)
+    return form
+
+
+class Coalescer(object):
+
+    """同じ変数の版をまとめる素集合
+       neighborsは代表の番号から、生存区間が重なる集合の代表の番号の集合を引く"""
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+        self.neighbors = [set() for _ in range(size)]
+
+    def find(self, k):
+        parent = self.parent
+        root = k
+        while parent[root] != root:
+            root = parent[root]
+        while parent[k] != root:
+            parent[k], k = root, parent[k]
+        return root
+
+    def interfere(self, j, k):
+        self.neighbors[j].add(k)
+        self.neighbors[k].add(j)
+
+    def union(self, j, k):
+        """jとkの集合の生存区間が重ならなければ1つにまとめて真を返す"""
+        a, b = self.find(j), self.find(k)
+        if a == b:
+            return True
+        if b in self.neighbors[a]:
+            return False
+        if len(self.neighbors[a]) < len(self.neighbors[b]):
+            a, b = b, a
+        for n in self.neighbors[b]:
+            self.neighbors[n].discard(b)
+            self.neighbors[n].add(a)
+        self.neighbors[a] |= self.neighbors[b]
+        self.neighbors[b] = set()
+        self.parent[b] = a
+        return True
+
+
+def number_variables(form):
+    """φ関数と文と終端命令に現れる候補の変数に番号を付ける
+       変数のリストと、Declのidから番号を引く辞書の組を返す"""
+    variables = []
+    index = {}
+
+    def add(var):
+        if form.is_candidate(var) and id(var) not in index:
+            index[id(var)] = len(variables)
+            variables.append(var)
+
+    for block in form.order:
+        for phi in block.phis:
+            add(phi.var)
+            for arg in phi.args:
+                add(arg)
+        for stmt in block.stmts:
+            dest, reads = operands(stmt) or (None, [])
+            add(dest)
+            for var in reads:
+                add(var)
+        for var in terminator_reads(block.terminator):
+            add(var)
+    return variables, index
+
+
+def liveness(form, index):
+    """候補の変数の生存情報を求め、各ブロックの出口で生きている変数の番号の集合の
+       リストを返す(orderと同じ順)
+       φ関数の結果はブロックの先頭で代入し、引数はそれぞれの元のブロックの出口で使う"""
+    order = form.order
+    position = dict((block.index, i) for i, block in enumerate(order))
+    uses = []
+    defs = []
+    phi_uses = [set() for _ in order]
+    for block in order:
+        use = set()
+        define = set(index[id(phi.var)] for phi in block.phis)
+        for stmt in block.stmts:
+            dest, reads = operands(stmt) or (None, [])
+            for var in reads:
+                k = index.get(id(var))
+                if k is not None and k not in define:
+                    use.add(k)
+            k = index.get(id(dest))
+            if k is not None:
+                define.add(k)
+        for var in terminator_reads(block.terminator):
+            k = index.get(id(var))
+            if k is not None and k not in define:
+                use.add(k)
+        uses.append(use)
+        defs.append(define)
+        for phi in block.phis:
+            for pred, arg in zip(block.preds, phi.args):
+                k = index.get(id(arg))
+                if k is not None and pred.index in position:
+                    phi_uses[position[pred.index]].add(k)
+
+    succs = [[position[succ.index] for succ in block.succs if succ.index in position]
+             for block in order]
+    live_in = [frozenset()] * len(order)
+    live_out = [frozenset()] * len(order)
+    changed = True
+    while changed:
+        changed = False
+        for i in reversed(range(len(order))):
+            out = set(phi_uses[i])
+            for j in succs[i]:
+                out |= live_in[j]
+            live_out[i] = out
+            new = uses[i] | (out - defs[i])
+            if new != live_in[i]:
+                live_in[i] = new
+                changed = True
+    return live_out
+
+
+def find_interference(form, index, origins, live_out, coalescer):
+    """同じ変数の版どうしで、代入したところで他方が生きているものを重なりとして記録する
+       originsは変数の番号ごとの元の変数の番号で、版が1つしかない変数はNone。
+       コピーの代入先とコピー元は同じ値なので重なりとしない"""
+
+    def interfere(k, live, src=None):
+        origin = origins[k]
+        if origin is None:
+            return
+        for j in live:
+            if origins[j] == origin and j != src and j != k:
+                coalescer.interfere(k, j)
+
+    for i, block in enumerate(form.order):
+        live = set(live_out[i])
+        for var in terminator_reads(block.terminator):
+            k = index.get(id(var))
+            if k is not None:
+                live.add(k)
+        for stmt in reversed(block.stmts):
+            dest, reads = operands(stmt) or (None, [])
+            k = index.get(id(dest))
+            if k is not None:
+                live.discard(k)
+                interfere(k, live, index.get(id(stmt.exp.var)) if is_copy(stmt) else None)
+            for var in reads:
+                k = index.get(id(var))
+                if k is not None:
+                    live.add(k)
+        phi_defs = [index[id(phi.var)] for phi in block.phis]
+        live.difference_update(phi_defs)
+        for k in phi_defs:
+            interfere(k, live)
+
+
+def split_phi(form, block, phi):
+    """φ関数 x = φ(a1, ..., an) を、新しい変数x'へのコピー x' = ai をそれぞれの元の
+       ブロックの最後に、x = x' をブロックの先頭に置いて取り除く(SreedharのMethod I)
+       x'を返す"""
+    reachable = set(b.index for b in form.order)
+    temp = form.new_version(form.origin(phi.var))
+    for pred, arg in zip(block.preds, phi.args):
+        if pred.index in reachable:
+            pred.stmts.append(ic.LetStatement(temp, ic.VarExpression(arg)))
+    block.stmts.insert(0, ic.LetStatement(phi.var, ic.VarExpression(temp)))
+    return temp
+
+
+def destruct(form):
+    """SSA形式のform.graphからφ関数を取り除き、生存区間の重ならない同じ変数の版を
+       1つの変数にまとめる。新しく作った変数のDeclのリストを返す
+
+       φ関数の結果と引数は重ならなければまとめ、φ関数をそのまま取り除く
+       (SSA形式にしただけなら必ずまとめられる)。変換によって重なるようになった
+       φ関数だけをsplit_phi()でコピーに置き換える"""
+    with gcpause.paused():
+        return coalesce(form)
+
+
+def coalesce(form):
+    """destruct()の本体"""
+    variables, index = number_variables(form)
+    groups = {}
+    group_order = []
+    for k, var in enumerate(variables):
+        key = id(form.origin(var))
+        if key not in groups:
+            groups[key] = []
+            group_order.append(key)
+        groups[key].append(k)
+    origins = [None] * len(variables)
+    for members in groups.values():
+        if len(members) > 1:
+            for k in members:
+                origins[k] = members[0]
+
+    coalescer = Coalescer(len(variables))
+    find_interference(form, index, origins, liveness(form, index), coalescer)
+
+    # 重なりは同じ変数の版どうしでしか調べていないので、ほかの変数の版
+    # (変換でコピーを伝播したものなど)を引数に持つφ関数もコピーに置き換える
+    def join(k, arg):
+        j = index.get(id(arg))
+        return j is not None and origins[k] is not None and origins[j] == origins[k] and \
+            coalescer.union(k, j)
+
+    new_decls = []
+    for block in form.order:
+        for phi in reversed(block.phis):
+            k = index[id(phi.var)]
+            if not all([join(k, arg) for arg in phi.args]):
+                new_decls.append(split_phi(form, block, phi))
+        block.phis = []
+
+    # 残った集合も、同じ変数のものは重ならない限り1つにまとめる。元の変数を含む
+    # 集合(なければ最初の集合)に元のDeclを使い、ほかの集合には新しいDeclを作る
+    names = {}
+    for key in group_order:
+        members = groups[key]
+        origin = form.origins[key]
+        first = index.get(key, members[0])
+        for k in members:
+            coalescer.union(first, k)
+        names[coalescer.find(first)] = origin
+        for k in members:
+            root = coalescer.find(k)
+            if root not in names:
+                names[root] = form.new_version(origin)
+                new_decls.append(names[root])
+
+    def read(var):
+        k = index.get(id(var))
+        return var if k is None else names[coalescer.find(k)]
+
+    for block in form.order:
+        block.stmts = [rewrite(stmt, read, read) if operands(stmt) is not None else stmt
+                       for stmt in block.stmts]
+        block.terminator = rewrite_terminator(block.terminator, read)
+    return new_decls
+
+
+def transform(fundef, passes=()):
+    """関数定義fundefの本体をSSA形式にしてpassesの関数(SSAFormを受け取る)を順に適用し、
+       元に戻した制御フローグラフをfundef.graphに置いて返す
+       新しく作った変数の宣言はfundef.body.declsに加える"""
+    graph = cfg.build_function(fundef)
+    form = construct(graph)
+    for run in passes:
+        run(form)
+    decls = destruct(form)
+    fundef.body.decls.extend(ic.VarDecl(decl) for decl in decls)
+    fundef.graph = graph
+    return graph
@@ -0,0 +1,151 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import re
+from unittest import TestCase
+import nose
+import cfg
+import ssa
+import intermed_code as ic
+import semantic_analyzer as sa
+import assign_address
+import codegen
+import printcode
+from parser import Parser
+
+OPERATIONS = {
+    "PLUS": lambda a, b: a + b, "MINUS": lambda a, b: a - b, "TIMES": lambda a, b: a * b,
+    "LT": lambda a, b: int(a < b), "GT": lambda a, b: int(a > b),
+    "LEQ": lambda a, b: int(a <= b), "GEQ": lambda a, b: int(a >= b),
+    "EQUAL": lambda a, b: int(a == b), "NEQ": lambda a, b: int(a != b),
+}
+
+
+def execute(graph):
+    """制御フローグラフを実行し、printした値のリストと返り値の組を返す
+       (整数の変数と四則演算、比較、print、分岐だけを扱う)"""
+    values = {}
+    printed = []
+    block = graph.entry
+    while True:
+        for stmt in block.stmts:
+            if isinstance(stmt, ic.PrintStatement):
+                printed.append(values[id(stmt.var)])
+            if not isinstance(stmt, ic.LetStatement):
+                continue
+            exp = stmt.exp
+            if isinstance(exp, ic.IntExpression):
+                value = exp.num
+            elif isinstance(exp, ic.VarExpression):
+                value = values[id(exp.var)]
+            else:
+                value = OPERATIONS[exp.op](values[id(exp.var_left)], values[id(exp.var_right)])
+            values[id(stmt.var)] = value
+        term = block.terminator
+        if isinstance(term, cfg.Return):
+            return printed, values[id(term.var)]
+        elif isinstance(term, cfg.Branch):
+            block = term.if_true if values[id(term.var)] else term.if_false
+        elif term.target is graph.exit:
+            return printed, None
+        else:
+            block = term.target
+
+
+def propagate_copies(form):
+    """SSA形式のコピー x = y を取り除き、xを使うところをyに置き換える
+       (φ関数の結果と引数の生存区間が重なるようにする変換)"""
+    replace = {}
+
+    def read(var):
+        return replace.get(id(var), var)
+
+    for block in form.order:
+        stmts = []
+        for stmt in block.stmts:
+            if ssa.is_copy(stmt) and form.is_candidate(stmt.var):
+                replace[id(stmt.var)] = read(stmt.exp.var)
+            else:
+                stmts.append(stmt)
+        block.stmts = stmts
+    for block in form.order:
+        for phi in block.phis:
+            phi.args = [read(arg) for arg in phi.args]
+        block.stmts = [ssa.rewrite(stmt, read, lambda var: var) for stmt in block.stmts]
+        block.terminator = ssa.rewrite_terminator(block.terminator, read)
+
+
+class SSATest(TestCase):
+
+    def setUp(self):
+        self.parser = Parser()
+        self.parser.build()
+
+    def tearDown(self):
+        pass
+
+    def generate(self, data):
+        tree = self.parser.parse(data)
+        sa.Analyzer(tree, check_types=True).analyze(tree)
+        return ic.IntermedCodeGenerator(tree).intermed_code_generator()
+
+    def assemble(self, data, transform):
+        code = self.generate(data)
+        if transform:
+            for item in code:
+                if isinstance(item, ic.FunctionDefinition):
+                    ssa.transform(item)
+        code = assign_address.AssignAddress(code).assign_address()
+        asm = printcode.PrintCode(codegen.CodeGenerator(code).intermed_code_to_code()).code_to_string()
+        names = {}
+        return re.sub(r"\bL\d+\b", lambda m: names.setdefault(m.group(0), "L" + str(len(names))), asm)
+
+    def test_single_assignment(self):
+        """SSA形式で各変数がただ1か所で代入され、ループの先頭にφ関数が置かれるかのテスト"""
+        code = self.generate("int main() { int i; int s; i = 0; s = 0; "
+                             "while (i < 5) { s = s + i; i = i + 1; } return s; }")
+        graph = cfg.build_function(code[-1])
+        form = ssa.construct(graph)
+
+        defined = [phi.var for block in form.order for phi in block.phis]
+        defined += [stmt.var for block in form.order for stmt in block.stmts]
+        nose.tools.eq_(len(defined), len(set(id(var) for var in defined)))
+        loop = graph.blocks[1]
+        nose.tools.eq_(["i", "s"], sorted(form.origin(phi.var).name for phi in loop.phis))
+        nose.tools.ok_(all(len(phi.args) == len(loop.preds) for phi in loop.phis))
+
+    def test_round_trip(self):
+        """SSA形式にして元に戻したコードが、ラベルの名前を除いて元のコードと同じかのテスト"""
+        data = ("void print(int x); int g; "
+                "int f(int a, int b) { int c; c = 0; if (a < b) c = a; else { c = b; g = c; } "
+                "while (c) { if (c > 2) c = c - 2; else c = c - 1; } return c + a; } "
+                "int main() { int x; x = f(3, 4); print(x); return x; }")
+
+        nose.tools.eq_(self.assemble(data, False), self.assemble(data, True))
+
+    def test_address_taken(self):
+        """アドレスを取る変数と大域変数、配列がSSA形式にされないかのテスト"""
+        code = self.generate("int g; int main() { int a; int b[2]; int *p; a = 1; p = &a; "
+                             "b[0] = a; g = a; return *p; }")
+        form = ssa.construct(cfg.build_function(code[-1]))
+        names = set(var.name for var in form.origins.values())
+
+        nose.tools.ok_("p" in names)
+        nose.tools.eq_(set(), names & set(["a", "b", "g"]))
+
+    def test_lost_copy(self):
+        """コピーを伝播してφ関数の結果と引数が重なっても、元に戻したコードが同じ結果になるかのテスト"""
+        data = ("void print(int x); int main() { int x; int y; int z; x = 0; y = 1; z = 2; "
+                "while (x < 4) { print(y); y = z; z = x; x = x + 1; } print(y); print(z); return x; }")
+        expected = execute(cfg.build_function(self.generate(data)[-1]))
+        fundef = self.generate(data)[-1]
+        graph = ssa.transform(fundef, [propagate_copies])
+
+        nose.tools.eq_(([1, 2, 0, 1, 2, 3], 4), expected)
+        nose.tools.eq_(expected, execute(graph))
+        nose.tools.ok_(all(not block.phis for block in graph.blocks))
+        nose.tools.ok_(len(fundef.body.decls) > 3)
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])
@@ -0,0 +1,141 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+from unittest import TestCase
+import nose
+import samplegen
+import semantic_analyzer
+import intermed_code
+import assign_address
+import codegen
+import printcode
+from parser import Parser
+
+# 各パスを実行するときに、呼び出し元より深く使ってよいPythonのスタックの段数
+STACK_MARGIN = 150
+
+
+def stack_depth():
+    depth = 0
+    frame = sys._getframe(1)
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    return depth
+
+
+def compile_program(parser, data):
+    """構文解析からアセンブリの文字列の出力までを、使えるスタックを制限して実行する"""
+    limit = sys.getrecursionlimit()
+    stdout = sys.stdout
+    devnull = open(os.devnull, "w")
+    sys.setrecursionlimit(stack_depth() + STACK_MARGIN)
+    sys.stdout = devnull
+    try:
+        tree = parser.parse(data)
+        analyzer = semantic_analyzer.Analyzer(tree)
+        env, _ = analyzer.analyze(tree)
+        checker = semantic_analyzer.TypeChecker(env)
+        checker.check_type(tree)
+        code = intermed_code.IntermedCodeGenerator(tree).intermed_code_generator()
+        code = assign_address.AssignAddress(code).assign_address()
+        asm = codegen.CodeGenerator(code).intermed_code_to_code()
+        return analyzer.error_count + checker.error_count, asm, printcode.PrintCode(asm).code_to_string()
+    finally:
+        sys.stdout = stdout
+        sys.setrecursionlimit(limit)
+        devnull.close()
+
+
+class StressTest(TestCase):
+
+    def setUp(self):
+        self.parser = Parser()
+        self.parser.build()
+
+    def tearDown(self):
+        pass
+
+    def compile_deep(self, shape, depth):
+        return compile_program(self.parser, samplegen.generate_deep_program(shape, depth))
+
+    def test_deep_expression(self):
+        """長い式の連鎖をスタックの深さを増やさずにコンパイルできるかのテスト"""
+        errors, asm, _ = self.compile_deep("expression", 20000)
+
+        nose.tools.eq_(0, errors)
+        nose.tools.eq_(19999, len([instr for instr in asm
+                                   if isinstance(instr, codegen.Instruction) and instr.op == "add"]))
+
+    def test_deep_block(self):
+        """入れ子の複文をスタックの深さを増やさずにコンパイルできるかのテスト"""
+        errors, asm, _ = self.compile_deep("block", 20000)
+
+        nose.tools.eq_(0, errors)
+        nose.tools.eq_(1, len([instr for instr in asm
+                               if isinstance(instr, codegen.Instruction) and instr.op == "add"]))
+
+    def test_deep_if(self):
+        """入れ子のif文をスタックの深さを増やさずにコンパイルできるかのテスト"""
+        errors, asm, _ = self.compile_deep("if", 5000)
+
+        nose.tools.eq_(0, errors)
+        nose.tools.eq_(5000, len([instr for instr in asm
+                                  if isinstance(instr, codegen.Instruction) and instr.op == "beqz"]))
+        nose.tools.eq_(10000, len([label for label in asm if isinstance(label, codegen.Label)]) - 1)
+
+    def test_deep_while(self):
+        """入れ子のwhile文をスタックの深さを増やさずにコンパイルできるかのテスト"""
+        errors, asm, _ = self.compile_deep("while", 5000)
+
+        nose.tools.eq_(0, errors)
+        nose.tools.eq_(10000, len([instr for instr in asm
+                                   if isinstance(instr, codegen.Instruction) and instr.op == "beqz"]))
+
+    def test_deep_expression_arena(self):
+        """長い式の連鎖をアリーナに詰めても、スタックの深さを増やさずにコンパイルできるかのテスト"""
+        parser = Parser(ast_storage="arena")
+        parser.build()
+        errors, asm, _ = compile_program(parser, samplegen.generate_deep_program("expression", 5000))
+
+        nose.tools.eq_(0, errors)
+        nose.tools.eq_(4999, len([instr for instr in asm
+                                  if isinstance(instr, codegen.Instruction) and instr.op == "add"]))
+
+    def test_deep_expression_cache(self):
+        """長い式の連鎖をキャッシュに保存し、読み込んでもスタックの深さを増やさずにコンパイルできるかのテスト"""
+        cache_dir = tempfile.mkdtemp()
+        try:
+            parser = Parser(cache_dir=cache_dir)
+            parser.build()
+            data = samplegen.generate_deep_program("expression", 5000)
+            stored = compile_program(parser, data)
+            loaded = compile_program(parser, data)
+        finally:
+            shutil.rmtree(cache_dir)
+
+        nose.tools.eq_(0, loaded[0])
+        nose.tools.eq_(stored[2], loaded[2])
+        nose.tools.eq_(1, parser.cache.hits)
+
+    def test_linear_time(self):
+        """入れ子の深さを8倍にしてもコンパイル時間が(2乗の64倍ではなく)線形に近く増えるかのテスト"""
+        for shape in ("expression", "if"):
+            elapsed = []
+            for depth in (1000, 8000):
+                data = samplegen.generate_deep_program(shape, depth)
+                start = time.time()
+                compile_program(self.parser, data)
+                elapsed.append(time.time() - start)
+
+            nose.tools.ok_(elapsed[1] < elapsed[0] * 24,
+                           "{0}: {1:.3f}s -> {2:.3f}s".format(shape, elapsed[0], elapsed[1]))
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])
@@ -0,0 +1,113 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""字句解析表(lextab)と構文解析表(parsetab)を管理するモジュール
+
+   表は生成済みのモジュールとしてリポジトリに同梱し、起動のたびに
+   文法解析や正規表現の検査をやり直さずに済むようにする。
+   文法やトークン規則を変更したときは python tables.py を実行して作り直す。"""
+
+import os
+import sys
+import hashlib
+import logging
+
+TABLE_DIR = os.path.dirname(os.path.abspath(__file__))
+LEXTAB = "lextab"
+PARSETAB = "parsetab"
+
+# 表の形式を変えたときに上げる
+TABLE_VERSION = 1
+
+
+def lexer_signature(lexer):
+    """Lexerのトークン規則から署名を計算して返す
+       規則の文字列と、関数規則の正規表現(docstring)とその定義順から求める"""
+    import ply.lex as lex
+
+    parts = [str(TABLE_VERSION), lex.__tabversion__,
+             " ".join(lexer.tokens), "t_ignore=" + lexer.t_ignore]
+
+    funcs = []
+    for name in sorted(dir(lexer)):
+        if not name.startswith("t_") or name == "t_ignore":
+            continue
+        rule = getattr(lexer, name)
+        if callable(rule):
+            funcs.append((rule.__code__.co_firstlineno, name, rule.__doc__ or ""))
+        else:
+            parts.append(name + "=" + rule)
+
+    # 関数規則は定義順にマッチするので、行番号ではなく順序だけを署名に含める
+    for _, name, doc in sorted(funcs):
+        parts.append(name + "=" + doc)
+
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def grammar_signature(parser):
+    """Parserの文法(p_関数の規則とトークン)からPLYと同じ方法で署名を計算して返す"""
+    import ply.yacc as yacc
+
+    pdict = dict((name, getattr(parser, name)) for name in dir(parser))
+    pinfo = yacc.ParserReflect(pdict)
+    pinfo.get_all()
+    return pinfo.signature()
+
+
+def load_lextab(lexer):
+    """同梱の字句解析表が現在のトークン規則と一致すればそのモジュールを返す
+       一致しない、または存在しなければNoneを返す"""
+    try:
+        import lextab
+    except ImportError:
+        return None
+
+    if getattr(lextab, "_lexsignature", None) != lexer_signature(lexer):
+        logging.warning("lextab is out of date; run \"python tables.py\" to regenerate it.")
+        return None
+
+    return lextab
+
+
+def load_parsetab():
+    """同梱の構文解析表のモジュールを返す。存在しなければNoneを返す
+       文法との署名の照合はPLYのyacc()が_lr_signatureを使って行う"""
+    try:
+        import parsetab
+    except ImportError:
+        return None
+
+    return parsetab
+
+
+def remove_table(name):
+    for ext in (".py", ".pyc", ".pyo"):
+        path = os.path.join(TABLE_DIR, name + ext)
+        if os.path.exists(path):
+            os.remove(path)
+    sys.modules.pop(name, None)
+
+
+def write_tables():
+    """現在のトークン規則と文法からlextab.pyとparsetab.pyを作り直す"""
+    import ply.lex as lex
+    import ply.yacc as yacc
+    from lexer import Lexer
+    from parser import Parser
+
+    # 字句解析表(optimizeモードで書き出し、署名を追記する)
+    remove_table(LEXTAB)
+    lexer = Lexer()
+    lex.lex(module=lexer, optimize=1, lextab=LEXTAB, outputdir=TABLE_DIR)
+    with open(os.path.join(TABLE_DIR, LEXTAB + ".py"), "a") as f:
+        f.write("_lexsignature = %r\n" % str(lexer_signature(lexer)))
+
+    # 構文解析表
+    remove_table(PARSETAB)
+    yacc.yacc(module=Parser(), tabmodule=PARSETAB, outputdir=TABLE_DIR,
+              write_tables=True, debug=False)
+
+
+if __name__ == '__main__':
+    write_tables()
@@ -0,0 +1,71 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+import nose
+import ply.lex as lex
+import ply.yacc as yacc
+import tables
+from lexer import Lexer
+from parser import Parser
+
+
+class TablesTest(TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_lextab_signature(self):
+        """同梱の字句解析表がトークン規則と一致するかのテスト"""
+        lextab = tables.load_lextab(Lexer())
+
+        nose.tools.ok_(lextab is not None)
+
+    def test_parsetab_signature(self):
+        """同梱の構文解析表の署名が文法と一致するかのテスト"""
+        parser = Parser()
+        pdict = dict((k, getattr(parser, k)) for k in dir(parser))
+        pinfo = yacc.ParserReflect(pdict)
+        pinfo.get_all()
+
+        parsetab = tables.load_parsetab()
+
+        nose.tools.ok_(parsetab is not None)
+        nose.tools.eq_(pinfo.signature(), parsetab._lr_signature)
+
+    def test_lexer_signature_changes(self):
+        """トークン規則を変えると署名が変わるかのテスト"""
+        class ChangedLexer(Lexer):
+            t_PLUS = r'\+\+\+'
+
+        nose.tools.ok_(tables.lexer_signature(Lexer()) !=
+                       tables.lexer_signature(ChangedLexer()))
+        nose.tools.ok_(tables.load_lextab(ChangedLexer()) is None)
+
+    def test_same_tokens(self):
+        """表から作った字句解析器が、規則から作った字句解析器と同じトークン列を返すかのテスト"""
+        data = "int main() { /* comment\n */ int a; a = 10 <= 2; return a++; }"
+
+        table_lexer = Lexer()
+        table_lexer.build()
+        rule_lexer = Lexer()
+        rule_lexer.lexer = lex.lex(module=rule_lexer)
+
+        expected = []
+        rule_lexer.lexer.input(data)
+        for tok in iter(rule_lexer.lexer.token, None):
+            expected.append((tok.type, tok.value, tok.lineno, tok.lexpos))
+
+        actual = []
+        table_lexer.lexer.input(data)
+        for tok in iter(table_lexer.lexer.token, None):
+            actual.append((tok.type, tok.value, tok.lineno, tok.lexpos))
+
+        nose.tools.eq_(expected, actual)
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])
@@ -0,0 +1,101 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""字句解析の結果を列ごとの配列に詰めて保持するモジュール
+
+   トークン1つごとにオブジェクトを作る代わりに、種類(tokenrules.tokensの添字)、
+   位置、行番号、値(値の表の添字)をそれぞれarrayに格納する。
+   構文解析器にはTokenCursorでトークンを1つずつ渡す。"""
+
+from array import array
+import tokenrules
+from dfa_lexer import Token
+
+KIND_INDEX = dict((toktype, i) for i, toktype in enumerate(tokenrules.tokens))
+
+
+class TokenBuffer(object):
+
+    """トークン列を列ごとの配列で保持するバッファ
+       fill()で入力を入れ替えても、配列はそのまま使い回す。値の表は入力ごとに
+       作り直すので、多数のファイルを解析しても前の入力の値が残り続けることはない"""
+
+    def __init__(self):
+        self.kinds = array("B")
+        self.lexpos = array("i")
+        self.lineno = array("i")
+        self.value_ids = array("i")
+        self.values = []       # 値の表(同じ値は1つにまとめる)
+        self.value_index = {}  # 値 -> 値の表の添字
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        """トークンと値の表を空にする。配列は縮めずに次のfill()で上書きする"""
+        self.count = 0
+        del self.values[:]
+        self.value_index.clear()
+
+    def intern(self, value):
+        index = self.value_index.get(value)
+        if index is None:
+            index = len(self.values)
+            self.values.append(value)
+            self.value_index[value] = index
+        return index
+
+    def append(self, toktype, value, lineno, lexpos):
+        i = self.count
+        if i < len(self.kinds):
+            self.kinds[i] = KIND_INDEX[toktype]
+            self.lexpos[i] = lexpos
+            self.lineno[i] = lineno
+            self.value_ids[i] = self.intern(value)
+        else:
+            self.kinds.append(KIND_INDEX[toktype])
+            self.lexpos.append(lexpos)
+            self.lineno.append(lineno)
+            self.value_ids.append(self.intern(value))
+        self.count = i + 1
+
+    def fill(self, lexer, data):
+        """lexer(PLYのLexerまたはDFAScanner)でdataを字句解析し、結果で置き換える"""
+        self.clear()
+        lexer.input(data)
+        append = self.append
+        for tok in iter(lexer.token, None):
+            append(tok.type, tok.value, tok.lineno, tok.lexpos)
+        return self
+
+    def token(self, i):
+        """i番目のトークンをPLYのLexTokenと同じ属性を持つオブジェクトとして返す"""
+        return Token(tokenrules.tokens[self.kinds[i]], self.values[self.value_ids[i]],
+                     self.lineno[i], self.lexpos[i])
+
+    def cursor(self):
+        return TokenCursor(self)
+
+
+class TokenCursor(object):
+
+    """TokenBufferを先頭から順に読む字句解析器。構文解析器にはtoken()を渡す"""
+
+    def __init__(self, buf):
+        self.buffer = buf
+        self.index = 0
+
+    @property
+    def last_lineno(self):
+        """最後に返したトークンの行番号"""
+        if self.index == 0:
+            return 1
+        return self.buffer.lineno[self.index - 1]
+
+    def token(self):
+        i = self.index
+        if i >= self.buffer.count:
+            return None
+        self.index = i + 1
+        return self.buffer.token(i)
@@ -0,0 +1,69 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+import nose
+import tokenbuffer
+import samplegen
+from lexer import Lexer
+from parser import Parser
+from parser_test import dump
+
+
+def token_tuples(token):
+    return [(tok.type, tok.value, tok.lineno, tok.lexpos) for tok in iter(token, None)]
+
+
+class TokenBufferTest(TestCase):
+
+    def setUp(self):
+        self.lexer = Lexer()
+        self.lexer.build()
+        self.data = samplegen.generate_program(3, 20, seed=2, syntax_only=True)
+
+    def tearDown(self):
+        pass
+
+    def test_same_tokens(self):
+        """バッファから読んだトークン列が字句解析器のトークン列と一致するかのテスト"""
+        self.lexer.lexer.input(self.data)
+        expected = token_tuples(self.lexer.lexer.token)
+        self.lexer.lexer.lineno = 1
+
+        buf = tokenbuffer.TokenBuffer().fill(self.lexer.lexer, self.data)
+
+        nose.tools.eq_(len(expected), len(buf))
+        nose.tools.eq_(expected, token_tuples(buf.cursor().token))
+
+    def test_interned_values(self):
+        """同じ値を値の表に一度だけ格納するかのテスト"""
+        buf = tokenbuffer.TokenBuffer().fill(self.lexer.lexer, "a = a + 1; b = a + 1;")
+
+        nose.tools.eq_(12, len(buf))
+        nose.tools.eq_(["a", "=", "+", 1, ";", "b"], buf.values)
+
+    def test_reuse(self):
+        """入力を入れ替えても配列を確保し直さないかのテスト"""
+        buf = tokenbuffer.TokenBuffer().fill(self.lexer.lexer, self.data)
+        address = buf.lexpos.buffer_info()[0]
+
+        buf.fill(self.lexer.lexer, "int a;")
+
+        nose.tools.eq_(3, len(buf))
+        nose.tools.eq_(address, buf.lexpos.buffer_info()[0])
+        nose.tools.eq_(["INT", "ID", "SEMICOLON"],
+                       [tok.type for tok in iter(buf.cursor().token, None)])
+        nose.tools.eq_(["int", "a", ";"], buf.values)
+
+    def test_parse(self):
+        """バッファを通して構文解析した結果が通常の構文解析と一致するかのテスト"""
+        parser = Parser()
+        parser.build()
+        buffered = Parser(token_buffer=True)
+        buffered.build()
+
+        nose.tools.eq_(dump(parser.parse(self.data)), dump(buffered.parse(self.data)))
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])
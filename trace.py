@@ -0,0 +1,167 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""名前付きのチャンネルとレベルでデバッグ用のトレースを出力するモジュール
+
+   各モジュールはchannel()で自分のチャンネルを作っておき、トレースを出す前に
+   そのレベルが有効かどうかをチャンネルの属性で確かめる。
+
+       TRACE = trace.channel("intermed")
+
+       if TRACE.debug:
+           TRACE.emit(trace.DEBUG, "let statement", left=left, right=right)
+
+   無効なときの手間は属性を1つ読んで分岐するだけで、emit()の引数の式の評価も
+   書式化も行わない。値はキーワード引数でそのまま渡し、書き出すときに初めて
+   文字列などに変換する。
+
+   enable()で有効にするチャンネルとレベルと出力先を決める。出力の形式は
+   - "text": 人が読むための1行ずつのテキスト(既定。出力先の既定は標準エラー出力)
+   - "jsonl": 1行に1つのJSONのオブジェクト
+     {"time": ..., "channel": ..., "level": ..., "message": ..., "fields": {...}}
+     フィールドの値のうち、JSONで表せないものはrepr()した文字列にする
+   環境変数COMPILER_TRACE(例: "intermed:debug,analyzer:info"や"*")を設定すると、
+   import したときに有効になる。出力先はCOMPILER_TRACE_FILE(拡張子が.jsonlなら
+   jsonl形式)で指定できる。"""
+
+import os
+import sys
+import time
+import json
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+DISABLED = 100
+
+LEVEL_NAMES = {DEBUG: "debug", INFO: "info", WARNING: "warning"}
+LEVELS = dict((name, level) for level, name in LEVEL_NAMES.items())
+
+_channels = {}
+_levels = {}            # チャンネル名("*"はすべて)から有効にしたレベル
+_output = None
+_opened = False         # _outputがenable()で開いたファイルか
+_format = "text"
+
+
+class Channel(object):
+
+    """トレースのチャンネル
+       debug, info, warningはそのレベルのトレースが有効かどうかを表す"""
+
+    __slots__ = ("name", "level", "debug", "info", "warning")
+
+    def __init__(self, name):
+        self.name = name
+        self.set_level(DISABLED)
+
+    def set_level(self, level):
+        self.level = level
+        self.debug = level <= DEBUG
+        self.info = level <= INFO
+        self.warning = level <= WARNING
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def emit(self, level, message, **fields):
+        """levelが有効ならトレースを1件書き出す"""
+        if level >= self.level:
+            write(self.name, level, message, fields)
+
+
+def channel(name):
+    """名前がnameのチャンネルを返す(同じ名前なら同じオブジェクト)"""
+    result = _channels.get(name)
+    if result is None:
+        result = _channels[name] = Channel(name)
+        result.set_level(_levels.get(name, _levels.get("*", DISABLED)))
+    return result
+
+
+def parse_spec(spec):
+    """"name:level,name"の形の文字列を、チャンネル名からレベルへの辞書にする
+       レベルを省略したチャンネルはDEBUGにする"""
+    levels = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, level = item.partition(":")
+        levels[name] = LEVELS[level.lower()] if level else DEBUG
+    return levels
+
+
+def enable(channels="*", level=DEBUG, output=None, format=None):
+    """チャンネルのトレースを有効にする
+       channelsはチャンネル名のリスト(levelを使う)、"name:level,..."の形の文字列、
+       または名前からレベルへの辞書。outputはファイル名かファイルのオブジェクトで、
+       省略すると標準エラー出力に書き出す。formatは"text"か"jsonl"で、省略すると
+       ファイル名の拡張子が.jsonlならjsonl、それ以外はtextにする"""
+    global _output, _opened, _format
+    if isinstance(channels, basestring):
+        levels = parse_spec(channels)
+    elif isinstance(channels, dict):
+        levels = dict(channels)
+    else:
+        levels = dict((name, level) for name in channels)
+    close()
+    _opened = isinstance(output, basestring)
+    if _opened:
+        if format is None and output.endswith(".jsonl"):
+            format = "jsonl"
+        output = open(output, "a")
+    _output = output
+    _format = format or "text"
+    _levels.clear()
+    _levels.update(levels)
+    for name, chan in _channels.items():
+        chan.set_level(_levels.get(name, _levels.get("*", DISABLED)))
+
+
+def disable():
+    """すべてのチャンネルのトレースを無効にする"""
+    close()
+    _levels.clear()
+    for chan in _channels.values():
+        chan.set_level(DISABLED)
+
+
+def close():
+    """enable()でファイル名を指定して開いた出力先を閉じる"""
+    global _output, _opened
+    if _opened:
+        _output.close()
+    _output = None
+    _opened = False
+
+
+def to_json(value):
+    """valueをJSONで表せる値にする"""
+    if value is None or isinstance(value, (bool, int, long, float, basestring)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    if isinstance(value, dict):
+        return dict((str(key), to_json(item)) for key, item in value.items())
+    return repr(value)
+
+
+def write(name, level, message, fields):
+    output = _output if _output is not None else sys.stderr
+    if _format == "jsonl":
+        record = {"time": time.time(), "channel": name,
+                  "level": LEVEL_NAMES.get(level, level), "message": message,
+                  "fields": to_json(fields)}
+        line = json.dumps(record, sort_keys=True)
+    else:
+        line = "[{0}] {1}: {2}".format(name, LEVEL_NAMES.get(level, level), message)
+        if fields:
+            line += " " + " ".join("{0}={1!r}".format(key, fields[key]) for key in sorted(fields))
+    # 1行を1回のwriteで書き出す(forkしたプロセスから同じファイルに追記しても行が混ざらない)
+    output.write(line + "\n")
+    output.flush()
+
+
+if os.environ.get("COMPILER_TRACE"):
+    enable(os.environ["COMPILER_TRACE"], output=os.environ.get("COMPILER_TRACE_FILE"))
@@ -0,0 +1,88 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import tempfile
+from StringIO import StringIO
+from unittest import TestCase
+import nose
+import trace
+import semantic_analyzer as sa
+import intermed_code as ic
+from parser import Parser
+
+
+class Counted(object):
+
+    """repr()された回数を数えるオブジェクト"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __repr__(self):
+        self.count += 1
+        return "Counted()"
+
+
+class TraceTest(TestCase):
+
+    def setUp(self):
+        self.channel = trace.channel("test")
+        self.output = StringIO()
+
+    def tearDown(self):
+        trace.disable()
+
+    def test_disabled(self):
+        """無効なチャンネルでは値を書式化せず、何も書き出さないかのテスト"""
+        value = Counted()
+        trace.enable(["other"], output=self.output)
+        nose.tools.ok_(not self.channel.debug)
+        self.channel.emit(trace.DEBUG, "message", value=value)
+
+        nose.tools.eq_(0, value.count)
+        nose.tools.eq_("", self.output.getvalue())
+
+    def test_levels(self):
+        """チャンネルごとのレベルより低いトレースだけが捨てられるかのテスト"""
+        trace.enable("test:info,other", output=self.output)
+        later = trace.channel("later")
+        self.channel.emit(trace.DEBUG, "debug")
+        self.channel.emit(trace.INFO, "info", value=1)
+
+        nose.tools.eq_((False, True, True), (self.channel.debug, self.channel.info,
+                                             self.channel.warning))
+        nose.tools.ok_(trace.channel("other").debug)
+        nose.tools.ok_(not later.warning)
+        nose.tools.eq_("[test] info: info value=1\n", self.output.getvalue())
+
+    def test_jsonl(self):
+        """解析と中間コード生成のトレースがJSONの行としてファイルに書き出されるかのテスト"""
+        fd, path = tempfile.mkstemp(suffix=".jsonl")
+        os.close(fd)
+        try:
+            trace.enable(["analyzer", "intermed"], output=path)
+            parser = Parser()
+            parser.build()
+            tree = parser.parse("int main() { int x; x = 1; if (x) x = x + 2; return x; }")
+            sa.Analyzer(tree).analyze(tree)
+            ic.IntermedCodeGenerator(tree).intermed_code_generator()
+            trace.disable()
+            with open(path) as f:
+                records = [json.loads(line) for line in f]
+        finally:
+            os.remove(path)
+
+        messages = [(record["channel"], record["message"]) for record in records]
+        nose.tools.eq_(("analyzer", "external declaration"), messages[0])
+        nose.tools.ok_(("intermed", "arithmetic operation") in messages)
+        nose.tools.eq_(2, messages.count(("intermed", "let statement")))
+        record = records[messages.index(("intermed", "arithmetic operation"))]
+        nose.tools.eq_("debug", record["level"])
+        nose.tools.eq_("PLUS", record["fields"]["op"])
+        nose.tools.eq_(2, record["fields"]["right"]["value"])
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])
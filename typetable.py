@@ -0,0 +1,102 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""型を表すオブジェクトをまとめるモジュール
+
+   同じ型がいつも同じオブジェクトになるように、型を作る関数は作った型を表に
+   覚えておく。そのため型が等しいかどうかは同一性(is)で判定でき、配列の大きさや
+   ポインタの指す先などは属性を読むだけで分かる。
+
+   以前の表現(文字列の "int"、タプルの ("pointer", "int")、("array", "int", 5)、
+   ("fun", "int", "int", ("pointer", "int")) など)はcanonical()で型に変換できる。"""
+
+
+class Type(object):
+
+    """型を表すクラス(直接作らずに、primitive()、pointer()などで作る)
+       kind   : "int"、"void"、"pointer"、"array"、"fun"のいずれか
+       target : ポインタの指す先、配列の要素の型
+       size   : 配列の大きさ
+       result : 関数の返り値の型
+       params : 関数のパラメータの型のタプル
+       spec   : 以前の表現(エラーメッセージなどの表示に使う)"""
+
+    __slots__ = ("kind", "target", "size", "result", "params", "spec",
+                 "is_int", "is_void", "is_pointer", "is_array", "is_function")
+
+    def __init__(self, kind, target=None, size=None, result=None, params=(), spec=None):
+        self.kind = kind
+        self.target = target
+        self.size = size
+        self.result = result
+        self.params = params
+        self.spec = spec
+        self.is_int = kind == "int"
+        self.is_void = kind == "void"
+        self.is_pointer = kind == "pointer"
+        self.is_array = kind == "array"
+        self.is_function = kind == "fun"
+
+    def __getitem__(self, index):
+        """以前の表現のタプルとしての要素(objtype[2]で配列の大きさを読むコードのため)"""
+        return self.spec[index]
+
+    def __str__(self):
+        return str(self.spec)
+
+    def __repr__(self):
+        return repr(self.spec)
+
+    def __reduce__(self):
+        # 直列化して戻したときも表の中の同じオブジェクトになるようにする
+        return canonical, (self.spec,)
+
+
+TYPES = {}
+
+
+def intern(key, *args, **kwargs):
+    """keyの型を表から返す(なければType(*args, **kwargs)を作って表に加える)"""
+    objtype = TYPES.get(key)
+    if objtype is None:
+        objtype = TYPES[key] = Type(*args, **kwargs)
+    return objtype
+
+
+def primitive(name):
+    return intern((name,), name, spec=name)
+
+
+def pointer(target):
+    return intern(("pointer", target), "pointer", target=target, spec=("pointer", target.spec))
+
+
+def array(target, size):
+    return intern(("array", target, size), "array", target=target, size=size,
+                  spec=("array", target.spec, size))
+
+
+def function(result, params):
+    params = tuple(params)
+    return intern(("fun", result, params), "fun", result=result, params=params,
+                  spec=("fun", result.spec) + tuple(param.spec for param in params))
+
+
+INT = primitive("int")
+VOID = primitive("void")
+INT_POINTER = pointer(INT)
+
+
+def canonical(spec):
+    """以前の表現specを型に変換する(型ならそのまま返す)"""
+    if isinstance(spec, Type):
+        return spec
+    if isinstance(spec, basestring):
+        return primitive(spec)
+    if spec[0] == "pointer":
+        return pointer(canonical(spec[1]))
+    elif spec[0] == "array":
+        return array(canonical(spec[1]), spec[2])
+    elif spec[0] == "fun":
+        return function(canonical(spec[1]), [canonical(param) for param in spec[2:]])
+    raise ValueError("Unknown type: {0!r}".format(spec))
@@ -0,0 +1,66 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+import pickle
+import nose
+import typetable
+import semantic_analyzer as sa
+
+
+class TypeTableTest(TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_intern(self):
+        """同じ型はいつも同じオブジェクトになるかのテスト"""
+        nose.tools.ok_(typetable.pointer(typetable.INT) is typetable.INT_POINTER)
+        nose.tools.ok_(typetable.array(typetable.INT, 8) is typetable.array(typetable.primitive("int"), 8))
+        nose.tools.ok_(typetable.array(typetable.INT, 8) is not typetable.array(typetable.INT, 4))
+        nose.tools.ok_(typetable.function(typetable.VOID, [typetable.INT, typetable.INT_POINTER])
+                       is typetable.function(typetable.VOID, (typetable.INT, typetable.INT_POINTER)))
+
+    def test_fields(self):
+        """配列の大きさやポインタの指す先などが属性で読めるかのテスト"""
+        array = typetable.array(typetable.INT, 8)
+        pointer = typetable.pointer(array)
+        function = typetable.function(typetable.INT, [typetable.INT_POINTER])
+
+        nose.tools.eq_((True, 8, typetable.INT), (array.is_array, array.size, array.target))
+        nose.tools.eq_((True, array), (pointer.is_pointer, pointer.target))
+        nose.tools.eq_((typetable.INT, (typetable.INT_POINTER,)), (function.result, function.params))
+        nose.tools.ok_(typetable.INT.is_int and not typetable.INT.is_array)
+
+    def test_canonical(self):
+        """以前の表現(文字列とタプル)から同じ型に変換でき、表示も以前のままかのテスト"""
+        spec = ("fun", "int", "int", ("pointer", ("array", "int", 8)))
+        function = typetable.canonical(spec)
+
+        nose.tools.ok_(function is typetable.function(
+            typetable.INT, [typetable.INT, typetable.pointer(typetable.array(typetable.INT, 8))]))
+        nose.tools.ok_(typetable.canonical("int") is typetable.INT)
+        nose.tools.ok_(typetable.canonical(function) is function)
+        nose.tools.eq_(str(spec), str(function))
+        nose.tools.eq_(8, typetable.canonical(("array", "int", 8))[2])
+
+    def test_pickle(self):
+        """直列化して戻しても表の中の同じオブジェクトになるかのテスト"""
+        array = typetable.array(typetable.INT, 3)
+
+        nose.tools.ok_(pickle.loads(pickle.dumps(array, 2)) is array)
+        nose.tools.ok_(pickle.loads(pickle.dumps(typetable.VOID)) is typetable.VOID)
+
+    def test_decl(self):
+        """Declに以前の表現を渡しても型に変換され、比較できるかのテスト"""
+        decl = sa.Decl("a", 2, "var", ("array", "int", 5))
+
+        nose.tools.ok_(decl.objtype is typetable.array(typetable.INT, 5))
+        nose.tools.eq_(sa.Decl("a", 2, "var", typetable.array(typetable.INT, 5)), decl)
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])
@@ -0,0 +1,139 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""ノードの種類ごとに処理を呼び分けるためのモジュール
+
+   isinstanceを並べて呼び分けると、後ろにある種類のノードほど判定の回数が増える。
+   dispatcher()で作ったメソッドは、ノードのクラスから呼び出すメソッドを表で引くので、
+   どの種類のノードも同じ手間で呼び分けられる。
+
+   呼び出されるメソッドは 接頭辞 + ノードのクラス名 という名前で定義する。
+   ノードのクラスの名前で見つからなければ基底クラスの名前で探し(MROの順)、
+   見つけたメソッドはビジターのクラスとノードのクラスの組ごとに表に覚えておく。
+   抽象構文木のノードにも中間命令にも使える。
+
+   深く入れ子になったプログラム(長い式の連鎖や入れ子のブロック)をPythonの
+   スタックを使わずにたどれるように、子のノードの処理をジェネレータで書いて
+   run()で実行できる。ジェネレータの中では
+
+       value = yield self.visit(child)   # 子の処理を呼び出して結果を受け取る
+       yield Return(value)               # 自分の結果を返して終わる
+
+   のように書く。yieldしたものがジェネレータなら呼び出しとして実行し、Return
+   ならそのジェネレータの返り値とし、それ以外の値(ジェネレータでないメソッドの
+   返り値)はそのまま送り返す。最後までReturnしなかったジェネレータはNoneを返す。
+   run()は呼び出しを明示的なスタックで管理するので、入れ子の深さによらず
+   Pythonのスタックの深さは一定になる。"""
+
+import sys
+import types
+
+
+def dispatcher(prefix, default=None, memo=None):
+    """prefix + クラス名 のメソッドを呼び分けるメソッドを作る
+
+       作ったメソッドは (node, *args) を受け取り、呼び分けたメソッドを
+       (self, node, *args) で呼んでその返り値を返す。対応するメソッドがない
+       ノードのときは、defaultという名前のメソッドを呼ぶ(defaultがNoneなら
+       何もせずにNoneを返す)
+       memoに属性名を与えると、ノードのその属性の値がNoneでないときは
+       メソッドを呼ばずにその値を返す(呼び出されたメソッドが結果をノードに
+       記録しておけば、同じノードを処理し直さずに済む)"""
+    tables = {}
+
+    def resolve(visitor_class, node_class):
+        for klass in node_class.__mro__:
+            method = getattr(visitor_class, prefix + klass.__name__, None)
+            if method is not None:
+                return method.__func__
+        if default is not None:
+            return getattr(visitor_class, default).__func__
+        return ignore
+
+    def dispatch(self, node, *args):
+        if memo is not None:
+            value = getattr(node, memo, None)
+            if value is not None:
+                return value
+        visitor_class = type(self)
+        table = tables.get(visitor_class)
+        if table is None:
+            table = tables[visitor_class] = {}
+        node_class = type(node)
+        method = table.get(node_class)
+        if method is None:
+            method = table[node_class] = resolve(visitor_class, node_class)
+        return method(self, node, *args)
+
+    dispatch.__name__ = prefix + "dispatch"
+    dispatch.__doc__ = "ノードのクラスに応じて {0}<クラス名> のメソッドを呼び出す".format(prefix)
+    return dispatch
+
+
+def ignore(self, node, *args):
+    return None
+
+
+class Return(object):
+
+    """ジェネレータで書いた処理の返り値(yield Return(value)で返す)"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value=None):
+        self.value = value
+
+
+def run(task):
+    """taskがジェネレータなら、その中の呼び出しを明示的なスタックで実行して返り値を返す
+       ジェネレータでなければ(すでに計算された返り値なので)そのまま返す
+       呼び出し先で起きた例外は、呼び出し元のジェネレータの中に投げ直す"""
+    generator_type = types.GeneratorType
+    if type(task) is not generator_type:
+        return task
+    stack = [task]
+    push = stack.append
+    pop = stack.pop
+    send = task.send
+    value = None
+    error = None
+    while True:
+        try:
+            if error is None:
+                result = send(value)
+            else:
+                exc_info, error = error, None
+                result = stack[-1].throw(*exc_info)
+        except StopIteration:
+            result = Return()
+        except Exception:
+            pop()
+            if not stack:
+                raise
+            send = stack[-1].send
+            error = sys.exc_info()
+            continue
+
+        if type(result) is generator_type:
+            push(result)
+            send = result.send
+            value = None
+        elif type(result) is Return:
+            pop()
+            if not stack:
+                return result.value
+            send = stack[-1].send
+            value = result.value
+        else:
+            value = result
+
+
+class NodeVisitor(object):
+
+    """visit_<クラス名> のメソッドを呼び分けるビジターの基底クラス
+       対応するメソッドのないノードではgeneric_visitを呼ぶ"""
+
+    visit = dispatcher("visit_", "generic_visit")
+
+    def generic_visit(self, node, *args):
+        return None
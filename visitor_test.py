@@ -0,0 +1,150 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+import nose
+import ast
+import arena
+import visitor
+
+
+class NameVisitor(visitor.NodeVisitor):
+
+    def visit_Identifier(self, node):
+        return "identifier"
+
+    def visit_UnaryOperator(self, node):
+        return "unary"
+
+    def visit_NodeList(self, node):
+        return [self.visit(child) for child in node.nodes]
+
+    def generic_visit(self, node):
+        return type(node).__name__
+
+
+class DerivedVisitor(NameVisitor):
+
+    def visit_Pointer(self, node):
+        return "pointer"
+
+
+class ArgumentVisitor(object):
+
+    count = visitor.dispatcher("count_", "count_default")
+
+    def count_Number(self, node, total):
+        return total + node.value
+
+    def count_default(self, node, total):
+        return total
+
+
+class MemoVisitor(object):
+
+    """求めた値をノードのexptypeに記録するビジター"""
+
+    calls = 0
+    typeof = visitor.dispatcher("typeof_", memo="exptype")
+
+    def typeof_Number(self, node):
+        self.calls += 1
+        node.exptype = "int"
+        return node.exptype
+
+
+class DepthVisitor(visitor.NodeVisitor):
+
+    """ジェネレータで書いたビジター(単項演算子の入れ子の深さを数える)"""
+
+    def visit_UnaryOperator(self, node):
+        depth = yield self.visit(node.expression)
+        yield visitor.Return(depth + 1)
+
+    def visit_Identifier(self, node):
+        if node.identifier == "error":
+            raise ValueError(node.lineno)
+        return 0
+
+    def visit_NodeList(self, node):
+        try:
+            for child in node.nodes:
+                yield self.visit(child)
+        except ValueError as e:
+            yield visitor.Return(e.args[0])
+
+
+class VisitorTest(TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_dispatch(self):
+        """ノードのクラス名のメソッドが呼ばれ、なければ基底クラスの名前で探すかのテスト"""
+        v = NameVisitor()
+        identifier = ast.Identifier("a", 1)
+        arguments = ast.ArgumentExpressionList(identifier)
+        arguments.append(ast.Number(1))
+
+        nose.tools.eq_("identifier", v.visit(identifier))
+        nose.tools.eq_("unary", v.visit(ast.Pointer(identifier, 1)))
+        nose.tools.eq_("unary", v.visit(ast.Address(identifier, 1)))
+        nose.tools.eq_(["identifier", "Number"], v.visit(arguments))
+        nose.tools.eq_("NullNode", v.visit(ast.NullNode()))
+
+    def test_subclass(self):
+        """派生したビジターでは派生クラスのメソッドの表を使うかのテスト"""
+        pointer = ast.Pointer(ast.Identifier("a", 1), 1)
+
+        nose.tools.eq_("unary", NameVisitor().visit(pointer))
+        nose.tools.eq_("pointer", DerivedVisitor().visit(pointer))
+        nose.tools.eq_("unary", NameVisitor().visit(pointer))
+
+    def test_arguments(self):
+        """追加の引数と返り値がそのまま渡されるかのテスト"""
+        v = ArgumentVisitor()
+
+        nose.tools.eq_(5, v.count(ast.Number(2), 3))
+        nose.tools.eq_(3, v.count(ast.NullNode(), 3))
+
+    def test_memo(self):
+        """memoの属性に値が記録されたノードではメソッドを呼ばないかのテスト"""
+        v = MemoVisitor()
+        number = ast.Number(1)
+
+        nose.tools.eq_("int", v.typeof(number))
+        nose.tools.eq_("int", v.typeof(number))
+        nose.tools.eq_(1, v.calls)
+        nose.tools.eq_(None, v.typeof(ast.NullNode()))
+
+    def test_arena_view(self):
+        """arenaのビューもクラス名で呼び分けられるかのテスト"""
+        tree = ast.ArgumentExpressionList(ast.Pointer(ast.Identifier("a", 1), 1))
+        view = arena.Arena.from_tree(tree).root_view()
+
+        nose.tools.eq_(["pointer"], DerivedVisitor().visit(view))
+
+    def test_run(self):
+        """run()で入れ子の呼び出しがPythonのスタックを使わずに実行されるかのテスト"""
+        node = ast.Identifier("a", 1)
+        for _ in range(10000):
+            node = ast.Pointer(node, 1)
+
+        nose.tools.eq_(10000, visitor.run(DepthVisitor().visit(node)))
+        nose.tools.eq_(0, visitor.run(DepthVisitor().visit(ast.Identifier("a", 1))))
+        nose.tools.eq_(None, visitor.run(DepthVisitor().visit(ast.ArgumentExpressionList(node))))
+
+    def test_run_exception(self):
+        """呼び出し先の例外が呼び出し元のジェネレータに投げ直されるかのテスト"""
+        arguments = ast.ArgumentExpressionList(ast.Pointer(ast.Identifier("error", 7), 1))
+
+        nose.tools.eq_(7, visitor.run(DepthVisitor().visit(arguments)))
+        nose.tools.assert_raises(ValueError, visitor.run,
+                                 DepthVisitor().visit(ast.Pointer(ast.Identifier("error", 7), 1)))
+
+
+if __name__ == '__main__':
+    nose.main(argv=['nose', '-v'])